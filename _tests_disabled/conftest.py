@@ -165,3 +165,62 @@ def test_product(app, test_db, test_company):
         test_db.session.add(product)
         test_db.session.commit()
         return product
+
+
+@pytest.fixture(scope='function')
+def file_app(tmp_path, monkeypatch):
+    """Isolated app on a file-backed SQLite database (concurrency and benchmark tests).
+
+    In-memory SQLite shares a single connection, so it cannot be used from threads.
+    The schema is created directly from the models.
+    """
+    from config import TestingConfig
+
+    monkeypatch.setenv('ENV', 'testing')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'app.db'}")
+
+    app = create_app('testing')
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    with app.app_context():
+        db.create_all()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture(scope='function')
+def make_tenant(file_app):
+    """Factory creating an approved company with an admin user; returns the company id."""
+    def _make_tenant(name, username, password='Test123!'):
+        with file_app.app_context():
+            company = Company(name=name, authorized_person='Test', email=f'{username}@test.com', status='approved')
+            db.session.add(company)
+            db.session.flush()
+            user = User(
+                company_id=company.id,
+                username=username,
+                email=f'{username}@user.test',
+                role='admin',
+                is_active=True,
+                force_password_change=False
+            )
+            user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+            return company.id
+    return _make_tenant
+
+
+@pytest.fixture(scope='function')
+def login_as(file_app):
+    """Factory returning a fresh test client logged in as the given user."""
+    def _login_as(username, password='Test123!'):
+        client = file_app.test_client()
+        response = client.post('/auth/login', data={'username': username, 'password': password})
+        assert response.status_code == 302
+        return client
+    return _login_as
@@ -0,0 +1,187 @@
+"""
+Streaming backup pipeline tests: SQLite source, compression, AES-GCM,
+manifest integrity and resumable chunked uploads against a fake Drive.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+from services.backup_pipeline import (
+    BackupError, LocalUploader, UploadCompleted, decrypt_stream, encrypt_stream, process_source, restore_stream, run_pipeline,
+    sqlite_source
+)
+from services.backup_service import BackupService
+
+KEY = bytes(range(32))
+
+
+class FakeDriveUploader:
+    """In-memory resumable upload sessions.
+
+    Selected sends persist half the data and then fail, selected status probes
+    fail, and lose_final_response completes the upload but drops the response.
+    """
+
+    def __init__(self, fail_sends=(), fail_probes=(), lose_final_response=False):
+        self.sessions = {}
+        self.files = {}
+        self.fail_sends = set(fail_sends)
+        self.fail_probes = set(fail_probes)
+        self.lose_final_response = lose_final_response
+        self.sends = 0
+        self.probes = 0
+
+    def begin(self, name):
+        self.sessions[name] = bytearray()
+        return name
+
+    def committed(self, session):
+        self.probes += 1
+        if self.probes in self.fail_probes:
+            raise ConnectionError('durum sorgusu zaman aşımı')
+        if session in self.files:
+            raise UploadCompleted(f'drive-{session}')
+        return len(self.sessions[session])
+
+    def send(self, session, offset, data, final):
+        self.sends += 1
+        buffer = self.sessions[session]
+        assert offset == len(buffer), 'upload must resume exactly at the committed offset'
+        if self.sends in self.fail_sends:
+            buffer += data[:len(data) // 2]
+            raise ConnectionError('bağlantı koptu')
+        buffer += data
+        if final:
+            self.files[session] = bytes(buffer)
+            if self.lose_final_response:
+                self.lose_final_response = False
+                raise ConnectionError('yanıt kayboldu')
+            return f'drive-{session}'
+        return None
+
+    def put_bytes(self, name, data):
+        self.files[name] = data
+        return f'drive-{name}'
+
+
+@pytest.fixture
+def source_db(tmp_path):
+    path = tmp_path / 'source.db'
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, balance NUMERIC)')
+    connection.executemany('INSERT INTO customers (name, balance) VALUES (?, ?)', [
+        (f'Müşteri {i} {os.urandom(16).hex()}', i * 1.5) for i in range(20000)
+    ])
+    connection.commit()
+    connection.close()
+    return path
+
+
+def _restore(dump):
+    connection = sqlite3.connect(':memory:')
+    connection.executescript(dump.decode())
+    return connection.execute('SELECT COUNT(*), SUM(balance) FROM customers').fetchone()
+
+
+class TestPipeline:
+    """Dump → compress → encrypt → hash → upload, verified on restore."""
+
+    def test_backup_service_roundtrip(self, source_db, tmp_path, monkeypatch):
+        monkeypatch.setenv('BACKUP_ENCRYPTION_KEY', base64.b64encode(KEY).decode())
+        monkeypatch.setenv('BACKUP_DIR', str(tmp_path / 'backup'))
+        monkeypatch.setenv('BACKUP_MODE', 'stream')
+        drive = FakeDriveUploader()
+        service = BackupService(database_url=f'sqlite:///{source_db}', uploader=drive)
+
+        manifest = service.create_backup()
+
+        name = manifest['name']
+        assert name.startswith('muhasebe_backup_') and name.endswith('.sql.zst.enc')
+        assert manifest['encryption'] and manifest['compression'] == 'zstd'
+        assert manifest['size'] == len(drive.files[name])
+        assert manifest['size'] < manifest['raw_size']
+        assert json.loads(drive.files[name + '.manifest.json']) == manifest
+        with open(tmp_path / 'backup' / 'manifests' / f'{name}.manifest.json') as f:
+            assert json.load(f) == manifest
+        # No plaintext reaches the uploader
+        assert b'CREATE TABLE' not in drive.files[name]
+
+        dump = b''.join(restore_stream([drive.files[name]], manifest, KEY))
+        assert _restore(dump) == (20000, sum(i * 1.5 for i in range(20000)))
+
+    def test_resumes_failed_chunks(self, source_db, tmp_path):
+        drive = FakeDriveUploader(fail_sends={2, 3, 5})
+        manifest = run_pipeline(
+            sqlite_source(str(source_db)), drive, 'resume.sql.gz', 'sqlite', compression='gzip',
+            chunk_size=256 * 1024, retry_backoff=0
+        )
+        assert manifest['upload_retries'] == 3
+        assert manifest['chunks'] >= 3
+        dump = b''.join(restore_stream([drive.files['resume.sql.gz']], manifest))
+        assert _restore(dump)[0] == 20000
+
+    def test_probe_failures_are_retried(self, source_db):
+        drive = FakeDriveUploader(fail_sends={2}, fail_probes={1, 2})
+        manifest = run_pipeline(
+            sqlite_source(str(source_db)), drive, 'probe.sql.gz', 'sqlite', compression='gzip',
+            chunk_size=256 * 1024, retry_backoff=0
+        )
+        assert manifest['upload_retries'] == 3
+        assert _restore(b''.join(restore_stream([drive.files['probe.sql.gz']], manifest)))[0] == 20000
+
+    def test_lost_final_response_counts_as_success(self, source_db):
+        drive = FakeDriveUploader(lose_final_response=True)
+        manifest = run_pipeline(sqlite_source(str(source_db)), drive, 'lost.sql.gz', 'sqlite',
+                                compression='gzip', retry_backoff=0)
+        assert manifest['remote_id'] == 'drive-lost.sql.gz'
+        assert manifest['upload_retries'] == 1
+        assert manifest['size'] == len(drive.files['lost.sql.gz'])
+
+    def test_gives_up_after_retries(self, source_db):
+        drive = FakeDriveUploader(fail_sends=set(range(1, 10)))
+        with pytest.raises(BackupError, match='yüklenemedi'):
+            run_pipeline(sqlite_source(str(source_db)), drive, 'fail.sql.gz', 'sqlite',
+                         compression='gzip', retries=2, retry_backoff=0)
+
+    def test_local_uploader(self, source_db, tmp_path):
+        uploader = LocalUploader(str(tmp_path / 'local'))
+        manifest = run_pipeline(sqlite_source(str(source_db)), uploader, 'local.sql.zst.enc', 'sqlite', key=KEY)
+        assert not any(name.endswith('.part') for name in os.listdir(tmp_path / 'local'))
+        dump = b''.join(restore_stream(uploader.open('local.sql.zst.enc'), manifest, KEY))
+        assert _restore(dump)[0] == 20000
+
+
+class TestIntegrity:
+    """Tampering, truncation and wrong keys are detected."""
+
+    def test_encryption_detects_tampering(self):
+        sealed = b''.join(encrypt_stream([b'a' * 3000, b'b' * 3000], KEY, segment_size=1024))
+        assert b''.join(decrypt_stream([sealed], KEY)) == b'a' * 3000 + b'b' * 3000
+
+        tampered = bytearray(sealed)
+        tampered[40] ^= 1
+        with pytest.raises(BackupError, match='doğrulanamadı'):
+            b''.join(decrypt_stream([bytes(tampered)], KEY))
+        # Dropping whole trailing segments is detected as well
+        with pytest.raises(BackupError, match='eksik'):
+            b''.join(decrypt_stream([sealed[:12 + 2 * (5 + 1024 + 16)]], KEY))
+        with pytest.raises(BackupError):
+            b''.join(decrypt_stream([sealed], bytes(32)))
+
+    def test_manifest_mismatch_and_wrong_key(self, source_db):
+        drive = FakeDriveUploader()
+        manifest = run_pipeline(sqlite_source(str(source_db)), drive, 'x.enc', 'sqlite', key=KEY)
+        with pytest.raises(BackupError, match='key_id'):
+            b''.join(restore_stream([drive.files['x.enc']], manifest, bytes(32)))
+        with pytest.raises(BackupError, match='manifestle'):
+            b''.join(restore_stream([drive.files['x.enc']], dict(manifest, sha256='0' * 64), KEY))
+
+    def test_failing_source_command(self):
+        command = [sys.executable, '-c', 'import sys; sys.stdout.write("x"); sys.stderr.write("boom"); sys.exit(3)']
+        with pytest.raises(BackupError, match='boom'):
+            b''.join(process_source(command))
@@ -0,0 +1,210 @@
+"""
+Deduplicated backup store tests: content-defined chunking, incremental
+uploads, restore integrity, GFS retention and reference-counted GC.
+"""
+
+import base64
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.backup_pipeline import BackupError
+from services.backup_service import BackupService
+from services import backup_store
+from services.backup_store import ChunkStore, LocalObjectStore, chunk_stream, gfs_keep
+
+KEY = bytes(range(32))
+SMALL = {'min_size': 4 * 1024, 'avg_size': 16 * 1024, 'max_size': 64 * 1024}
+
+
+def _data(size, seed=1):
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.fixture
+def store(tmp_path):
+    chunk_store = ChunkStore(LocalObjectStore(str(tmp_path / 'objects')), str(tmp_path / 'index.sqlite3'), key=KEY)
+    yield chunk_store
+    chunk_store.close()
+
+
+def _stored_chunks(tmp_path):
+    return {name for _, _, files in os.walk(tmp_path / 'objects' / 'chunks') for name in files}
+
+
+class TestChunking:
+    """Chunk boundaries depend on content, so local edits only touch nearby chunks."""
+
+    def test_sizes_and_edit_locality(self):
+        data = _data(1024 * 1024)
+        chunks = list(chunk_stream([data[i:i + 5000] for i in range(0, len(data), 5000)], **SMALL))
+        assert b''.join(chunks) == data
+        assert all(SMALL['min_size'] <= len(chunk) <= SMALL['max_size'] for chunk in chunks[:-1])
+
+        edited = data[:300000] + b'yeni fatura satiri' + data[300000:]
+        edited_chunks = list(chunk_stream([edited], **SMALL))
+        assert len(set(edited_chunks) - set(chunks)) <= 2
+
+    def test_vectorised_scan_matches_python_loop(self, monkeypatch):
+        pytest.importorskip('numpy')
+        data = _data(1024 * 1024, seed=7)
+        # Small scan blocks so boundaries also fall across block edges
+        monkeypatch.setattr(backup_store, '_SCAN_BLOCK', 3000)
+        vectorised = [len(chunk) for chunk in chunk_stream([data], **SMALL)]
+        monkeypatch.setattr(backup_store, 'numpy', None)
+        assert [len(chunk) for chunk in chunk_stream([data], **SMALL)] == vectorised
+
+
+class TestStore:
+    """Incremental backups upload only unseen chunks and restore byte-for-byte."""
+
+    def test_incremental_backup_and_restore(self, store, tmp_path):
+        data = _data(2 * 1024 * 1024)
+        first = store.backup([data], 'b1', 'sqlite', **SMALL)
+        assert first['reused_chunks'] == 0
+        assert first['encryption'] == 'aes-256-gcm'
+
+        changed = data[:1000000] + b'X' * 100 + data[1000100:]
+        second = store.backup([changed], 'b2', 'sqlite', **SMALL)
+        assert second['new_chunks'] <= 2
+        assert second['uploaded_bytes'] < first['uploaded_bytes'] / 10
+
+        assert b''.join(store.restore('b1')) == data
+        assert b''.join(store.restore('b2')) == changed
+        # Chunks are encrypted at rest
+        for path in (tmp_path / 'objects' / 'chunks').rglob('*'):
+            if path.is_file():
+                assert path.read_bytes()[6:] not in data
+
+        stats = store.stats()
+        assert stats['snapshots'] == 2
+        assert stats['dedup_ratio'] > 1.5
+
+    def test_tampering_and_wrong_key(self, store, tmp_path):
+        store.backup([_data(200 * 1024)], 'b1', 'sqlite', **SMALL)
+        path = next(p for p in (tmp_path / 'objects' / 'chunks').rglob('*') if p.is_file())
+        blob = bytearray(path.read_bytes())
+        blob[-1] ^= 1
+        path.write_bytes(bytes(blob))
+        with pytest.raises(BackupError, match='doğrulanamadı'):
+            b''.join(store.restore('b1'))
+
+        other = ChunkStore(store.objects, str(tmp_path / 'index.sqlite3'), key=bytes(32))
+        try:
+            with pytest.raises(BackupError):
+                b''.join(other.restore('b1'))
+        finally:
+            other.close()
+
+    def test_rebuild_index(self, store, tmp_path):
+        data = _data(300 * 1024)
+        store.backup([data], 'b1', 'sqlite', **SMALL)
+        store.backup([data + b'son'], 'b2', 'sqlite', **SMALL)
+        expected = dict(store.index.execute('SELECT id, refs FROM chunks'))
+        store.close()
+        os.remove(tmp_path / 'index.sqlite3')
+
+        rebuilt = ChunkStore(store.objects, str(tmp_path / 'index.sqlite3'), key=KEY)
+        try:
+            assert rebuilt.rebuild_index() == (2, len(expected), 0)
+            assert dict(rebuilt.index.execute('SELECT id, refs FROM chunks')) == expected
+            assert b''.join(rebuilt.restore('b2')) == data + b'son'
+        finally:
+            rebuilt.close()
+
+
+class TestRetention:
+    """Grandfather-father-son selection and reference-counted garbage collection."""
+
+    def test_gfs_keep(self):
+        end = datetime(2024, 6, 30, 3, 0)
+        # Two backups per day for a year
+        snapshots = [(f's{i}', end - timedelta(hours=12 * i)) for i in range(730)]
+        keep = gfs_keep(snapshots, daily=7, weekly=4, monthly=12)
+        assert 's0' in keep
+        kept = sorted((created for name, created in snapshots if name in keep), reverse=True)
+        # 7 days, plus older weeks/months; never more than the sum of the limits
+        assert len(keep) <= 7 + 4 + 12
+        assert len({created.date() for created in kept[:7]}) == 7
+        assert len({(created.year, created.month) for created in kept}) == 12
+        assert gfs_keep([('only', end)], daily=0, weekly=0, monthly=0) == {'only'}
+
+    def test_retention_collects_only_orphan_chunks(self, store, tmp_path):
+        shared = _data(256 * 1024, seed=2)
+        old, new = datetime(2024, 1, 1), datetime(2024, 6, 1)
+        store.backup([_data(128 * 1024, seed=3) + shared], 'old', 'sqlite', **SMALL)
+        store.backup([shared + _data(128 * 1024, seed=4)], 'new', 'sqlite', **SMALL)
+        store.index.execute("UPDATE snapshots SET created_at = ? WHERE name = 'old'", (old.isoformat(),))
+        store.index.execute("UPDATE snapshots SET created_at = ? WHERE name = 'new'", (new.isoformat(),))
+        before = _stored_chunks(tmp_path)
+
+        with pytest.raises(BackupError, match='zaten var'):
+            store.backup([shared], 'new', 'sqlite', **SMALL)
+
+        removed, chunks, freed = store.apply_retention(daily=1, weekly=0, monthly=0)
+        assert removed == ['old'] and [name for name, _ in store.snapshots()] == ['new']
+        # Orphans wait out the grace period
+        assert chunks == 0
+
+        assert store.collect_garbage(grace_seconds=0)[0] > 0
+        remaining = _stored_chunks(tmp_path)
+        assert remaining < before
+        assert remaining == {chunk_id for chunk_id in store.manifest('new')['chunks']}
+        assert b''.join(store.restore('new')) == shared + _data(128 * 1024, seed=4)
+
+
+class TestBackupService:
+    """BackupService uses the dedup store and applies retention after each backup."""
+
+    def test_dedup_backup_with_local_target(self, tmp_path, monkeypatch):
+        db_path = tmp_path / 'source.db'
+        connection = sqlite3.connect(db_path)
+        connection.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)')
+        connection.executemany('INSERT INTO customers (name) VALUES (?)',
+                               [(f'Müşteri {i} {os.urandom(8).hex()}',) for i in range(30000)])
+        connection.commit()
+        monkeypatch.setenv('BACKUP_DIR', str(tmp_path / 'backup'))
+        monkeypatch.setenv('BACKUP_TARGET', 'local')
+        monkeypatch.setenv('BACKUP_ENCRYPTION_KEY', base64.b64encode(KEY).decode())
+        service = BackupService(database_url=f'sqlite:///{db_path}')
+
+        first = service.create_backup()
+        connection.execute("UPDATE customers SET name = 'Değişti' WHERE id = 15000")
+        connection.commit()
+        connection.close()
+        time.sleep(1)  # Backup names have one-second resolution
+        second = service.create_backup()
+
+        assert second['new_chunks'] < len(second['chunks'])
+        assert second['uploaded_bytes'] < first['uploaded_bytes']
+        store = service.store()
+        try:
+            dump = b''.join(store.restore(second['name'])).decode()
+        finally:
+            store.close()
+        assert "'Değişti'" in dump
+
+    def test_missing_index_is_rebuilt_from_store(self, tmp_path, monkeypatch):
+        db_path = tmp_path / 'source.db'
+        connection = sqlite3.connect(db_path)
+        connection.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)')
+        connection.executemany('INSERT INTO customers (name) VALUES (?)', [(f'Müşteri {i}',) for i in range(5000)])
+        connection.commit()
+        connection.close()
+        monkeypatch.setenv('BACKUP_DIR', str(tmp_path / 'backup'))
+        monkeypatch.setenv('BACKUP_TARGET', 'local')
+        service = BackupService(database_url=f'sqlite:///{db_path}')
+        first = service.create_backup()
+
+        # A recreated container starts without the index file
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(tmp_path / 'backup' / f'store.sqlite3{suffix}'):
+                os.remove(tmp_path / 'backup' / f'store.sqlite3{suffix}')
+        assert service.latest_manifest()['name'] == first['name']
+        time.sleep(1)  # Backup names have one-second resolution
+        second = service.create_backup()
+        assert second['new_chunks'] == 0
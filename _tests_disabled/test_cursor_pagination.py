@@ -0,0 +1,127 @@
+"""
+Keyset cursor pagination tests: walking every page returns each row exactly
+once in the offset order, cursors are tenant-scoped and tamper-checked.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from models import db, Customer, CustomerTransaction, Product, Supplier, Transaction
+
+
+def _walk(client, url, **params):
+    """Follow next_cursor until the last page and return all item ids."""
+    ids, cursor = [], ''
+    while True:
+        query = '&'.join(f'{key}={value}' for key, value in dict(params, cursor=cursor).items())
+        response = client.get(f'{url}?{query}')
+        assert response.status_code == 200, response.get_json()
+        data = response.get_json()
+        ids.extend(item['id'] for item in data['items'])
+        if not data['has_next']:
+            assert data['next_cursor'] is None
+            return ids
+        cursor = data['next_cursor']
+
+
+@pytest.fixture
+def seeded(file_app, make_tenant):
+    company_id = make_tenant('İmleç', 'cursor_admin')
+    other_id = make_tenant('Diğer', 'cursor_other')
+    with file_app.app_context():
+        start = date(2026, 1, 1)
+        # Aynı tarihte birden çok kayıt: id ile kararlı sıra gerekir
+        db.session.add_all([
+            Transaction(company_id=company_id, type='income', amount=i + 1, date=start + timedelta(days=i // 3))
+            for i in range(47)
+        ])
+        db.session.add_all([
+            Transaction(company_id=other_id, type='income', amount=1, date=start) for _ in range(5)
+        ])
+        customers = [Customer(company_id=company_id, name=f'Müşteri {i % 7}') for i in range(23)]
+        db.session.add_all(customers)
+        db.session.add_all([
+            Product(company_id=company_id, name=f'Ürün {i % 4}', unit='adet', unit_price=1) for i in range(11)
+        ])
+        db.session.add_all([
+            Supplier(company_id=company_id, name=f'Tedarikçi {i}', balance=i % 3) for i in range(9)
+        ])
+        db.session.commit()
+        db.session.add_all([
+            CustomerTransaction(customer_id=customers[0].id, type='debt', amount=1,
+                                date=start + timedelta(days=i % 2))
+            for i in range(13)
+        ])
+        db.session.commit()
+        return {'company_id': company_id, 'customer_id': customers[0].id}
+
+
+class TestCursorPagination:
+    """Every endpoint's cursor walk matches the full ordered result."""
+
+    def test_transactions_walk(self, file_app, seeded, login_as):
+        client = login_as('cursor_admin')
+        ids = _walk(client, '/api/transactions', limit=10)
+        with file_app.app_context():
+            expected = [t.id for t in Transaction.query.filter_by(company_id=seeded['company_id']).order_by(
+                Transaction.date.desc(), Transaction.id.desc())]
+        assert ids == expected
+        assert len(ids) == 47
+        # Offset mode breaks date ties on id as well
+        offset_ids = [item['id'] for page in range(1, 6)
+                      for item in client.get(f'/api/transactions?page={page}&per_page=10').get_json()['items']]
+        assert offset_ids == expected
+
+    def test_name_ordered_endpoints(self, file_app, seeded, login_as):
+        client = login_as('cursor_admin')
+        with file_app.app_context():
+            customers = [c.id for c in Customer.query.filter_by(company_id=seeded['company_id']).order_by(
+                Customer.name, Customer.id)]
+            products = [p.id for p in Product.query.filter_by(company_id=seeded['company_id']).order_by(
+                Product.name, Product.id)]
+            suppliers = [s.id for s in Supplier.query.filter_by(company_id=seeded['company_id']).order_by(
+                Supplier.balance.desc(), Supplier.id.desc())]
+        assert _walk(client, '/api/customers', limit=4) == customers
+        assert _walk(client, '/api/products', limit=3) == products
+        assert _walk(client, '/api/suppliers', limit=2, sort='-balance') == suppliers
+
+    def test_supplier_balance_filters(self, seeded, login_as):
+        client = login_as('cursor_admin')
+        balances = [item['balance'] for item in client.get(
+            '/api/suppliers?min_balance=0.99&max_balance=1.00').get_json()['items']]
+        assert balances == ['1.00'] * 3
+        assert client.get('/api/suppliers?min_balance=1.001').get_json()['total'] == 3
+        for value in ('abc', 'NaN', 'Infinity', '1,5'):
+            response = client.get(f'/api/suppliers?max_balance={value}')
+            assert response.status_code == 400, value
+            assert 'max_balance' in response.get_json()['error']
+
+    def test_ledger_walk(self, file_app, seeded, login_as):
+        client = login_as('cursor_admin')
+        ids = _walk(client, f"/api/customers/{seeded['customer_id']}/transactions", limit=5)
+        assert len(ids) == len(set(ids)) == 13
+
+    def test_counts_on_request(self, seeded, login_as):
+        client = login_as('cursor_admin')
+        data = client.get('/api/transactions?cursor=&limit=5').get_json()
+        assert 'total' not in data
+        exact = client.get('/api/transactions?cursor=&limit=5&count=exact').get_json()
+        assert exact['total'] == 47 and exact['total_is_estimate'] is False
+        approx = client.get('/api/transactions?cursor=&limit=5&count=approx').get_json()
+        assert approx['total'] == 47
+
+    def test_invalid_cursors_are_rejected(self, seeded, login_as):
+        client = login_as('cursor_admin')
+        assert client.get('/api/transactions?cursor=bm90LWpzb24').status_code == 400
+        assert client.get('/api/transactions?cursor=!!!').status_code == 400
+        # Başka sıralamanın imleci kabul edilmez
+        name_cursor = client.get('/api/customers?cursor=&limit=1').get_json()['next_cursor']
+        assert client.get(f'/api/transactions?cursor={name_cursor}').status_code == 400
+        assert client.get('/api/transactions?cursor=&count=all').status_code == 400
+
+    def test_cursor_does_not_cross_tenants(self, seeded, login_as):
+        cursor = login_as('cursor_admin').get('/api/transactions?cursor=&limit=1').get_json()['next_cursor']
+        data = login_as('cursor_other').get(f'/api/transactions?cursor={cursor}&limit=100').get_json()
+        assert len(data['items']) == 5
+        assert all(item['amount'] == '1.00' for item in data['items'])
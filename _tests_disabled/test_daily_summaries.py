@@ -0,0 +1,91 @@
+"""
+Daily summary rollup tests: API writes keep daily_summaries in step with the
+raw tables, and reports read from it.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from models import db, Customer, Product, DailySummary
+from services.summary_service import backfill_daily_summaries, summary_totals
+
+
+def _summaries(app, company_id):
+    with app.app_context():
+        return {
+            row.date: tuple(getattr(row, column) for column in DailySummary.TOTAL_COLUMNS)
+            for row in DailySummary.query.filter_by(company_id=company_id)
+        }
+
+
+def _nonzero(summaries):
+    return {day: values for day, values in summaries.items() if any(values)}
+
+
+class TestDailySummaries:
+    """Incremental maintenance matches a full backfill."""
+
+    def test_api_writes_maintain_summaries(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Özet', 'summary_admin')
+        other_id = make_tenant('Diğer', 'summary_other')
+        with file_app.app_context():
+            customer = Customer(company_id=company_id, name='Ayşe')
+            product = Product(company_id=company_id, name='Çay', unit='adet', unit_price=5)
+            db.session.add_all([customer, product])
+            db.session.commit()
+            customer_id, product_id = customer.id, product.id
+        client = login_as('summary_admin')
+        login_as('summary_other').post('/api/transactions', json={
+            'type': 'income', 'amount': '999', 'date': '2026-03-01'
+        })
+
+        client.post('/api/transactions', json={'type': 'income', 'amount': '100.10', 'date': '2026-03-01'})
+        client.post('/api/transactions', json={'type': 'expense', 'amount': '40', 'date': '2026-03-01'})
+        moved = client.post('/api/transactions', json={'type': 'income', 'amount': '25', 'date': '2026-03-02'}).get_json()
+        deleted = client.post('/api/transactions', json={'type': 'income', 'amount': '7', 'date': '2026-03-02'}).get_json()
+
+        client.put(f"/api/transactions/{moved['id']}", json={
+            'type': 'expense', 'amount': '30', 'description': '', 'date': '2026-03-03'
+        })
+        client.delete(f"/api/transactions/{deleted['id']}")
+
+        response = client.post('/api/receipts', json={
+            'customer_id': customer_id, 'total_amount': '50', 'tax_rate': '20', 'date': '2026-03-02',
+            'items': [{'product_id': product_id, 'quantity': 10, 'unit_price': 5, 'total_price': 50}]
+        })
+        assert response.status_code == 201
+        client.post(f'/api/customers/{customer_id}/transactions', json={
+            'type': 'payment', 'amount': '20', 'date': '2026-03-03'
+        })
+
+        incremental = _nonzero(_summaries(file_app, company_id))
+        assert incremental == {
+            date(2026, 3, 1): (Decimal('100.10'), Decimal('40.00'), 0, Decimal('0.00'), Decimal('0.00'), Decimal('0.00')),
+            date(2026, 3, 2): (Decimal('0.00'), Decimal('0.00'), 1, Decimal('60.00'), Decimal('60.00'), Decimal('0.00')),
+            date(2026, 3, 3): (Decimal('0.00'), Decimal('30.00'), 0, Decimal('0.00'), Decimal('0.00'), Decimal('20.00')),
+        }
+
+        with file_app.app_context():
+            backfill_daily_summaries(company_id)
+        assert _nonzero(_summaries(file_app, company_id)) == incremental
+
+        with file_app.app_context():
+            totals = summary_totals(company_id, date(2026, 3, 1), date(2026, 3, 31))
+            assert totals['income_total'] == Decimal('100.10')
+            assert totals['expense_total'] == Decimal('70.00')
+            assert summary_totals(other_id)['income_total'] == Decimal('999.00')
+            assert summary_totals(None)['income_total'] == Decimal('0.00')
+
+    def test_profit_loss_report_reads_summaries(self, file_app, make_tenant, login_as):
+        make_tenant('Rapor', 'summary_report')
+        client = login_as('summary_report')
+        client.post('/api/transactions', json={'type': 'income', 'amount': '80', 'date': '2026-02-10'})
+        client.post('/api/transactions', json={'type': 'expense', 'amount': '30', 'date': '2026-02-11'})
+
+        response = client.get('/reports/profit-loss?year=2026&month=2')
+        assert response.status_code == 200
+        assert b'02/2026' in response.data
+
+        stats = client.get('/api/stats/dashboard').get_json()
+        assert stats['total_income'] == 80.0
+        assert stats['cash_balance'] == 50.0
@@ -0,0 +1,98 @@
+"""
+Connection pool tests: per-environment engine options, checkout wait and
+usage metrics, the slow-checkout warning and the platform-admin stats endpoint.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from db_pool import TimedQueuePool, engine_options, install_pool_metrics
+from models import db, User
+
+
+class TestEngineOptions:
+    """Pool settings come from config; SQLite only gets the timed pool."""
+
+    def test_postgres_options_follow_config(self):
+        options = engine_options({'DB_POOL_SIZE': 8, 'DB_MAX_OVERFLOW': 2, 'DB_POOL_TIMEOUT': 10,
+                                  'DB_POOL_RECYCLE': 600, 'DB_POOL_PRE_PING': False},
+                                 'postgresql+pg8000://u:p@db/muhasebe')
+        assert options == {'poolclass': TimedQueuePool, 'pool_size': 8, 'max_overflow': 2,
+                           'pool_timeout': 10, 'pool_recycle': 600, 'pool_pre_ping': False}
+
+    def test_sqlite_options(self):
+        assert engine_options({}, 'sqlite:///:memory:') == {}
+        assert engine_options({'DB_POOL_SIZE': 8}, 'sqlite:///muhasebe.db') == {'poolclass': TimedQueuePool}
+
+
+class TestPoolMetrics:
+    """Checkouts record wait time and usage; slow waits are counted and logged."""
+
+    def test_waiting_for_a_busy_pool(self, tmp_path, caplog):
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool,
+                               pool_size=1, max_overflow=0, pool_timeout=5)
+        metrics = install_pool_metrics(engine, slow_checkout_ms=100)
+        holding = threading.Event()
+
+        def hold_connection():
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+                holding.set()
+                time.sleep(0.3)
+
+        thread = threading.Thread(target=hold_connection)
+        thread.start()
+        holding.wait()
+        with caplog.at_level(logging.WARNING, logger='db_pool'):
+            with engine.connect() as conn:
+                assert metrics.snapshot()['checked_out'] == 1
+                conn.execute(text('SELECT 1'))
+        thread.join()
+
+        stats = metrics.snapshot()
+        assert stats['checkouts'] == 2
+        assert stats['slow_checkouts'] == 1
+        assert stats['checked_out'] == 0
+        assert stats['checked_out_peak'] == 1
+        assert stats['pool_size'] == 1
+        assert 0.2 < stats['wait_seconds_max'] <= stats['wait_seconds_total']
+        assert stats['wait_buckets']['0.5'] == 2
+        assert stats['wait_buckets']['0.1'] == 1
+        assert 'Yavaş havuz checkout' in caplog.text
+
+    def test_overflow_peak(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool,
+                               pool_size=1, max_overflow=2)
+        metrics = install_pool_metrics(engine)
+        connections = [engine.connect() for _ in range(3)]
+        assert metrics.snapshot()['overflow'] == 2
+        for conn in connections:
+            conn.close()
+        stats = metrics.snapshot()
+        assert (stats['overflow_peak'], stats['checked_out_peak'], stats['max_overflow']) == (2, 3, 2)
+
+    def test_metrics_survive_dispose(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool)
+        metrics = install_pool_metrics(engine)
+        engine.dispose(close=False)
+        with engine.connect():
+            pass
+        assert metrics.snapshot()['checkouts'] == 1
+
+
+def test_pool_stats_endpoint(file_app, make_tenant, login_as):
+    make_tenant('Havuz', 'pool_admin')
+    client = login_as('pool_admin')
+    assert client.get('/api/stats/pool').status_code == 403
+
+    with file_app.app_context():
+        user = User.query.filter_by(username='pool_admin').one()
+        user.role = 'platform_admin'
+        db.session.commit()
+    client = login_as('pool_admin')
+    data = client.get('/api/stats/pool').get_json()
+    assert data['pool']['pool_class'] == 'TimedQueuePool'
+    assert data['pool']['checkouts'] > 0
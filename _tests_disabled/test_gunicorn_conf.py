@@ -0,0 +1,64 @@
+"""
+Gunicorn profile tests: worker sizing per profile and environment overrides,
+and X-Request-Start parsing for the queue-time hooks.
+"""
+
+import os
+import runpy
+
+import pytest
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def _load(monkeypatch, cpus=2, **env):
+    for name in ('GUNICORN_PROFILE', 'WEB_CONCURRENCY', 'GUNICORN_WORKER_CLASS', 'GUNICORN_THREADS',
+                 'GUNICORN_MAX_WORKERS', 'GUNICORN_PRELOAD', 'GUNICORN_BIND', 'PORT'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    # Test sürecinin Prometheus modunu değiştirmesin
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', '')
+    monkeypatch.setenv('_PROMETHEUS_MULTIPROC_READY', '1')
+    monkeypatch.setattr('multiprocessing.cpu_count', lambda: cpus)
+    return runpy.run_path(CONF_PATH)
+
+
+class TestProfiles:
+    """Worker count and class follow the profile, the CPU count and the env."""
+
+    def test_default_gthread_profile(self, monkeypatch):
+        conf = _load(monkeypatch)
+        assert (conf['worker_class'], conf['workers'], conf['threads']) == ('gthread', 3, 4)
+        assert conf['preload_app'] is True
+        assert conf['bind'] == '0.0.0.0:8080'
+
+    def test_sync_and_single_profiles(self, monkeypatch):
+        conf = _load(monkeypatch, cpus=8, GUNICORN_PROFILE='sync')
+        assert (conf['worker_class'], conf['workers'], conf['threads']) == ('sync', 8, 1)
+        conf = _load(monkeypatch, cpus=8, GUNICORN_PROFILE='single')
+        assert (conf['workers'], conf['preload_app']) == (1, False)
+
+    def test_env_overrides(self, monkeypatch):
+        conf = _load(monkeypatch, WEB_CONCURRENCY='5', GUNICORN_THREADS='8', GUNICORN_PRELOAD='0', PORT='9000')
+        assert (conf['workers'], conf['threads'], conf['preload_app']) == (5, 8, False)
+        assert conf['bind'] == '0.0.0.0:9000'
+
+    def test_unknown_profile(self, monkeypatch):
+        with pytest.raises(RuntimeError):
+            _load(monkeypatch, GUNICORN_PROFILE='eventlet')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('t=1700000000.250', 1700000000.25),
+    ('1700000000250', 1700000000.25),
+    ('1700000000250000', 1700000000.25),
+    ('', None),
+    ('t=abc', None),
+])
+def test_parse_request_start(monkeypatch, value, expected):
+    parse = _load(monkeypatch)['parse_request_start']
+    if expected is None:
+        assert parse(value) is None
+    else:
+        assert parse(value) == pytest.approx(expected)
@@ -0,0 +1,122 @@
+"""
+Identity cache tests: warm requests skip the users table, and user/company
+edits invalidate cached identities in every process through auth_version.
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from models import db, User, Company
+
+
+@contextmanager
+def _user_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _add_user(app, company_id, username, role='admin'):
+    with app.app_context():
+        user = User(company_id=company_id, username=username, email=f'{username}@user.test',
+                    role=role, is_active=True, force_password_change=False)
+        user.set_password('Test123!')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _update(app, model, object_id, **values):
+    with app.app_context():
+        obj = db.session.get(model, object_id)
+        for key, value in values.items():
+            setattr(obj, key, value)
+        db.session.commit()
+
+
+class TestIdentityCache:
+    """current_user comes from the cache until an edit bumps auth_version."""
+
+    def test_warm_requests_skip_users_table(self, file_app, make_tenant, login_as):
+        make_tenant('Önbellek', 'identity_admin')
+        client = login_as('identity_admin')
+        client.get('/api/transactions')
+        with _user_queries(file_app) as statements:
+            for _ in range(3):
+                assert client.get('/api/transactions').status_code == 200
+                assert client.get('/').status_code == 200
+        assert statements == []
+
+    def test_role_change_applies_on_next_request(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Rol', 'identity_owner')
+        user_id = _add_user(file_app, company_id, 'identity_member')
+        client = login_as('identity_member')
+        assert client.post('/api/customers', json={'name': 'Ali'}).status_code == 201
+
+        owner = login_as('identity_owner')
+        owner.post(f'/auth/admin/users/{user_id}/change-role', data={'new_role': 'observer'})
+        with file_app.app_context():
+            assert db.session.get(User, user_id).role == 'observer'
+        assert client.post('/api/customers', json={'name': 'Veli'}).status_code == 403
+
+    def test_deactivated_or_deleted_user_is_logged_out(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Pasif', 'identity_passive_owner')
+        user_id = _add_user(file_app, company_id, 'identity_passive')
+        client = login_as('identity_passive')
+        assert client.get('/api/transactions').status_code == 200
+
+        _update(file_app, User, user_id, is_active=False)
+        assert client.get('/api/transactions').status_code == 302
+
+        _update(file_app, User, user_id, is_active=True)
+        client = login_as('identity_passive')
+        with file_app.app_context():
+            db.session.delete(db.session.get(User, user_id))
+            db.session.commit()
+        assert client.get('/api/transactions').status_code == 302
+
+    def test_company_edit_and_unrelated_writes(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Şirket', 'identity_company')
+        client = login_as('identity_company')
+        client.get('/api/transactions')
+        cache = file_app.extensions['cache']
+        version = cache.get_counter('auth_version')
+
+        # last_login ve iş verisi yazımları kimlik önbelleğini geçersiz kılmaz
+        login_as('identity_company')
+        client.post('/api/customers', json={'name': 'Ayşe'})
+        assert cache.get_counter('auth_version') == version
+
+        _update(file_app, Company, company_id, status='suspended')
+        assert cache.get_counter('auth_version') == version + 1
+        with _user_queries(file_app) as statements:
+            client.get('/api/transactions')
+        assert len(statements) == 1
+
+    def test_change_password_writes_through_identity(self, file_app, make_tenant, login_as):
+        make_tenant('Şifre', 'identity_password')
+        with file_app.app_context():
+            user = User.query.filter_by(username='identity_password').one()
+            user.force_password_change = True
+            db.session.commit()
+        client = login_as('identity_password')
+        response = client.post('/auth/change-password', data={
+            'current_password': 'Test123!', 'new_password': 'Yeni1234!', 'confirm_password': 'Yeni1234!'
+        })
+        assert response.status_code == 302
+        with file_app.app_context():
+            user = User.query.filter_by(username='identity_password').one()
+            assert user.check_password('Yeni1234!')
+            assert user.force_password_change is False
+        assert client.get('/api/transactions').status_code == 200
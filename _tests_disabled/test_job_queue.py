@@ -0,0 +1,224 @@
+"""
+Background job queue tests: async report exports, retries with backoff,
+per-tenant concurrency caps, progress reporting and stale lease recovery.
+"""
+
+import json
+import threading
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from job_queue import (
+    JOB_HANDLERS, JobContext, JobLeaseLost, PermanentJobError, QueueLimitReached, Worker, _now, claim_job, enqueue,
+    requeue_stale
+)
+from models import db, Job, Product
+from services.backup_service import BackupService
+
+
+@pytest.fixture
+def worker(file_app, tmp_path):
+    file_app.config['JOB_OUTPUT_DIR'] = str(tmp_path / 'jobs')
+    return Worker(file_app, worker_id='test-worker')
+
+
+def _job(app, job_id):
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        db.session.expunge(job)
+        return job
+
+
+class TestAsyncExport:
+    """Export routes return a job id; the worker writes the file for download."""
+
+    def test_enqueue_run_and_download(self, file_app, make_tenant, login_as, worker):
+        company_id = make_tenant('Kuyruk', 'job_admin')
+        make_tenant('Başka', 'job_other')
+        with file_app.app_context():
+            db.session.add_all([
+                Product(company_id=company_id, name=f'Ürün {i}', unit='adet', unit_price=10,
+                        purchase_price=4, stock_quantity=i)
+                for i in range(5)
+            ])
+            db.session.commit()
+        client = login_as('job_admin')
+
+        response = client.get('/reports/export/stock/excel?async=1')
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        status_url = response.get_json()['status_url']
+        assert client.get(status_url).get_json()['status'] == 'queued'
+        assert client.get(f'/reports/jobs/{job_id}/download').status_code == 409
+
+        assert worker.run_once() == job_id
+        data = client.get(status_url).get_json()
+        assert data['status'] == 'succeeded'
+        assert data['progress'] == 100
+        assert data['attempts'] == 1
+
+        download = client.get(data['download_url'])
+        assert download.status_code == 200
+        assert 'attachment' in download.headers['Content-Disposition']
+        sheet = load_workbook(BytesIO(download.data), read_only=True).active
+        rows = list(sheet.iter_rows(values_only=True))
+        assert rows[0][0] == 'Ürün'
+        assert len(rows) == 6
+
+        # Other tenants cannot see or download the job
+        other = login_as('job_other')
+        assert other.get(status_url).status_code == 404
+        assert other.get(data['download_url']).status_code == 404
+
+    def test_rejects_invalid_requests_and_queue_limit(self, file_app, make_tenant, login_as):
+        make_tenant('Sınır', 'job_limit')
+        client = login_as('job_limit')
+        assert client.get('/reports/export/stock/csv?async=1').status_code == 400
+        assert client.get('/reports/export/unknown/excel?async=1').status_code == 400
+
+        file_app.config['JOB_TENANT_QUEUE_LIMIT'] = 2
+        assert client.get('/reports/export/stock/pdf?async=1').status_code == 202
+        assert client.get('/reports/export/stock/excel?async=1').status_code == 202
+        assert client.get('/reports/export/stock/excel?async=1').status_code == 429
+
+    def test_backup_job_skipped_outside_production(self, file_app, worker):
+        with file_app.app_context():
+            job_id = enqueue('backup', unique=True).id
+            assert enqueue('backup', unique=True).id == job_id
+        assert worker.run_once() == job_id
+        job = _job(file_app, job_id)
+        assert job.status == 'succeeded'
+        assert json.loads(job.result) == {'skipped': True}
+
+
+    def test_queue_limit_holds_under_concurrent_enqueues(self, file_app, make_tenant):
+        company_id = make_tenant('Yarış', 'job_race')
+        barrier = threading.Barrier(8)
+        outcomes = []
+
+        def submit():
+            with file_app.app_context():
+                barrier.wait()
+                try:
+                    enqueue('noop', company_id=company_id, limit=3)
+                    outcomes.append('queued')
+                except QueueLimitReached:
+                    outcomes.append('rejected')
+
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(outcomes) == ['queued'] * 3 + ['rejected'] * 5
+        with file_app.app_context():
+            assert Job.query.filter_by(company_id=company_id).count() == 3
+
+    def test_backup_does_not_swallow_lost_lease(self, monkeypatch):
+        def lost(self, progress=None):
+            raise JobLeaseLost()
+
+        monkeypatch.setattr(BackupService, 'create_backup', lost)
+        with pytest.raises(JobLeaseLost):
+            BackupService(database_url='sqlite:///unused.db')._run_backup(lambda percent, message: None)
+
+
+class TestRetries:
+    """Failing jobs are retried with exponential backoff, then marked failed."""
+
+    def test_backoff_then_failure(self, file_app, worker, monkeypatch):
+        calls = []
+
+        def flaky(ctx):
+            calls.append(ctx.attempt)
+            raise RuntimeError('geçici hata')
+
+        monkeypatch.setitem(JOB_HANDLERS, 'flaky', flaky)
+        file_app.config['JOB_RETRY_BASE_SECONDS'] = 60
+        with file_app.app_context():
+            job_id = enqueue('flaky', max_attempts=2).id
+
+        before = _now()
+        assert worker.run_once() == job_id
+        job = _job(file_app, job_id)
+        assert job.status == 'queued'
+        assert 'geçici hata' in job.error
+        assert job.run_at >= before + timedelta(seconds=60)
+        # Not ready until the backoff elapses
+        assert worker.run_once() is None
+
+        with file_app.app_context():
+            db.session.get(Job, job_id).run_at = _now()
+            db.session.commit()
+        assert worker.run_once() == job_id
+        job = _job(file_app, job_id)
+        assert job.status == 'failed'
+        assert job.attempts == 2
+        assert calls == [1, 2]
+
+    def test_permanent_error_and_unknown_kind(self, file_app, worker, monkeypatch):
+        def invalid(ctx):
+            raise PermanentJobError('geçersiz')
+
+        monkeypatch.setitem(JOB_HANDLERS, 'invalid', invalid)
+        with file_app.app_context():
+            first = enqueue('invalid').id
+            second = enqueue('no_such_kind').id
+        worker.run_once()
+        worker.run_once()
+        assert _job(file_app, first).status == 'failed'
+        assert _job(file_app, first).attempts == 1
+        assert 'Bilinmeyen iş türü' in _job(file_app, second).error
+
+
+class TestClaiming:
+    """Per-tenant concurrency caps and lease handling."""
+
+    def test_tenant_concurrency_cap(self, file_app, make_tenant):
+        first_company = make_tenant('A', 'job_cap_a')
+        second_company = make_tenant('B', 'job_cap_b')
+        with file_app.app_context():
+            a1 = enqueue('noop', company_id=first_company).id
+            a2 = enqueue('noop', company_id=first_company).id
+            b1 = enqueue('noop', company_id=second_company).id
+
+            assert claim_job('w1', tenant_concurrency=1) == a1
+            # The oldest remaining job belongs to a tenant already at its cap
+            assert claim_job('w2', tenant_concurrency=1) == b1
+            assert claim_job('w3', tenant_concurrency=1) is None
+            assert claim_job('w3', tenant_concurrency=2) == a2
+
+    def test_progress_and_stale_lease(self, file_app, worker, monkeypatch):
+        seen = []
+
+        def slow(ctx):
+            ctx.progress(40, 'yarısı')
+            with db.engine.connect() as conn:
+                seen.append(conn.exec_driver_sql(
+                    'SELECT progress, progress_message FROM jobs WHERE id = ?', (ctx.job_id,)
+                ).one())
+            return {'ok': True}
+
+        monkeypatch.setitem(JOB_HANDLERS, 'slow', slow)
+        with file_app.app_context():
+            job_id = enqueue('slow').id
+            assert claim_job('dead-worker') == job_id
+            stale = db.session.get(Job, job_id)
+            context = JobContext(stale, 'dead-worker')
+            stale.locked_at = _now() - timedelta(hours=1)
+            db.session.commit()
+            assert requeue_stale(lease_seconds=60) == 1
+
+            # The previous owner can no longer report progress
+            with pytest.raises(JobLeaseLost):
+                context.progress(100)
+
+        assert worker.run_once() == job_id
+        assert tuple(seen[0]) == (40, 'yarısı')
+        job = _job(file_app, job_id)
+        assert job.status == 'succeeded'
+        assert job.attempts == 2
+        assert job.locked_by == 'test-worker'
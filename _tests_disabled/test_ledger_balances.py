@@ -0,0 +1,205 @@
+"""
+Ledger listener tests: stored balance totals follow customer and supplier
+transactions written through the API, and the reconcile CLI commands detect
+and repair totals that drifted from the ledger.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from models import db, Customer, Product, Supplier, SupplierTransaction
+
+
+def _totals(app, model, owner_id):
+    with app.app_context():
+        owner = db.session.get(model, owner_id)
+        return owner.total_debt, owner.total_payment, owner.balance
+
+
+def _d(*values):
+    return tuple(Decimal(v) for v in values)
+
+
+@pytest.fixture
+def customer_client(file_app, make_tenant, login_as):
+    company_id = make_tenant('Bakkal', 'ledger_admin')
+    client = login_as('ledger_admin')
+    customer_id = client.post('/api/customers', json={'name': 'Veresiye'}).get_json()['id']
+    return company_id, client, customer_id
+
+
+@pytest.fixture
+def supplier_client(file_app, make_tenant, login_as):
+    company_id = make_tenant('Toptancı', 'supplier_ledger_admin')
+    client = login_as('supplier_ledger_admin')
+    supplier_id = client.post('/api/suppliers', json={'name': 'Un Deposu'}).get_json()['id']
+    return company_id, client, supplier_id
+
+
+def _invoke(app, *args):
+    """Run a CLI command inside this app's context (not whichever app is already pushed)."""
+    with app.app_context():
+        return app.test_cli_runner().invoke(args=list(args))
+
+
+def _corrupt(app, model, owner_id):
+    table = model.__table__
+    with app.app_context():
+        db.session.execute(table.update().where(table.c.id == owner_id).values(
+            total_debt=Decimal('999.00'), total_payment=Decimal('1.00'), balance=Decimal('998.00')
+        ))
+        db.session.commit()
+
+
+class TestCustomerLedger:
+    """Customer.total_debt/total_payment/balance track customer_transactions."""
+
+    def test_create_edit_delete(self, file_app, customer_client):
+        _, client, customer_id = customer_client
+        url = f'/api/customers/{customer_id}/transactions'
+
+        debt = client.post(url, json={'type': 'debt', 'amount': '150.00'})
+        assert debt.status_code == 201
+        payment = client.post(url, json={'type': 'payment', 'amount': '40.00'})
+        assert payment.status_code == 201
+        assert _totals(file_app, Customer, customer_id) == _d('150.00', '40.00', '110.00')
+
+        # Amount change
+        debt_id = debt.get_json()['id']
+        response = client.put(f'/api/customer-transactions/{debt_id}', json={'type': 'debt', 'amount': '200.00'})
+        assert response.status_code == 200
+        assert _totals(file_app, Customer, customer_id) == _d('200.00', '40.00', '160.00')
+
+        # Type change moves the amount from one side of the ledger to the other
+        payment_id = payment.get_json()['id']
+        response = client.put(f'/api/customer-transactions/{payment_id}', json={'type': 'debt', 'amount': '40.00'})
+        assert response.status_code == 200
+        assert _totals(file_app, Customer, customer_id) == _d('240.00', '0.00', '240.00')
+
+        # Amount and type change together
+        response = client.put(f'/api/customer-transactions/{debt_id}', json={'type': 'payment', 'amount': '90.00'})
+        assert response.status_code == 200
+        assert _totals(file_app, Customer, customer_id) == _d('40.00', '90.00', '-50.00')
+
+        assert client.delete(f'/api/customer-transactions/{debt_id}').status_code == 200
+        assert _totals(file_app, Customer, customer_id) == _d('40.00', '0.00', '40.00')
+        assert client.delete(f'/api/customer-transactions/{payment_id}').status_code == 200
+        assert _totals(file_app, Customer, customer_id) == _d('0.00', '0.00', '0.00')
+
+    def test_receipt_posts_debt_through_ledger(self, file_app, customer_client):
+        company_id, client, customer_id = customer_client
+        with file_app.app_context():
+            product = Product(company_id=company_id, name='Çay', unit='adet', unit_price=5)
+            db.session.add(product)
+            db.session.commit()
+            product_id = product.id
+
+        response = client.post('/api/receipts', json={
+            'customer_id': customer_id,
+            'total_amount': '100.00',
+            'tax_rate': '20',
+            'items': [{'product_id': product_id, 'quantity': 20, 'unit_price': 5, 'total_price': 100}]
+        })
+        assert response.status_code == 201
+        assert _totals(file_app, Customer, customer_id) == _d('120.00', '0.00', '120.00')
+
+        # The receipt's debt is an ordinary ledger row: editing it moves the balance
+        transactions = client.get(f'/api/customers/{customer_id}/transactions').get_json()['items']
+        assert len(transactions) == 1
+        response = client.put(f"/api/customer-transactions/{transactions[0]['id']}",
+                              json={'type': 'debt', 'amount': '100.00'})
+        assert response.status_code == 200
+        assert _totals(file_app, Customer, customer_id) == _d('100.00', '0.00', '100.00')
+
+
+class TestReconcileCustomerBalances:
+    """flask reconcile-customer-balances reports and repairs drifted totals."""
+
+    def test_check_and_fix(self, file_app, customer_client):
+        company_id, client, customer_id = customer_client
+        url = f'/api/customers/{customer_id}/transactions'
+        client.post(url, json={'type': 'debt', 'amount': '75.00'})
+        client.post(url, json={'type': 'payment', 'amount': '25.00'})
+
+        result = _invoke(file_app, 'reconcile-customer-balances')
+        assert result.exit_code == 0, result.output
+        assert 'uyumlu' in result.output
+
+        _corrupt(file_app, Customer, customer_id)
+
+        # Without --fix: reported, exit code 1, stored totals untouched
+        result = _invoke(file_app, 'reconcile-customer-balances', '--company-id', str(company_id))
+        assert result.exit_code == 1, result.output
+        assert f'#{customer_id}' in result.output
+        assert '1 uyumsuz bakiye' in result.output
+        assert _totals(file_app, Customer, customer_id) == _d('999.00', '1.00', '998.00')
+
+        result = _invoke(file_app, 'reconcile-customer-balances', '--fix')
+        assert result.exit_code == 0, result.output
+        assert 'düzeltildi' in result.output
+        assert _totals(file_app, Customer, customer_id) == _d('75.00', '25.00', '50.00')
+
+        result = _invoke(file_app, 'reconcile-customer-balances')
+        assert result.exit_code == 0, result.output
+        assert 'uyumlu' in result.output
+
+
+class TestSupplierLedger:
+    """Supplier.total_debt/total_payment/balance track supplier_transactions."""
+
+    def test_create_update_delete(self, file_app, supplier_client):
+        _, client, supplier_id = supplier_client
+        url = f'/api/suppliers/{supplier_id}/transactions'
+
+        debt = client.post(url, json={'type': 'debt', 'amount': '500.00'})
+        assert debt.status_code == 201
+        payment = client.post(url, json={'type': 'payment', 'amount': '120.00'})
+        assert payment.status_code == 201
+        assert _totals(file_app, Supplier, supplier_id) == _d('500.00', '120.00', '380.00')
+
+        # The API has no edit endpoint for supplier transactions; update through the ORM
+        debt_id = debt.get_json()['id']
+        with file_app.app_context():
+            transaction = db.session.get(SupplierTransaction, debt_id)
+            transaction.amount = Decimal('650.00')
+            db.session.commit()
+        assert _totals(file_app, Supplier, supplier_id) == _d('650.00', '120.00', '530.00')
+
+        with file_app.app_context():
+            transaction = db.session.get(SupplierTransaction, debt_id)
+            transaction.type = 'payment'
+            transaction.amount = Decimal('80.00')
+            db.session.commit()
+        assert _totals(file_app, Supplier, supplier_id) == _d('0.00', '200.00', '-200.00')
+
+        assert client.delete(f'/api/supplier-transactions/{debt_id}').status_code == 200
+        assert _totals(file_app, Supplier, supplier_id) == _d('0.00', '120.00', '-120.00')
+        assert client.delete(f"/api/supplier-transactions/{payment.get_json()['id']}").status_code == 200
+        assert _totals(file_app, Supplier, supplier_id) == _d('0.00', '0.00', '0.00')
+
+
+class TestReconcileSupplierBalances:
+    """flask reconcile-supplier-balances reports and repairs drifted totals."""
+
+    def test_check_and_fix(self, file_app, supplier_client):
+        company_id, client, supplier_id = supplier_client
+        url = f'/api/suppliers/{supplier_id}/transactions'
+        client.post(url, json={'type': 'debt', 'amount': '300.00'})
+        client.post(url, json={'type': 'payment', 'amount': '100.00'})
+
+        _corrupt(file_app, Supplier, supplier_id)
+
+        result = _invoke(file_app, 'reconcile-supplier-balances', '--company-id', str(company_id))
+        assert result.exit_code == 1, result.output
+        assert f'Tedarikçi #{supplier_id}' in result.output
+        assert _totals(file_app, Supplier, supplier_id) == _d('999.00', '1.00', '998.00')
+
+        result = _invoke(file_app, 'reconcile-supplier-balances', '--fix')
+        assert result.exit_code == 0, result.output
+        assert '1 tedarikçi bakiyesi düzeltildi' in result.output
+        assert _totals(file_app, Supplier, supplier_id) == _d('300.00', '100.00', '200.00')
+
+        result = _invoke(file_app, 'reconcile-supplier-balances')
+        assert result.exit_code == 0, result.output
+        assert 'uyumlu' in result.output
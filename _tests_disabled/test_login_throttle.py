@@ -0,0 +1,183 @@
+"""
+Login throttle tests: sliding-window lockout on both backends, sharing across
+processes, no main-database writes for failed logins, compaction of the
+legacy login_attempts table and a credential-stuffing load test.
+"""
+
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from login_throttle import MemoryThrottle, SQLiteThrottle, compact_login_attempts
+from models import db, LoginAttempt, get_turkey_time
+
+POLICY = {'max_attempts': 3, 'window': 60, 'lockout': 120}
+
+ATTACK_THREADS = int(os.environ.get('LOGIN_ATTACK_THREADS', 8))
+ATTACK_REQUESTS = int(os.environ.get('LOGIN_ATTACK_REQUESTS', 250))
+LOGIN_P99_BUDGET = float(os.environ.get('LOGIN_P99_SECONDS', 3.0))
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def throttle(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryThrottle(**POLICY)
+    return SQLiteThrottle(str(tmp_path / 'throttle.sqlite3'), **POLICY)
+
+
+@contextmanager
+def _count_writes(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _fail_twice(path):
+    store = SQLiteThrottle(path, **POLICY)
+    store.register_failure('ip:10.0.0.1')
+    store.register_failure('ip:10.0.0.1')
+
+
+class TestThrottleBackends:
+    """Both backends implement the same sliding window and lockout."""
+
+    def test_lockout_after_max_attempts(self, throttle):
+        now = 1000.0
+        assert throttle.register_failure('ip:1', now) == 2
+        assert throttle.register_failure('ip:1', now + 1) == 1
+        assert throttle.locked_for(['ip:1'], now + 1) == 0
+        assert throttle.register_failure('ip:1', now + 2) == 0
+        assert throttle.locked_for(['ip:1', 'ip:2'], now + 2) == 120
+        assert throttle.locked_for(['ip:2'], now + 2) == 0
+        # Kilit sırasında gelen eşzamanlı denemeler kilidi değiştirmez
+        assert throttle.register_failure('ip:1', now + 3) == 0
+        assert throttle.locked_for(['ip:1'], now + 3) == 119
+        # Kilit bitince sayım sıfırdan başlar
+        assert throttle.locked_for(['ip:1'], now + 123) == 0
+        assert throttle.register_failure('ip:1', now + 123) == 2
+
+    def test_window_slides(self, throttle):
+        now = 1000.0
+        throttle.register_failure('ip:1', now)
+        throttle.register_failure('ip:1', now + 30)
+        # İlk deneme pencereden çıktı
+        assert throttle.register_failure('ip:1', now + 61) == 1
+        assert throttle.locked_for(['ip:1'], now + 61) == 0
+
+    def test_reset_and_compact(self, throttle):
+        now = time.time()
+        throttle.register_failure('ip:1', now)
+        throttle.register_failure('ip:2', now - 500)
+        throttle.reset(['ip:1'])
+        assert throttle.register_failure('ip:1', now) == 2
+        assert throttle.compact(now) == 1
+        assert throttle.compact(now) == 0
+
+    def test_sqlite_store_is_shared_across_processes(self, tmp_path):
+        path = str(tmp_path / 'shared.sqlite3')
+        store = SQLiteThrottle(path, **POLICY)
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_fail_twice, args=(path,)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert store.locked_for(['ip:10.0.0.1']) > 0
+
+
+class TestLoginFlow:
+    """Failed logins lock out without writing to the main database."""
+
+    def test_failed_logins_lock_out_without_db_writes(self, file_app, make_tenant):
+        make_tenant('Kilit', 'throttle_user')
+        client = file_app.test_client()
+        with _count_writes(file_app) as writes:
+            for _ in range(5):
+                response = client.post('/auth/login', data={'username': 'throttle_user', 'password': 'yanlış'})
+                assert response.status_code == 200
+        assert writes == []
+        assert 'kilitlendi' in response.get_data(as_text=True)
+
+        response = client.post('/auth/login', data={'username': 'throttle_user', 'password': 'Test123!'})
+        assert response.status_code == 200
+        assert 'Çok fazla başarısız giriş denemesi' in response.get_data(as_text=True)
+
+        # Başka bir IP etkilenmez
+        response = file_app.test_client().post(
+            '/auth/login', data={'username': 'throttle_user', 'password': 'Test123!'},
+            environ_base={'REMOTE_ADDR': '10.9.9.9'}
+        )
+        assert response.status_code == 302
+
+    def test_compact_login_attempts(self, file_app):
+        with file_app.app_context():
+            now = get_turkey_time().replace(tzinfo=None)
+            db.session.add_all(
+                [LoginAttempt(ip_address=f'10.0.0.{i}', last_attempt_at=now - timedelta(days=40)) for i in range(25)]
+                + [LoginAttempt(ip_address='10.0.1.1', last_attempt_at=now - timedelta(days=1))]
+            )
+            db.session.commit()
+            assert compact_login_attempts(retention_days=30, batch_size=10) == 25
+            assert LoginAttempt.query.count() == 1
+
+
+@pytest.mark.slow
+def test_login_p99_under_credential_stuffing(file_app, make_tenant, tmp_path):
+    """Legitimate logins stay fast while threads hammer /auth/login from many IPs."""
+    make_tenant('Yük', 'load_user')
+    file_app.extensions['login_throttle'] = SQLiteThrottle(str(tmp_path / 'load.sqlite3'), max_attempts=5)
+    stop = threading.Event()
+    errors = []
+
+    def attacker(index):
+        client = file_app.test_client()
+        for i in range(ATTACK_REQUESTS):
+            if stop.is_set():
+                return
+            response = client.post(
+                '/auth/login', data={'username': f'stuffed{i}', 'password': 'hunter2'},
+                environ_base={'REMOTE_ADDR': f'198.51.{index}.{i % 50}'}
+            )
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    with _count_writes(file_app) as writes:
+        threads = [threading.Thread(target=attacker, args=(i,)) for i in range(ATTACK_THREADS)]
+        for thread in threads:
+            thread.start()
+
+        durations = []
+        for i in range(40):
+            client = file_app.test_client()
+            started = time.perf_counter()
+            response = client.post('/auth/login', data={'username': 'load_user', 'password': 'Test123!'},
+                                   environ_base={'REMOTE_ADDR': f'203.0.113.{i}'})
+            durations.append(time.perf_counter() - started)
+            assert response.status_code == 302
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    p99 = statistics.quantiles(durations, n=100)[98]
+    assert errors == []
+    # Ana veritabanına yalnızca başarılı girişlerin last_login güncellemesi yazılır
+    assert all(statement.lstrip().upper().startswith('UPDATE USERS') for statement in writes)
+    assert p99 < LOGIN_P99_BUDGET
@@ -0,0 +1,135 @@
+"""
+PDF export tests: Arabic shaping / bidi ordering, the export endpoint, font
+subsetting, translated headers and a 100-page customer debt benchmark.
+"""
+
+import io
+import os
+import re
+import time
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from models import db, Customer, Product, Transaction
+from pdf_writer import _encoded_text, find_font_path, render_table, shape_arabic, visual_order
+from reports import _report_rows
+from translations import get_all_translations
+
+FONT_PATH = find_font_path(os.environ.get('PDF_FONT_PATH'))
+requires_font = pytest.mark.skipif(FONT_PATH is None, reason='no TrueType font with Turkish/Arabic glyphs')
+
+BENCH_PAGES = 100
+BENCH_TIME_BUDGET = float(os.environ.get('PDF_BENCH_SECONDS', 10))
+BENCH_MEMORY_BUDGET = 32 * 1024 * 1024
+
+
+class TestTextShaping:
+    """Arabic letters get contextual forms and RTL runs are reordered."""
+
+    def test_contextual_forms(self):
+        # beh (initial) + teh (final)
+        assert shape_arabic('بت') == 'ﺑﺖ'
+        # lam-alef ligature, isolated and final
+        assert shape_arabic('لا') == 'ﻻ'
+        assert shape_arabic('سلا') == 'ﺳﻼ'
+
+    def test_turkish_text_is_untouched(self):
+        assert visual_order('Müşteri Ğüşİıç 12,50') == 'Müşteri Ğüşİıç 12,50'
+
+    def test_rtl_run_with_numbers(self):
+        assert visual_order('ديون ١٢٣') == '١٢٣ نويد'
+        assert visual_order('محمد (علي)') == '(يلع) دمحم'
+        assert visual_order('abc مرحبا def') == 'abc ابحرم def'
+
+
+@requires_font
+class TestPdfExport:
+    """All four report types render to a valid PDF."""
+
+    def test_exports_all_report_types(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('PDF', 'pdf_admin')
+        with file_app.app_context():
+            db.session.add_all([
+                Customer(company_id=company_id, name='محمد علي', balance=150, total_debt=200, total_payment=50),
+                Customer(company_id=company_id, name='Şükrü Işık', balance=75, total_debt=75, total_payment=0),
+                Product(company_id=company_id, name='Çay', unit='kg', unit_price=10,
+                        purchase_price=4, stock_quantity=3),
+                Transaction(company_id=company_id, type='income', amount=100, description='Satış'),
+            ])
+            db.session.commit()
+        client = login_as('pdf_admin')
+
+        for report_type in ('profit_loss', 'stock', 'top_products', 'customer_debts'):
+            response = client.get(f'/reports/export/{report_type}/pdf')
+            assert response.status_code == 200, report_type
+            assert response.mimetype == 'application/pdf'
+            body = b''.join(response.response)
+            response.close()
+            assert body.startswith(b'%PDF-1.4')
+            assert body.rstrip().endswith(b'%%EOF')
+            assert int(response.headers['Content-Length']) == len(body)
+
+    def test_font_is_subset_and_header_cache_ignores_subtitle(self):
+        _encoded_text.cache_clear()
+        sizes = []
+        for minute in ('12:00', '12:01'):
+            output = io.BytesIO()
+            render_table(output, FONT_PATH, 'Müşteri Borçları', ['Müşteri', 'Kalan Borç'],
+                         [['Şükrü Işık', 10.0], ['محمد علي', 20.0]], subtitle=f'18.10.2026 {minute}')
+            body = output.getvalue()
+            sizes.append(len(body))
+            # Only the glyphs in use are embedded, under a subset tag
+            assert re.search(rb'/BaseFont /[A-Z]{6}\+DejaVuSans', body)
+            assert int(re.search(rb'/Length1 (\d+)', body).group(1)) < os.path.getsize(FONT_PATH) / 5
+        assert max(sizes) < 100 * 1024
+        # Title and column headers are cached; the timestamped subtitle is not
+        assert _encoded_text.cache_info().currsize == 3
+
+    def test_headers_follow_the_export_language(self, file_app, make_tenant):
+        company_id = make_tenant('PDF', 'pdf_lang')
+        with file_app.app_context():
+            for lang in ('tr', 'ar'):
+                bundle = get_all_translations(lang)
+                _, headers, _ = _report_rows('profit_loss', company_id, lang=lang)
+                assert headers == [bundle.date, bundle.entry_type, bundle.amount, bundle.description]
+            _, headers, _ = _report_rows('customer_debts', company_id)
+            assert headers == ['Müşteri', 'Telefon', 'Toplam Borç', 'Ödenen', 'Kalan Borç']
+
+    def test_unknown_report_type_is_rejected(self, file_app, make_tenant, login_as):
+        make_tenant('PDF', 'pdf_bad')
+        response = login_as('pdf_bad').get('/reports/export/unknown/pdf')
+        assert response.status_code == 400
+
+
+@requires_font
+@pytest.mark.slow
+def test_customer_debt_pdf_benchmark():
+    """A 100-page customer debt PDF renders within a fixed time and memory budget."""
+    rows_per_page = 50
+    rows = (
+        [f'Müşteri {i} محمد' if i % 4 == 0 else f'Müşteri Ğüşİıç {i}', '0555 111 22 33',
+         1000.0 + i, 250.0, 750.0 + i]
+        for i in range(BENCH_PAGES * rows_per_page)
+    )
+    output = io.BytesIO()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        pages = render_table(
+            output, FONT_PATH, 'Müşteri Borçları',
+            ['Müşteri', 'Telefon', 'Toplam Borç', 'Ödenen', 'Kalan Borç'], rows,
+            subtitle=datetime.now().strftime('%d.%m.%Y %H:%M')
+        )
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Çıktı tamponu hariç bellek kullanımı sayfa sayısından bağımsız kalmalı
+    peak -= len(output.getvalue())
+    assert pages >= BENCH_PAGES
+    assert elapsed < BENCH_TIME_BUDGET, f'{pages} pages in {elapsed:.2f}s'
+    assert peak < BENCH_MEMORY_BUDGET, f'peak {peak / 1024 / 1024:.1f} MiB'
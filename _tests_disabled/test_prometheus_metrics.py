@@ -0,0 +1,159 @@
+"""
+Prometheus /metrics tests: access control, request/pool/cache/throttle/export
+and backup metrics, and aggregation across processes in multiprocess mode.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+import urllib.request
+
+import pytest
+from prometheus_client import REGISTRY
+
+from models import db, User
+from prometheus_metrics import observe_backup, observe_job, start_worker_metrics_server
+from services.dashboard_service import get_cache_counters
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+def _promote(app, username):
+    with app.app_context():
+        User.query.filter_by(username=username).one().role = 'platform_admin'
+        db.session.commit()
+
+
+class TestMetricsAccess:
+    """Only platform admins or allowed networks can scrape /metrics."""
+
+    def test_local_network_allowed(self, file_app):
+        response = file_app.test_client().get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+
+    def test_remote_anonymous_and_tenant_admin_rejected(self, file_app, make_tenant, login_as):
+        remote = {'REMOTE_ADDR': '203.0.113.7'}
+        assert file_app.test_client().get('/metrics', environ_base=remote).status_code == 403
+        make_tenant('Metrik', 'metrics_admin')
+        client = login_as('metrics_admin')
+        assert client.get('/metrics', environ_base=remote).status_code == 403
+
+        _promote(file_app, 'metrics_admin')
+        client = login_as('metrics_admin')
+        assert client.get('/metrics', environ_base=remote).status_code == 200
+
+    def test_configured_networks(self, file_app):
+        file_app.extensions['metrics_networks'] = []
+        assert file_app.test_client().get('/metrics').status_code == 403
+
+
+class TestMetricsContent:
+    """Instrumented subsystems show up in the exposition output."""
+
+    def test_request_pool_and_cache_metrics(self, file_app, make_tenant, login_as):
+        make_tenant('İçerik', 'metrics_content')
+        client = login_as('metrics_content')
+        labels = {'blueprint': 'api', 'endpoint': 'api.get_customers', 'method': 'GET'}
+        before = _sample('muhasebe_http_request_duration_seconds_count', labels)
+        client.get('/api/customers')
+        client.get('/api/customers')
+        assert _sample('muhasebe_http_request_duration_seconds_count', labels) == before + 2
+
+        body = file_app.test_client().get('/metrics').get_data(as_text=True)
+        assert 'muhasebe_http_requests_total{blueprint="api",endpoint="api.get_customers",method="GET",status="200"}' in body
+        assert 'muhasebe_db_pool_checkout_wait_seconds_bucket' in body
+        assert 'muhasebe_db_pool_checked_out' in body
+        assert 'muhasebe_cache_requests_total{cache="dashboard",result="hit"}' in body
+        assert 'muhasebe_cache_hit_ratio{cache="dashboard"}' in body
+
+    def test_dashboard_hits_do_not_write_to_shared_cache(self, file_app, make_tenant, login_as, monkeypatch):
+        make_tenant('Sayaç', 'metrics_counter')
+        client = login_as('metrics_counter')
+        file_app.config['CACHE_COUNTER_FLUSH_SECONDS'] = 3600
+        cache = file_app.extensions['cache']
+        with file_app.app_context():
+            before = get_cache_counters()
+        writes = []
+        original_incr = cache.incr
+        monkeypatch.setattr(cache, 'incr', lambda key, amount=1: writes.append(key) or original_incr(key, amount))
+
+        for _ in range(5):
+            assert client.get('/api/stats/dashboard').status_code == 200
+        assert [key for key in writes if key.startswith('stats:')] == []
+
+        # Reading the counters flushes this process's pending counts
+        with file_app.app_context():
+            after = get_cache_counters()
+        assert (after['hits'] - before['hits'], after['misses'] - before['misses']) == (4, 1)
+
+    def test_login_rejections(self, file_app, make_tenant):
+        make_tenant('Kilit', 'metrics_locked')
+        before = _sample('muhasebe_login_throttle_rejections_total', {'scope': 'ip'})
+        client = file_app.test_client()
+        for _ in range(6):
+            client.post('/auth/login', data={'username': 'metrics_locked', 'password': 'yanlış'})
+        assert _sample('muhasebe_login_throttle_rejections_total', {'scope': 'ip'}) == before + 1
+
+    def test_export_duration(self, file_app, make_tenant, login_as):
+        pytest.importorskip('openpyxl')
+        make_tenant('Export', 'metrics_export')
+        client = login_as('metrics_export')
+        labels = {'report_type': 'stock', 'format': 'excel'}
+        before = _sample('muhasebe_report_export_duration_seconds_count', labels)
+        response = client.get('/reports/export/stock/excel')
+        assert response.status_code == 200
+        response.get_data()
+        response.close()
+        assert _sample('muhasebe_report_export_duration_seconds_count', labels) == before + 1
+
+    def test_backup_outcomes(self):
+        before = _sample('muhasebe_backup_runs_total', {'outcome': 'failure'})
+        observe_backup('failure', 2.5)
+        observe_backup('success', 1.0)
+        assert _sample('muhasebe_backup_runs_total', {'outcome': 'failure'}) == before + 1
+        assert _sample('muhasebe_backup_last_success_timestamp_seconds') > 0
+
+    def test_worker_serves_job_metrics(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        start_worker_metrics_server(port, address='127.0.0.1')
+        observe_job('report_export', 'succeeded', 0.4)
+        body = urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5).read().decode()
+        assert 'muhasebe_jobs_total{kind="report_export",outcome="succeeded"}' in body
+        assert 'muhasebe_job_duration_seconds_count{kind="report_export"}' in body
+
+
+WORKER_SCRIPT = textwrap.dedent('''
+    from prometheus_metrics import observe_backup, observe_login_rejection
+    observe_login_rejection('ip')
+    observe_login_rejection('ip')
+    observe_backup('success', 3.0)
+''')
+
+SCRAPE_SCRIPT = textwrap.dedent('''
+    from app import create_app
+    app = create_app('testing')
+    print(app.test_client().get('/metrics').get_data(as_text=True))
+''')
+
+
+def test_multiprocess_aggregation(tmp_path):
+    """Values written by separate worker processes are summed by one scrape."""
+    env = dict(os.environ, ENV='testing', PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(3):
+        subprocess.run([sys.executable, '-c', WORKER_SCRIPT], cwd=PROJECT_ROOT, env=env, check=True)
+    output = subprocess.run(
+        [sys.executable, '-c', SCRAPE_SCRIPT], cwd=PROJECT_ROOT, env=env, check=True,
+        capture_output=True, text=True
+    ).stdout
+    assert 'muhasebe_login_throttle_rejections_total{scope="ip"} 6.0' in output
+    assert 'muhasebe_backup_runs_total{outcome="success"} 3.0' in output
+    assert 'muhasebe_backup_duration_seconds_count 3.0' in output
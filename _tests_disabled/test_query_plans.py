@@ -0,0 +1,197 @@
+"""
+Query plan tests: every hot list/report query must be served by an index.
+
+A large multi-tenant dataset is bulk-inserted, the hot pages are requested and
+every SQL statement they issue is run through EXPLAIN. The dataset size can be
+tuned with QUERY_PLAN_ROWS (default: 1M rows spread over all tenant tables).
+"""
+
+import json
+import os
+import random
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from models import (
+    db, Transaction, Customer, CustomerTransaction, Supplier, SupplierTransaction,
+    Product, Receipt, ReceiptItem
+)
+
+TOTAL_ROWS = int(os.environ.get('QUERY_PLAN_ROWS', 1_000_000))
+COMPANIES = 100
+BATCH_SIZE = 20_000
+
+# Tablo başına satır payı (toplam TOTAL_ROWS)
+SHARES = {
+    Transaction: 0.40,
+    CustomerTransaction: 0.20,
+    Receipt: 0.10,
+    ReceiptItem: 0.20,
+    SupplierTransaction: 0.05,
+    Customer: 0.02,
+    Product: 0.02,
+    Supplier: 0.01,
+}
+SEEDED_TABLES = {model.__tablename__ for model in SHARES}
+
+
+def _count(model):
+    return max(COMPANIES, int(TOTAL_ROWS * SHARES[model]))
+
+
+def _insert(model, rows):
+    """Core executemany in batches (no ORM events, no identity map)."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(model.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(model.__table__.insert(), batch)
+
+
+def _seed(app, company_ids):
+    rnd = random.Random(42)
+    start = date.today() - timedelta(days=730)
+    now = datetime.now()
+
+    def day():
+        return start + timedelta(days=rnd.randrange(730))
+
+    def company(i):
+        return company_ids[i % len(company_ids)]
+
+    with app.app_context():
+        n_customers, n_suppliers, n_products = _count(Customer), _count(Supplier), _count(Product)
+        n_receipts = _count(Receipt)
+
+        _insert(Customer, ({
+            'id': i + 1, 'company_id': company(i), 'name': f'Müşteri {i:07d}',
+            'total_debt': 100, 'total_payment': 40, 'balance': 60, 'created_at': now
+        } for i in range(n_customers)))
+        _insert(Supplier, ({
+            'id': i + 1, 'company_id': company(i), 'name': f'Tedarikçi {i:07d}',
+            'total_debt': 100, 'total_payment': 40, 'balance': 60, 'is_active': True, 'created_at': now
+        } for i in range(n_suppliers)))
+        _insert(Product, ({
+            'id': i + 1, 'company_id': company(i), 'name': f'Ürün {i:07d}', 'unit': 'adet',
+            'unit_price': 10, 'purchase_price': 6, 'stock_quantity': 50, 'stock_threshold': 5,
+            'created_at': now
+        } for i in range(n_products)))
+        _insert(Transaction, ({
+            'company_id': company(i), 'type': 'income' if i % 3 else 'expense',
+            'description': 'Satış', 'amount': rnd.randint(1, 1000), 'date': day(), 'created_at': now
+        } for i in range(_count(Transaction))))
+        # Müşteri i, şirket (i % COMPANIES) altındadır; hareketler aynı şirket içinde kalır
+        _insert(CustomerTransaction, ({
+            'customer_id': rnd.randrange(n_customers) + 1, 'type': 'debt' if i % 2 else 'payment',
+            'amount': rnd.randint(1, 500), 'date': day(), 'created_at': now
+        } for i in range(_count(CustomerTransaction))))
+        _insert(SupplierTransaction, ({
+            'supplier_id': rnd.randrange(n_suppliers) + 1, 'type': 'debt' if i % 2 else 'payment',
+            'amount': rnd.randint(1, 500), 'date': day(), 'created_at': now
+        } for i in range(_count(SupplierTransaction))))
+        _insert(Receipt, ({
+            'id': i + 1, 'company_id': company(i), 'customer_id': (i % n_customers) + 1,
+            'receipt_no': f'F{i // COMPANIES + 1:03d}', 'total_amount': 100, 'tax_rate': 0,
+            'tax_amount': 0, 'grand_total': 100, 'date': day(), 'created_at': now
+        } for i in range(n_receipts)))
+        _insert(ReceiptItem, ({
+            'receipt_id': (i % n_receipts) + 1, 'product_id': (i % n_products) + 1,
+            'quantity': 2, 'unit_price': 50, 'total_price': 100
+        } for i in range(_count(ReceiptItem))))
+        db.session.commit()
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+
+
+def _capture_statements(app, client, urls):
+    """Requests the URLs and returns the distinct SELECT statements they issued."""
+    statements = {}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.setdefault(statement, parameters)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200, f'{url} -> {response.status_code}'
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+def _sqlite_full_scans(connection, statement, parameters):
+    """Tables of the seeded set read with a full SCAN (no index) in the plan."""
+    plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if not match:
+            continue
+        table = re.sub(r'_\d+$', '', match.group(1))
+        if table in SEEDED_TABLES and 'USING' not in detail:
+            scans.append(detail)
+    return scans
+
+
+def _postgresql_seq_scans(connection, statement, parameters):
+    plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in SEEDED_TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return scans
+
+
+@pytest.mark.slow
+class TestQueryPlans:
+    """Hot tenant queries use composite indexes instead of full table scans."""
+
+    def test_hot_queries_use_indexes(self, file_app, make_tenant, login_as):
+        company_ids = [make_tenant(f'Şirket {i}', f'plan_{i}') for i in range(COMPANIES)]
+        _seed(file_app, company_ids)
+
+        company_id = company_ids[0]
+        with file_app.app_context():
+            customer_id = db.session.query(Customer.id).filter_by(company_id=company_id).first()[0]
+            supplier_id = db.session.query(Supplier.id).filter_by(company_id=company_id).first()[0]
+
+        urls = [
+            '/', '/transactions', '/customers', f'/customer/{customer_id}',
+            '/suppliers', f'/supplier/{supplier_id}', '/products', '/receipts',
+            '/api/transactions', '/api/customers', f'/api/customers/{customer_id}/transactions',
+            '/api/suppliers', '/api/suppliers?sort=-balance', f'/api/suppliers/{supplier_id}/transactions',
+            '/api/products', '/api/receipts', '/api/stats/dashboard',
+            '/reports/profit-loss', '/reports/top-products', '/reports/customer-debts', '/reports/stock',
+        ]
+        statements = _capture_statements(file_app, login_as('plan_0'), urls)
+        assert statements
+
+        failures = []
+        with file_app.app_context():
+            with db.engine.connect() as connection:
+                explain = (_postgresql_seq_scans if connection.dialect.name == 'postgresql'
+                           else _sqlite_full_scans)
+                for statement, parameters in statements.items():
+                    scans = explain(connection, statement, parameters)
+                    if scans:
+                        failures.append(f'{scans}\n    {statement}')
+
+        assert not failures, 'Queries without an index:\n' + '\n'.join(failures)
@@ -0,0 +1,80 @@
+"""
+Per-company receipt number sequence tests, including concurrent posts.
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from models import db, Customer, Product, Receipt, ReceiptSequence
+
+PARALLEL_POSTS = 50
+
+
+def _seed_customer_and_product(app, company_id):
+    with app.app_context():
+        customer = Customer(company_id=company_id, name='Kasa Müşterisi')
+        product = Product(company_id=company_id, name='Çay', unit='adet', unit_price=5)
+        db.session.add_all([customer, product])
+        db.session.commit()
+        return customer.id, product.id
+
+
+def _receipt_payload(customer_id, product_id):
+    return {
+        'customer_id': customer_id,
+        'total_amount': '10.00',
+        'items': [{'product_id': product_id, 'quantity': 2, 'unit_price': 5, 'total_price': 10}]
+    }
+
+
+class TestReceiptSequence:
+    """Receipt numbers are allocated from a per-company counter."""
+
+    def test_numbers_are_scoped_per_company(self, file_app, make_tenant, login_as):
+        company_a = make_tenant('A', 'seq_a')
+        company_b = make_tenant('B', 'seq_b')
+        client_a = login_as('seq_a')
+        client_b = login_as('seq_b')
+
+        payload_a = _receipt_payload(*_seed_customer_and_product(file_app, company_a))
+        payload_b = _receipt_payload(*_seed_customer_and_product(file_app, company_b))
+
+        assert client_a.post('/api/receipts', json=payload_a).get_json()['receipt_no'] == 'F001'
+        assert client_a.post('/api/receipts', json=payload_a).get_json()['receipt_no'] == 'F002'
+        # Two tenants may hand out the same number
+        assert client_b.post('/api/receipts', json=payload_b).get_json()['receipt_no'] == 'F001'
+
+    def test_sequence_continues_from_existing_receipts(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Eski', 'seq_legacy')
+        customer_id, product_id = _seed_customer_and_product(file_app, company_id)
+        with file_app.app_context():
+            db.session.add(Receipt(company_id=company_id, customer_id=customer_id, receipt_no='F041',
+                                   total_amount=1, grand_total=1))
+            db.session.commit()
+            assert ReceiptSequence.peek_receipt_no(company_id) == 'F042'
+
+        client = login_as('seq_legacy')
+        response = client.post('/api/receipts', json=_receipt_payload(customer_id, product_id))
+        assert response.get_json()['receipt_no'] == 'F042'
+
+    @pytest.mark.slow
+    def test_parallel_receipt_posts_have_no_duplicates(self, file_app, make_tenant, login_as):
+        """50 parallel receipt posts: all succeed, numbers are unique and gapless."""
+        company_id = make_tenant('Yoğun Kafe', 'seq_busy')
+        payload = _receipt_payload(*_seed_customer_and_product(file_app, company_id))
+        clients = [login_as('seq_busy') for _ in range(PARALLEL_POSTS)]
+
+        def post(client):
+            return client.post('/api/receipts', json=payload)
+
+        with ThreadPoolExecutor(max_workers=PARALLEL_POSTS) as pool:
+            responses = list(pool.map(post, clients))
+
+        # No request may fail with an error that would require a client retry
+        assert [r.status_code for r in responses] == [201] * PARALLEL_POSTS
+        numbers = sorted(r.get_json()['receipt_no'] for r in responses)
+        assert numbers == [f'F{i:03d}' for i in range(1, PARALLEL_POSTS + 1)]
+
+        with file_app.app_context():
+            assert ReceiptSequence.query.get(company_id).last_value == PARALLEL_POSTS
+            assert Receipt.query.filter_by(company_id=company_id).count() == PARALLEL_POSTS
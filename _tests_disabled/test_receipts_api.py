@@ -0,0 +1,106 @@
+"""
+Receipt list API tests: pagination, filters, ?include=items and a constant
+number of queries per page regardless of page size.
+"""
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Customer, Product, Receipt, ReceiptItem
+
+
+@contextmanager
+def _count_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def receipts(file_app, make_tenant):
+    company_id = make_tenant('Kafe', 'receipts_admin')
+    other_id = make_tenant('Diğer', 'receipts_other')
+    with file_app.app_context():
+        customers = [Customer(company_id=company_id, name=f'Müşteri {i}') for i in range(4)]
+        products = [Product(company_id=company_id, name=f'Ürün {i}', unit='adet', unit_price=5) for i in range(6)]
+        outsider = Customer(company_id=other_id, name='Başka')
+        db.session.add_all(customers + products + [outsider])
+        db.session.flush()
+
+        start = date(2026, 4, 1)
+        for i in range(60):
+            receipt = Receipt(
+                company_id=company_id, customer_id=customers[i % 4].id, receipt_no=f'F{i + 1:03d}',
+                total_amount=Decimal('15'), grand_total=Decimal('15'), date=start + timedelta(days=i % 30)
+            )
+            receipt.items = [
+                ReceiptItem(product_id=products[(i + j) % 6].id, quantity=1, unit_price=5, total_price=5)
+                for j in range(3)
+            ]
+            db.session.add(receipt)
+        db.session.add(Receipt(company_id=other_id, customer_id=outsider.id, receipt_no='F001',
+                               total_amount=1, grand_total=1, date=start))
+        db.session.commit()
+        return {'customer_id': customers[1].id}
+
+
+class TestReceiptsApi:
+    """GET /api/receipts is paginated, filterable and eager-loaded."""
+
+    def test_pagination_and_items_switch(self, receipts, login_as):
+        client = login_as('receipts_admin')
+        data = client.get('/api/receipts?per_page=50').get_json()
+        assert data['total'] == 60
+        assert len(data['items']) == 50
+        assert data['has_next'] is True
+        assert 'items' not in data['items'][0]
+        assert data['items'][0]['customer_name'].startswith('Müşteri')
+
+        data = client.get('/api/receipts?per_page=5&include=items').get_json()
+        assert all(len(r['items']) == 3 for r in data['items'])
+        assert all(item['product_name'].startswith('Ürün') for r in data['items'] for item in r['items'])
+
+    def test_filters(self, receipts, login_as):
+        client = login_as('receipts_admin')
+        data = client.get('/api/receipts?start_date=2026-04-10&end_date=2026-04-11&per_page=100').get_json()
+        assert data['total'] == 4
+        assert {r['date'] for r in data['items']} == {'2026-04-10', '2026-04-11'}
+
+        data = client.get(f"/api/receipts?customer_id={receipts['customer_id']}&per_page=100").get_json()
+        assert data['total'] == 15
+        assert {r['customer_id'] for r in data['items']} == {receipts['customer_id']}
+
+        assert client.get('/api/receipts?start_date=01.04.2026').status_code == 400
+
+    def test_cursor_mode(self, receipts, login_as):
+        client = login_as('receipts_admin')
+        ids, cursor = [], ''
+        while cursor is not None:
+            data = client.get(f'/api/receipts?cursor={cursor}&limit=25&include=items').get_json()
+            ids.extend(r['id'] for r in data['items'])
+            cursor = data['next_cursor']
+        assert len(ids) == len(set(ids)) == 60
+
+    def test_constant_query_count(self, file_app, receipts, login_as):
+        client = login_as('receipts_admin')
+        client.get('/api/receipts')
+        counts = []
+        for per_page in (5, 50):
+            with _count_queries(file_app) as statements:
+                response = client.get(f'/api/receipts?per_page={per_page}&include=items')
+            assert response.status_code == 200
+            counts.append(len([s for s in statements if s.lstrip().upper().startswith('SELECT')]))
+        assert counts[0] == counts[1], counts
@@ -0,0 +1,97 @@
+"""
+Streaming Excel export tests.
+"""
+
+import os
+import tracemalloc
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from models import db, Transaction, Customer, Product
+
+LARGE_EXPORT_ROWS = int(os.environ.get('EXPORT_BENCH_ROWS', 50_000))
+
+
+def _bulk_transactions(app, company_id, count):
+    start = date.today() - timedelta(days=365)
+    now = datetime.now()
+    with app.app_context():
+        db.session.execute(Transaction.__table__.insert(), [
+            {
+                'company_id': company_id, 'type': 'income' if i % 2 else 'expense',
+                'amount': i % 1000 + 1, 'description': f'İşlem {i}',
+                'date': start + timedelta(days=i % 365), 'created_at': now
+            }
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def _download(client, report_type):
+    response = client.get(f'/reports/export/{report_type}/excel')
+    assert response.status_code == 200
+    assert response.is_streamed
+    body = b''.join(response.response)
+    assert int(response.headers['Content-Length']) == len(body)
+    response.close()
+    return load_workbook(BytesIO(body), read_only=True).active
+
+
+class TestExcelExport:
+    """Exports are built in write-only mode and streamed in chunks."""
+
+    def test_exports_all_report_types(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Export', 'export_admin')
+        other_id = make_tenant('Diğer', 'export_other')
+        _bulk_transactions(file_app, company_id, 25)
+        _bulk_transactions(file_app, other_id, 10)
+        with file_app.app_context():
+            db.session.add_all([
+                Customer(company_id=company_id, name='Borçlu', balance=150, total_debt=200, total_payment=50),
+                Customer(company_id=company_id, name='Temiz', balance=0),
+                Product(company_id=company_id, name='Çay', unit='kg', unit_price=10,
+                        purchase_price=4, stock_quantity=3),
+            ])
+            db.session.commit()
+        client = login_as('export_admin')
+
+        rows = list(_download(client, 'profit_loss').values)
+        assert rows[0] == ('Tarih', 'Tür', 'Tutar', 'Açıklama')
+        assert len(rows) == 26
+
+        rows = list(_download(client, 'customer_debts').values)
+        assert rows[1:] == [('Borçlu', None, 200, 50, 150)]
+
+        rows = list(_download(client, 'stock').values)
+        assert rows[1:] == [('Çay', 'kg', 3, 4, 12)]
+
+        rows = list(_download(client, 'top_products').values)
+        assert rows == [('Ürün', 'Birim', 'Satış Miktarı', 'Toplam Gelir')]
+
+    def test_unknown_report_type_is_rejected(self, file_app, make_tenant, login_as):
+        make_tenant('Export', 'export_bad')
+        response = login_as('export_bad').get('/reports/export/unknown/excel')
+        assert response.status_code == 400
+
+    @pytest.mark.slow
+    def test_large_export_memory_stays_flat(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Büyük', 'export_large')
+        _bulk_transactions(file_app, company_id, LARGE_EXPORT_ROWS)
+        client = login_as('export_large')
+
+        tracemalloc.start()
+        try:
+            response = client.get('/reports/export/profit_loss/excel')
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert response.status_code == 200
+        assert size > 0
+        # Satır başına bellek ayrılmıyor: tepe kullanım satır sayısından bağımsız kalmalı
+        assert peak < 64 * 1024 * 1024, f'peak {peak / 1024 / 1024:.1f} MiB for {LARGE_EXPORT_ROWS} rows'
@@ -0,0 +1,84 @@
+"""
+Request instrumentation tests: Server-Timing header, per-endpoint query and
+object counts, the N+1 warning and the platform-admin stats endpoint.
+"""
+
+import logging
+import re
+
+from models import db, Customer, User
+
+
+def _server_timing(response):
+    header = response.headers['Server-Timing']
+    return {
+        'app': float(re.search(r'app;dur=([\d.]+)', header).group(1)),
+        'db': float(re.search(r'db;dur=([\d.]+)', header).group(1)),
+        'queries': int(re.search(r'"(\d+) queries"', header).group(1)),
+        'objects': int(re.search(r'(\d+) objects"', header).group(1)),
+    }
+
+
+def _add_customers(app, company_id, count):
+    with app.app_context():
+        db.session.add_all([Customer(company_id=company_id, name=f'Müşteri {i}', balance=i) for i in range(count)])
+        db.session.commit()
+
+
+class TestRequestMetrics:
+    """Every request records wall time, DB time, statements and loaded objects."""
+
+    def test_server_timing_header(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Zamanlama', 'timing_user')
+        _add_customers(file_app, company_id, 12)
+        client = login_as('timing_user')
+        timing = _server_timing(client.get('/customers'))
+        assert timing['queries'] >= 1
+        assert timing['objects'] >= 12
+        assert 0 <= timing['db'] <= timing['app']
+
+    def test_header_disabled(self, file_app, make_tenant, login_as):
+        make_tenant('Gizli', 'timing_hidden')
+        file_app.config['SERVER_TIMING_HEADER'] = False
+        client = login_as('timing_hidden')
+        assert 'Server-Timing' not in client.get('/api/customers').headers
+
+    def test_per_endpoint_stats(self, file_app, make_tenant, login_as):
+        company_id = make_tenant('Pencere', 'timing_stats')
+        _add_customers(file_app, company_id, 5)
+        client = login_as('timing_stats')
+        for _ in range(4):
+            client.get('/api/customers')
+        client.get('/olmayan-sayfa')
+
+        stats = file_app.extensions['request_metrics'].snapshot()
+        assert stats['api.get_customers']['count'] == 4
+        assert stats['api.get_customers']['avg_loads'] >= 5
+        assert stats['api.get_customers']['max_queries'] == stats['api.get_customers']['p95_queries']
+        assert stats['unmatched']['count'] == 1
+
+    def test_query_heavy_request_is_logged(self, file_app, make_tenant, login_as, caplog):
+        make_tenant('Uyarı', 'timing_warn')
+        client = login_as('timing_warn')
+        file_app.config['REQUEST_QUERY_WARN'] = 0
+        with caplog.at_level(logging.WARNING, logger='request_metrics'):
+            client.get('/api/customers')
+        assert 'api.get_customers' in caplog.text
+
+    def test_queries_outside_requests_are_ignored(self, file_app):
+        with file_app.app_context():
+            assert Customer.query.count() == 0
+        assert file_app.extensions['request_metrics'].snapshot() == {}
+
+
+def test_request_stats_endpoint(file_app, make_tenant, login_as):
+    make_tenant('İstatistik', 'timing_admin')
+    client = login_as('timing_admin')
+    assert client.get('/api/stats/requests').status_code == 403
+
+    with file_app.app_context():
+        User.query.filter_by(username='timing_admin').one().role = 'platform_admin'
+        db.session.commit()
+    client = login_as('timing_admin')
+    data = client.get('/api/stats/requests').get_json()
+    assert 'auth.login' in data['endpoints']
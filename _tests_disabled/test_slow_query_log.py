@@ -0,0 +1,105 @@
+"""
+Slow-query log tests: SQL fingerprints, request context in the log line,
+first-occurrence EXPLAIN capture and the platform admin stats endpoint.
+"""
+
+import logging
+
+from prometheus_client import REGISTRY
+
+from models import db, User
+from slow_query_log import fingerprint, normalize_sql
+
+
+def _log_everything(app, explain=True):
+    slow_queries = app.extensions['slow_queries']
+    slow_queries.threshold = 0
+    slow_queries.explain = explain
+    slow_queries.clear()
+    return slow_queries
+
+
+class TestFingerprint:
+    """Statements differing only in values share a fingerprint."""
+
+    def test_literals_and_parameters(self):
+        first = "SELECT * FROM customers WHERE company_id = 3 AND name = 'Ali' AND id IN (1, 2, 3)"
+        second = "SELECT * FROM customers WHERE company_id = 17 AND name = 'O''Brien' AND id IN (9)"
+        assert fingerprint(first) == fingerprint(second)
+        assert normalize_sql(first) == 'SELECT * FROM customers WHERE company_id = ? AND name = ? AND id IN (?)'
+
+    def test_driver_placeholders_and_casts(self):
+        assert normalize_sql('SELECT a FROM t WHERE b = %(b_1)s AND c = $2 AND d = :d') == \
+            'SELECT a FROM t WHERE b = ? AND c = ? AND d = ?'
+        assert normalize_sql("SELECT x::date FROM t WHERE y = %s") == 'SELECT x::date FROM t WHERE y = ?'
+        assert normalize_sql('INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)') == 'INSERT INTO t (a, b) VALUES (?, ?)'
+        assert fingerprint('SELECT 1 FROM t1') != fingerprint('SELECT 1 FROM t2')
+
+
+class TestSlowQueryLog:
+    """Slow statements are logged with context and explained once."""
+
+    def test_logs_endpoint_company_and_plan(self, file_app, make_tenant, login_as, caplog):
+        company_id = make_tenant('Yavaş', 'slow_admin')
+        client = login_as('slow_admin')
+        slow_queries = _log_everything(file_app)
+
+        with caplog.at_level(logging.WARNING, logger='slow_query_log'):
+            assert client.get('/api/customers').status_code == 200
+            client.get('/api/customers')
+
+        lines = [record.getMessage() for record in caplog.records if record.name == 'slow_query_log']
+        logged = [line for line in lines if 'endpoint=api.get_customers' in line and 'FROM customers' in line]
+        assert logged and f'company_id={company_id}' in logged[0]
+
+        snapshot = slow_queries.snapshot()
+        customer_queries = [entry for entry in snapshot.values()
+                            if entry['last_endpoint'] == 'api.get_customers' and 'FROM customers' in entry['sql']]
+        assert customer_queries
+        assert all(entry['count'] == 2 for entry in customer_queries)
+        assert all(entry['plan'] and ('SCAN' in entry['plan'] or 'SEARCH' in entry['plan'])
+                   for entry in customer_queries)
+        # Plans are captured only for the first occurrence of each fingerprint
+        assert len([line for line in lines if line.startswith('Sorgu planı [')]) == \
+            len({key for key, entry in snapshot.items() if entry['plan']})
+
+    def test_outside_request_and_without_explain(self, file_app):
+        slow_queries = _log_everything(file_app, explain=False)
+        with file_app.app_context():
+            db.session.execute(db.text('SELECT 1'))
+        entry = next(entry for entry in slow_queries.snapshot().values() if entry['sql'] == 'SELECT ?')
+        assert entry['last_endpoint'] == '-'
+        assert entry['plan'] is None
+
+    def test_threshold_filters_fast_statements(self, file_app):
+        slow_queries = _log_everything(file_app)
+        slow_queries.threshold = 60
+        with file_app.app_context():
+            db.session.execute(db.text('SELECT 1'))
+        assert slow_queries.snapshot() == {}
+
+    def test_prometheus_counter(self, file_app, make_tenant, login_as):
+        make_tenant('Sayaç', 'slow_counter')
+        client = login_as('slow_counter')
+        _log_everything(file_app, explain=False)
+        labels = {'endpoint': 'api.get_products'}
+        before = REGISTRY.get_sample_value('muhasebe_db_slow_queries_total', labels) or 0
+        client.get('/api/products')
+        assert REGISTRY.get_sample_value('muhasebe_db_slow_queries_total', labels) > before
+
+
+def test_stats_endpoint_platform_admin_only(file_app, make_tenant, login_as):
+    make_tenant('İstatistik', 'slow_stats')
+    client = login_as('slow_stats')
+    _log_everything(file_app)
+    assert client.get('/api/stats/slow-queries').status_code == 403
+
+    with file_app.app_context():
+        User.query.filter_by(username='slow_stats').one().role = 'platform_admin'
+        db.session.commit()
+    client = login_as('slow_stats')
+    response = client.get('/api/stats/slow-queries')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['threshold_ms'] == 0
+    assert any('FROM users' in entry['sql'] for entry in data['fingerprints'].values())
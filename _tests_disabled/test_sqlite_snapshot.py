@@ -0,0 +1,121 @@
+"""
+Online SQLite snapshot tests for backup.py: consistent copies while a
+writer is active, integrity verification and compressed local backups.
+"""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import backup
+from services.backup_pipeline import BackupError, decompress_stream
+
+
+@pytest.fixture
+def live_db(tmp_path):
+    path = tmp_path / 'live.db'
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE ledger (id INTEGER PRIMARY KEY, company_id INTEGER, amount INTEGER, note TEXT)')
+    connection.executemany('INSERT INTO ledger (company_id, amount, note) VALUES (?, ?, ?)', [
+        (i % 5, i, 'x' * 200) for i in range(20000)
+    ])
+    connection.commit()
+    connection.close()
+    return path
+
+
+def _balanced(path):
+    connection = sqlite3.connect(path)
+    try:
+        count, total = connection.execute('SELECT COUNT(*), SUM(amount) FROM ledger').fetchone()
+        # The writer inserts +n and -n in one transaction; a torn copy would break the invariant
+        pairs = connection.execute('SELECT COALESCE(SUM(amount), 0) FROM ledger WHERE company_id = 99').fetchone()[0]
+        return count, total, pairs
+    finally:
+        connection.close()
+
+
+class TestSnapshot:
+    """The backup API copies in page batches without blocking writers."""
+
+    def test_snapshot_during_writes(self, live_db, tmp_path):
+        stop = threading.Event()
+        writes = []
+
+        def writer():
+            connection = sqlite3.connect(live_db, timeout=30)
+            n = 0
+            while not stop.is_set():
+                n += 1
+                with connection:
+                    connection.execute('INSERT INTO ledger (company_id, amount, note) VALUES (99, ?, ?)', (n, 'y'))
+                    connection.execute('INSERT INTO ledger (company_id, amount, note) VALUES (99, ?, ?)', (-n, 'y'))
+                writes.append(n)
+            connection.close()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            size = backup.snapshot_database(live_db, tmp_path / 'snap.db', pages=16, sleep=0)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert writes, 'writer must make progress while the snapshot runs'
+        assert size == (tmp_path / 'snap.db').stat().st_size
+        count, _, pairs = _balanced(tmp_path / 'snap.db')
+        assert count >= 20000 and (count - 20000) % 2 == 0
+        assert pairs == 0
+        # The snapshot is a standalone file, not a WAL database
+        connection = sqlite3.connect(tmp_path / 'snap.db')
+        assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        connection.close()
+
+    def test_corrupt_database_fails_integrity_check(self, live_db, tmp_path):
+        connection = sqlite3.connect(live_db)
+        connection.execute('PRAGMA journal_mode=DELETE')
+        connection.execute('CREATE INDEX ix_ledger_amount ON ledger (amount)')
+        connection.close()
+        # Overwrite a page in the middle of the file
+        with open(live_db, 'r+b') as f:
+            f.seek(4096 * 200)
+            f.write(b'\xff' * 4096)
+        with pytest.raises((BackupError, sqlite3.DatabaseError)):
+            backup.snapshot_database(live_db, tmp_path / 'bad.db')
+
+
+class TestLocalBackup:
+    """create_local_backup writes a compressed, timestamped snapshot."""
+
+    @pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+    def test_compressed_backup(self, live_db, tmp_path, compression):
+        path = backup.create_local_backup(live_db, tmp_path / 'backups', compression=compression)
+
+        assert path.name.startswith('muhasebe_backup_')
+        assert path.name.endswith('.db.' + backup.COMPRESSION_EXTENSIONS[compression])
+        assert [p.name for p in (tmp_path / 'backups').iterdir()] == [path.name]
+        restored = tmp_path / 'restored.db'
+        restored.write_bytes(b''.join(decompress_stream([path.read_bytes()], compression)))
+        assert _balanced(restored) == (20000, sum(range(20000)), 0)
+        assert path.stat().st_size < restored.stat().st_size
+
+    def test_missing_database(self, tmp_path):
+        assert backup.create_local_backup(tmp_path / 'yok.db', tmp_path / 'backups') is None
+
+    def test_cleanup_keeps_in_progress_snapshot(self, tmp_path, monkeypatch):
+        folder = tmp_path / 'backups'
+        folder.mkdir()
+        finished = [folder / f'muhasebe_backup_2024010{i}_030000.db.zst' for i in range(1, 5)]
+        for index, path in enumerate(finished):
+            path.write_bytes(b'x')
+            os.utime(path, (index, index))
+        in_progress = folder / 'muhasebe_backup_20240105_030000.db.tmp'
+        in_progress.write_bytes(b'x')
+        os.utime(in_progress, (0, 0))
+        monkeypatch.setattr(backup, 'BACKUP_FOLDER', folder)
+
+        backup.cleanup_local_backups(keep_count=2)
+        assert sorted(p.name for p in folder.iterdir()) == sorted([in_progress.name] + [p.name for p in finished[2:]])
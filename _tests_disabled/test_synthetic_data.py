@@ -0,0 +1,118 @@
+"""
+Synthetic data generator and route benchmark harness tests.
+"""
+
+import json
+from datetime import date
+
+from sqlalchemy import func
+
+import benchmark
+from models import (
+    db, Customer, CustomerTransaction, DailySummary, Product, Receipt, ReceiptItem, ReceiptSequence,
+    Supplier, SupplierTransaction, Transaction
+)
+from services.balance_service import reconcile_customer_balances, reconcile_supplier_balances
+from services.synthetic_data import DEFAULT_PASSWORD, generate_synthetic_data
+
+SIZES = dict(customers=20, products=10, suppliers=5, transactions=200, receipts=60, end_date=date(2026, 1, 31))
+DUMPED = (Customer, Product, Supplier, Transaction, Receipt, ReceiptItem, CustomerTransaction, SupplierTransaction)
+
+
+def _dump():
+    return {
+        model.__tablename__: [tuple(row) for row in db.session.execute(
+            db.select(model.__table__).order_by(*model.__table__.primary_key.columns)
+        )]
+        for model in DUMPED
+    }
+
+
+class TestGenerator:
+    """Bulk generator writes consistent, reproducible tenants."""
+
+    def test_counts_and_derived_tables(self, file_app):
+        with file_app.app_context():
+            results = generate_synthetic_data(companies=2, **SIZES)
+            company_id = results[0]['company_id']
+
+            assert [result['username'] for result in results] == ['sentetik1', 'sentetik2']
+            counts = results[0]['counts']
+            assert counts['customers'] == Customer.query.filter_by(company_id=company_id).count() == 20
+            assert counts['transactions'] == 200
+            assert Receipt.query.filter_by(company_id=company_id).count() == 60
+            assert counts['receipt_items'] == db.session.query(func.count(ReceiptItem.id)).join(Receipt).filter(
+                Receipt.company_id == company_id
+            ).scalar()
+
+            # Bulk inserts skip ORM listeners; balances, summaries and the counter are written explicitly
+            assert reconcile_customer_balances() == []
+            assert reconcile_supplier_balances() == []
+            receipt_total = db.session.query(func.sum(Receipt.grand_total)).filter(
+                Receipt.company_id == company_id
+            ).scalar()
+            summary_total = db.session.query(func.sum(DailySummary.receipt_total)).filter(
+                DailySummary.company_id == company_id
+            ).scalar()
+            assert summary_total == receipt_total
+            assert ReceiptSequence.peek_receipt_no(company_id) == 'F061'
+
+    def test_same_seed_same_rows(self, file_app):
+        with file_app.app_context():
+            generate_synthetic_data(seed=7, **SIZES)
+            first = _dump()
+            db.drop_all()
+            db.create_all()
+            generate_synthetic_data(seed=7, **SIZES)
+            assert _dump() == first
+
+            db.drop_all()
+            db.create_all()
+            generate_synthetic_data(seed=8, **SIZES)
+            assert _dump()['transactions'] != first['transactions']
+
+
+class TestBenchmarkHarness:
+    """Every main/api/reports route is measured and results can be diffed."""
+
+    def test_all_routes_measured(self, file_app, tmp_path):
+        file_app.config['JOB_OUTPUT_DIR'] = str(tmp_path / 'jobs')
+        with file_app.app_context():
+            generate_synthetic_data(**SIZES)
+        report = benchmark.run_benchmarks(file_app, 'sentetik1', DEFAULT_PASSWORD, rounds=1, warmup=0)
+
+        measured = {(result['endpoint']) for result in report['results'].values()}
+        expected = {
+            rule.endpoint for rule in file_app.url_map.iter_rules()
+            if rule.endpoint.split('.')[0] in benchmark.BLUEPRINTS
+        }
+        assert report['skipped'] == {}
+        assert measured == expected
+        failures = {name: result['status'] for name, result in report['results'].items()
+                    if max(result['status']) >= 400}
+        assert failures == {}
+        assert report['results']['GET /api/customers']['queries'] >= 1
+        json.dumps(report)
+
+        # Write cases clean up after themselves
+        with file_app.app_context():
+            assert Customer.query.count() == 20
+
+    def test_compare_flags_regressions(self):
+        baseline = {'results': {
+            'GET /a': {'median_ms': 10.0, 'queries': 2},
+            'GET /b': {'median_ms': 10.0, 'queries': 2},
+            'GET /gone': {'median_ms': 1.0, 'queries': 1},
+        }}
+        current = {'results': {
+            'GET /a': {'median_ms': 10.5, 'queries': 2},
+            'GET /b': {'median_ms': 20.0, 'queries': 3},
+            'GET /new': {'median_ms': 1.0, 'queries': 1},
+        }}
+        rows, regressions = benchmark.compare(baseline, current, threshold=0.2, min_delta_ms=1.0)
+        assert [row[0] for row in regressions] == ['GET /b']
+        assert regressions[0][-1] == 'yavaşladı, sorgu arttı'
+        notes = {row[0]: row[-1] for row in rows}
+        assert notes['GET /a'] == ''
+        assert notes['GET /new'] == 'yeni'
+        assert notes['GET /gone'] == 'kaldırıldı'
@@ -0,0 +1,187 @@
+"""
+Tenant isolation tests: the do_orm_execute hook filters every TenantScoped
+model in plain, limited, joined, aggregate, Core-style and relationship
+queries, plus a slow-marked timing comparison with the previous before_compile
+hook (recorded as test-suite properties, e.g. with --junitxml).
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+import pytest
+from flask import g
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Query, Session
+
+import models
+from models import (
+    db, Customer, CustomerTransaction, DailySummary, Product, Receipt, ReceiptItem,
+    Supplier, Transaction
+)
+
+BENCH_QUERIES = int(os.environ.get('TENANT_BENCH_QUERIES', 3000))
+
+
+@contextmanager
+def _as_tenant(app, company_id, platform_admin=False):
+    with app.test_request_context():
+        g.company_id = company_id
+        g.is_platform_admin = platform_admin
+        yield
+        db.session.rollback()
+
+
+@pytest.fixture
+def tenants(file_app, make_tenant):
+    ids = [make_tenant('Birinci', 'iso_a'), make_tenant('İkinci', 'iso_b')]
+    with file_app.app_context():
+        for company_id in ids:
+            customer = Customer(company_id=company_id, name=f'Müşteri {company_id}', balance=10)
+            product = Product(company_id=company_id, name=f'Ürün {company_id}', unit='adet', unit_price=5)
+            db.session.add_all([
+                customer, product,
+                Supplier(company_id=company_id, name=f'Tedarikçi {company_id}'),
+                Transaction(company_id=company_id, type='income', amount=company_id * 100),
+            ])
+            db.session.flush()
+            db.session.add(CustomerTransaction(customer_id=customer.id, type='debt', amount=10))
+            receipt = Receipt(company_id=company_id, customer_id=customer.id, receipt_no='F001',
+                              total_amount=5, grand_total=5)
+            receipt.items = [ReceiptItem(product_id=product.id, quantity=1, unit_price=5, total_price=5)]
+            db.session.add(receipt)
+        db.session.commit()
+    return ids
+
+
+TENANT_MODELS = [Transaction, Customer, Supplier, Product, Receipt, DailySummary]
+
+
+class TestTenantIsolation:
+    """A tenant never sees, counts or modifies another tenant's rows."""
+
+    @pytest.mark.parametrize('model', TENANT_MODELS, ids=lambda m: m.__name__)
+    def test_entity_queries(self, file_app, tenants, model):
+        own, other = tenants
+        with _as_tenant(file_app, own):
+            assert {row.company_id for row in model.query.all()} == {own}
+            assert {row.company_id for row in model.query.limit(50).all()} == {own}
+            assert {row.company_id for row in model.query.order_by(model.company_id).offset(0).limit(5)} == {own}
+            assert model.query.filter(model.company_id == other).count() == 0
+            assert db.session.scalars(select(model).where(model.company_id == other)).all() == []
+            assert db.session.query(func.count()).select_from(model).scalar() == model.query.count()
+
+    def test_get_by_primary_key(self, file_app, tenants):
+        own, other = tenants
+        with file_app.app_context():
+            other_customer_id = Customer.query.filter_by(company_id=other).one().id
+        with _as_tenant(file_app, own):
+            assert db.session.get(Customer, other_customer_id) is None
+            assert Customer.query.filter_by(id=other_customer_id).first() is None
+
+    def test_joins_subqueries_and_aggregates(self, file_app, tenants):
+        own, _ = tenants
+        with _as_tenant(file_app, own):
+            rows = db.session.query(CustomerTransaction).join(Customer).all()
+            assert {ct.customer.company_id for ct in rows} == {own}
+
+            names = db.session.query(Receipt.receipt_no, Customer.name).join(
+                Customer, Receipt.customer_id == Customer.id).all()
+            assert names == [('F001', f'Müşteri {own}')]
+
+            subquery = select(Customer.id).scalar_subquery()
+            assert db.session.query(Customer).filter(Customer.id.in_(subquery)).count() == 1
+            assert db.session.query(func.sum(Transaction.amount)).scalar() == own * 100
+
+    def test_relationship_loads(self, file_app, tenants):
+        own, _ = tenants
+        with _as_tenant(file_app, own):
+            receipt = Receipt.query.one()
+            assert receipt.customer.company_id == own
+            assert [item.product.company_id for item in receipt.items] == [own]
+
+    def test_bulk_update_and_delete(self, file_app, tenants):
+        own, other = tenants
+        with _as_tenant(file_app, own):
+            assert Supplier.query.update({'notes': 'güncellendi'}, synchronize_session=False) == 1
+            assert Transaction.query.delete(synchronize_session=False) == 1
+            db.session.commit()
+        with file_app.app_context():
+            assert Supplier.query.filter_by(company_id=other).one().notes != 'güncellendi'
+            assert Transaction.query.filter_by(company_id=other).count() == 1
+
+    def test_platform_admin_and_opt_out(self, file_app, tenants):
+        own, _ = tenants
+        with _as_tenant(file_app, None, platform_admin=True):
+            assert Customer.query.count() == 2
+        with _as_tenant(file_app, own):
+            assert Customer.query.count() == 1
+            assert Customer.query.execution_options(all_tenants=True).count() == 2
+        with file_app.app_context():
+            # İstek dışı (CLI, iş kuyruğu) bağlamında filtre uygulanmaz
+            assert Customer.query.count() == 2
+
+    def test_user_without_company_sees_nothing(self, file_app, tenants):
+        # A non-admin user with no company binds company_id = NULL instead of going unfiltered
+        with _as_tenant(file_app, None):
+            for model in TENANT_MODELS:
+                assert model.query.count() == 0
+            assert db.session.scalar(select(func.count()).select_from(Customer)) == 0
+            assert Supplier.query.update({'notes': 'sızıntı'}, synchronize_session=False) == 0
+        # Request code running before the tenant context is set is filtered as well
+        with file_app.test_request_context():
+            assert Customer.query.count() == 0
+
+    def test_api_cannot_reach_other_tenant(self, file_app, tenants, login_as):
+        own, other = tenants
+        with file_app.app_context():
+            other_receipt_id = Receipt.query.filter_by(company_id=other).one().id
+        client = login_as('iso_a')
+        assert client.get(f'/api/receipts/{other_receipt_id}').status_code == 404
+        data = client.get('/api/receipts?cursor=&limit=100&include=items').get_json()
+        assert [r['customer_name'] for r in data['items']] == [f'Müşteri {own}']
+
+
+def _legacy_auto_filter_by_company(query):
+    """before_compile hook used before loader criteria; the timing baseline below."""
+    if not hasattr(g, 'is_platform_admin') or g.is_platform_admin:
+        return query
+    if not hasattr(g, 'company_id') or g.company_id is None:
+        return query
+    if query._limit_clause is not None or query._offset_clause is not None:
+        return query
+    if query.column_descriptions:
+        entity = query.column_descriptions[0]['entity']
+        if entity is not None and getattr(entity, '__tablename__', None) in {
+                'customers', 'products', 'suppliers', 'receipts', 'transactions'}:
+            query = query.filter(entity.company_id == g.company_id)
+    return query
+
+
+def _time_queries(app, company_id):
+    """Seconds per filtered customer query and the company ids the queries returned."""
+    with _as_tenant(app, company_id):
+        seen = {c.company_id for c in Customer.query.filter(Customer.balance > 0).all()}
+        started = time.perf_counter()
+        for i in range(BENCH_QUERIES):
+            Customer.query.filter(Customer.balance > i % 5).all()
+        return (time.perf_counter() - started) / BENCH_QUERIES, seen
+
+
+@pytest.mark.slow
+def test_isolation_hook_benchmark(file_app, tenants, record_testsuite_property):
+    """Both hooks filter to the tenant; per-query cost of each is recorded, not asserted."""
+    own, _ = tenants
+    event.remove(Session, 'do_orm_execute', models._apply_tenant_criteria)
+    event.listen(Query, 'before_compile', _legacy_auto_filter_by_company, retval=True)
+    try:
+        legacy, legacy_seen = _time_queries(file_app, own)
+    finally:
+        event.remove(Query, 'before_compile', _legacy_auto_filter_by_company)
+        event.listen(Session, 'do_orm_execute', models._apply_tenant_criteria)
+    current, current_seen = _time_queries(file_app, own)
+
+    assert legacy_seen == current_seen == {own}
+    record_testsuite_property('tenant_hook_queries', BENCH_QUERIES)
+    record_testsuite_property('tenant_hook_before_compile_us_per_query', round(legacy * 1e6, 1))
+    record_testsuite_property('tenant_hook_loader_criteria_us_per_query', round(current * 1e6, 1))
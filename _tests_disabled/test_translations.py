@@ -0,0 +1,146 @@
+"""
+Translation tests: compiled per-language bundles, Arabic digits in the date
+filters, customers.html rendered with the compiled bundle and a slow-marked
+5k-row render timing against the old dict wrapper (recorded as
+test-suite properties, e.g. with --junitxml).
+"""
+
+import os
+import time
+from datetime import datetime
+
+import pytest
+from flask import render_template, render_template_string, session
+from flask_login import login_user
+
+import app as app_module
+from identity_cache import load_user_identity
+from models import Customer, User
+from translations import TRANSLATIONS, get_all_translations
+
+RENDER_ROWS = 200
+BENCH_ROWS = int(os.environ.get('TRANSLATION_BENCH_ROWS', 5000))
+BENCH_ROUNDS = int(os.environ.get('TRANSLATION_BENCH_ROUNDS', 5))
+
+
+class TestTranslationBundles:
+    """Bundles are compiled once, read-only and fall back to the key."""
+
+    def test_languages_share_keys(self):
+        assert set(TRANSLATIONS['tr']) == set(TRANSLATIONS['ar'])
+
+    def test_attribute_item_and_get_access(self):
+        t = get_all_translations('ar')
+        assert t.customers == TRANSLATIONS['ar']['customers']
+        assert t['customers'] == t.get('customers') == t.customers
+        assert t.items == TRANSLATIONS['ar']['items']
+        assert t.missing_key == t['missing_key'] == 'missing_key'
+        assert t.get('missing_key', 'varsayılan') == 'varsayılan'
+
+    def test_bundles_are_shared_and_frozen(self):
+        t = get_all_translations('tr')
+        assert get_all_translations('tr') is t
+        assert get_all_translations('xx') is t
+        with pytest.raises(AttributeError):
+            t.customers = 'değişti'
+        with pytest.raises(AttributeError):
+            t.new_key = 'yeni'
+
+    @pytest.mark.parametrize('lang, expected', [
+        ('tr', '02.01.2024 - 02.01.2024'),
+        ('ar', '٠٢.٠١.٢٠٢٤ - ٠٢.٠١.٢٠٢٤'),
+    ])
+    def test_date_filters_localize_digits(self, file_app, lang, expected):
+        with file_app.test_request_context():
+            session['lang'] = lang
+            rendered = render_template_string(
+                "{{ d|format_date }} - {{ d|turkey_time('%d.%m.%Y') }}", d=datetime(2024, 1, 2, 12, 0)
+            )
+        assert rendered == expected
+
+
+@pytest.mark.parametrize('lang', ['tr', 'ar'])
+def test_customers_render_with_compiled_bundle(file_app, make_tenant, lang):
+    """customers.html renders every row and the page strings in the session language."""
+    company_id = make_tenant('Çeviri', f'translation_{lang}')
+    with file_app.app_context():
+        user_id = User.query.filter_by(username=f'translation_{lang}').one().id
+    customers = [
+        Customer(id=i, company_id=company_id, name=f'Müşteri {i}', phone='0555 000 00 00' if i % 2 else None,
+                 balance=(i % 7) - 3)
+        for i in range(1, RENDER_ROWS + 1)
+    ]
+
+    with file_app.test_request_context('/customers'):
+        session['lang'] = lang
+        login_user(load_user_identity(user_id))
+        html = render_template('customers.html', customers=customers, total_debt=0)
+
+    assert html.count('class="customer-row"') == RENDER_ROWS
+    assert f'Müşteri {RENDER_ROWS}' in html
+    assert TRANSLATIONS[lang]['customers'] in html
+    other = 'ar' if lang == 'tr' else 'tr'
+    assert TRANSLATIONS[other]['new_customer'] not in html
+
+
+class _DictWrapper:
+    """Per-render wrapper from before compiled bundles: attribute lookups go through __getattr__."""
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            return object.__getattribute__(self, key)
+        return self._data.get(key, key)
+
+    def __getitem__(self, key):
+        return self._data.get(key, key)
+
+
+def _dict_wrapper_translations(lang='tr'):
+    return _DictWrapper(TRANSLATIONS.get(lang, TRANSLATIONS['tr']))
+
+
+def _timed_render(customers):
+    started = time.perf_counter()
+    html = render_template('customers.html', customers=customers, total_debt=0)
+    return time.perf_counter() - started, html
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('lang', ['tr', 'ar'])
+def test_customers_render_benchmark(file_app, make_tenant, lang, record_testsuite_property):
+    """Both translation objects render the same 5k-row page; best time of each is recorded."""
+    company_id = make_tenant('Çeviri', f'translation_bench_{lang}')
+    with file_app.app_context():
+        user_id = User.query.filter_by(username=f'translation_bench_{lang}').one().id
+    customers = [
+        Customer(id=i, company_id=company_id, name=f'Müşteri {i}', phone='0555 000 00 00' if i % 2 else None,
+                 balance=(i % 7) - 3)
+        for i in range(1, BENCH_ROWS + 1)
+    ]
+
+    wrapper, bundle = [], []
+    with file_app.test_request_context('/customers'):
+        session['lang'] = lang
+        login_user(load_user_identity(user_id))
+        _, expected = _timed_render(customers)
+        # Rounds alternate so warm-up and noise hit both sides equally
+        for _ in range(BENCH_ROUNDS):
+            elapsed, html = _timed_render(customers)
+            bundle.append(elapsed)
+            assert html == expected
+            app_module.get_all_translations = _dict_wrapper_translations
+            try:
+                elapsed, html = _timed_render(customers)
+            finally:
+                app_module.get_all_translations = get_all_translations
+            wrapper.append(elapsed)
+            assert html == expected
+
+    assert expected.count('class="customer-row"') == BENCH_ROWS
+    prefix = f'customers_render_{lang}_{BENCH_ROWS}_rows'
+    record_testsuite_property(f'{prefix}_dict_wrapper_ms', round(min(wrapper) * 1000, 1))
+    record_testsuite_property(f'{prefix}_compiled_bundle_ms', round(min(bundle) * 1000, 1))
+    record_testsuite_property(f'{prefix}_saving_percent', round((min(wrapper) - min(bundle)) / min(wrapper) * 100, 1))
@@ -2,10 +2,18 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for, f
 from flask_login import LoginManager, current_user
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
+from jinja2 import pass_context
 from models import db, Transaction, Customer, CustomerTransaction, Product, Receipt, ReceiptItem, User, Company
 from config import config, is_production, is_demo, is_testing, is_development, get_database_url
-from translations import get_all_translations, get_translation
+from translations import DIGIT_TABLES, get_all_translations, get_translation
 from logging_config import setup_logging, add_sensitive_filter
+from cache import init_cache
+from db_pool import engine_options, init_pool_metrics
+from request_metrics import init_request_metrics
+from slow_query_log import init_slow_query_log
+from prometheus_metrics import init_metrics
+from login_throttle import init_login_throttle
+from identity_cache import init_identity_cache, load_user_identity
 from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal
 import os
@@ -54,19 +62,9 @@ def create_app(config_name=None):
     if not is_testing():
         app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
     
-    # SQLite için pool parametreleri uygulanmaz (SQLite connection pooling desteklemez)
-    # PostgreSQL gibi production veritabanları için pool ayarları
+    # Havuz ayarları ortama göre config'den (DB_POOL_*); SQLite'ta havuz parametreleri uygulanmaz
     db_url = app.config.get('SQLALCHEMY_DATABASE_URI', '')
-    if db_url and not db_url.startswith('sqlite'):
-        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-            'pool_pre_ping': True,
-            'pool_recycle': 300,
-            'pool_timeout': 30,
-            'max_overflow': 0
-        }
-    else:
-        # SQLite için boş veya minimal engine options
-        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config, db_url)
     
     # CSRF token timeout - 1 saat (3600 saniye)
     app.config['WTF_CSRF_TIME_LIMIT'] = 3600
@@ -76,6 +74,27 @@ def create_app(config_name=None):
     db.init_app(app)
     migrate.init_app(app, db)
     
+    # Havuz metrikleri (checkout bekleme süresi, kullanım, yavaş checkout uyarısı)
+    init_pool_metrics(app)
+    
+    # İstek süresi / sorgu sayısı ölçümü - diğer before_request hook'larından önce kaydedilir
+    init_request_metrics(app)
+    
+    # Yavaş SQL logu (endpoint, company_id, parmak izi; isteğe bağlı EXPLAIN)
+    init_slow_query_log(app)
+    
+    # Prometheus /metrics (platform admin veya METRICS_ALLOWED_NETWORKS)
+    init_metrics(app)
+    
+    # Paylaşılan önbellek (dashboard istatistikleri, tenant veri versiyonları)
+    init_cache(app)
+    
+    # Giriş denemesi kısıtlayıcı (ana veritabanı dışında, worker'lar arası paylaşılır)
+    init_login_throttle(app)
+    
+    # Oturum kullanıcısı için süreç içi kimlik önbelleği (user_loader)
+    init_identity_cache(app)
+    
     # Flask-WTF CSRF başlatma
     csrf.init_app(app)
     
@@ -90,38 +109,38 @@ def create_app(config_name=None):
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # Kimlik kaydı önbellekten gelir; tam User satırı yalnızca gerektiğinde yüklenir
+        return load_user_identity(int(user_id))
     
     # Jinja2 filter - Türkiye saati (dil desteği ile)
     @app.template_filter('turkey_time')
-    def turkey_time_filter(dt, format='%d.%m.%Y %H:%M'):
+    @pass_context
+    def turkey_time_filter(context, dt, format='%d.%m.%Y %H:%M'):
         """Template'de Türkiye saatini göster"""
         turkey_dt = to_turkey_time(dt)
         if turkey_dt:
-            lang = session.get('lang', 'tr')
             formatted = turkey_dt.strftime(format)
-            if lang == 'ar':
-                # Arapça rakamlarına çevir
-                arabic_numerals = str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')
-                formatted = formatted.translate(arabic_numerals)
+            # Dil, context processor'ın render başına bir kez koyduğu değerden okunur
+            digits = DIGIT_TABLES.get(context.get('current_lang'))
+            if digits:
+                formatted = formatted.translate(digits)
             return formatted
         return ''
     
     # Jinja2 filter - Sadece tarih (dil desteği ile)
     @app.template_filter('format_date')
-    def format_date_filter(dt, format='%d.%m.%Y'):
+    @pass_context
+    def format_date_filter(context, dt, format='%d.%m.%Y'):
         """Template'de tarihi formatla"""
         if dt is None:
             return ''
-        lang = session.get('lang', 'tr')
         if hasattr(dt, 'strftime'):
             formatted = dt.strftime(format)
         else:
             formatted = str(dt)
-        if lang == 'ar':
-            # Arapça rakamlarına çevir
-            arabic_numerals = str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')
-            formatted = formatted.translate(arabic_numerals)
+        digits = DIGIT_TABLES.get(context.get('current_lang'))
+        if digits:
+            formatted = formatted.translate(digits)
         return formatted
     
     # Dil context processor - tüm template'lerde kullanılabilir
@@ -169,6 +188,10 @@ def create_app(config_name=None):
     
     # API endpointlerini CSRF korumasından muaf tut (blueprint kaydettikten sonra)
     csrf.exempt(api_bp)
+    
+    # CLI komutları (flask reconcile-customer-balances vb.)
+    from commands import register_commands
+    register_commands(app)
 
     # Tenant izolasyonu için before_request hook
     @app.before_request
@@ -280,6 +303,9 @@ def ensure_saas_schema():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        alter_statements.append(
+            "CREATE INDEX IF NOT EXISTS ix_login_attempts_ip_username ON login_attempts (ip_address, username)"
+        )
 
     with db.engine.begin() as conn:
         for stmt in alter_statements:
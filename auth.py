@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from models import db, User, Company, CompanyRequest, Customer, Transaction, Product, Receipt, LoginAttempt
+from models import db, User, Company, CompanyRequest, Customer, Transaction, Product, Receipt
 from datetime import datetime, timezone, timedelta
 from functools import wraps
 from translations import get_translation
+from login_throttle import get_login_throttle
+from prometheus_metrics import observe_login_rejection
 import secrets
 import string
 import re
@@ -454,15 +456,15 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for('main.index'))
     
-    # Brute force koruması - IP bazlı kontrol
+    # Brute force koruması - IP bazlı kontrol (ana veritabanına dokunmaz)
+    throttle = get_login_throttle()
     ip_address = request.remote_addr or 'unknown'
-    MAX_ATTEMPTS = 5
-    LOCKOUT_MINUTES = 15
+    ip_key = f'ip:{ip_address}'
+    LOCKOUT_MINUTES = current_app.config.get('LOGIN_LOCKOUT_MINUTES', 15)
     
-    # IP bazlı giriş denemesini kontrol et
-    ip_attempt = LoginAttempt.query.filter_by(ip_address=ip_address, username=None).first()
-    if ip_attempt and ip_attempt.is_locked():
-        remaining = ip_attempt.get_remaining_lockout_seconds()
+    remaining = throttle.locked_for([ip_key])
+    if remaining:
+        observe_login_rejection('ip')
         minutes = remaining // 60
         flash(f'Çok fazla başarısız giriş denemesi. Lütfen {minutes} dakika sonra tekrar deneyin.', 'danger')
         return render_template('auth/login.html')
@@ -471,12 +473,13 @@ def login():
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '')
         remember = request.form.get('remember', False)
+        user_key = f'user:{ip_address}:{username}' if username else None
         
         # Kullanıcı bazlı kilitleme kontrolü
-        if username:
-            user_attempt = LoginAttempt.query.filter_by(ip_address=ip_address, username=username).first()
-            if user_attempt and user_attempt.is_locked():
-                remaining = user_attempt.get_remaining_lockout_seconds()
+        if user_key:
+            remaining = throttle.locked_for([user_key])
+            if remaining:
+                observe_login_rejection('user')
                 minutes = remaining // 60
                 flash(f'Bu hesap kilitlendi. Lütfen {minutes} dakika sonra tekrar deneyin.', 'danger')
                 return render_template('auth/login.html')
@@ -485,11 +488,7 @@ def login():
         
         if user and user.check_password(password):
             # Başarılı giriş - deneme sayılarını sıfırla
-            if ip_attempt:
-                ip_attempt.reset_attempts()
-            if user_attempt:
-                user_attempt.reset_attempts()
-            db.session.commit()
+            throttle.reset([key for key in (ip_key, user_key) if key])
             
             if not user.is_active:
                 flash('Hesabınız devre dışı bırakılmış.', 'danger')
@@ -514,24 +513,11 @@ def login():
             next_page = request.args.get('next')
             return redirect(get_safe_redirect(next_page, 'main.index'))
         else:
-            # Başarısız giriş - deneme sayısını artır
-            if not ip_attempt:
-                ip_attempt = LoginAttempt(ip_address=ip_address)
-                db.session.add(ip_attempt)
-            
-            ip_attempt.increment_attempt(MAX_ATTEMPTS, LOCKOUT_MINUTES)
-            
-            # Kullanıcı bazlı takip de yap
-            if username:
-                user_attempt = LoginAttempt.query.filter_by(ip_address=ip_address, username=username).first()
-                if not user_attempt:
-                    user_attempt = LoginAttempt(ip_address=ip_address, username=username)
-                    db.session.add(user_attempt)
-                user_attempt.increment_attempt(MAX_ATTEMPTS, LOCKOUT_MINUTES)
-            
-            db.session.commit()
+            # Başarısız giriş - deneme sayısını artır (IP ve kullanıcı bazlı)
+            remaining_attempts = throttle.register_failure(ip_key)
+            if user_key:
+                throttle.register_failure(user_key)
             
-            remaining_attempts = MAX_ATTEMPTS - ip_attempt.attempt_count
             if remaining_attempts > 0:
                 flash(f'Kullanıcı adı veya şifre hatalı. Kalan deneme: {remaining_attempts}', 'danger')
             else:
@@ -10,13 +10,24 @@ Kurulum:
 5. pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client
 
 İlk çalıştırmada tarayıcı açılacak ve Google hesabınıza giriş yapmanız istenecek.
+
+Yerel yedek, uygulama çalışırken sqlite3 online backup API'si ile alınır: sayfalar
+küçük gruplar halinde kopyalanır. WAL modunda kaynakta açık tutulan okuma işlemi
+anlık görüntüyü kopyalamanın başladığı ana sabitler; yazan istekler WAL'a yazmaya
+devam eder ve kopyalama yeniden başlamaz. Diğer günlük modlarında gruplar arasında
+kilit bırakılır. Anlık görüntü PRAGMA integrity_check ile doğrulanıp sıkıştırılır
+(zstd, kurulu değilse gzip); yazılmakta olan .db.tmp dosyaları temizlikte silinmez.
 """
 
 import os
-import shutil
+import sqlite3
+import time
 from datetime import datetime
 from pathlib import Path
 
+from prometheus_metrics import observe_backup
+from services.backup_pipeline import READ_SIZE, BackupError, compress_stream, default_compression
+
 # Google Drive API için gerekli kütüphaneler
 try:
     from google.auth.transport.requests import Request
@@ -37,6 +48,10 @@ BACKUP_FOLDER = Path(__file__).parent / 'backups'
 CREDENTIALS_FILE = Path(__file__).parent / 'credentials.json'
 TOKEN_FILE = Path(__file__).parent / 'token.json'
 DRIVE_FOLDER_NAME = 'Muhasebe_Yedekleri'
+# Online backup: her adımda kopyalanan sayfa sayısı ve adımlar arası bekleme (yazanlara fırsat)
+SNAPSHOT_PAGES = int(os.environ.get('BACKUP_SQLITE_PAGES', 1024))
+SNAPSHOT_SLEEP = float(os.environ.get('BACKUP_SQLITE_SLEEP', 0.01))
+COMPRESSION_EXTENSIONS = {'zstd': 'zst', 'gzip': 'gz'}
 
 def get_drive_service():
     """Google Drive API servisini başlat"""
@@ -80,20 +95,104 @@ def get_or_create_folder(service, folder_name):
     print(f"'{folder_name}' klasörü oluşturuldu.")
     return folder.get('id')
 
-def create_local_backup():
-    """Yerel yedek oluştur"""
-    if not DATABASE_PATH.exists():
-        print(f"HATA: Veritabanı bulunamadı: {DATABASE_PATH}")
+def snapshot_database(source_path, target_path, pages=SNAPSHOT_PAGES, sleep=SNAPSHOT_SLEEP):
+    """Çalışan veritabanının tutarlı kopyasını sqlite3 online backup API ile alır.
+    
+    WAL modunda kaynakta bir okuma işlemi açık tutulur: görüntü bu ana sabitlenir,
+    yazanlar WAL'a yazmaya devam eder ve kopyalama baştan başlamaz (sabitlenmezse her
+    yazımda backup API kopyalamayı yeniden başlatır, sürekli yazılan veritabanında hiç
+    bitmeyebilir). Diğer modlarda okuma kilidi yazanları durduracağı için yalnızca
+    adımlar arasında kilit bırakılır. Kopya tek dosyalıktır (journal_mode=DELETE);
+    integrity_check geçmezse BackupError verilir.
+    """
+    started = time.monotonic()
+    last_report = [started]
+    
+    def report(status, remaining, total):
+        now = time.monotonic()
+        if remaining and now - last_report[0] < 1:
+            return
+        last_report[0] = now
+        done = total - remaining
+        print(f"Anlık görüntü: {done}/{total} sayfa (%{done * 100 // max(total, 1)})")
+    
+    source = sqlite3.connect(source_path, timeout=30, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    try:
+        page_size = source.execute('PRAGMA page_size').fetchone()[0]
+        if source.execute('PRAGMA journal_mode').fetchone()[0] == 'wal':
+            source.execute('BEGIN')
+            source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        source.backup(target, pages=pages, progress=report, sleep=sleep)
+        target.execute('PRAGMA journal_mode=DELETE')
+        result = target.execute('PRAGMA integrity_check').fetchall()
+        page_count = target.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+    if result != [('ok',)]:
+        raise BackupError('Anlık görüntü doğrulanamadı: ' + '; '.join(row[0] for row in result[:5]))
+    
+    duration = time.monotonic() - started
+    size = page_count * page_size
+    print(
+        f"Anlık görüntü alındı: {size / 1024 / 1024:.1f} MB, {duration:.1f} sn "
+        f"({size / 1024 / 1024 / duration if duration else 0:.1f} MB/s), integrity_check: ok"
+    )
+    return size
+
+
+def compress_file(source_path, target_path, compression):
+    """Dosyayı akış halinde sıkıştırır; sıkıştırılmış boyutu döndürür"""
+    def read():
+        with open(source_path, 'rb') as f:
+            while True:
+                data = f.read(READ_SIZE)
+                if not data:
+                    return
+                yield data
+    
+    size = 0
+    with open(target_path, 'wb') as f:
+        for data in compress_stream(read(), compression):
+            f.write(data)
+            size += len(data)
+    return size
+
+
+def create_local_backup(database_path=None, backup_folder=None, compression=None):
+    """Yerel yedek oluştur: online anlık görüntü → integrity_check → sıkıştırma"""
+    database_path = Path(database_path or DATABASE_PATH)
+    backup_folder = Path(backup_folder or BACKUP_FOLDER)
+    if not database_path.exists():
+        print(f"HATA: Veritabanı bulunamadı: {database_path}")
         return None
     
-    BACKUP_FOLDER.mkdir(exist_ok=True)
+    backup_folder.mkdir(exist_ok=True)
     
+    compression = compression or default_compression()
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_name = f"muhasebe_backup_{timestamp}.db"
-    backup_path = BACKUP_FOLDER / backup_name
+    backup_path = backup_folder / f"muhasebe_backup_{timestamp}.db.{COMPRESSION_EXTENSIONS[compression]}"
+    snapshot_path = backup_folder / f"muhasebe_backup_{timestamp}.db.tmp"
     
-    shutil.copy2(DATABASE_PATH, backup_path)
-    print(f"Yerel yedek oluşturuldu: {backup_path}")
+    started = time.monotonic()
+    try:
+        size = snapshot_database(database_path, snapshot_path)
+        compressed_size = compress_file(snapshot_path, backup_path, compression)
+    except Exception as e:
+        print(f"HATA: Yerel yedek alınamadı: {e}")
+        if backup_path.exists():
+            backup_path.unlink()
+        return None
+    finally:
+        if snapshot_path.exists():
+            snapshot_path.unlink()
+    
+    duration = time.monotonic() - started
+    print(
+        f"Yerel yedek oluşturuldu: {backup_path} ({compressed_size / 1024 / 1024:.1f} MB, "
+        f"%{compressed_size * 100 // max(size, 1)} oran, {size / 1024 / 1024 / duration if duration else 0:.1f} MB/s)"
+    )
     
     return backup_path
 
@@ -132,14 +231,25 @@ def cleanup_local_backups(keep_count=7):
     if not BACKUP_FOLDER.exists():
         return
     
-    backups = sorted(BACKUP_FOLDER.glob('*.db'), key=os.path.getmtime, reverse=True)
+    # Yalnızca tamamlanmış yedekler; sürmekte olan yedeğin .db.tmp anlık görüntüsü hariç
+    suffixes = ('.db', *(f'.db.{extension}' for extension in COMPRESSION_EXTENSIONS.values()))
+    backups = sorted(
+        (path for path in BACKUP_FOLDER.glob('muhasebe_backup_*.db*') if path.name.endswith(suffixes)),
+        key=os.path.getmtime, reverse=True
+    )
     
     for backup in backups[keep_count:]:
         backup.unlink()
         print(f"Yerel eski yedek silindi: {backup.name}")
 
 def backup():
-    """Ana yedekleme fonksiyonu"""
+    """Ana yedekleme fonksiyonu; sonucu ve süreyi metriklere yazar"""
+    started = time.monotonic()
+    success = _run_backup()
+    observe_backup('success' if success else 'failure', time.monotonic() - started)
+    return success
+
+def _run_backup():
     print("=" * 50)
     print(f"Yedekleme başlatıldı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
@@ -0,0 +1,278 @@
+"""
+Süreçler arası paylaşılan anahtar/değer önbelleği ve tenant veri versiyonları.
+
+Gunicorn worker'ları arasında paylaşım için yerel dosya tabanlı arka uçlar kullanılır:
+- sqlite: tek bir SQLite dosyası (WAL modunda, varsayılan)
+- file: dizin içinde anahtar başına bir JSON dosyası
+- memory: süreç içi sözlük (test ve tek süreçli geliştirme için)
+
+Değerler JSON olarak saklanır; sayaçlar (incr) ayrı tutulur ve süresi dolmaz.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+
+class MemoryCache:
+    """Süreç içi önbellek - worker'lar arasında paylaşılmaz"""
+
+    def __init__(self):
+        self._data = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (json.dumps(value), expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            return self._counters[key]
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+
+class SQLiteCache:
+    """Tek bir SQLite dosyasında paylaşılan önbellek.
+
+    Bağlantılar thread ve süreç (fork) başına açılır; WAL modu sayesinde
+    okuyucular yazanları beklemez.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_counters ('
+            'key TEXT PRIMARY KEY, value INTEGER NOT NULL)'
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), expires_at)
+        )
+        # Eski versiyon anahtarları zamanla birikir - ara sıra süresi dolanları temizle
+        if random.random() < 0.01:
+            conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (now,))
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def incr(self, key, amount=1):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT INTO cache_counters (key, value) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = value + excluded.value',
+                (key, amount)
+            )
+            value = conn.execute('SELECT value FROM cache_counters WHERE key = ?', (key,)).fetchone()[0]
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return value
+
+    def get_counter(self, key):
+        row = self._connect().execute('SELECT value FROM cache_counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+
+class FileCache:
+    """Dizin tabanlı önbellek - anahtar başına bir JSON dosyası.
+
+    Yazımlar geçici dosya + os.replace ile atomiktir; sayaçlar flock ile korunur.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, suffix):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + suffix)
+
+    def _write_atomic(self, path, payload):
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        try:
+            with open(self._path(key, '.json'), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry['expires_at'] is not None and entry['expires_at'] < time.time():
+            return None
+        return entry['value']
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._write_atomic(self._path(key, '.json'), json.dumps({'value': value, 'expires_at': expires_at}))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key, '.json'))
+        except FileNotFoundError:
+            pass
+
+    def incr(self, key, amount=1):
+        with open(self._path(key, '.counter'), 'a+', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                value = int(f.read() or 0) + amount
+                f.seek(0)
+                f.truncate()
+                f.write(str(value))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return value
+
+    def get_counter(self, key):
+        try:
+            with open(self._path(key, '.counter'), encoding='utf-8') as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+
+def create_cache(app):
+    """Konfigürasyona göre önbellek arka ucunu oluşturur"""
+    backend = app.config.get('CACHE_BACKEND', 'sqlite')
+    if backend == 'memory':
+        return MemoryCache()
+    if backend == 'file':
+        return FileCache(app.config.get('CACHE_PATH') or os.path.join(app.instance_path, 'cache'))
+    if backend == 'sqlite':
+        return SQLiteCache(app.config.get('CACHE_PATH') or os.path.join(app.instance_path, 'cache.sqlite3'))
+    raise ValueError(f'Bilinmeyen CACHE_BACKEND: {backend}')
+
+
+def init_cache(app):
+    """Önbelleği uygulamaya bağlar (app.extensions['cache'])"""
+    app.extensions['cache'] = create_cache(app)
+
+
+def get_cache():
+    return current_app.extensions['cache']
+
+
+# =============================================================================
+# TENANT VERİ VERSİYONLARI
+# =============================================================================
+# Her şirket için artan bir sayaç tutulur. Önbellek anahtarları bu versiyonu
+# içerdiği için, şirketin verisi yazıldığında eski anahtarlar kendiliğinden
+# geçersiz hale gelir (silmeye gerek kalmaz).
+
+def data_version(company_id):
+    """Şirketin güncel veri versiyonu"""
+    return get_cache().get_counter(f'data_version:{company_id}')
+
+
+def bump_data_version(company_id):
+    """Şirketin veri versiyonunu artırır (ilgili önbellek anahtarlarını geçersiz kılar)"""
+    return get_cache().incr(f'data_version:{company_id}')
+
+
+def _tracked_company_id(session, obj):
+    """Yazılan nesnenin ait olduğu şirketi bulur; izlenmeyen modeller için None"""
+    from models import Transaction, Receipt, Customer, CustomerTransaction
+
+    if isinstance(obj, (Transaction, Receipt, Customer)):
+        return obj.company_id
+    if isinstance(obj, CustomerTransaction):
+        customer = session.identity_map.get(session.identity_key(Customer, obj.customer_id))
+        if customer is not None:
+            return customer.company_id
+        return session.execute(
+            select(Customer.company_id).where(Customer.id == obj.customer_id)
+        ).scalar()
+    return None
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_written_companies(session, flush_context):
+    companies = session.info.setdefault('written_company_ids', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        company_id = _tracked_company_id(session, obj)
+        if company_id is not None:
+            companies.add(company_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_written_companies(session):
+    companies = session.info.pop('written_company_ids', None)
+    if not companies or not has_app_context() or 'cache' not in current_app.extensions:
+        return
+    for company_id in companies:
+        bump_data_version(company_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written_companies(session):
+    session.info.pop('written_company_ids', None)
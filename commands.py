@@ -0,0 +1,187 @@
+"""
+Flask CLI komutları (flask <komut> ile çalıştırılır).
+"""
+
+import click
+
+
+def _report_reconcile(label, mismatches, fix):
+    """Bakiye doğrulama sonucunu yazdırır; düzeltilmemiş uyumsuzlukta hata koduyla çıkar"""
+    for m in mismatches:
+        click.echo(
+            f"{label} #{m['id']} (şirket {m['company_id']}): "
+            f"saklanan {m['stored_balance']} / defter {m['ledger_balance']}"
+        )
+
+    if not mismatches:
+        click.echo(f'Tüm {label.lower()} bakiyeleri defterle uyumlu.')
+    elif fix:
+        click.echo(f'{len(mismatches)} {label.lower()} bakiyesi düzeltildi.')
+    else:
+        click.echo(f'{len(mismatches)} uyumsuz bakiye bulundu. Düzeltmek için --fix kullanın.')
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    """Uygulamaya özel CLI komutlarını kaydeder"""
+
+    @app.cli.command('reconcile-customer-balances')
+    @click.option('--company-id', type=int, default=None, help='Sadece bu şirketi kontrol et')
+    @click.option('--fix', is_flag=True, help='Uyuşmayan bakiyeleri defterden yeniden yaz')
+    def reconcile_customer_balances_command(company_id, fix):
+        """Saklanan müşteri bakiyelerini customer_transactions defteriyle doğrular"""
+        from services.balance_service import reconcile_customer_balances
+
+        mismatches = reconcile_customer_balances(company_id=company_id, fix=fix)
+        _report_reconcile('Müşteri', mismatches, fix)
+
+    @app.cli.command('reconcile-supplier-balances')
+    @click.option('--company-id', type=int, default=None, help='Sadece bu şirketi kontrol et')
+    @click.option('--fix', is_flag=True, help='Uyuşmayan bakiyeleri defterden yeniden yaz')
+    def reconcile_supplier_balances_command(company_id, fix):
+        """Saklanan tedarikçi bakiyelerini supplier_transactions defteriyle doğrular"""
+        from services.balance_service import reconcile_supplier_balances
+
+        mismatches = reconcile_supplier_balances(company_id=company_id, fix=fix)
+        _report_reconcile('Tedarikçi', mismatches, fix)
+
+    @app.cli.command('backfill-daily-summaries')
+    @click.option('--company-id', type=int, default=None, help='Sadece bu şirketi yeniden oluştur')
+    def backfill_daily_summaries_command(company_id):
+        """Günlük özet tablosunu (daily_summaries) ham işlemlerden yeniden oluşturur"""
+        from services.summary_service import backfill_daily_summaries
+
+        days = backfill_daily_summaries(company_id=company_id)
+        click.echo(f'{days} günlük özet yazıldı.')
+
+    @app.cli.command('compact-login-attempts')
+    @click.option('--retention-days', type=int, default=30, help='login_attempts kayıtlarının saklanacağı gün sayısı')
+    def compact_login_attempts_command(retention_days):
+        """Giriş kısıtlayıcısının süresi dolan kayıtlarını ve eski login_attempts satırlarını siler"""
+        from login_throttle import compact_login_attempts, get_login_throttle
+
+        expired = get_login_throttle().compact()
+        deleted = compact_login_attempts(retention_days=retention_days)
+        click.echo(f'{expired} süresi dolmuş kısıtlama kaydı, {deleted} eski login_attempts satırı silindi.')
+
+    @app.cli.command('generate-synthetic-data')
+    @click.option('--companies', type=int, default=1, show_default=True, help='Oluşturulacak şirket sayısı')
+    @click.option('--customers', type=int, default=200, show_default=True, help='Şirket başına müşteri')
+    @click.option('--products', type=int, default=100, show_default=True, help='Şirket başına ürün')
+    @click.option('--suppliers', type=int, default=20, show_default=True, help='Şirket başına tedarikçi')
+    @click.option('--transactions', type=int, default=2000, show_default=True, help='Şirket başına gelir/gider işlemi')
+    @click.option('--receipts', type=int, default=1000, show_default=True, help='Şirket başına fiş')
+    @click.option('--items-per-receipt', type=int, default=3, show_default=True, help='Fiş başına ortalama kalem')
+    @click.option('--days', type=int, default=365, show_default=True, help='Tarihlerin yayıldığı gün sayısı')
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Son gün (varsayılan bugün; aynı seed ve tarih aynı veriyi üretir)')
+    @click.option('--seed', type=int, default=42, show_default=True)
+    @click.option('--start', type=int, default=1, show_default=True, help='İlk şirket numarası (kullanıcı adı sentetik<N>)')
+    @click.option('--batch-size', type=int, default=5000, show_default=True, help='Toplu yazım parça boyutu')
+    def generate_synthetic_data_command(companies, customers, products, suppliers, transactions, receipts,
+                                        items_per_receipt, days, end_date, seed, start, batch_size):
+        """Performans ölçümleri için deterministik sentetik şirketler ve veriler yazar"""
+        from config import is_production
+        from services.synthetic_data import DEFAULT_PASSWORD, generate_synthetic_data
+
+        if is_production():
+            raise click.ClickException('Sentetik veri production veritabanına yazılamaz.')
+        results = generate_synthetic_data(
+            companies=companies, customers=customers, products=products, suppliers=suppliers,
+            transactions=transactions, receipts=receipts, items_per_receipt=items_per_receipt,
+            days=days, end_date=end_date.date() if end_date else None, seed=seed, start=start,
+            batch_size=batch_size
+        )
+        for result in results:
+            rows = sum(result['counts'].values())
+            click.echo(f"Şirket #{result['company_id']} ({result['username']}): {rows} satır")
+        click.echo(f'{len(results)} şirket oluşturuldu. Şifre: {DEFAULT_PASSWORD}')
+
+    @app.cli.command('run-worker')
+    @click.option('--once', is_flag=True, help='Hazır tek işi çalıştırıp çık (cron/test)')
+    def run_worker_command(once):
+        """Arka plan iş kuyruğunu işler (export, yedekleme); SIGTERM ile çalışan iş bitince durur"""
+        from job_queue import Worker
+        from prometheus_metrics import observe_job, start_worker_metrics_server
+
+        worker = Worker(app)
+        worker.observers.append(observe_job)
+        if not once:
+            if app.config['JOB_METRICS_PORT']:
+                start_worker_metrics_server(app.config['JOB_METRICS_PORT'])
+            worker.run()
+            return
+        job_id = worker.run_once()
+        click.echo(f'İş #{job_id} çalıştırıldı.' if job_id else 'Çalışmaya hazır iş yok.')
+
+    @app.cli.command('enqueue-backup')
+    def enqueue_backup_command():
+        """Veritabanı yedeğini iş kuyruğuna ekler (bekleyen/çalışan yedekleme varsa yenisi eklenmez)"""
+        from job_queue import enqueue
+
+        job = enqueue('backup', unique=True)
+        click.echo(f'Yedekleme işi #{job.id} ({job.status}).')
+
+    @app.cli.command('prune-backups')
+    @click.option('--rebuild-index', is_flag=True, help='Dedup indeksini depodaki manifestlerden yeniden kur')
+    def prune_backups_command(rebuild_index):
+        """GFS saklama kuralını uygular ve başvurusu kalmayan yedek parçalarını siler"""
+        from services.backup_service import BackupService
+
+        backup_service = BackupService()
+        if rebuild_index:
+            if backup_service.mode != 'dedup':
+                raise click.ClickException('İndeks yalnızca BACKUP_MODE=dedup için kullanılır.')
+            store = backup_service.store()
+            try:
+                snapshots, chunks, missing = store.rebuild_index()
+            finally:
+                store.close()
+            click.echo(f'İndeks yeniden kuruldu: {snapshots} yedek, {chunks} parça, {missing} eksik parça.')
+        removed = backup_service.apply_retention()
+        for name in removed:
+            click.echo(f'Silindi: {name}')
+        click.echo(f'{len(removed)} yedek silindi.')
+        if backup_service.mode == 'dedup':
+            store = backup_service.store()
+            try:
+                stats = store.stats()
+            finally:
+                store.close()
+            click.echo(
+                f"Depo: {stats['snapshots']} yedek, {stats['chunks']} parça, "
+                f"{stats['stored_bytes'] / 1024 / 1024:.1f} MB (tekilleştirme oranı {stats['dedup_ratio']})"
+            )
+
+    @app.cli.command('verify-backup')
+    @click.option('--jobs', type=int, default=None, help='pg_restore paralel iş sayısı (varsayılan: CPU sayısı)')
+    @click.option('--keep', is_flag=True, help='Geri yüklenen geçici kopyayı silme')
+    def verify_backup_command(jobs, keep):
+        """En yeni yedeği geçici veritabanına geri yükleyip şirket bazında canlı veritabanıyla karşılaştırır"""
+        from models import db
+        from services.backup_pipeline import BackupError
+        from services.backup_verify import verify_latest_backup
+
+        try:
+            report = verify_latest_backup(db.engine, jobs=jobs, keep=keep)
+        except BackupError as e:
+            raise click.ClickException(f'Yedek geri yüklenemedi: {e}')
+        click.echo(f"Yedek: {report['name']} ({report['created_at']}, {report['backup_age_seconds'] // 60} dk önce)")
+        click.echo(
+            f"Geri yükleme: {report['restored_size'] / 1024 / 1024:.1f} MB, {report['restore_seconds']:.1f} sn "
+            f"({report['restore_throughput_mb_s']} MB/s, {report['jobs']} iş)"
+        )
+        click.echo(f"Karşılaştırma: {report['tenants']} şirket, {report['checks']} kontrol, {report['compare_seconds']:.1f} sn")
+        click.echo(f"RTO: {report['rto_seconds']:.1f} sn")
+        if report['restored_copy']:
+            click.echo(f"Geri yüklenen kopya: {report['restored_copy']}")
+        for mismatch in report['mismatches']:
+            click.echo(
+                f"FARK {mismatch['check']} şirket #{mismatch['company_id']}: "
+                f"canlı {'/'.join(mismatch['live'])}, yedek {'/'.join(mismatch['restored'])}"
+            )
+        if report['mismatches']:
+            raise click.ClickException(
+                f"{len(report['mismatches'])} fark bulundu (yedekten sonraki yazımlar da fark olarak görünür)."
+            )
+        click.echo('Yedek doğrulandı: tüm şirketlerde satır sayıları ve sağlama toplamları eşleşiyor.')
@@ -6,6 +6,71 @@ load_dotenv()
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Worker'lar arası paylaşılan önbellek: sqlite (varsayılan), file veya memory
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
+    CACHE_PATH = os.environ.get('CACHE_PATH')  # Boşsa instance/ altında
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 300))
+    # Önbellek isabet sayaçları süreç içinde biriktirilip bu aralıkla paylaşılan önbelleğe yazılır
+    CACHE_COUNTER_FLUSH_SECONDS = int(os.environ.get('CACHE_COUNTER_FLUSH_SECONDS', 10))
+    
+    # Oturum kullanıcısı kimlik önbelleği (süreç içi, auth_version sayacıyla geçersiz kılınır)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 300))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    
+    # Giriş kısıtlayıcı (brute force): sqlite (worker'lar arası, varsayılan) veya memory
+    LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND', 'sqlite')
+    LOGIN_THROTTLE_PATH = os.environ.get('LOGIN_THROTTLE_PATH')  # Boşsa instance/ altında
+    LOGIN_MAX_ATTEMPTS = int(os.environ.get('LOGIN_MAX_ATTEMPTS', 5))
+    LOGIN_ATTEMPT_WINDOW_MINUTES = int(os.environ.get('LOGIN_ATTEMPT_WINDOW_MINUTES', 15))
+    LOGIN_LOCKOUT_MINUTES = int(os.environ.get('LOGIN_LOCKOUT_MINUTES', 15))
+    
+    # Veritabanı bağlantı havuzu (SQLite'ta uygulanmaz); worker başına geçerlidir.
+    # gthread worker'larında havuz boyutu + taşma >= GUNICORN_THREADS olmalı
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 300))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    # Bu süreden uzun checkout beklemeleri uyarı olarak loglanır (ms)
+    DB_POOL_SLOW_CHECKOUT_MS = int(os.environ.get('DB_POOL_SLOW_CHECKOUT_MS', 100))
+    
+    # İstek ölçümü: endpoint başına son N isteğin örnekleri, uyarı eşikleri
+    REQUEST_METRICS_WINDOW = int(os.environ.get('REQUEST_METRICS_WINDOW', 1000))
+    REQUEST_QUERY_WARN = int(os.environ.get('REQUEST_QUERY_WARN', 50))
+    REQUEST_SLOW_MS = int(os.environ.get('REQUEST_SLOW_MS', 1000))
+    # Server-Timing yanıt başlığı (tarayıcı geliştirici araçlarında görünür)
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '1') == '1'
+    
+    # Yavaş sorgu logu: bu süreden uzun SQL ifadeleri parmak iziyle loglanır (ms).
+    # SLOW_QUERY_EXPLAIN=1 her parmak izinin ilk örneği için plan alır; PostgreSQL'de
+    # EXPLAIN ANALYZE sorguyu bir kez daha çalıştırır
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '0') == '1'
+    SLOW_QUERY_MAX_FINGERPRINTS = int(os.environ.get('SLOW_QUERY_MAX_FINGERPRINTS', 500))
+    
+    # Arka plan iş kuyruğu (flask run-worker): export ve yedekleme işleri jobs tablosunda bekler.
+    # Şirket başına aynı anda çalışan iş ve bekleyen iş sınırı; hata alan iş üstel beklemeyle
+    # (taban * 2^(deneme-1), en çok JOB_RETRY_MAX_SECONDS) JOB_MAX_ATTEMPTS kez denenir.
+    # JOB_LEASE_SECONDS boyunca heartbeat gelmeyen iş (ölen worker) yeniden kuyruğa alınır
+    JOB_TENANT_CONCURRENCY = int(os.environ.get('JOB_TENANT_CONCURRENCY', 1))
+    JOB_TENANT_QUEUE_LIMIT = int(os.environ.get('JOB_TENANT_QUEUE_LIMIT', 10))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_BASE_SECONDS = int(os.environ.get('JOB_RETRY_BASE_SECONDS', 30))
+    JOB_RETRY_MAX_SECONDS = int(os.environ.get('JOB_RETRY_MAX_SECONDS', 3600))
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 300))
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 2))
+    # Export dosyaları web ve worker süreçlerinin ortak gördüğü dizinde olmalı; boşsa instance/jobs
+    JOB_OUTPUT_DIR = os.environ.get('JOB_OUTPUT_DIR')
+    JOB_RESULT_TTL_HOURS = int(os.environ.get('JOB_RESULT_TTL_HOURS', 24))
+    # Worker metriklerinin (iş sayı/süreleri, export süreleri) sunulduğu port; 0 kapatır
+    JOB_METRICS_PORT = int(os.environ.get('JOB_METRICS_PORT', 9102))
+    
+    # /metrics erişimi: platform admin oturumu veya bu ağlardaki istemciler (virgülle ayrılmış CIDR)
+    METRICS_ALLOWED_NETWORKS = os.environ.get('METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128')
+    
+    # PDF export yazı tipi (Türkçe + Arapça glyph'leri olan bir TTF); boşsa DejaVu Sans aranır
+    PDF_FONT_PATH = os.environ.get('PDF_FONT_PATH')
+    
     @staticmethod
     def init_app(app):
         pass
@@ -16,6 +81,10 @@ class DevelopmentConfig(Config):
     
 class ProductionConfig(Config):
     DEBUG = False
+    # İstek kuyrukta 30 sn beklemek yerine erken hata alsın
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Sorgu sayısı ve süreleri dışarıya gösterilmez
+    SERVER_TIMING_HEADER = False
     
     @classmethod
     def init_app(cls, app):
@@ -48,6 +117,9 @@ class ProductionConfig(Config):
 class DemoConfig(Config):
     DEBUG = True
     SECRET_KEY = os.environ.get('FLASK_SECRET_KEY') or 'demo-secret-key-not-for-production'
+    # Ücretsiz plan veritabanlarının bağlantı sınırı düşüktür
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 2))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 2))
     
     @classmethod
     def init_app(cls, app):
@@ -64,6 +136,8 @@ class TestingConfig(Config):
     SECRET_KEY = 'test-secret-key'
     # Allow override via environment variable for migration compatibility
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    CACHE_BACKEND = 'memory'
+    LOGIN_THROTTLE_BACKEND = 'memory'
     
     @classmethod
     def init_app(cls, app):
@@ -0,0 +1,165 @@
+"""
+SQLAlchemy bağlantı havuzu ayarları ve havuz metrikleri.
+
+Havuz boyutu, taşma, recycle, zaman aşımı ve pre-ping ortama göre config'den
+(DB_POOL_*) okunur. Havuz olayları süreç başına şunları toplar:
+- checkout bekleme süresi (toplam, en yüksek ve histogram kovaları)
+- kullanımdaki bağlantı sayısı ve taşma (overflow) kullanımı, en yüksek değerleriyle
+- DB_POOL_SLOW_CHECKOUT_MS eşiğini aşan yavaş checkout sayısı (ayrıca uyarı loglanır)
+
+Bekleme süresi TimedQueuePool'un _do_get çağrısında ölçülür: havuz doluysa
+bağlantı iade edilene kadar geçen süre ve yeni bağlantı açma süresi dahildir.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Checkout bekleme histogramı kova üst sınırları (saniye)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class TimedQueuePool(QueuePool):
+    """Checkout bekleme süresini bağlantı kaydına yazan QueuePool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            logger.warning(
+                'Havuz checkout zaman aşımı (%.1f sn): kullanımda %s, taşma %s/%s',
+                time.perf_counter() - started, self.checkedout(), max(self.overflow(), 0), self._max_overflow
+            )
+            raise
+        record.info['checkout_wait'] = time.perf_counter() - started
+        return record
+
+
+class PoolMetrics:
+    """Tek bir engine'in süreç içi havuz sayaçları"""
+
+    def __init__(self, engine, slow_checkout_ms=100):
+        self.engine = engine
+        self.slow_checkout = slow_checkout_ms / 1000
+        # record_checkout sonrası (bekleme, kullanımda, taşma) ile çağrılır (ör. Prometheus)
+        self.observers = []
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.checked_out_peak = 0
+        self.overflow_peak = 0
+
+    def pool_usage(self):
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return 0, 0
+        return pool.checkedout(), max(pool.overflow(), 0)
+
+    def record_checkout(self, wait):
+        checked_out, overflow = self.pool_usage()
+        with self._lock:
+            # Fork sonrası master'ın sayaçları worker'a taşınmaz
+            if self._pid != os.getpid():
+                self._reset()
+            self.checkouts += 1
+            self.checked_out_peak = max(self.checked_out_peak, checked_out)
+            self.overflow_peak = max(self.overflow_peak, overflow)
+            # Süre ölçmeyen havuzlarda (bellek içi SQLite) yalnızca sayılır
+            slow = wait is not None and wait > self.slow_checkout
+            if wait is not None:
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+                for i, bound in enumerate(WAIT_BUCKETS):
+                    if wait <= bound:
+                        self.wait_buckets[i] += 1
+                        break
+            if slow:
+                self.slow_checkouts += 1
+        for observer in self.observers:
+            observer(wait, checked_out, overflow)
+        if slow:
+            logger.warning(
+                'Yavaş havuz checkout: %.0f ms bekledi (kullanımda %s, taşma %s)',
+                wait * 1000, checked_out, overflow
+            )
+
+    def snapshot(self):
+        """Sayaçların JSON uyumlu kopyası"""
+        pool = self.engine.pool
+        checked_out, overflow = self.pool_usage()
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS, self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                'pool_class': type(pool).__name__,
+                'pool_size': pool.size() if isinstance(pool, QueuePool) else None,
+                'max_overflow': getattr(pool, '_max_overflow', None),
+                'checked_out': checked_out,
+                'checked_out_peak': self.checked_out_peak,
+                'overflow': overflow,
+                'overflow_peak': self.overflow_peak,
+                'checkouts': self.checkouts,
+                'slow_checkouts': self.slow_checkouts,
+                'wait_seconds_total': round(self.wait_total, 6),
+                'wait_seconds_max': round(self.wait_max, 6),
+                'wait_buckets': buckets,
+            }
+
+
+def engine_options(app_config, db_url):
+    """Veritabanı türü ve ortama göre SQLALCHEMY_ENGINE_OPTIONS"""
+    if db_url.startswith('sqlite'):
+        # Bellek içi SQLite tek bağlantı kullanır; dosya SQLite'ta havuz
+        # parametreleri uygulanmaz, yalnızca bekleme süresi ölçülür
+        if ':memory:' in db_url or db_url.rstrip('/') == 'sqlite:':
+            return {}
+        return {'poolclass': TimedQueuePool}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': app_config.get('DB_POOL_SIZE', 5),
+        'max_overflow': app_config.get('DB_MAX_OVERFLOW', 5),
+        'pool_timeout': app_config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': app_config.get('DB_POOL_RECYCLE', 300),
+        'pool_pre_ping': app_config.get('DB_POOL_PRE_PING', True),
+    }
+
+
+def install_pool_metrics(engine, slow_checkout_ms=100):
+    """Engine'in havuz olaylarına metrik dinleyicisini bağlar"""
+    metrics = PoolMetrics(engine, slow_checkout_ms)
+
+    # Engine düzeyindeki dinleyici dispose() sonrası yeniden oluşturulan havuza da geçer
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout(connection_record.info.pop('checkout_wait', None))
+
+    return metrics
+
+
+def init_pool_metrics(app):
+    """Havuz metriklerini uygulamaya bağlar (app.extensions['pool_metrics'])"""
+    from models import db
+
+    with app.app_context():
+        engine = db.engine
+    app.extensions['pool_metrics'] = install_pool_metrics(
+        engine, app.config.get('DB_POOL_SLOW_CHECKOUT_MS', 100)
+    )
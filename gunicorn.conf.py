@@ -0,0 +1,146 @@
+"""
+Gunicorn çalışma profili - start.sh ve Dockerfile bu dosyayla başlatır:
+
+    gunicorn -c gunicorn.conf.py "app:create_app()"
+
+Profil (GUNICORN_PROFILE):
+- gthread (varsayılan): CPU + 1 worker, her birinde GUNICORN_THREADS thread.
+  Uzun bir export yalnızca bir thread'i meşgul eder.
+- sync: 2 * CPU + 1 tek thread'li worker.
+- single: eski davranış (tek sync worker, preload yok) - karşılaştırma için.
+
+Tek tek ayarlar ortam değişkenleriyle ezilebilir: WEB_CONCURRENCY, GUNICORN_WORKER_CLASS,
+GUNICORN_THREADS, GUNICORN_MAX_WORKERS, GUNICORN_PRELOAD, GUNICORN_TIMEOUT, PORT.
+
+preload_app ile create_app() ve importlar master süreçte bir kez yapılır, worker'lar
+fork ile copy-on-write paylaşır. Master'ın açtığı veritabanı bağlantıları fork
+sonrası her worker'da bırakılır (post_fork).
+
+Kuyruk süresi: nginx isteği aldığı anı X-Request-Start başlığıyla iletir
+(nginx/conf.d); istek bir worker'a ulaşana kadar geçen süre loglanır.
+
+Prometheus: worker'lar metriklerini PROMETHEUS_MULTIPROC_DIR dizinine yazar
+(varsayılan: geçici dizin altında). Dizin master başlarken temizlenir; ölen
+worker'ların anlık göstergeleri child_exit'te düşürülür.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+PROFILES = {
+    'gthread': {'worker_class': 'gthread', 'preload': True},
+    'sync': {'worker_class': 'sync', 'preload': True},
+    'single': {'worker_class': 'sync', 'preload': False, 'workers': 1},
+}
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+profile_name = os.environ.get('GUNICORN_PROFILE', 'gthread')
+if profile_name not in PROFILES:
+    raise RuntimeError(f'Bilinmeyen GUNICORN_PROFILE: {profile_name} ({", ".join(PROFILES)})')
+profile = PROFILES[profile_name]
+
+cpu_count = multiprocessing.cpu_count()
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', profile['worker_class'])
+if worker_class == 'gthread':
+    threads = _env_int('GUNICORN_THREADS', 4)
+    default_workers = cpu_count + 1
+else:
+    threads = 1
+    default_workers = 2 * cpu_count + 1
+# Küçük sunucularda (1-2 GB RAM) bellek sınırı: worker sayısı GUNICORN_MAX_WORKERS ile kırpılır
+workers = _env_int('WEB_CONCURRENCY', profile.get('workers') or min(default_workers, _env_int('GUNICORN_MAX_WORKERS', 8)))
+
+preload_app = _env_bool('GUNICORN_PRELOAD', profile['preload'])
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# prometheus_client import edilmeden (preload) önce tanımlanmalı. HUP ile config
+# yeniden okunduğunda çalışan worker'ların dosyaları silinmez.
+if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'muhasebe-prometheus')
+if not os.environ.get('_PROMETHEUS_MULTIPROC_READY'):
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+    os.environ['_PROMETHEUS_MULTIPROC_READY'] = '1'
+
+# Kuyruk süresi bu eşiği aşarsa uyarı loglanır (ms)
+QUEUE_WARN_MS = _env_int('GUNICORN_QUEUE_WARN_MS', 500)
+
+
+def when_ready(server):
+    server.log.info(
+        'Profil %s: %s worker, sınıf %s, %s thread, preload %s',
+        profile_name, server.cfg.workers, server.cfg.worker_class_str, server.cfg.threads,
+        'açık' if server.cfg.preload_app else 'kapalı'
+    )
+
+
+def post_fork(server, worker):
+    """Master'dan miras kalan havuz bağlantılarını worker'da kullanmadan bırakır"""
+    if not server.cfg.preload_app:
+        return
+    from models import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: bağlantılar master'a ait, yalnızca bu süreçteki havuz sıfırlanır
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Ölen worker'ın livesum göstergelerini (havuz kullanımı) toplamdan çıkarır"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def parse_request_start(value):
+    """X-Request-Start değerini (t=saniye/ms/µs) epoch saniyesine çevirir; okunamazsa None"""
+    if not value:
+        return None
+    try:
+        started = float(value.strip().removeprefix('t='))
+    except ValueError:
+        return None
+    if started > 1e14:
+        return started / 1e6
+    if started > 1e11:
+        return started / 1e3
+    return started
+
+
+def pre_request(worker, req):
+    req.received_at = time.time()
+    header = next((value for name, value in req.headers if name == 'X-REQUEST-START'), None)
+    started = parse_request_start(header)
+    req.queue_ms = max(0.0, (req.received_at - started) * 1000) if started else None
+
+
+def post_request(worker, req, environ, resp):
+    duration_ms = (time.time() - req.received_at) * 1000
+    queue_ms = req.queue_ms
+    queue = f'{queue_ms:.0f}' if queue_ms is not None else '-'
+    message = '%s %s %s %.0fms kuyruk=%sms'
+    args = (req.method, req.path, resp.status_code, duration_ms, queue)
+    if queue_ms is not None and queue_ms > QUEUE_WARN_MS:
+        worker.log.warning(message, *args)
+    else:
+        worker.log.debug(message, *args)
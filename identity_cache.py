@@ -0,0 +1,177 @@
+"""
+Oturumdaki kullanıcı için hafif kimlik kaydı ve süreç içi TTL/LRU önbellek.
+
+Flask-Login'in user_loader'ı her istekte users tablosunu okumak yerine
+(id, username, email, company_id, role, is_active, force_password_change) kaydını
+bu önbellekten döndürür. Diğer alanlar veya metotlar (set_password, last_login ...)
+istendiğinde tam User satırı o istek için yüklenir.
+
+Geçersiz kılma: User'ın kimlik alanları veya Company kayıtları değiştiğinde
+commit sonrası paylaşılan önbellekteki 'auth_version' sayacı artırılır; tüm
+worker'lar bir sonraki istekte eski kayıtları atar. TTL, ORM dışı yazımlar
+(doğrudan SQL) için üst sınırdır.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from cache import get_cache
+
+IDENTITY_FIELDS = ('id', 'username', 'email', 'company_id', 'role', 'is_active', 'force_password_change')
+AUTH_VERSION_KEY = 'auth_version'
+
+
+class UserIdentity:
+    """current_user olarak kullanılan hafif kullanıcı kaydı"""
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, fields):
+        object.__setattr__(self, '_fields', dict(fields))
+        object.__setattr__(self, '_user', None)
+
+    def get_id(self):
+        return str(self._fields['id'])
+
+    @property
+    def is_admin(self):
+        """Admin yetkisi olan rolleri kontrol eder"""
+        return self._fields['role'] in ('admin', 'platform_admin')
+
+    @property
+    def is_platform_admin(self):
+        """Platform admin kontrolü"""
+        return self._fields['role'] == 'platform_admin'
+
+    @property
+    def is_observer(self):
+        """Kullanıcının gözlemci olup olmadığını kontrol eder"""
+        return self._fields['role'] == 'observer'
+
+    def load_user(self):
+        """Tam User satırı (istek başına bir kez yüklenir)"""
+        if self._user is None:
+            from models import db, User
+            object.__setattr__(self, '_user', db.session.get(User, self._fields['id']))
+        return self._user
+
+    def __getattr__(self, name):
+        fields = object.__getattribute__(self, '_fields')
+        if name in fields:
+            return fields[name]
+        return getattr(self.load_user(), name)
+
+    def __setattr__(self, name, value):
+        # Yazımlar tam satıra yapılır (commit ile kalıcı olur)
+        setattr(self.load_user(), name, value)
+        if name in self._fields:
+            self._fields[name] = value
+
+
+class IdentityCache:
+    """user_id -> (kimlik alanları, auth_version, son geçerlilik) - LRU sırasıyla"""
+
+    def __init__(self, ttl=300, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            fields, entry_version, expires_at = entry
+            if entry_version != version or expires_at < time.time():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return fields
+
+    def set(self, user_id, version, fields):
+        with self._lock:
+            self._entries[user_id] = (fields, version, time.time() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def init_identity_cache(app):
+    """Kimlik önbelleğini uygulamaya bağlar (app.extensions['identity_cache'])"""
+    app.extensions['identity_cache'] = IdentityCache(
+        ttl=app.config.get('USER_CACHE_TTL', 300),
+        max_size=app.config.get('USER_CACHE_SIZE', 1024)
+    )
+
+
+def load_user_identity(user_id):
+    """user_loader: önbellekten kimlik kaydı; pasif veya silinmiş kullanıcı için None"""
+    from models import db, User
+
+    identity_cache = current_app.extensions['identity_cache']
+    version = get_cache().get_counter(AUTH_VERSION_KEY)
+    fields = identity_cache.get(user_id, version)
+    if fields is None:
+        row = db.session.query(*[getattr(User, name) for name in IDENTITY_FIELDS]).filter(
+            User.id == user_id
+        ).first()
+        if row is None:
+            return None
+        fields = dict(zip(IDENTITY_FIELDS, row))
+        identity_cache.set(user_id, version, fields)
+    # Devre dışı bırakılan kullanıcının mevcut oturumu da sonlanır
+    if fields['is_active'] is not None and not fields['is_active']:
+        return None
+    return UserIdentity(fields)
+
+
+def invalidate_identities():
+    """Tüm worker'lardaki kimlik kayıtlarını geçersiz kılar"""
+    get_cache().incr(AUTH_VERSION_KEY)
+
+
+def _changes_identity(session):
+    """Flush kimlik kayıtlarını etkiliyor mu: silinen/düzenlenen şirket veya kullanıcı alanları"""
+    from models import User, Company
+
+    if any(isinstance(obj, (User, Company)) for obj in session.deleted):
+        return True
+    for obj in session.dirty:
+        if isinstance(obj, Company):
+            return True
+        if isinstance(obj, User):
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in IDENTITY_FIELDS):
+                return True
+    return False
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_identity_changes(session, flush_context):
+    if _changes_identity(session):
+        session.info['identity_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_auth_version(session):
+    if not session.info.pop('identity_changed', False):
+        return
+    if not has_app_context() or 'cache' not in current_app.extensions:
+        return
+    invalidate_identities()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_identity_changes(session):
+    session.info.pop('identity_changed', None)
@@ -0,0 +1,413 @@
+"""
+Veritabanı tabanlı arka plan iş kuyruğu.
+
+Uzun süren işler (Excel/PDF export, yedekleme) istek içinde çalıştırılmak yerine
+`jobs` tablosuna yazılır ve ayrı bir worker süreci (`flask run-worker`) tarafından
+işlenir. Ayrı bir broker gerekmez; kuyruk uygulama veritabanındadır.
+
+İş alma:
+- PostgreSQL: aday satır `SELECT ... FOR UPDATE SKIP LOCKED` ile kilitlenir,
+  böylece worker'lar aynı işi beklemeden birbirini atlar. Şirket başına eşzamanlılık
+  sınırı, şirket anahtarlı transaction advisory lock altında kontrol edilir.
+- SQLite: yazmalar zaten sıralıdır; iş, koşullu UPDATE (hala 'queued' ve şirketin
+  çalışan iş sayısı sınırın altında) ile alınır, etkilenen satır sayısı kontrol edilir.
+
+Hata alan iş üstel beklemeyle (JOB_RETRY_BASE_SECONDS * 2^(deneme-1), en çok
+JOB_RETRY_MAX_SECONDS) yeniden kuyruğa alınır; PermanentJobError veya deneme
+hakkının bitmesi işi 'failed' yapar. Worker ilerlemeyi ayrı bir bağlantıyla yazar
+ve arka planda heartbeat (locked_at) günceller; JOB_LEASE_SECONDS boyunca heartbeat
+gelmeyen işler (ölen worker) yeniden kuyruğa alınır.
+
+Handler'lar `@job_handler('tür')` ile kaydedilir ve JobContext alır; döndürdükleri
+sözlük JSON olarak `result` kolonuna yazılır. Handler modülleri HANDLER_MODULES
+içinde listelenir ve worker başlarken import edilir.
+"""
+
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from flask import current_app, g
+from sqlalchemy import text
+
+from models import db, Job, get_turkey_time
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+HANDLER_MODULES = ('reports', 'services.backup_service')
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('succeeded', 'failed')
+# İlerleme en fazla bu sıklıkta yazılır (saniye); %100 her zaman yazılır
+PROGRESS_INTERVAL = 1.0
+PURGE_INTERVAL = 600
+# Şirket başına advisory lock anahtarı (PostgreSQL); şirketsiz (sistem) işler 0 kullanır
+_ADVISORY_LOCK_BASE = 0x6A6F6200
+
+
+class PermanentJobError(Exception):
+    """Yeniden denenmeyecek hata (ör. geçersiz rapor türü)"""
+
+
+class QueueLimitReached(Exception):
+    """Şirketin bekleyen/çalışan iş sayısı JOB_TENANT_QUEUE_LIMIT sınırında"""
+
+
+class JobLeaseLost(Exception):
+    """İş bu worker'dan alınmış (lease süresi doldu); sonuç yazılmaz"""
+
+
+def job_handler(kind):
+    """İş türü için handler kaydeder: handler(ctx: JobContext) -> dict | None"""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def load_handlers():
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def _now():
+    # Kolonlar saat dilimi bilgisi olmadan saklanır; tüm karşılaştırmalar bu değerle yapılır
+    return get_turkey_time().replace(tzinfo=None)
+
+
+def retry_delay(attempts):
+    """`attempts`. denemeden sonra beklenecek süre (saniye)"""
+    config = current_app.config
+    base = config.get('JOB_RETRY_BASE_SECONDS', 30)
+    return min(base * 2 ** max(attempts - 1, 0), config.get('JOB_RETRY_MAX_SECONDS', 3600))
+
+
+def enqueue(kind, payload=None, company_id=None, user_id=None, max_attempts=None, delay=0, unique=False, limit=None):
+    """İşi kuyruğa ekler ve Job döndürür.
+
+    unique=True ise aynı tür ve şirket için bekleyen/çalışan iş varsa yenisi
+    eklenmez, mevcut iş döner (ör. üst üste tetiklenen yedeklemeler).
+    limit verilirse şirketin bekleyen + çalışan iş sayısı sınıra ulaşmışsa
+    QueueLimitReached fırlatılır.
+
+    Kontroller ekleme ile aynı transaction'da, yeni satır yazıldıktan sonra yapılır:
+    SQLite'ta yazma kilidi, PostgreSQL'de şirket anahtarlı advisory lock eşzamanlı
+    eklemeleri sıraya sokar; iki istek aynı anda sınırı aşamaz.
+    """
+    if (unique or limit) and db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(text('SELECT pg_advisory_xact_lock(:key)'),
+                           {'key': _ADVISORY_LOCK_BASE + (company_id or 0)})
+
+    now = _now()
+    job = Job(
+        kind=kind,
+        company_id=company_id,
+        user_id=user_id,
+        payload=json.dumps(payload or {}),
+        status='queued',
+        attempts=0,
+        max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3),
+        run_at=now + timedelta(seconds=delay),
+        progress=0,
+        created_at=now
+    )
+    db.session.add(job)
+    db.session.flush()
+
+    active = Job.query.filter(Job.company_id == company_id, Job.status.in_(ACTIVE_STATUSES), Job.id != job.id)
+    if unique:
+        existing = active.filter(Job.kind == kind).order_by(Job.id).first()
+        if existing:
+            existing_id = existing.id
+            db.session.rollback()
+            return db.session.get(Job, existing_id)
+    if limit is not None and active.count() >= limit:
+        db.session.rollback()
+        raise QueueLimitReached(f'Bekleyen iş sayısı sınıra ulaştı ({limit})')
+    db.session.commit()
+    return job
+
+
+_RUNNING_FOR_COMPANY = (
+    "(SELECT COUNT(*) FROM jobs r WHERE r.status = 'running' "
+    "AND COALESCE(r.company_id, 0) = COALESCE({alias}.company_id, 0))"
+)
+
+
+def claim_job(worker_id, tenant_concurrency=1, attempts=3):
+    """Çalışmaya hazır en eski işi bu worker'a atar; iş id'si veya None.
+
+    Şirket sınırına takılan aday (başka worker aynı anda aldıysa) atlanır ve
+    birkaç kez yeni aday denenir.
+    """
+    for _ in range(attempts):
+        now = _now()
+        with db.engine.begin() as conn:
+            postgresql = conn.dialect.name == 'postgresql'
+            candidate = conn.execute(text(
+                "SELECT j.id, j.company_id FROM jobs j "
+                "WHERE j.status = 'queued' AND j.run_at <= :now "
+                f"AND {_RUNNING_FOR_COMPANY.format(alias='j')} < :cap "
+                "ORDER BY j.run_at, j.id LIMIT 1"
+                + (" FOR UPDATE OF j SKIP LOCKED" if postgresql else "")
+            ), {'now': now, 'cap': tenant_concurrency}).first()
+            if candidate is None:
+                return None
+
+            if postgresql:
+                # Aynı şirketin işlerini alan worker'lar sayımı sırayla yapsın (sınır aşılmasın)
+                conn.execute(text('SELECT pg_advisory_xact_lock(:key)'),
+                             {'key': _ADVISORY_LOCK_BASE + (candidate.company_id or 0)})
+            claimed = conn.execute(text(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = :worker, "
+                "locked_at = :now, started_at = :now, progress = 0, progress_message = NULL "
+                "WHERE id = :id AND status = 'queued' "
+                f"AND {_RUNNING_FOR_COMPANY.format(alias='jobs')} < :cap"
+            ), {'id': candidate.id, 'worker': worker_id, 'now': now, 'cap': tenant_concurrency}).rowcount
+        if claimed:
+            return candidate.id
+    return None
+
+
+def _update_owned(job_id, worker_id, values):
+    """Yalnızca bu worker'ın hala sahip olduğu çalışan işi günceller; etkilenen satır sayısı"""
+    assignments = ', '.join(f'{column} = :{column}' for column in values)
+    with db.engine.begin() as conn:
+        return conn.execute(text(
+            f"UPDATE jobs SET {assignments} "
+            "WHERE id = :job_id AND locked_by = :worker AND status = 'running'"
+        ), dict(values, job_id=job_id, worker=worker_id)).rowcount
+
+
+def requeue_stale(lease_seconds):
+    """Heartbeat'i lease süresini aşan çalışan işleri kuyruğa geri alır veya hak bittiyse sonlandırır"""
+    now = _now()
+    params = {'cutoff': now - timedelta(seconds=lease_seconds), 'now': now}
+    with db.engine.begin() as conn:
+        failed = conn.execute(text(
+            "UPDATE jobs SET status = 'failed', finished_at = :now, locked_at = NULL, "
+            "error = 'Worker yanıt vermedi (lease süresi doldu)' "
+            "WHERE status = 'running' AND locked_at < :cutoff AND attempts >= max_attempts"
+        ), params).rowcount
+        requeued = conn.execute(text(
+            "UPDATE jobs SET status = 'queued', run_at = :now, locked_by = NULL, locked_at = NULL "
+            "WHERE status = 'running' AND locked_at < :cutoff"
+        ), params).rowcount
+    if failed or requeued:
+        logger.warning('Süresi dolan işler: %s yeniden kuyrukta, %s başarısız', requeued, failed)
+    return requeued + failed
+
+
+def output_dir():
+    path = current_app.config.get('JOB_OUTPUT_DIR') or os.path.join(current_app.instance_path, 'jobs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def output_file(job):
+    """Başarılı işin çıktı dosyasının yolu; dosyası olmayan işte None"""
+    result = json.loads(job.result or '{}')
+    if not result.get('file'):
+        return None
+    return os.path.join(output_dir(), result['file'])
+
+
+def purge_finished(ttl_hours):
+    """TTL'i dolan bitmiş işleri ve çıktı dosyalarını siler; silinen iş sayısı"""
+    cutoff = _now() - timedelta(hours=ttl_hours)
+    jobs = Job.query.filter(Job.status.in_(FINISHED_STATUSES), Job.finished_at < cutoff).all()
+    for job in jobs:
+        path = output_file(job)
+        if path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        db.session.delete(job)
+    db.session.commit()
+    return len(jobs)
+
+
+class JobContext:
+    """Handler'a verilen bağlam: payload, şirket, ilerleme ve çıktı dosyası"""
+
+    def __init__(self, job, worker_id):
+        self.job_id = job.id
+        self.kind = job.kind
+        self.company_id = job.company_id
+        self.user_id = job.user_id
+        self.attempt = job.attempts
+        self.payload = json.loads(job.payload or '{}')
+        self.worker_id = worker_id
+        self._last_progress = 0.0
+
+    def progress(self, percent, message=None):
+        """İlerlemeyi yazar (kısıtlanarak); iş bu worker'dan alınmışsa JobLeaseLost"""
+        percent = max(0, min(int(percent), 100))
+        now = time.monotonic()
+        if percent < 100 and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        values = {'progress': percent, 'progress_message': (message or '')[:200], 'locked_at': _now()}
+        if not _update_owned(self.job_id, self.worker_id, values):
+            raise JobLeaseLost(f'İş #{self.job_id} artık bu worker\'da değil')
+
+    def output_path(self, suffix):
+        """Çıktı dosyası için yol; handler sonucu {'file': os.path.basename(yol)} içermelidir"""
+        return os.path.join(output_dir(), f'job_{self.job_id}{suffix}')
+
+
+class _Heartbeat(threading.Thread):
+    """İş sürerken locked_at'i düzenli günceller (ilerleme bildirmeyen uzun işler için)"""
+
+    def __init__(self, app, job_id, worker_id, interval):
+        super().__init__(daemon=True, name=f'job-heartbeat-{job_id}')
+        self.app = app
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    _update_owned(self.job_id, self.worker_id, {'locked_at': _now()})
+            except Exception as e:
+                logger.warning('İş #%s heartbeat yazılamadı: %s', self.job_id, e)
+
+
+def _prepare_sqlite(engine):
+    """Dosya tabanlı SQLite'ı WAL moduna alır: ilerleme yazıları handler'ın okumalarını beklemesin"""
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+
+
+class Worker:
+    """Kuyruktan iş alıp çalıştıran süreç döngüsü (her süreç aynı anda tek iş çalıştırır)"""
+
+    def __init__(self, app, worker_id=None):
+        config = app.config
+        self.app = app
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.tenant_concurrency = config.get('JOB_TENANT_CONCURRENCY', 1)
+        self.lease_seconds = config.get('JOB_LEASE_SECONDS', 300)
+        self.poll_interval = config.get('JOB_POLL_INTERVAL', 2.0)
+        self.result_ttl_hours = config.get('JOB_RESULT_TTL_HOURS', 24)
+        # Her biten işten sonra (tür, sonuç: succeeded/retried/failed, süre) ile çağrılır
+        self.observers = []
+        self.stopping = False
+        self._last_purge = 0.0
+        load_handlers()
+        with app.app_context():
+            _prepare_sqlite(db.engine)
+
+    def run_once(self):
+        """Süresi dolan işleri toplar, hazır bir iş varsa çalıştırır; çalıştırılan iş id'si veya None"""
+        with self.app.app_context():
+            requeue_stale(self.lease_seconds)
+            job_id = claim_job(self.worker_id, self.tenant_concurrency)
+        if job_id is not None:
+            self.run_job(job_id)
+        return job_id
+
+    def run_job(self, job_id):
+        heartbeat = _Heartbeat(self.app, job_id, self.worker_id, max(self.lease_seconds / 3, 1))
+        heartbeat.start()
+        try:
+            with self.app.app_context():
+                try:
+                    self._execute(job_id)
+                finally:
+                    db.session.remove()
+        finally:
+            heartbeat.stopped.set()
+
+    def _execute(self, job_id):
+        job = db.session.get(Job, job_id)
+        ctx = JobContext(job, self.worker_id)
+        # Tenant filtresi işin şirketine göre uygulanır; şirketsiz (sistem) işler filtresiz çalışır
+        g.company_id = job.company_id
+        g.is_platform_admin = job.company_id is None
+        db.session.commit()
+
+        started = time.monotonic()
+        logger.info('İş #%s (%s) başladı, deneme %s/%s', job_id, ctx.kind, ctx.attempt, job.max_attempts)
+        try:
+            handler = JOB_HANDLERS.get(ctx.kind)
+            if handler is None:
+                raise PermanentJobError(f'Bilinmeyen iş türü: {ctx.kind}')
+            result = handler(ctx)
+        except JobLeaseLost as e:
+            db.session.rollback()
+            logger.warning('%s', e)
+            return
+        except Exception as e:
+            db.session.rollback()
+            outcome = self._fail(job_id, ctx, e)
+        else:
+            outcome = 'succeeded'
+            if not _update_owned(job_id, self.worker_id, {
+                'status': 'succeeded', 'progress': 100, 'result': json.dumps(result or {}),
+                'error': None, 'finished_at': _now(), 'locked_at': None
+            }):
+                logger.warning('İş #%s tamamlandı ancak artık bu worker\'da değil; sonuç yazılmadı', job_id)
+                return
+            logger.info('İş #%s (%s) tamamlandı', job_id, ctx.kind)
+        duration = time.monotonic() - started
+        for observer in self.observers:
+            observer(ctx.kind, outcome, duration)
+
+    def _fail(self, job_id, ctx, error):
+        message = f'{type(error).__name__}: {error}'[:2000]
+        max_attempts = db.session.get(Job, job_id).max_attempts
+        if isinstance(error, PermanentJobError) or ctx.attempt >= max_attempts:
+            logger.error('İş #%s (%s) başarısız: %s', job_id, ctx.kind, message)
+            values = {'status': 'failed', 'error': message, 'finished_at': _now(), 'locked_at': None}
+            outcome = 'failed'
+        else:
+            delay = retry_delay(ctx.attempt)
+            logger.warning('İş #%s (%s) hata aldı, %s sn sonra yeniden denenecek: %s',
+                           job_id, ctx.kind, delay, message)
+            values = {'status': 'queued', 'error': message, 'run_at': _now() + timedelta(seconds=delay),
+                      'locked_by': None, 'locked_at': None}
+            outcome = 'retried'
+        _update_owned(job_id, self.worker_id, values)
+        return outcome
+
+    def purge(self, force=False):
+        if not force and time.monotonic() - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        with self.app.app_context():
+            removed = purge_finished(self.result_ttl_hours)
+        if removed:
+            logger.info('%s eski iş temizlendi', removed)
+
+    def stop(self, *_):
+        logger.info('Worker durduruluyor; çalışan iş bitince çıkılacak')
+        self.stopping = True
+
+    def run(self):
+        """SIGTERM/SIGINT gelene kadar kuyruğu işler"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info('Worker %s başladı (şirket başına en fazla %s iş)', self.worker_id, self.tenant_concurrency)
+        while not self.stopping:
+            try:
+                self.purge()
+                job_id = self.run_once()
+            except Exception:
+                logger.exception('Worker döngüsünde hata')
+                job_id = None
+            if job_id is None and not self.stopping:
+                time.sleep(self.poll_interval)
@@ -0,0 +1,227 @@
+"""
+Gunicorn profillerini yerel olarak karşılaştıran yük testi.
+
+Geçici bir SQLite veritabanına örnek şirket ve veri yazar, her profil için
+gunicorn'u gunicorn.conf.py ile başlatır ve aynı iş yükünü uygular: oturum açmış
+istemciler ana sayfa, müşteri listesi ve API uçlarını dolaşırken bir istemci
+sürekli büyük bir Excel export'u ister. Sonuçta profil başına throughput ve
+gecikme yüzdelikleri yazdırılır.
+
+Kullanım:
+    python load_test.py
+    python load_test.py --profiles single,gthread --duration 30 --clients 32
+"""
+
+import argparse
+import http.cookiejar
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import timedelta
+
+PATHS = ['/', '/customers', '/api/transactions', '/api/customers', '/api/receipts']
+EXPORT_PATH = '/reports/export/profit_loss/excel'
+USERNAME = 'yuk_testi'
+PASSWORD = 'YukTesti123!'
+
+
+def seed_database(transactions, customers):
+    """Geçici veritabanını oluşturur ve örnek şirket/veri yazar"""
+    from app import create_app
+    from models import db, Company, Customer, Transaction, User, get_turkey_time
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        company = Company(name='Yük Testi', authorized_person='Test', email='yuk@test.local', status='approved')
+        db.session.add(company)
+        db.session.flush()
+        user = User(company_id=company.id, username=USERNAME, email='yuk@user.local', role='admin',
+                    is_active=True, force_password_change=False)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        now = get_turkey_time().replace(tzinfo=None)
+        db.session.add_all([
+            Customer(company_id=company.id, name=f'Müşteri {i}', balance=i % 50) for i in range(customers)
+        ])
+        db.session.add_all([
+            Transaction(company_id=company.id, type='income' if i % 3 else 'expense', amount=10 + i % 90,
+                        description=f'İşlem {i}', date=(now - timedelta(minutes=i)).date())
+            for i in range(transactions)
+        ])
+        db.session.commit()
+        db.engine.dispose()
+
+
+class Client:
+    """Çerezli, oturum açmış basit HTTP istemcisi"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def get(self, path, timeout=180):
+        with self.opener.open(self.base_url + path, timeout=timeout) as response:
+            response.read()
+            return response.status
+
+    def login(self):
+        with self.opener.open(self.base_url + '/auth/login', timeout=30) as response:
+            page = response.read().decode()
+        token = re.search(r'name="csrf_token" value="([^"]+)"', page)
+        data = {'username': USERNAME, 'password': PASSWORD}
+        if token:
+            data['csrf_token'] = token.group(1)
+        body = urllib.parse.urlencode(data).encode()
+        with self.opener.open(self.base_url + '/auth/login', data=body, timeout=30) as response:
+            response.read()
+            if '/auth/login' in response.url:
+                raise RuntimeError('Giriş başarısız')
+
+
+def wait_until_ready(base_url, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn başlatılamadı')
+        try:
+            with urllib.request.urlopen(base_url + '/auth/login', timeout=2):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn zamanında hazır olmadı')
+
+
+def run_profile(profile, env, args):
+    """Profili başlatır, iş yükünü uygular ve ölçümleri döndürür"""
+    port = args.port
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(env, GUNICORN_PROFILE=profile, GUNICORN_BIND=f'127.0.0.1:{port}')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:create_app()'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    latencies, export_latencies, errors = [], [], []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def browse(index):
+        client = Client(base_url)
+        try:
+            client.login()
+        except Exception as exc:
+            errors.append(repr(exc))
+            return
+        i = index
+        while not stop.is_set():
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                client.get(path)
+            except Exception as exc:
+                errors.append(f'{path}: {exc!r}')
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    def export():
+        client = Client(base_url)
+        client.login()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                client.get(EXPORT_PATH)
+            except Exception as exc:
+                errors.append(f'{EXPORT_PATH}: {exc!r}')
+                continue
+            export_latencies.append(time.perf_counter() - started)
+
+    try:
+        wait_until_ready(base_url, process)
+        threads = [threading.Thread(target=browse, args=(i,)) for i in range(args.clients)]
+        if args.export:
+            threads.append(threading.Thread(target=export))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+    return {
+        'profile': profile,
+        'requests': len(latencies),
+        'rps': len(latencies) / args.duration,
+        'latencies': sorted(latencies),
+        'exports': len(export_latencies),
+        'errors': errors,
+    }
+
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gunicorn profillerini karşılaştıran yük testi')
+    parser.add_argument('--profiles', default='single,sync,gthread', help='virgülle ayrılmış GUNICORN_PROFILE listesi')
+    parser.add_argument('--duration', type=int, default=20, help='profil başına ölçüm süresi (saniye)')
+    parser.add_argument('--clients', type=int, default=16, help='eşzamanlı gezinen istemci sayısı')
+    parser.add_argument('--transactions', type=int, default=50000, help='örnek işlem sayısı')
+    parser.add_argument('--customers', type=int, default=500, help='örnek müşteri sayısı')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--no-export', dest='export', action='store_false',
+                        help='arka planda büyük export isteme')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='muhasebe-load-')
+    env = dict(
+        os.environ,
+        ENV='development',
+        FLASK_DEBUG='0',
+        FLASK_SECRET_KEY='load-test-secret',
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        CACHE_PATH=os.path.join(workdir, 'cache.sqlite3'),
+        LOGIN_THROTTLE_PATH=os.path.join(workdir, 'login_throttle.sqlite3'),
+    )
+    os.environ.update(env)
+    print(f'Veri hazırlanıyor ({args.transactions} işlem, {args.customers} müşteri) -> {workdir}')
+    seed_database(args.transactions, args.customers)
+
+    results = []
+    for profile in args.profiles.split(','):
+        print(f'Profil {profile}: {args.duration} sn, {args.clients} istemci'
+              f'{" + export" if args.export else ""}')
+        results.append(run_profile(profile.strip(), env, args))
+
+    print()
+    print(f'{"profil":<10}{"istek":>8}{"istek/sn":>10}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"export":>8}{"hata":>6}')
+    for result in results:
+        latencies = result['latencies']
+        p50 = statistics.median(latencies) * 1000 if latencies else float('nan')
+        print(f'{result["profile"]:<10}{result["requests"]:>8}{result["rps"]:>10.1f}{p50:>9.0f}'
+              f'{percentile(latencies, 0.95) * 1000:>9.0f}{percentile(latencies, 0.99) * 1000:>9.0f}'
+              f'{result["exports"]:>8}{len(result["errors"]):>6}')
+        for error in result['errors'][:3]:
+            print(f'  ! {error}')
+
+
+if __name__ == '__main__':
+    main()
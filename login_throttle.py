@@ -0,0 +1,201 @@
+"""
+Giriş denemesi kısıtlayıcı (brute force koruması) - ana veritabanına dokunmaz.
+
+Kayan pencere: bir anahtarın son LOGIN_ATTEMPT_WINDOW_MINUTES içindeki başarısız
+denemeleri sayılır; LOGIN_MAX_ATTEMPTS'a ulaşınca anahtar LOGIN_LOCKOUT_MINUTES
+boyunca kilitlenir. Anahtarlar 'ip:<ip>' ve 'user:<ip>:<kullanıcı>' biçimindedir.
+
+Arka uçlar (LOGIN_THROTTLE_BACKEND):
+- sqlite: gunicorn worker'larının paylaştığı tek bir SQLite dosyası (WAL, varsayılan)
+- memory: süreç içi sözlük (test ve tek süreçli geliştirme için)
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+
+
+class _SlidingWindow:
+    """Arka uçların ortak pencere/kilit hesabı"""
+
+    def __init__(self, max_attempts=5, window=900, lockout=900):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lockout = lockout
+
+    def _record_failure(self, failures, locked_until, now):
+        """Yeni deneme listesi, kilit bitişi ve kalan deneme hakkı"""
+        if locked_until and locked_until > now:
+            # Eşzamanlı istekler kilidi uzatmaz veya sıfırlamaz
+            return failures, locked_until, 0
+        failures = ([t for t in failures if t > now - self.window] + [now])[-self.max_attempts:]
+        if len(failures) >= self.max_attempts:
+            # Kilit süresi dolunca sayım sıfırdan başlar
+            return [], now + self.lockout, 0
+        return failures, None, self.max_attempts - len(failures)
+
+    def _expires_at(self, failures, locked_until):
+        return max([locked_until or 0] + [t + self.window for t in failures])
+
+
+class MemoryThrottle(_SlidingWindow):
+    """Süreç içi kısıtlayıcı - worker'lar arasında paylaşılmaz"""
+
+    def __init__(self, **policy):
+        super().__init__(**policy)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def locked_for(self, keys, now=None):
+        """Anahtarlardan herhangi biri kilitliyse kalan saniye, değilse 0"""
+        now = now or time.time()
+        with self._lock:
+            locked = [self._entries.get(key, ([], None))[1] or 0 for key in keys]
+        return max(0, int(max(locked) - now))
+
+    def register_failure(self, key, now=None):
+        """Başarısız denemeyi kaydeder; kalan deneme hakkını döndürür (0: kilitlendi)"""
+        now = now or time.time()
+        with self._lock:
+            failures, locked_until = self._entries.get(key, ([], None))
+            failures, locked_until, remaining = self._record_failure(failures, locked_until, now)
+            self._entries[key] = (failures, locked_until)
+        return remaining
+
+    def reset(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def compact(self, now=None):
+        """Süresi dolmuş kayıtları siler; silinen kayıt sayısını döndürür"""
+        now = now or time.time()
+        with self._lock:
+            expired = [key for key, (failures, locked_until) in self._entries.items()
+                       if self._expires_at(failures, locked_until) < now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+
+class SQLiteThrottle(_SlidingWindow):
+    """Tek bir SQLite dosyasında paylaşılan kısıtlayıcı.
+
+    Bağlantılar thread ve süreç (fork) başına açılır; okuma tek bir SELECT,
+    yazma tek bir BEGIN IMMEDIATE transaction'ıdır.
+    """
+
+    def __init__(self, path, **policy):
+        super().__init__(**policy)
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS login_throttle ('
+            'key TEXT PRIMARY KEY, failures TEXT NOT NULL, locked_until REAL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_login_throttle_expires ON login_throttle (expires_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def locked_for(self, keys, now=None):
+        """Anahtarlardan herhangi biri kilitliyse kalan saniye, değilse 0"""
+        now = now or time.time()
+        placeholders = ','.join('?' * len(keys))
+        row = self._connect().execute(
+            f'SELECT MAX(locked_until) FROM login_throttle WHERE key IN ({placeholders})', list(keys)
+        ).fetchone()
+        return max(0, int((row[0] or 0) - now))
+
+    def register_failure(self, key, now=None):
+        """Başarısız denemeyi kaydeder; kalan deneme hakkını döndürür (0: kilitlendi)"""
+        now = now or time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT failures, locked_until FROM login_throttle WHERE key = ?', (key,)).fetchone()
+            failures, locked_until, remaining = self._record_failure(
+                json.loads(row[0]) if row else [], row[1] if row else None, now
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO login_throttle (key, failures, locked_until, expires_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(failures), locked_until, self._expires_at(failures, locked_until))
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        # Saldırı sırasında dosya büyümesin - ara sıra süresi dolanları temizle
+        if random.random() < 0.01:
+            self.compact(now)
+        return remaining
+
+    def reset(self, keys):
+        placeholders = ','.join('?' * len(keys))
+        self._connect().execute(f'DELETE FROM login_throttle WHERE key IN ({placeholders})', list(keys))
+
+    def compact(self, now=None):
+        """Süresi dolmuş kayıtları siler; silinen kayıt sayısını döndürür"""
+        now = now or time.time()
+        return self._connect().execute('DELETE FROM login_throttle WHERE expires_at < ?', (now,)).rowcount
+
+
+def create_login_throttle(app):
+    """Konfigürasyona göre kısıtlayıcı arka ucunu oluşturur"""
+    policy = {
+        'max_attempts': app.config.get('LOGIN_MAX_ATTEMPTS', 5),
+        'window': app.config.get('LOGIN_ATTEMPT_WINDOW_MINUTES', 15) * 60,
+        'lockout': app.config.get('LOGIN_LOCKOUT_MINUTES', 15) * 60,
+    }
+    backend = app.config.get('LOGIN_THROTTLE_BACKEND', 'sqlite')
+    if backend == 'memory':
+        return MemoryThrottle(**policy)
+    if backend == 'sqlite':
+        path = app.config.get('LOGIN_THROTTLE_PATH') or os.path.join(app.instance_path, 'login_throttle.sqlite3')
+        return SQLiteThrottle(path, **policy)
+    raise ValueError(f'Bilinmeyen LOGIN_THROTTLE_BACKEND: {backend}')
+
+
+def init_login_throttle(app):
+    """Kısıtlayıcıyı uygulamaya bağlar (app.extensions['login_throttle'])"""
+    app.extensions['login_throttle'] = create_login_throttle(app)
+
+
+def get_login_throttle():
+    return current_app.extensions['login_throttle']
+
+
+def compact_login_attempts(retention_days=30, batch_size=1000):
+    """Eski login_attempts satırlarını parça parça siler; silinen satır sayısını döndürür.
+
+    Giriş akışı artık bu tabloya yazmaz; tablo eski sürümlerden kalan kayıtları
+    tutar. Silme kısa transaction'larla yapılır, tablo kilitli kalmaz.
+    """
+    from datetime import timedelta
+    from models import db, LoginAttempt, get_turkey_time
+
+    cutoff = get_turkey_time().replace(tzinfo=None) - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = [row_id for (row_id,) in db.session.query(LoginAttempt.id).filter(
+            db.or_(LoginAttempt.last_attempt_at < cutoff, LoginAttempt.last_attempt_at.is_(None))
+        ).limit(batch_size)]
+        if not ids:
+            return deleted
+        deleted += LoginAttempt.query.filter(LoginAttempt.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
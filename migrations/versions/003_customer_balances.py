@@ -0,0 +1,43 @@
+"""Add stored balance totals to customers
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('customers', sa.Column('total_debt', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'))
+    op.add_column('customers', sa.Column('total_payment', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'))
+    op.add_column('customers', sa.Column('balance', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'))
+
+    # Mevcut defterden özetleri doldur
+    op.execute("""
+        UPDATE customers SET
+            total_debt = COALESCE((
+                SELECT SUM(ct.amount) FROM customer_transactions ct
+                WHERE ct.customer_id = customers.id AND ct.type = 'debt'
+            ), 0),
+            total_payment = COALESCE((
+                SELECT SUM(ct.amount) FROM customer_transactions ct
+                WHERE ct.customer_id = customers.id AND ct.type = 'payment'
+            ), 0)
+    """)
+    op.execute("UPDATE customers SET balance = total_debt - total_payment")
+
+
+def downgrade():
+    with op.batch_alter_table('customers') as batch_op:
+        batch_op.drop_column('balance')
+        batch_op.drop_column('total_payment')
+        batch_op.drop_column('total_debt')
@@ -0,0 +1,47 @@
+"""Add stored balance totals to suppliers
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('suppliers', sa.Column('total_debt', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'))
+    op.add_column('suppliers', sa.Column('total_payment', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'))
+    op.add_column('suppliers', sa.Column('balance', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'))
+
+    # Mevcut defterden özetleri doldur
+    op.execute("""
+        UPDATE suppliers SET
+            total_debt = COALESCE((
+                SELECT SUM(st.amount) FROM supplier_transactions st
+                WHERE st.supplier_id = suppliers.id AND st.type = 'debt'
+            ), 0),
+            total_payment = COALESCE((
+                SELECT SUM(st.amount) FROM supplier_transactions st
+                WHERE st.supplier_id = suppliers.id AND st.type = 'payment'
+            ), 0)
+    """)
+    op.execute("UPDATE suppliers SET balance = total_debt - total_payment")
+
+    # /api/suppliers?sort=-balance&min_balance=... için
+    op.create_index('ix_suppliers_company_balance', 'suppliers', ['company_id', 'balance', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_suppliers_company_balance', table_name='suppliers')
+    with op.batch_alter_table('suppliers') as batch_op:
+        batch_op.drop_column('balance')
+        batch_op.drop_column('total_payment')
+        batch_op.drop_column('total_debt')
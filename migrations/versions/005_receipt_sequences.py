@@ -0,0 +1,72 @@
+"""Per-company receipt number sequences and scoped receipt_no uniqueness
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# SQLite'ta isimsiz unique constraint'leri batch modunda düşürebilmek için
+NAMING_CONVENTION = {'uq': 'uq_%(table_name)s_%(column_0_name)s'}
+
+
+def _receipt_no_unique_constraints(bind):
+    inspector = sa.inspect(bind)
+    columns = {c['name'] for c in inspector.get_columns('receipts')}
+    if 'receipt_no' not in columns:
+        return None
+    return [
+        uc for uc in inspector.get_unique_constraints('receipts')
+        if uc['column_names'] == ['receipt_no']
+    ]
+
+
+def upgrade():
+    op.create_table('receipt_sequences',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.PrimaryKeyConstraint('company_id')
+    )
+
+    bind = op.get_bind()
+    legacy_constraints = _receipt_no_unique_constraints(bind)
+    if legacy_constraints is None:
+        # Eski şemada receipt_no kolonu yok - sayaçlar ilk fişte oluşturulur
+        return
+
+    # Sayaçları mevcut fişlerin en büyük numarasından başlat
+    last_values = {}
+    for company_id, receipt_no in bind.execute(sa.text('SELECT company_id, receipt_no FROM receipts')):
+        if company_id is None or not receipt_no or receipt_no[:1] != 'F' or not receipt_no[1:].isdigit():
+            continue
+        last_values[company_id] = max(last_values.get(company_id, 0), int(receipt_no[1:]))
+    if last_values:
+        op.bulk_insert(
+            sa.table('receipt_sequences', sa.column('company_id', sa.Integer), sa.column('last_value', sa.Integer)),
+            [{'company_id': cid, 'last_value': value} for cid, value in last_values.items()]
+        )
+
+    # receipt_no global unique -> (company_id, receipt_no) unique
+    with op.batch_alter_table('receipts', naming_convention=NAMING_CONVENTION) as batch_op:
+        for uc in legacy_constraints:
+            batch_op.drop_constraint(uc['name'] or 'uq_receipts_receipt_no', type_='unique')
+        batch_op.create_unique_constraint('uq_receipts_company_receipt_no', ['company_id', 'receipt_no'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    if _receipt_no_unique_constraints(bind) is not None:
+        with op.batch_alter_table('receipts') as batch_op:
+            batch_op.drop_constraint('uq_receipts_company_receipt_no', type_='unique')
+            batch_op.create_unique_constraint('receipts_receipt_no_key', ['receipt_no'])
+    op.drop_table('receipt_sequences')
@@ -0,0 +1,98 @@
+"""Composite indexes for tenant-scoped list and report queries
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+PostgreSQL'de indeksler CREATE INDEX CONCURRENTLY ile (tabloyu kilitlemeden)
+oluşturulur; bu yüzden migration transaction dışında (autocommit) çalışır.
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# (indeks adı, tablo, kolonlar, PostgreSQL INCLUDE kolonları)
+INDEXES = [
+    # Gelir/gider listesi, dashboard ve kar/zarar raporu
+    ('ix_transactions_company_date', 'transactions', ['company_id', 'date', 'created_at'], None),
+    ('ix_transactions_company_type_date', 'transactions', ['company_id', 'type', 'date'], ['amount']),
+    # Müşteri listesi (isme göre) ve borç raporu (bakiyeye göre)
+    ('ix_customers_company_name', 'customers', ['company_id', 'name'], None),
+    ('ix_customers_company_balance', 'customers', ['company_id', 'balance'], None),
+    ('ix_customer_transactions_customer_date', 'customer_transactions', ['customer_id', 'date'], ['type', 'amount']),
+    ('ix_suppliers_company_name', 'suppliers', ['company_id', 'name'], None),
+    ('ix_supplier_transactions_supplier_date', 'supplier_transactions', ['supplier_id', 'date'], ['type', 'amount']),
+    ('ix_products_company_name', 'products', ['company_id', 'name'], None),
+    # Fiş listesi, son fişler ve müşteri detay sayfası
+    ('ix_receipts_company_date', 'receipts', ['company_id', 'date', 'created_at'], None),
+    ('ix_receipts_company_created', 'receipts', ['company_id', 'created_at'], None),
+    ('ix_receipts_company_customer_date', 'receipts', ['company_id', 'customer_id', 'date'], None),
+    ('ix_receipt_items_receipt', 'receipt_items', ['receipt_id'], None),
+    ('ix_receipt_items_product', 'receipt_items', ['product_id'], None),
+    ('ix_users_company', 'users', ['company_id'], None),
+    ('ix_login_attempts_ip_username', 'login_attempts', ['ip_address', 'username'], None),
+]
+
+
+def _existing_columns(bind):
+    inspector = sa.inspect(bind)
+    return {
+        table: {c['name'] for c in inspector.get_columns(table)}
+        for table in inspector.get_table_names()
+    }
+
+
+def upgrade():
+    bind = op.get_bind()
+    is_postgresql = bind.dialect.name == 'postgresql'
+    columns = _existing_columns(bind)
+
+    pending = []
+    for name, table, index_columns, include in INDEXES:
+        # Eski şemalarda (ör. login_attempts henüz yoksa) ilgili indeks atlanır
+        if not set(index_columns) <= columns.get(table, set()):
+            logger.info(f'Skipping {name}: {table} has no columns {index_columns}')
+            continue
+        pending.append((name, table, index_columns, include))
+
+    if is_postgresql:
+        with op.get_context().autocommit_block():
+            for name, table, index_columns, include in pending:
+                op.create_index(
+                    name, table, index_columns,
+                    postgresql_concurrently=True,
+                    postgresql_include=include or []
+                )
+    else:
+        for name, table, index_columns, include in pending:
+            op.create_index(name, table, index_columns)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = {
+        (table, index['name'])
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+
+    for name, table, _, _ in reversed(INDEXES):
+        if (table, name) not in existing:
+            continue
+        if bind.dialect.name == 'postgresql':
+            with op.get_context().autocommit_block():
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        else:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,88 @@
+"""Daily per-company summary rollup table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from collections import defaultdict
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+TOTAL_COLUMNS = ('income_total', 'expense_total', 'receipt_count', 'receipt_total', 'debt_total', 'payment_total')
+
+
+def _daily_totals(bind):
+    """Mevcut verilerden (şirket, gün) bazında özetler"""
+    inspector = sa.inspect(bind)
+    columns = {table: {c['name'] for c in inspector.get_columns(table)} for table in inspector.get_table_names()}
+    # Eski şemalarda tarih kolonları DATETIME olabilir - gün bazında grupla
+    day = 'DATE({0})' if bind.dialect.name == 'sqlite' else 'CAST({0} AS DATE)'
+
+    queries = []
+    if {'company_id', 'date', 'type', 'amount'} <= columns.get('transactions', set()):
+        queries.append((f"""
+            SELECT company_id, {day.format('date')},
+                   SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+                   SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END)
+            FROM transactions WHERE company_id IS NOT NULL AND date IS NOT NULL
+            GROUP BY company_id, {day.format('date')}
+        """, ('income_total', 'expense_total')))
+    if {'company_id', 'date', 'grand_total'} <= columns.get('receipts', set()):
+        queries.append((f"""
+            SELECT company_id, {day.format('date')}, COUNT(*), SUM(grand_total)
+            FROM receipts WHERE company_id IS NOT NULL AND date IS NOT NULL
+            GROUP BY company_id, {day.format('date')}
+        """, ('receipt_count', 'receipt_total')))
+    if {'customer_id', 'date', 'type', 'amount'} <= columns.get('customer_transactions', set()):
+        queries.append((f"""
+            SELECT c.company_id, {day.format('ct.date')},
+                   SUM(CASE WHEN ct.type = 'debt' THEN ct.amount ELSE 0 END),
+                   SUM(CASE WHEN ct.type = 'payment' THEN ct.amount ELSE 0 END)
+            FROM customer_transactions ct JOIN customers c ON c.id = ct.customer_id
+            WHERE c.company_id IS NOT NULL AND ct.date IS NOT NULL
+            GROUP BY c.company_id, {day.format('ct.date')}
+        """, ('debt_total', 'payment_total')))
+
+    totals = defaultdict(lambda: dict.fromkeys(TOTAL_COLUMNS, 0))
+    for sql, keys in queries:
+        for company_id, row_day, *values in bind.execute(sa.text(sql)):
+            for key, value in zip(keys, values):
+                totals[(company_id, str(row_day))][key] = value or 0
+    return totals
+
+
+def upgrade():
+    daily_summaries = op.create_table('daily_summaries',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('income_total', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('expense_total', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('receipt_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('receipt_total', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('debt_total', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('payment_total', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.PrimaryKeyConstraint('company_id', 'date')
+    )
+
+    # Mevcut işlemlerden özetleri doldur
+    rows = [
+        dict(values, company_id=company_id, date=date.fromisoformat(row_day[:10]))
+        for (company_id, row_day), values in sorted(_daily_totals(op.get_bind()).items())
+    ]
+    if rows:
+        op.bulk_insert(daily_summaries, rows)
+
+
+def downgrade():
+    op.drop_table('daily_summaries')
@@ -3,59 +3,81 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from sqlalchemy import event
-from sqlalchemy.orm import Query
-from flask import g
+from sqlalchemy import bindparam, event, inspect
+from sqlalchemy.orm import Session, declared_attr, with_loader_criteria
+from flask import g, has_app_context, has_request_context
 
 db = SQLAlchemy()
 
-# Tenant izolasyonu için modeller listesi
-TENANT_MODELS = {'customers', 'products', 'suppliers', 'receipts', 'transactions'}
 
-@event.listens_for(Query, "before_compile", retval=True)
-def auto_filter_by_company(query):
+class TenantScoped:
+    """Şirket verisi - istek içinde company_id ile otomatik filtrelenir.
+
+    User bilerek dahil değildir: kullanıcı adı benzersizlik kontrolleri ve
+    giriş işlemleri tüm şirketler üzerinde çalışmalıdır.
     """
-    Otomatik tenant izolasyonu - company_id filtresi ekler.
-    Platform admin kullanıcılar için filtre uygulanmaz.
-    limit() veya offset() varsa filtre eklenmez (manual scoped queries kullanılır).
+
+    # Modeller kendi company_id kolonunu tanımlar; bu tanım with_loader_criteria
+    # lambda'sının mixin üzerinden derlenebilmesi için gereklidir
+    @declared_attr
+    def company_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+
+
+def _tenant_filter_required():
+    """Sorgulara şirket kriteri eklenmeli mi?
+
+    İstek içinde platform admin dışında herkes filtrelenir; şirketi olmayan veya
+    giriş yapmamış kullanıcılar company_id = NULL ile hiçbir satır görmez.
+    İstek dışında (CLI, iş kuyruğu) yalnızca g.is_platform_admin açıkça False
+    ayarlanmışsa (tenant işleri) filtre uygulanır.
     """
-    # Kullanıcı giriş yapmamış veya platform admin ise filtreleme
-    if not hasattr(g, 'is_platform_admin'):
-        return query
-    
-    if g.is_platform_admin:
-        return query
-    
-    # company_id yoksa filtreleme yapma
-    if not hasattr(g, 'company_id') or g.company_id is None:
-        return query
-    
-    # Query'de limit veya offset varsa filtreleme yapma (hata önlemi)
-    try:
-        # SQLAlchemy 1.4+ iç limit/offset kontrolü
-        if hasattr(query, '_limit_clause') and query._limit_clause is not None:
-            return query
-        if hasattr(query, '_offset_clause') and query._offset_clause is not None:
-            return query
-        # Eski SQLAlchemy versiyonları için
-        if hasattr(query, '_limit') and query._limit is not None:
-            return query
-        if hasattr(query, '_offset') and query._offset is not None:
-            return query
-    except (AttributeError, TypeError):
-        pass
-    
-    # Tenant modelleri için company_id filtresi ekle
-    if query.column_descriptions:
-        entity = query.column_descriptions[0]['entity']
-        if entity is not None:
-            table_name = getattr(entity, '__tablename__', None)
-            if table_name in TENANT_MODELS:
-                # Company column'u var mı kontrol et
-                if hasattr(entity, 'company_id'):
-                    query = query.filter(entity.company_id == g.company_id)
-    
-    return query
+    if has_request_context():
+        return not g.get('is_platform_admin', False)
+    if not has_app_context():
+        return False
+    return not g.get('is_platform_admin', True)
+
+
+def _tenant_company_id():
+    """Filtre uygulanacak şirket; tenant bağlamı yoksa None"""
+    if not has_app_context():
+        return None
+    return g.get('company_id')
+
+
+# Şirket id'si her çalıştırmada bu parametreden okunur: kriter SQL'i sabit kalır
+# ve derlenmiş sorgu önbelleği tüm şirketler için ortak kullanılır.
+# Şirket yoksa NULL olur ve hiçbir satır dönmez.
+_TENANT_COMPANY_ID = bindparam('tenant_company_id', callable_=_tenant_company_id)
+
+_TENANT_CRITERIA = with_loader_criteria(
+    TenantScoped, lambda cls: cls.company_id == _TENANT_COMPANY_ID, include_aliases=True
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _apply_tenant_criteria(execute_state):
+    """
+    Otomatik tenant izolasyonu - TenantScoped modellere company_id kriteri ekler.
+    Kriter JOIN'lere, alt sorgulara, limit/offset'li sorgulara, toplu
+    UPDATE/DELETE'lere ve ilişki yüklemelerine de uygulanır.
+    Bilinçli olarak tüm şirketleri okuyan sorgular execution_options(all_tenants=True) kullanır.
+    """
+    if not execute_state.is_orm_statement:
+        return
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    # İlişki/kolon yüklemeleri kriteri üst sorgudan devralır
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if execute_state.execution_options.get('all_tenants', False):
+        return
+    if not _tenant_filter_required():
+        return
+
+    execute_state.statement = execute_state.statement.options(_TENANT_CRITERIA)
+
 
 # Türkiye saat dilimi (UTC+3)
 TURKEY_TZ = timezone(timedelta(hours=3))
@@ -161,6 +183,9 @@ class CompanyRequest(db.Model):
 class User(db.Model, UserMixin):
     """Kullanıcılar (platform_admin, admin ve observer rolleri)"""
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_company', 'company_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=True)  # SaaS için
@@ -207,9 +232,14 @@ class User(db.Model, UserMixin):
             'last_login': self.last_login.isoformat() if self.last_login else None
         }
 
-class Transaction(db.Model):
+class Transaction(db.Model, TenantScoped):
     """Gelir/Gider işlemleri"""
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Liste/dashboard (tarih sıralı) ve tür bazlı toplamlar (kar/zarar) için
+        db.Index('ix_transactions_company_date', 'company_id', 'date', 'created_at'),
+        db.Index('ix_transactions_company_type_date', 'company_id', 'type', 'date', postgresql_include=['amount']),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)  # SaaS için
@@ -229,9 +259,13 @@ class Transaction(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
-class Customer(db.Model):
+class Customer(db.Model, TenantScoped):
     """Müşteriler"""
     __tablename__ = 'customers'
+    __table_args__ = (
+        db.Index('ix_customers_company_name', 'company_id', 'name'),
+        db.Index('ix_customers_company_balance', 'company_id', 'balance'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)  # SaaS için
@@ -241,20 +275,19 @@ class Customer(db.Model):
     created_at = db.Column(db.DateTime, default=get_turkey_time)
     updated_at = db.Column(db.DateTime, default=get_turkey_time, onupdate=get_turkey_time)
     
+    # Bakiye özetleri - CustomerTransaction yazımlarında aynı transaction içinde güncellenir
+    # (bkz. _apply_ledger). Defterle tutarlılık: flask reconcile-customer-balances
+    total_debt = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    total_payment = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    balance = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    
     # İlişkiler
     transactions = db.relationship('CustomerTransaction', backref='customer', lazy=True, cascade='all, delete-orphan')
     receipts = db.relationship('Receipt', backref='customer', lazy=True)
     
     def get_balance(self):
-        """Müşterinin güncel bakiyesini hesaplar"""
-        total_debt = sum(t.amount for t in self.transactions if t.type == 'debt')
-        total_payment = sum(t.amount for t in self.transactions if t.type == 'payment')
-        return total_debt - total_payment
-    
-    @property
-    def balance(self):
-        """Müşterinin güncel bakiyesini property olarak döndürür"""
-        return self.get_balance()
+        """Müşterinin güncel bakiyesini döndürür (saklanan özet kolonundan)"""
+        return self.balance or Decimal('0')
     
     def to_json(self):
         """Modeli JSON formatına çevirir"""
@@ -274,7 +307,7 @@ class Customer(db.Model):
             'name': self.name,
             'phone': self.phone or '',
             'notes': self.notes or '',
-            'balance': str(self.get_balance()) if self.get_balance() else '0.00',
+            'balance': str(self.balance) if self.balance else '0.00',
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -282,6 +315,9 @@ class Customer(db.Model):
 class CustomerTransaction(db.Model):
     """Müşteri borç/alacak işlemleri"""
     __tablename__ = 'customer_transactions'
+    __table_args__ = (
+        db.Index('ix_customer_transactions_customer_date', 'customer_id', 'date', postgresql_include=['type', 'amount']),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
@@ -302,9 +338,14 @@ class CustomerTransaction(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
-class Supplier(db.Model):
+
+class Supplier(db.Model, TenantScoped):
     """Tedarikçiler"""
     __tablename__ = 'suppliers'
+    __table_args__ = (
+        db.Index('ix_suppliers_company_balance', 'company_id', 'balance', 'id'),
+        db.Index('ix_suppliers_company_name', 'company_id', 'name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)  # SaaS için
@@ -323,19 +364,18 @@ class Supplier(db.Model):
     created_at = db.Column(db.DateTime, default=get_turkey_time)
     updated_at = db.Column(db.DateTime, default=get_turkey_time, onupdate=get_turkey_time)
     
+    # Borç özetleri - SupplierTransaction yazımlarında aynı transaction içinde güncellenir
+    # (bkz. _apply_ledger). Defterle tutarlılık: flask reconcile-supplier-balances
+    total_debt = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    total_payment = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    balance = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    
     # İlişkiler
     transactions = db.relationship('SupplierTransaction', backref='supplier', lazy=True, cascade='all, delete-orphan')
     
     def get_balance(self):
-        """Tedarikçinin güncel bakiyesini hesaplar (borç - ödeme)"""
-        total_debt = sum(t.amount for t in self.transactions if t.type == 'debt')
-        total_payment = sum(t.amount for t in self.transactions if t.type == 'payment')
-        return total_debt - total_payment
-    
-    @property
-    def balance(self):
-        """Tedarikçinin güncel bakiyesini property olarak döndürür"""
-        return self.get_balance()
+        """Tedarikçinin güncel bakiyesini döndürür (borç - ödeme, saklanan özet kolonundan)"""
+        return self.balance or Decimal('0')
     
     def to_json(self):
         """Modeli JSON formatına çevirir"""
@@ -365,7 +405,7 @@ class Supplier(db.Model):
             'tax_number': self.tax_number or '',
             'notes': self.notes or '',
             'is_active': self.is_active,
-            'balance': str(self.get_balance()) if self.get_balance() else '0.00',
+            'balance': str(self.balance) if self.balance else '0.00',
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -373,6 +413,9 @@ class Supplier(db.Model):
 class SupplierTransaction(db.Model):
     """Tedarikçi borç/ödeme işlemleri"""
     __tablename__ = 'supplier_transactions'
+    __table_args__ = (
+        db.Index('ix_supplier_transactions_supplier_date', 'supplier_id', 'date', postgresql_include=['type', 'amount']),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), nullable=False)
@@ -393,9 +436,71 @@ class SupplierTransaction(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
-class Product(db.Model):
+
+def _apply_ledger(connection, table, row_id, tx_type, amount, sign):
+    """Bakiye özetlerine tek bir borç/ödeme işleminin etkisini ekler (sign=1) veya geri alır (sign=-1).
+    
+    Müşteri ve tedarikçi defterleri için ortaktır. Güncelleme SQL tarafında
+    (balance = balance + :delta) yapılır, böylece eşzamanlı yazımlarda kayıp
+    güncelleme olmaz ve flush ile aynı transaction'a dahil olur.
+    """
+    if row_id is None or tx_type not in ('debt', 'payment'):
+        return
+    delta = Decimal(str(amount or 0)) * sign
+    if tx_type == 'debt':
+        values = {
+            'total_debt': table.c.total_debt + delta,
+            'balance': table.c.balance + delta
+        }
+    else:
+        values = {
+            'total_payment': table.c.total_payment + delta,
+            'balance': table.c.balance - delta
+        }
+    connection.execute(table.update().where(table.c.id == row_id).values(**values))
+
+
+def _previous_value(state, key):
+    """Flush sırasında bir alanın değişiklik öncesi değerini döndürür"""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.obj(), key)
+
+
+def _register_ledger_listeners(transaction_model, owner_model, owner_key):
+    """Defter modelinin insert/update/delete olaylarını sahibinin bakiye kolonlarına bağlar"""
+    table = owner_model.__table__
+
+    @event.listens_for(transaction_model, 'after_insert')
+    def ledger_inserted(mapper, connection, target):
+        _apply_ledger(connection, table, getattr(target, owner_key), target.type, target.amount, 1)
+
+    @event.listens_for(transaction_model, 'after_update')
+    def ledger_updated(mapper, connection, target):
+        state = inspect(target)
+        keys = (owner_key, 'type', 'amount')
+        old = tuple(_previous_value(state, key) for key in keys)
+        new = tuple(getattr(target, key) for key in keys)
+        if old == new:
+            return
+        _apply_ledger(connection, table, *old, -1)
+        _apply_ledger(connection, table, *new, 1)
+
+    @event.listens_for(transaction_model, 'after_delete')
+    def ledger_deleted(mapper, connection, target):
+        _apply_ledger(connection, table, getattr(target, owner_key), target.type, target.amount, -1)
+
+
+_register_ledger_listeners(CustomerTransaction, Customer, 'customer_id')
+_register_ledger_listeners(SupplierTransaction, Supplier, 'supplier_id')
+
+class Product(db.Model, TenantScoped):
     """Ürünler (stoklu)"""
     __tablename__ = 'products'
+    __table_args__ = (
+        db.Index('ix_products_company_name', 'company_id', 'name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)  # SaaS için
@@ -449,14 +554,22 @@ class Product(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
-class Receipt(db.Model):
+class Receipt(db.Model, TenantScoped):
     """Satış fişleri"""
     __tablename__ = 'receipts'
+    __table_args__ = (
+        # Fiş numaraları şirket bazında benzersizdir (her şirket F001'den başlar)
+        db.UniqueConstraint('company_id', 'receipt_no', name='uq_receipts_company_receipt_no'),
+        # Fiş listesi, son fişler ve müşteri detay sayfası için
+        db.Index('ix_receipts_company_date', 'company_id', 'date', 'created_at'),
+        db.Index('ix_receipts_company_created', 'company_id', 'created_at'),
+        db.Index('ix_receipts_company_customer_date', 'company_id', 'customer_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)  # SaaS için
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
-    receipt_no = db.Column(db.String(20), unique=True, nullable=False)
+    receipt_no = db.Column(db.String(20), nullable=False)
     total_amount = db.Column(db.Numeric(15, 2), nullable=False)
     tax_rate = db.Column(db.Numeric(5, 2), default=0)
     tax_amount = db.Column(db.Numeric(15, 2), default=0)
@@ -468,8 +581,8 @@ class Receipt(db.Model):
     # İlişkiler
     items = db.relationship('ReceiptItem', backref='receipt', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_items=True):
+        result = {
             'id': self.id,
             'customer_id': self.customer_id,
             'customer_name': self.customer.name if self.customer else None,
@@ -480,13 +593,213 @@ class Receipt(db.Model):
             'grand_total': str(self.grand_total) if self.grand_total else str(self.total_amount),
             'notes': self.notes,
             'date': self.date.isoformat() if self.date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'items': [item.to_dict() for item in self.items]
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        if include_items:
+            result['items'] = [item.to_dict() for item in self.items]
+        return result
+
+class ReceiptSequence(db.Model):
+    """Şirket bazlı fiş numarası sayacı"""
+    __tablename__ = 'receipt_sequences'
+    
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def format_receipt_no(value):
+        return f"F{value:03d}"
+    
+    @staticmethod
+    def _parse_receipt_no(receipt_no):
+        if receipt_no and receipt_no[:1] == 'F' and receipt_no[1:].isdigit():
+            return int(receipt_no[1:])
+        return 0
+    
+    @classmethod
+    def _last_issued(cls, company_id):
+        """Sayaç öncesi kesilmiş fişlerin en büyük numarası"""
+        return max(
+            (cls._parse_receipt_no(no) for (no,) in
+             db.session.query(Receipt.receipt_no).filter(Receipt.company_id == company_id)),
+            default=0
+        )
+    
+    @classmethod
+    def _ensure(cls, company_id):
+        """Şirketin sayaç satırı yoksa mevcut fişlerin en büyük numarasından başlatır"""
+        start = cls._last_issued(company_id)
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+        
+        if insert is not None:
+            # Eşzamanlı ilk fişlerde satırı yalnızca biri oluşturur
+            db.session.execute(
+                insert(cls.__table__).values(company_id=company_id, last_value=start).on_conflict_do_nothing()
+            )
+        elif db.session.get(cls, company_id) is None:
+            db.session.add(cls(company_id=company_id, last_value=start))
+            db.session.flush()
+    
+    @classmethod
+    def next_value(cls, company_id):
+        """Sıradaki fiş numarasını atomik olarak ayırır.
+        
+        Tek bir UPDATE ... RETURNING ile artırılır; satır kilidi çağıranın
+        transaction'ı bitene kadar tutulur, böylece numaralar boşluksuz ve tekildir.
+        RETURNING desteklemeyen SQLite sürümlerinde UPDATE + SELECT kullanılır
+        (SQLite UPDATE ile yazma kilidini alır, aynı transaction'da güvenlidir).
+        """
+        table = cls.__table__
+        stmt = table.update().where(table.c.company_id == company_id).values(
+            last_value=table.c.last_value + 1
+        )
+        returning = db.session.get_bind().dialect.update_returning
+        
+        for _ in range(2):
+            if returning:
+                value = db.session.execute(stmt.returning(table.c.last_value)).scalar()
+            elif db.session.execute(stmt).rowcount:
+                value = db.session.execute(
+                    db.select(table.c.last_value).where(table.c.company_id == company_id)
+                ).scalar()
+            else:
+                value = None
+            if value is not None:
+                return value
+            cls._ensure(company_id)
+        raise RuntimeError(f'Fiş sayacı oluşturulamadı: şirket {company_id}')
+    
+    @classmethod
+    def next_receipt_no(cls, company_id):
+        return cls.format_receipt_no(cls.next_value(company_id))
+    
+    @classmethod
+    def peek_receipt_no(cls, company_id):
+        """Sıradaki numarayı ayırmadan gösterir (form önizlemesi için)"""
+        sequence = db.session.get(cls, company_id)
+        if sequence is not None:
+            return cls.format_receipt_no(sequence.last_value + 1)
+        return cls.format_receipt_no(cls._last_issued(company_id) + 1)
+
+
+class DailySummary(db.Model, TenantScoped):
+    """Şirket bazlı günlük özet - raporlar ve dashboard ham işlemler yerine buradan okur.
+    
+    Satırlar Transaction, Receipt ve CustomerTransaction yazımlarıyla aynı
+    flush içinde artımlı olarak güncellenir (bkz. _register_summary_listeners);
+    `flask backfill-daily-summaries` ham tablolardan yeniden oluşturur.
+    """
+    __tablename__ = 'daily_summaries'
+    
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    income_total = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    expense_total = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    receipt_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    receipt_total = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')
+    debt_total = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')  # Verilen borç (veresiye)
+    payment_total = db.Column(db.Numeric(15, 2), nullable=False, default=0, server_default='0')  # Alınan ödeme
+    
+    TOTAL_COLUMNS = ('income_total', 'expense_total', 'receipt_count', 'receipt_total', 'debt_total', 'payment_total')
+
+
+def _apply_daily_summary(connection, company_id, day, deltas, sign):
+    """Günlük özet satırına değişim ekler; satır yoksa oluşturur (upsert).
+    
+    Bakiye güncellemeleri gibi SQL tarafında (kolon = kolon + :delta) yapılır,
+    böylece aynı gün için eşzamanlı yazımlar birbirini ezmez.
+    """
+    deltas = {key: value * sign for key, value in deltas.items() if value}
+    if company_id is None or day is None or not deltas:
+        return
+    table = DailySummary.__table__
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        insert = None
+    
+    if insert is not None:
+        stmt = insert(table).values(company_id=company_id, date=day, **deltas)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.company_id, table.c.date],
+            set_={key: table.c[key] + stmt.excluded[key] for key in deltas}
+        ))
+        return
+    
+    updated = connection.execute(
+        table.update().where(table.c.company_id == company_id, table.c.date == day).values(
+            **{key: table.c[key] + value for key, value in deltas.items()}
+        )
+    )
+    if not updated.rowcount:
+        connection.execute(table.insert().values(company_id=company_id, date=day, **deltas))
+
+
+def _transaction_summary(connection, company_id, day, tx_type, amount):
+    column = {'income': 'income_total', 'expense': 'expense_total'}.get(tx_type)
+    return company_id, day, {column: Decimal(str(amount or 0))} if column else {}
+
+
+def _receipt_summary(connection, company_id, day, grand_total):
+    return company_id, day, {'receipt_count': 1, 'receipt_total': Decimal(str(grand_total or 0))}
+
+
+def _customer_transaction_summary(connection, customer_id, day, tx_type, amount):
+    column = {'debt': 'debt_total', 'payment': 'payment_total'}.get(tx_type)
+    if column is None or customer_id is None:
+        return None, day, {}
+    customers = Customer.__table__
+    company_id = connection.execute(
+        db.select(customers.c.company_id).where(customers.c.id == customer_id)
+    ).scalar()
+    return company_id, day, {column: Decimal(str(amount or 0))}
+
+
+def _register_summary_listeners(model, keys, summarize):
+    """Modelin insert/update/delete olaylarını günlük özet tablosuna bağlar.
+    
+    `summarize(connection, *değerler)` -> (company_id, tarih, {kolon: değişim})
+    """
+    @event.listens_for(model, 'after_insert')
+    def summary_inserted(mapper, connection, target):
+        _apply_daily_summary(connection, *summarize(connection, *(getattr(target, key) for key in keys)), 1)
+
+    @event.listens_for(model, 'after_update')
+    def summary_updated(mapper, connection, target):
+        state = inspect(target)
+        old = tuple(_previous_value(state, key) for key in keys)
+        new = tuple(getattr(target, key) for key in keys)
+        if old == new:
+            return
+        _apply_daily_summary(connection, *summarize(connection, *old), -1)
+        _apply_daily_summary(connection, *summarize(connection, *new), 1)
+
+    @event.listens_for(model, 'after_delete')
+    def summary_deleted(mapper, connection, target):
+        _apply_daily_summary(connection, *summarize(connection, *(getattr(target, key) for key in keys)), -1)
+
+
+_register_summary_listeners(Transaction, ('company_id', 'date', 'type', 'amount'), _transaction_summary)
+_register_summary_listeners(Receipt, ('company_id', 'date', 'grand_total'), _receipt_summary)
+_register_summary_listeners(CustomerTransaction, ('customer_id', 'date', 'type', 'amount'), _customer_transaction_summary)
+
 
 class ReceiptItem(db.Model):
     """Fiş kalemleri"""
     __tablename__ = 'receipt_items'
+    __table_args__ = (
+        db.Index('ix_receipt_items_receipt', 'receipt_id'),
+        db.Index('ix_receipt_items_product', 'product_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     receipt_id = db.Column(db.Integer, db.ForeignKey('receipts.id'), nullable=False)
@@ -514,6 +827,9 @@ class ReceiptItem(db.Model):
 class LoginAttempt(db.Model):
     """Brute force koruması için giriş denemeleri"""
     __tablename__ = 'login_attempts'
+    __table_args__ = (
+        db.Index('ix_login_attempts_ip_username', 'ip_address', 'username'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     ip_address = db.Column(db.String(45), nullable=False)  # IPv6 desteği için 45 karakter
@@ -563,3 +879,51 @@ class LoginAttempt(db.Model):
             'locked_until': self.locked_until.isoformat() if self.locked_until else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+class Job(db.Model):
+    """Arka plan işleri (export, yedekleme) - bkz. job_queue.py.
+    
+    Tenant filtresine dahil değildir: worker tüm şirketlerin işlerini alır,
+    route'lar company_id'yi açıkça kontrol eder. Zaman kolonları saat dilimi
+    bilgisi olmadan (Türkiye saati) saklanır ve parametre olarak karşılaştırılır.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+        db.Index('ix_jobs_company_status', 'company_id', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    payload = db.Column(db.Text)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, nullable=False)  # Bu zamandan önce alınmaz (yeniden deneme beklemesi)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)  # Son heartbeat; JOB_LEASE_SECONDS aşılırsa iş yeniden kuyruğa alınır
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    progress_message = db.Column(db.String(200))
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'progress': self.progress,
+            'progress_message': self.progress_message or '',
+            'error': self.error if self.status == 'failed' else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,876 @@
+"""
+Saf Python PDF tablo yazıcısı (rapor export'ları için).
+
+- TrueType yazı tipi (varsayılan DejaVu Sans) Identity-H kodlamasıyla gömülür;
+  Türkçe ve Arapça karakterlerin tamamı desteklenir. Yazı tipi programı
+  belgede kullanılan glyph'lere indirgenir (subset).
+- Sayfalar üretildikçe dosyaya yazılır; bellekte yalnızca o anki sayfa tutulur.
+- Ayrıştırılmış yazı tipi, glyph kümesine göre yazı tipi alt kümeleri ve
+  başlık metinlerinin glyph kodları süreç başına önbelleğe alınır.
+- Arapça metin bağlamsal harf biçimlerine (presentation forms) çevrilir ve
+  basitleştirilmiş bidi algoritmasıyla görsel sıraya dizilir.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+A4 = (595.28, 841.89)
+MARGIN = 36
+TITLE_SIZE = 14
+SUBTITLE_SIZE = 8
+FONT_SIZE = 8
+HEADER_ROW_HEIGHT = 18
+ROW_HEIGHT = 14
+CELL_PADDING = 4
+HEADER_COLOR = (0.4, 0.494, 0.918)  # #667eea - Excel export ile aynı
+WIDTH_SAMPLE_ROWS = 500
+
+DEFAULT_FONT_PATHS = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+    '/usr/local/share/fonts/DejaVuSans.ttf',
+    '/Library/Fonts/DejaVuSans.ttf',
+)
+
+
+def find_font_path(configured=None):
+    """Kullanılacak TrueType dosyası - önce konfigürasyon, sonra bilinen sistem yolları"""
+    for path in ((configured,) if configured else ()) + DEFAULT_FONT_PATHS:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+# =============================================================================
+# TRUETYPE YAZI TİPİ
+# =============================================================================
+
+class TrueTypeFont:
+    """PDF'e gömmek için gereken TrueType tablolarını okur (cmap, hmtx, metrikler)"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.path = path
+        self.data = data
+
+        num_tables = struct.unpack('>H', data[4:6])[0]
+        tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack('>4sIII', data[12 + 16 * i:28 + 16 * i])
+            tables[tag.decode('latin-1')] = (offset, length)
+
+        self.tables = tables
+        head = tables['head'][0]
+        self.long_loca = struct.unpack('>h', data[head + 50:head + 52])[0] == 1
+        units_per_em = struct.unpack('>H', data[head + 18:head + 20])[0]
+        scale = 1000.0 / units_per_em
+        self.bbox = [round(v * scale) for v in struct.unpack('>hhhh', data[head + 36:head + 44])]
+
+        hhea = tables['hhea'][0]
+        ascent, descent = struct.unpack('>hh', data[hhea + 4:hhea + 8])
+        self.ascent, self.descent = round(ascent * scale), round(descent * scale)
+        num_hmetrics = struct.unpack('>H', data[hhea + 34:hhea + 36])[0]
+
+        maxp = tables['maxp'][0]
+        num_glyphs = struct.unpack('>H', data[maxp + 4:maxp + 6])[0]
+        self.num_glyphs = num_glyphs
+
+        hmtx = tables['hmtx'][0]
+        advances = list(struct.unpack(f'>{num_hmetrics * 2}H', data[hmtx:hmtx + num_hmetrics * 4])[::2])
+        advances.extend([advances[-1]] * (num_glyphs - num_hmetrics))
+        self.widths = [round(a * scale) for a in advances]
+
+        self.cap_height = self.ascent
+        if 'OS/2' in tables:
+            os2, length = tables['OS/2']
+            version = struct.unpack('>H', data[os2:os2 + 2])[0]
+            if version >= 2 and length >= 90:
+                self.cap_height = round(struct.unpack('>h', data[os2 + 88:os2 + 90])[0] * scale)
+
+        self.italic_angle = 0
+        if 'post' in tables:
+            post = tables['post'][0]
+            self.italic_angle = struct.unpack('>i', data[post + 4:post + 8])[0] / 65536.0
+
+        self.cmap = self._read_cmap(data, tables['cmap'][0])
+        base = re.sub(r'[^A-Za-z0-9-]', '', os.path.splitext(os.path.basename(path))[0])
+        self.name = base or 'EmbeddedFont'
+
+        # Karakter -> (glyph id, hex kod, genişlik) - sıcak yol için
+        self._glyphs = {}
+
+    @staticmethod
+    def _read_cmap(data, offset):
+        num_subtables = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        subtables = {}
+        for i in range(num_subtables):
+            platform, encoding, sub_offset = struct.unpack('>HHI', data[offset + 4 + 8 * i:offset + 12 + 8 * i])
+            subtables[(platform, encoding)] = offset + sub_offset
+
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3)):
+            if key in subtables:
+                start = subtables[key]
+                fmt = struct.unpack('>H', data[start:start + 2])[0]
+                if fmt == 12:
+                    return TrueTypeFont._read_cmap_format12(data, start)
+                if fmt == 4:
+                    return TrueTypeFont._read_cmap_format4(data, start)
+        raise ValueError('Desteklenen bir Unicode cmap tablosu bulunamadı')
+
+    @staticmethod
+    def _read_cmap_format4(data, start):
+        seg_count = struct.unpack('>H', data[start + 6:start + 8])[0] // 2
+        ends_at = start + 14
+        starts_at = ends_at + seg_count * 2 + 2
+        deltas_at = starts_at + seg_count * 2
+        ranges_at = deltas_at + seg_count * 2
+        ends = struct.unpack(f'>{seg_count}H', data[ends_at:ends_at + seg_count * 2])
+        starts = struct.unpack(f'>{seg_count}H', data[starts_at:starts_at + seg_count * 2])
+        deltas = struct.unpack(f'>{seg_count}h', data[deltas_at:deltas_at + seg_count * 2])
+        range_offsets = struct.unpack(f'>{seg_count}H', data[ranges_at:ranges_at + seg_count * 2])
+
+        cmap = {}
+        for seg, (first, last, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+            if first == 0xFFFF:
+                continue
+            for code in range(first, last + 1):
+                if range_offset == 0:
+                    gid = (code + delta) & 0xFFFF
+                else:
+                    at = ranges_at + seg * 2 + range_offset + (code - first) * 2
+                    gid = struct.unpack('>H', data[at:at + 2])[0]
+                    if gid:
+                        gid = (gid + delta) & 0xFFFF
+                if gid:
+                    cmap[code] = gid
+        return cmap
+
+    @staticmethod
+    def _read_cmap_format12(data, start):
+        num_groups = struct.unpack('>I', data[start + 12:start + 16])[0]
+        cmap = {}
+        for i in range(num_groups):
+            first, last, gid = struct.unpack('>III', data[start + 16 + 12 * i:start + 28 + 12 * i])
+            for code in range(first, last + 1):
+                cmap[code] = gid + code - first
+        return cmap
+
+    def has_glyph(self, char):
+        return ord(char) in self.cmap
+
+    def glyph(self, char):
+        """(glyph id, 4 haneli hex kod, 1000 birimlik genişlik)"""
+        entry = self._glyphs.get(char)
+        if entry is None:
+            gid = self.cmap.get(ord(char), 0)
+            entry = (gid, b'%04X' % gid, self.widths[gid] if gid < len(self.widths) else 0)
+            self._glyphs[char] = entry
+        return entry
+
+    def text_width(self, text, size):
+        return sum(self.glyph(char)[2] for char in text) * size / 1000.0
+
+
+@lru_cache(maxsize=4)
+def load_font(path):
+    """Ayrıştırılmış yazı tipi - süreç başına bir kez okunur"""
+    return TrueTypeFont(path)
+
+
+# PDF'teki CIDFontType2 için gereken tablolar; cmap, post, name, GSUB/GPOS atılır
+_SUBSET_TABLES = (b'cvt ', b'fpgm', b'glyf', b'head', b'hhea', b'hmtx', b'loca', b'maxp', b'prep')
+# Bileşik glyph bayrakları
+_ARG_1_AND_2_ARE_WORDS = 0x0001
+_WE_HAVE_A_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+_WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+def _glyph_locations(font):
+    """loca tablosu: glyph i'nin glyf içindeki [başlangıç, bitiş) konumu için num_glyphs + 1 değer"""
+    offset = font.tables['loca'][0]
+    count = font.num_glyphs + 1
+    if font.long_loca:
+        return struct.unpack(f'>{count}I', font.data[offset:offset + count * 4])
+    return [value * 2 for value in struct.unpack(f'>{count}H', font.data[offset:offset + count * 2])]
+
+
+def _components(glyph):
+    """Bileşik glyph'in başvurduğu glyph numaraları"""
+    if len(glyph) < 10 or struct.unpack('>h', glyph[:2])[0] >= 0:
+        return []
+    gids, at = [], 10
+    while True:
+        flags, gid = struct.unpack('>HH', glyph[at:at + 4])
+        gids.append(gid)
+        at += 4 + (4 if flags & _ARG_1_AND_2_ARE_WORDS else 2)
+        if flags & _WE_HAVE_A_SCALE:
+            at += 2
+        elif flags & _WE_HAVE_AN_X_AND_Y_SCALE:
+            at += 4
+        elif flags & _WE_HAVE_A_TWO_BY_TWO:
+            at += 8
+        if not flags & _MORE_COMPONENTS:
+            return gids
+
+
+def _checksum(data):
+    data += b'\0' * (-len(data) % 4)
+    return sum(struct.unpack(f'>{len(data) // 4}I', data)) & 0xFFFFFFFF
+
+
+@lru_cache(maxsize=16)
+def _font_subset(path, gids):
+    """Yalnızca `gids` glyph'lerini içeren sıkıştırılmış yazı tipi programı: (program, ham boyut).
+
+    Glyph numaraları korunur (CIDToGIDMap /Identity, /W ve ToUnicode değişmez);
+    kullanılmayan glyph'lerin taslakları boşaltılır. Aynı glyph kümesi için
+    süreç başına bir kez üretilir.
+    """
+    font = load_font(path)
+    data = font.data
+    glyf = font.tables['glyf'][0]
+    locations = _glyph_locations(font)
+
+    keep, pending = set(), [0, *gids]
+    while pending:
+        gid = pending.pop()
+        if gid in keep or gid >= font.num_glyphs:
+            continue
+        keep.add(gid)
+        pending.extend(_components(data[glyf + locations[gid]:glyf + locations[gid + 1]]))
+
+    glyphs, loca, end = [], [0], 0
+    for gid in range(font.num_glyphs):
+        if gid in keep:
+            glyph = data[glyf + locations[gid]:glyf + locations[gid + 1]]
+            glyph += b'\0' * (-len(glyph) % 4)
+            glyphs.append(glyph)
+            end += len(glyph)
+        loca.append(end)
+
+    head_offset, head_length = font.tables['head']
+    head = bytearray(data[head_offset:head_offset + head_length])
+    head[8:12] = b'\0\0\0\0'  # checkSumAdjustment aşağıda yeniden hesaplanır
+    head[50:52] = struct.pack('>h', 1)  # uzun loca
+    tables = {
+        tag.encode('latin-1'): data[offset:offset + length]
+        for tag, (offset, length) in font.tables.items() if tag.encode('latin-1') in _SUBSET_TABLES
+    }
+    tables.update({b'head': bytes(head), b'glyf': b''.join(glyphs), b'loca': struct.pack(f'>{len(loca)}I', *loca)})
+
+    tags = sorted(tables)
+    entry_selector = len(tags).bit_length() - 1
+    search_range = 16 << entry_selector
+    header = struct.pack('>IHHHH', 0x00010000, len(tags), search_range, entry_selector, len(tags) * 16 - search_range)
+    records, body = [], b''
+    offset = len(header) + 16 * len(tags)
+    for tag in tags:
+        table = tables[tag]
+        if tag == b'head':
+            head_at = offset + len(body)
+        records.append(struct.pack('>4sIII', tag, _checksum(table), offset + len(body), len(table)))
+        body += table + b'\0' * (-len(table) % 4)
+    program = bytearray(header + b''.join(records) + body)
+    program[head_at + 8:head_at + 12] = struct.pack('>I', (0xB1B0AFBA - _checksum(bytes(program))) & 0xFFFFFFFF)
+    return zlib.compress(bytes(program), 6), len(program)
+
+
+def _subset_tag(gids):
+    """Alt küme yazı tipi adı öneki (ABCDEF+): glyph kümesine göre sabit altı büyük harf"""
+    digest = hashlib.sha1(b','.join(b'%d' % gid for gid in sorted(gids))).digest()
+    return ''.join(chr(65 + byte % 26) for byte in digest[:6])
+
+
+# =============================================================================
+# ARAPÇA HARF BİÇİMLERİ VE BIDI
+# =============================================================================
+
+# Harf: (tek başına, son, baş, orta) - None: o tarafa bağlanmaz
+_ARABIC_FORMS = {
+    0x0621: (0xFE80, None, None, None),
+    0x0622: (0xFE81, 0xFE82, None, None),
+    0x0623: (0xFE83, 0xFE84, None, None),
+    0x0624: (0xFE85, 0xFE86, None, None),
+    0x0625: (0xFE87, 0xFE88, None, None),
+    0x0626: (0xFE89, 0xFE8A, 0xFE8B, 0xFE8C),
+    0x0627: (0xFE8D, 0xFE8E, None, None),
+    0x0628: (0xFE8F, 0xFE90, 0xFE91, 0xFE92),
+    0x0629: (0xFE93, 0xFE94, None, None),
+    0x062A: (0xFE95, 0xFE96, 0xFE97, 0xFE98),
+    0x062B: (0xFE99, 0xFE9A, 0xFE9B, 0xFE9C),
+    0x062C: (0xFE9D, 0xFE9E, 0xFE9F, 0xFEA0),
+    0x062D: (0xFEA1, 0xFEA2, 0xFEA3, 0xFEA4),
+    0x062E: (0xFEA5, 0xFEA6, 0xFEA7, 0xFEA8),
+    0x062F: (0xFEA9, 0xFEAA, None, None),
+    0x0630: (0xFEAB, 0xFEAC, None, None),
+    0x0631: (0xFEAD, 0xFEAE, None, None),
+    0x0632: (0xFEAF, 0xFEB0, None, None),
+    0x0633: (0xFEB1, 0xFEB2, 0xFEB3, 0xFEB4),
+    0x0634: (0xFEB5, 0xFEB6, 0xFEB7, 0xFEB8),
+    0x0635: (0xFEB9, 0xFEBA, 0xFEBB, 0xFEBC),
+    0x0636: (0xFEBD, 0xFEBE, 0xFEBF, 0xFEC0),
+    0x0637: (0xFEC1, 0xFEC2, 0xFEC3, 0xFEC4),
+    0x0638: (0xFEC5, 0xFEC6, 0xFEC7, 0xFEC8),
+    0x0639: (0xFEC9, 0xFECA, 0xFECB, 0xFECC),
+    0x063A: (0xFECD, 0xFECE, 0xFECF, 0xFED0),
+    0x0641: (0xFED1, 0xFED2, 0xFED3, 0xFED4),
+    0x0642: (0xFED5, 0xFED6, 0xFED7, 0xFED8),
+    0x0643: (0xFED9, 0xFEDA, 0xFEDB, 0xFEDC),
+    0x0644: (0xFEDD, 0xFEDE, 0xFEDF, 0xFEE0),
+    0x0645: (0xFEE1, 0xFEE2, 0xFEE3, 0xFEE4),
+    0x0646: (0xFEE5, 0xFEE6, 0xFEE7, 0xFEE8),
+    0x0647: (0xFEE9, 0xFEEA, 0xFEEB, 0xFEEC),
+    0x0648: (0xFEED, 0xFEEE, None, None),
+    0x0649: (0xFEEF, 0xFEF0, None, None),
+    0x064A: (0xFEF1, 0xFEF2, 0xFEF3, 0xFEF4),
+    # Farsça/Urduca ek harfler
+    0x067E: (0xFB56, 0xFB57, 0xFB58, 0xFB59),
+    0x0686: (0xFB7A, 0xFB7B, 0xFB7C, 0xFB7D),
+    0x0698: (0xFB8A, 0xFB8B, None, None),
+    0x06A9: (0xFB8E, 0xFB8F, 0xFB90, 0xFB91),
+    0x06AF: (0xFB92, 0xFB93, 0xFB94, 0xFB95),
+    0x06CC: (0xFBFC, 0xFBFD, 0xFBFE, 0xFBFF),
+}
+# Lam + elif bitişik yazımları: elif -> (tek başına, son)
+_LAM_ALEF = {
+    0x0622: (0xFEF5, 0xFEF6),
+    0x0623: (0xFEF7, 0xFEF8),
+    0x0625: (0xFEF9, 0xFEFA),
+    0x0627: (0xFEFB, 0xFEFC),
+}
+_LAM = 0x0644
+_TATWEEL = 0x0640
+_MIRRORED = str.maketrans('()[]{}<>«»', ')(][}{><»«')
+_RTL_RE = re.compile('[\u0590-\u08ff\ufb1d-\ufdff\ufe70-\ufefc]')
+_ARABIC_INDIC_DIGITS = set('\u0660\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668\u0669'
+                           '\u06f0\u06f1\u06f2\u06f3\u06f4\u06f5\u06f6\u06f7\u06f8\u06f9')
+_NUMBER_SEPARATORS = set('.,:/')
+
+
+def _is_transparent(code):
+    return 0x064B <= code <= 0x065F or code == 0x0670
+
+
+def _joins_forward(code):
+    """Bir sonraki (soldaki) harfe bağlanabilir mi"""
+    forms = _ARABIC_FORMS.get(code)
+    return code == _TATWEEL or (forms is not None and forms[2] is not None)
+
+
+def _joins_backward(code):
+    forms = _ARABIC_FORMS.get(code)
+    return code == _TATWEEL or (forms is not None and forms[1] is not None)
+
+
+def shape_arabic(text, font=None):
+    """Arapça harfleri bağlama göre (baş/orta/son/tek) sunum biçimlerine çevirir.
+
+    Yazı tipinde karşılığı olmayan biçimler için temel harf bırakılır.
+    """
+    codes = [ord(char) for char in text]
+    n = len(codes)
+    result = []
+
+    def neighbour(index, step):
+        index += step
+        while 0 <= index < n and _is_transparent(codes[index]):
+            index += step
+        return codes[index] if 0 <= index < n else None
+
+    def pick(code, fallback):
+        char = chr(code)
+        return char if font is None or font.has_glyph(char) else fallback
+
+    i = 0
+    while i < n:
+        code = codes[i]
+        forms = _ARABIC_FORMS.get(code)
+        if forms is None:
+            result.append(chr(code))
+            i += 1
+            continue
+
+        previous = neighbour(i, -1)
+        joins_previous = previous is not None and _joins_forward(previous)
+
+        if code == _LAM and i + 1 < n and codes[i + 1] in _LAM_ALEF:
+            isolated, final = _LAM_ALEF[codes[i + 1]]
+            ligature = final if joins_previous else isolated
+            result.append(pick(ligature, chr(code) + chr(codes[i + 1])))
+            i += 2
+            continue
+
+        following = neighbour(i, 1)
+        joins_next = following is not None and _joins_backward(following) and forms[2] is not None
+        joins_previous = joins_previous and forms[1] is not None
+
+        if joins_previous and joins_next:
+            form = forms[3]
+        elif joins_previous:
+            form = forms[1]
+        elif joins_next:
+            form = forms[2]
+        else:
+            form = forms[0]
+        result.append(pick(form, chr(code)))
+        i += 1
+    return ''.join(result)
+
+
+def _bidi_type(char):
+    if _RTL_RE.match(char):
+        return 'AN' if char in _ARABIC_INDIC_DIGITS else 'R'
+    if char.isdigit():
+        return 'EN'
+    if char.isalpha():
+        return 'L'
+    return 'ON'
+
+
+def is_rtl_text(text):
+    """Metnin ilk güçlü karakteri sağdan sola mı"""
+    for char in text:
+        kind = _bidi_type(char)
+        if kind == 'R':
+            return True
+        if kind == 'L':
+            return False
+    return False
+
+
+def visual_order(text, rtl_base=None):
+    """Mantıksal sıradaki metni ekranda soldan sağa çizilecek görsel sıraya çevirir.
+
+    Unicode bidi algoritmasının tek satırlık, gömme (embedding) karakterleri
+    olmayan metinler için sadeleştirilmiş hali: sayılar ve Latin harfleri
+    soldan sağa, Arapça/İbranice sağdan sola akar.
+    """
+    if rtl_base is None:
+        rtl_base = is_rtl_text(text)
+    types = [_bidi_type(char) for char in text]
+    n = len(types)
+    base = 'R' if rtl_base else 'L'
+
+    # Sayıların içindeki ayraçlar (1.234,56 - 18.10.2026) sayının parçasıdır
+    for i in range(1, n - 1):
+        if types[i] == 'ON' and text[i] in _NUMBER_SEPARATORS and \
+                types[i - 1] in ('EN', 'AN') and types[i + 1] == types[i - 1]:
+            types[i] = types[i - 1]
+
+    # W7: Latin bağlamındaki sayılar Latin gibi davranır
+    last_strong = base
+    for i, kind in enumerate(types):
+        if kind in ('L', 'R'):
+            last_strong = kind
+        elif kind == 'EN' and last_strong == 'L':
+            types[i] = 'L'
+
+    # N1/N2: nötr karakterler iki yanı aynı yöndeyse o yönü, değilse paragraf yönünü alır
+    def strong(kind):
+        return 'L' if kind == 'L' else 'R'
+
+    i = 0
+    while i < n:
+        if types[i] != 'ON':
+            i += 1
+            continue
+        j = i
+        while j < n and types[j] == 'ON':
+            j += 1
+        before = strong(types[i - 1]) if i > 0 else base
+        after = strong(types[j]) if j < n else base
+        types[i:j] = [before if before == after else base] * (j - i)
+        i = j
+
+    if rtl_base:
+        levels = [1 if kind == 'R' else 2 for kind in types]
+    else:
+        levels = [0 if kind == 'L' else 1 if kind == 'R' else 2 for kind in types]
+
+    chars = list(text)
+    for level in range(max(levels, default=0), 0, -1):
+        i = 0
+        while i < n:
+            if levels[i] < level:
+                i += 1
+                continue
+            j = i
+            while j < n and levels[j] >= level:
+                j += 1
+            chars[i:j] = chars[i:j][::-1]
+            levels[i:j] = levels[i:j][::-1]
+            i = j
+
+    return ''.join(
+        char.translate(_MIRRORED) if level % 2 else char
+        for char, level in zip(chars, levels)
+    )
+
+
+def prepare_text(text, font=None, rtl_base=None):
+    """Çizime hazır metin: Arapça biçimlendirme + görsel sıralama (gerekirse)"""
+    if not _RTL_RE.search(text):
+        return text
+    return visual_order(shape_arabic(text, font), rtl_base)
+
+
+# =============================================================================
+# HÜCRE BİÇİMLENDİRME
+# =============================================================================
+
+_TO_ARABIC_DIGITS = str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')
+_TURKISH_SEPARATORS = str.maketrans(',.', '.,')
+
+
+def format_cell(value, arabic_digits=False):
+    """Hücre değerini metne çevirir (Türkçe sayı ve tarih biçimi)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        text = 'Evet' if value else 'Hayır'
+    elif isinstance(value, (int, float, Decimal)):
+        text = f'{value:,.2f}'.translate(_TURKISH_SEPARATORS)
+    elif isinstance(value, (date, datetime)):
+        text = value.strftime('%d.%m.%Y')
+    else:
+        return str(value)
+    return text.translate(_TO_ARABIC_DIGITS) if arabic_digits else text
+
+
+# =============================================================================
+# AKIŞLI PDF BELGESİ
+# =============================================================================
+
+class PdfDocument:
+    """Sayfaları üretildikçe dosyaya yazan PDF belgesi.
+
+    Nesne konumları ve sayfa listesi dışında hiçbir şey bellekte tutulmaz;
+    yazı tipi nesneleri (kullanılan glyph'lerin alt kümesi, genişlikleri ve ToUnicode)
+    kapanışta yazılır.
+    """
+
+    def __init__(self, fileobj, font, page_size=A4, title=None):
+        self.out = fileobj
+        self.font = font
+        self.page_size = page_size
+        self.title = title
+        self._position = 0
+        self._offsets = {}
+        self._next_id = 1
+        self._page_ids = []
+        self._used_glyphs = {}
+
+        self._catalog_id = self._reserve()
+        self._pages_id = self._reserve()
+        self._font_id = self._reserve()
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def _reserve(self):
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def _write(self, data):
+        self.out.write(data)
+        self._position += len(data)
+
+    def _write_object(self, object_id, body):
+        self._offsets[object_id] = self._position
+        self._write(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+
+    def _write_stream(self, object_id, data, extra=b'', compressed=False, raw_length=None):
+        if not compressed:
+            data = zlib.compress(data, 6)
+        length1 = b' /Length1 %d' % raw_length if raw_length is not None else b''
+        self._write_object(
+            object_id,
+            b'<< /Length %d /Filter /FlateDecode%s%s >>\nstream\n' % (len(data), length1, extra)
+            + data + b'\nendstream'
+        )
+
+    def encode(self, text):
+        """Metni Identity-H glyph dizisine (<...>) çevirir"""
+        glyph = self.font.glyph
+        used = self._used_glyphs
+        parts = []
+        for char in text:
+            gid, code, _ = glyph(char)
+            if gid not in used:
+                used[gid] = char
+            parts.append(code)
+        return b'<' + b''.join(parts) + b'>'
+
+    def mark_used(self, glyphs):
+        for gid, char in glyphs:
+            self._used_glyphs.setdefault(gid, char)
+
+    def add_page(self, content):
+        content_id = self._reserve()
+        page_id = self._reserve()
+        self._write_stream(content_id, content)
+        width, height = self.page_size
+        self._write_object(page_id, (
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+        ) % (self._pages_id, width, height, self._font_id, content_id))
+        self._page_ids.append(page_id)
+
+    def _write_font(self):
+        font = self.font
+        descendant_id, descriptor_id, program_id, to_unicode_id = (self._reserve() for _ in range(4))
+        gids = frozenset(self._used_glyphs)
+        name = f'{_subset_tag(gids)}+{font.name}'.encode('ascii')
+
+        program, raw_length = _font_subset(font.path, gids)
+        self._write_stream(program_id, program, compressed=True, raw_length=raw_length)
+
+        self._write_object(descriptor_id, (
+            b'<< /Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%d %d %d %d] '
+            b'/ItalicAngle %d /Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>'
+        ) % (name, *font.bbox, font.italic_angle, font.ascent, font.descent, font.cap_height, program_id))
+
+        gids = sorted(gids)
+        widths = b' '.join(b'%d [%d]' % (gid, font.widths[gid]) for gid in gids)
+        self._write_object(descendant_id, (
+            b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s '
+            b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+            b'/FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s] >>'
+        ) % (name, descriptor_id, widths))
+
+        entries = [
+            b'<%04X> <%s>' % (gid, self._used_glyphs[gid].encode('utf-16-be').hex().upper().encode('ascii'))
+            for gid in gids
+        ]
+        cmap = [
+            b'/CIDInit /ProcSet findresource begin 12 dict begin begincmap',
+            b'/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+            b'/CMapName /Adobe-Identity-UCS def /CMapType 2 def',
+            b'1 begincodespacerange <0000> <FFFF> endcodespacerange',
+        ]
+        for start in range(0, len(entries), 100):
+            chunk = entries[start:start + 100]
+            cmap.append(b'%d beginbfchar' % len(chunk))
+            cmap.extend(chunk)
+            cmap.append(b'endbfchar')
+        cmap.append(b'endcmap CMapName currentdict /CMap defineresource pop end end')
+        self._write_stream(to_unicode_id, b'\n'.join(cmap))
+
+        self._write_object(self._font_id, (
+            b'<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H '
+            b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>'
+        ) % (name, descendant_id, to_unicode_id))
+
+    def close(self):
+        self._write_font()
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self._page_ids)
+        self._write_object(self._pages_id, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._page_ids)))
+        self._write_object(self._catalog_id, b'<< /Type /Catalog /Pages %d 0 R >>' % self._pages_id)
+
+        info_id = self._reserve()
+        info = f'<< /Producer (Muhasebe Pro) /Title <FEFF{(self.title or "").encode("utf-16-be").hex().upper()}> >>'
+        self._write_object(info_id, info.encode('ascii'))
+
+        xref_position = self._position
+        lines = [b'xref', b'0 %d' % self._next_id, b'0000000000 65535 f ']
+        for object_id in range(1, self._next_id):
+            lines.append(b'%010d 00000 n ' % self._offsets[object_id])
+        lines.append(b'trailer')
+        lines.append(b'<< /Size %d /Root %d 0 R /Info %d 0 R >>' % (self._next_id, self._catalog_id, info_id))
+        lines.append(b'startxref')
+        lines.append(b'%d' % xref_position)
+        lines.append(b'%%EOF\n')
+        self._write(b'\n'.join(lines))
+
+
+# =============================================================================
+# TABLO YERLEŞİMİ
+# =============================================================================
+
+def _text_op(encoded, x, y, size):
+    return b'BT /F1 %.1f Tf %.2f %.2f Td %s Tj ET\n' % (size, x, y, encoded)
+
+
+def _column_layout(font, headers, sample, page_width, arabic_digits):
+    """Kolon genişlikleri (örneklemden) ve sayısal kolonlar"""
+    available = page_width - 2 * MARGIN
+    natural = [font.text_width(prepare_text(str(h), font), FONT_SIZE) for h in headers]
+    numeric = [bool(sample) for _ in headers]
+    for row in sample:
+        for index, value in enumerate(row):
+            text = prepare_text(format_cell(value, arabic_digits), font)
+            natural[index] = max(natural[index], font.text_width(text, FONT_SIZE))
+            if value is not None and not isinstance(value, (int, float, Decimal)):
+                numeric[index] = False
+
+    natural = [width + 2 * CELL_PADDING for width in natural]
+    # Çok geniş metin kolonları sayfanın yarısını geçmesin
+    natural = [min(width, available / 2) for width in natural]
+    scale = available / sum(natural)
+    return [width * scale for width in natural], numeric
+
+
+@lru_cache(maxsize=256)
+def _encoded_text(font_path, text):
+    """Başlık metninin glyph dizisi, 1 puntoluk genişliği ve kullanılan (glyph, karakter) çiftleri.
+
+    Rapor başlığı ve kolon başlıkları dile ve rapor türüne göre sabittir; her
+    sayfada ve ardışık isteklerde yeniden biçimlendirilmez.
+    """
+    font = load_font(font_path)
+    visual = prepare_text(text, font)
+    codes, used = [], set()
+    for char in visual:
+        gid, code, _ = font.glyph(char)
+        used.add((gid, char))
+        codes.append(code)
+    return b'<' + b''.join(codes) + b'>', font.text_width(visual, 1), frozenset(used)
+
+
+def _header_block(font_path, title, subtitle, headers, widths, rtl, page_size):
+    """Her sayfada tekrarlanan başlık bandı (içerik akışı + kullanılan glyph'ler).
+
+    Alt başlık tarih ve saat içerdiği için önbelleğe alınmaz; yalnızca yerleşim
+    her belgede bir kez hesaplanır.
+    """
+    page_width, page_height = page_size
+    used = set()
+
+    def encode(text, cached=True):
+        encoded, unit_width, glyphs = (_encoded_text if cached else _encoded_text.__wrapped__)(font_path, text)
+        used.update(glyphs)
+        return encoded, unit_width
+
+    ops = []
+    y = page_height - MARGIN - TITLE_SIZE
+    for text, size in ((title, TITLE_SIZE), (subtitle, SUBTITLE_SIZE)):
+        if not text:
+            continue
+        encoded, unit_width = encode(text, cached=size == TITLE_SIZE)
+        x = page_width - MARGIN - unit_width * size if rtl else MARGIN
+        ops.append(b'0 g 2 Tr 0.2 w ' if size == TITLE_SIZE else b'0.4 g 0 Tr ')
+        ops.append(_text_op(encoded, x, y, size))
+        y -= size + 6
+
+    band_top = y
+    ops.append(b'0 Tr %.3f %.3f %.3f rg %.2f %.2f %.2f %.2f re f\n' % (
+        *HEADER_COLOR, MARGIN, band_top - HEADER_ROW_HEIGHT, page_width - 2 * MARGIN, HEADER_ROW_HEIGHT))
+    ops.append(b'1 g 1 G 2 Tr 0.15 w\n')
+    for text, (left, width) in zip(headers, _column_positions(widths, page_width, rtl)):
+        encoded, unit_width = encode(text)
+        text_width = unit_width * FONT_SIZE
+        x = left + max(CELL_PADDING, (width - text_width) / 2)
+        ops.append(_text_op(encoded, x, band_top - HEADER_ROW_HEIGHT + 6, FONT_SIZE))
+    ops.append(b'0 Tr 0 g 0 G\n')
+    return b''.join(ops), frozenset(used), band_top - HEADER_ROW_HEIGHT
+
+
+@lru_cache(maxsize=64)
+def _column_positions(widths, page_width, rtl):
+    """Kolonların (sol kenar, genişlik) listesi - RTL düzende sağdan sola dizilir"""
+    positions = []
+    if rtl:
+        right = page_width - MARGIN
+        for width in widths:
+            positions.append((right - width, width))
+            right -= width
+    else:
+        left = MARGIN
+        for width in widths:
+            positions.append((left, width))
+            left += width
+    return tuple(positions)
+
+
+def _fit(font, text, width):
+    """Hücreye sığmayan metni '…' ile kısaltır (mantıksal sırada keserek)"""
+    visual = prepare_text(text, font)
+    if font.text_width(visual, FONT_SIZE) <= width:
+        return visual
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        candidate = prepare_text(text[:middle].rstrip() + '…', font)
+        if font.text_width(candidate, FONT_SIZE) <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return prepare_text(text[:low].rstrip() + '…', font)
+
+
+def render_table(fileobj, font_path, title, headers, rows, subtitle='', rtl=False, arabic_digits=False,
+                 page_size=A4):
+    """Tabloyu sayfa sayfa PDF olarak yazar; yazılan sayfa sayısını döndürür.
+
+    `rows` herhangi bir iteratör olabilir - ilk WIDTH_SAMPLE_ROWS satır kolon
+    genişliklerini tahmin etmek için okunur, kalanlar akış halinde işlenir.
+    """
+    font = load_font(font_path)
+    headers = tuple(str(h) for h in headers)
+    rows = iter(rows)
+    sample = []
+    for row in rows:
+        sample.append(row)
+        if len(sample) >= WIDTH_SAMPLE_ROWS:
+            break
+
+    page_width, page_height = page_size
+    widths, numeric = _column_layout(font, headers, sample, page_width, arabic_digits)
+    widths = tuple(round(width, 2) for width in widths)
+    positions = _column_positions(widths, page_width, rtl)
+    header, header_glyphs, table_top = _header_block(font_path, title, subtitle, headers, widths, rtl, page_size)
+
+    document = PdfDocument(fileobj, font, page_size, title=title)
+    document.mark_used(header_glyphs)
+
+    def finish_page(body):
+        footer = str(document.page_count + 1)
+        if arabic_digits:
+            footer = footer.translate(_TO_ARABIC_DIGITS)
+        footer_x = (page_width - font.text_width(footer, FONT_SIZE)) / 2
+        body.append(b'0.4 g ' + _text_op(document.encode(footer), footer_x, MARGIN / 2, FONT_SIZE))
+        document.add_page(b''.join(body))
+
+    def all_rows():
+        yield from sample
+        yield from rows
+
+    body = [header]
+    y = table_top
+    for index, row in enumerate(all_rows()):
+        if y - ROW_HEIGHT < MARGIN:
+            finish_page(body)
+            body = [header]
+            y = table_top
+        y -= ROW_HEIGHT
+        if index % 2:
+            body.append(b'0.96 g %.2f %.2f %.2f %.2f re f 0 g\n' % (MARGIN, y, page_width - 2 * MARGIN, ROW_HEIGHT))
+        for value, (left, width), is_numeric in zip(row, positions, numeric):
+            text = format_cell(value, arabic_digits)
+            if not text:
+                continue
+            visual = _fit(font, text, width - 2 * CELL_PADDING)
+            text_width = font.text_width(visual, FONT_SIZE)
+            if is_numeric or rtl or (_RTL_RE.search(text) and is_rtl_text(text)):
+                x = left + width - CELL_PADDING - text_width
+            else:
+                x = left + CELL_PADDING
+            body.append(_text_op(document.encode(visual), x, y + 4, FONT_SIZE))
+
+    if len(body) > 1 or document.page_count == 0:
+        finish_page(body)
+    document.close()
+    return document.page_count
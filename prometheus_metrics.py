@@ -0,0 +1,215 @@
+"""
+Prometheus metin formatında /metrics uç noktası.
+
+Toplanan metrikler:
+- endpoint/blueprint başına istek süresi histogramı, istek sayısı ve SQL ifadesi sayısı
+- veritabanı havuzu: checkout bekleme histogramı, yavaş checkout'lar, kullanımdaki/taşan bağlantılar
+- endpoint başına yavaş SQL ifadesi sayısı (SLOW_QUERY_MS)
+- dashboard önbelleği isabet/ıskalama sayaçları ve oranı (paylaşılan önbellekten okunur)
+- giriş kısıtlayıcısının reddettiği denemeler
+- rapor export süreleri ve yedekleme sonuç/süreleri
+- arka plan işleri: tür/sonuç başına sayı ve süre, kuyruktan yapılan export süreleri
+  (worker sürecinde toplanır; worker bunları JOB_METRICS_PORT'tan kendisi sunar)
+
+Çoklu worker: PROMETHEUS_MULTIPROC_DIR tanımlıysa her süreç değerlerini bu dizine
+yazar ve /metrics tüm worker'ların toplamını döndürür (gunicorn.conf.py dizini
+hazırlar ve ölen worker'ları işaretler). Değişken prometheus_client import
+edilmeden önce tanımlı olmalıdır.
+
+Erişim: platform admin oturumu veya METRICS_ALLOWED_NETWORKS içindeki istemci adresi.
+"""
+
+import ipaddress
+import os
+import time
+
+from flask import Response, abort, current_app, request
+from flask_login import current_user
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+    start_http_server
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from db_pool import WAIT_BUCKETS
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+REQUEST_LATENCY = Histogram(
+    'muhasebe_http_request_duration_seconds', 'İstek süresi (saniye)', ['blueprint', 'endpoint', 'method']
+)
+REQUESTS = Counter(
+    'muhasebe_http_requests_total', 'Tamamlanan istekler', ['blueprint', 'endpoint', 'method', 'status']
+)
+REQUEST_QUERIES = Histogram(
+    'muhasebe_http_request_queries', 'İstek başına SQL ifadesi sayısı', ['blueprint', 'endpoint'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'muhasebe_db_pool_checkout_wait_seconds', 'Havuzdan bağlantı alma bekleme süresi', buckets=WAIT_BUCKETS
+)
+DB_POOL_SLOW_CHECKOUTS = Counter(
+    'muhasebe_db_pool_slow_checkouts_total', 'DB_POOL_SLOW_CHECKOUT_MS eşiğini aşan checkout sayısı'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'muhasebe_db_pool_checked_out', 'Kullanımdaki bağlantılar (tüm worker\'lar)', multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'muhasebe_db_pool_overflow', 'Havuz boyutunu aşan bağlantılar (tüm worker\'lar)', multiprocess_mode='livesum'
+)
+DB_SLOW_QUERIES = Counter(
+    'muhasebe_db_slow_queries_total', 'SLOW_QUERY_MS eşiğini aşan SQL ifadeleri', ['endpoint']
+)
+LOGIN_THROTTLE_REJECTIONS = Counter(
+    'muhasebe_login_throttle_rejections_total', 'Kilit nedeniyle reddedilen giriş denemeleri', ['scope']
+)
+EXPORT_DURATION = Histogram(
+    'muhasebe_report_export_duration_seconds', 'Rapor export süresi (yanıt gönderimi dahil)',
+    ['report_type', 'format'], buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+BACKUP_RUNS = Counter('muhasebe_backup_runs_total', 'Yedekleme çalıştırmaları', ['outcome'])
+BACKUP_DURATION = Histogram(
+    'muhasebe_backup_duration_seconds', 'Yedekleme süresi', buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+BACKUP_LAST_SUCCESS = Gauge(
+    'muhasebe_backup_last_success_timestamp_seconds', 'Son başarılı yedeklemenin zamanı', multiprocess_mode='max'
+)
+JOB_RUNS = Counter('muhasebe_jobs_total', 'Biten arka plan iş denemeleri', ['kind', 'outcome'])
+JOB_DURATION = Histogram(
+    'muhasebe_job_duration_seconds', 'Arka plan iş denemesi süresi', ['kind'],
+    buckets=(0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+
+def observe_login_rejection(scope):
+    """Kilitli IP ('ip') veya kullanıcı ('user') nedeniyle reddedilen giriş"""
+    LOGIN_THROTTLE_REJECTIONS.labels(scope).inc()
+
+
+def observe_export(response, report_type, format, started):
+    """Export süresini (started: perf_counter) yanıt tamamen gönderildiğinde, akış sonu dahil kaydeder"""
+    if not isinstance(response, Response):
+        return response
+    response.call_on_close(
+        lambda: EXPORT_DURATION.labels(report_type, format).observe(time.perf_counter() - started)
+    )
+    return response
+
+
+def observe_backup(outcome, duration=None):
+    """Yedekleme sonucu: 'success', 'failure' veya 'skipped'"""
+    BACKUP_RUNS.labels(outcome).inc()
+    if duration is not None:
+        BACKUP_DURATION.observe(duration)
+    if outcome == 'success':
+        BACKUP_LAST_SUCCESS.set(time.time())
+
+
+def observe_job(kind, outcome, duration):
+    """Arka plan iş denemesi: 'succeeded', 'retried' veya 'failed'"""
+    JOB_RUNS.labels(kind, outcome).inc()
+    JOB_DURATION.labels(kind).observe(duration)
+
+
+def _observe_request(request, response, duration, timing):
+    blueprint = request.blueprint or ''
+    endpoint = request.endpoint or 'unmatched'
+    REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(duration)
+    REQUESTS.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+    REQUEST_QUERIES.labels(blueprint, endpoint).observe(timing.queries)
+
+
+class _CacheCollector:
+    """Dashboard önbelleği sayaçları - paylaşılan önbellekte zaten tüm worker'ların toplamıdır"""
+
+    def collect(self):
+        from services.dashboard_service import get_cache_counters
+
+        counters = get_cache_counters()
+        requests = CounterMetricFamily(
+            'muhasebe_cache_requests', 'Önbellek istekleri', labels=['cache', 'result']
+        )
+        requests.add_metric(['dashboard', 'hit'], counters['hits'])
+        requests.add_metric(['dashboard', 'miss'], counters['misses'])
+        yield requests
+        ratio = GaugeMetricFamily('muhasebe_cache_hit_ratio', 'Önbellek isabet oranı', labels=['cache'])
+        ratio.add_metric(['dashboard'], counters['hit_ratio'])
+        yield ratio
+
+
+def _metrics_allowed():
+    if current_user.is_authenticated and current_user.is_platform_admin:
+        return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in network for network in current_app.extensions['metrics_networks'])
+
+
+def metrics_view():
+    """Prometheus metin formatında metrikler"""
+    if not _metrics_allowed():
+        abort(403)
+    cache_registry = CollectorRegistry(auto_describe=False)
+    cache_registry.register(_CacheCollector())
+    body = generate_latest(_registry()) + generate_latest(cache_registry)
+    return Response(body, mimetype=CONTENT_TYPE_LATEST)
+
+
+def _registry():
+    """Tek süreçte varsayılan kayıt; PROMETHEUS_MULTIPROC_DIR varsa tüm süreçlerin toplamı"""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def start_worker_metrics_server(port, address='0.0.0.0'):
+    """Worker sürecinin metriklerini (iş sayı/süreleri, export süreleri) ayrı bir HTTP portunda sunar.
+
+    Worker web isteği almadığı için metrikleri /metrics üzerinden okunamaz; Prometheus
+    worker'ı bu porttan ayrıca toplar.
+    """
+    start_http_server(port, addr=address, registry=_registry())
+
+
+def init_metrics(app):
+    """İstek/havuz gözlemcilerini bağlar ve /metrics uç noktasını ekler"""
+    app.extensions['metrics_networks'] = [
+        ipaddress.ip_network(network.strip(), strict=False)
+        for network in app.config.get('METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+        if network.strip()
+    ]
+    app.extensions['request_metrics'].observers.append(_observe_request)
+
+    pool_metrics = app.extensions['pool_metrics']
+
+    def observe_checkout(wait, checked_out, overflow):
+        if wait is not None:
+            DB_POOL_CHECKOUT_WAIT.observe(wait)
+            if wait > pool_metrics.slow_checkout:
+                DB_POOL_SLOW_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.set(checked_out)
+        DB_POOL_OVERFLOW.set(overflow)
+
+    pool_metrics.observers.append(observe_checkout)
+
+    @event.listens_for(pool_metrics.engine, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        # Olay, bağlantı havuza dönmeden önce çalışır; iade edilen bağlantı düşülür
+        pool = pool_metrics.engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        checked_out = max(pool.checkedout() - 1, 0)
+        DB_POOL_CHECKED_OUT.set(checked_out)
+        DB_POOL_OVERFLOW.set(max(checked_out - pool.size(), 0))
+
+    app.extensions['slow_queries'].observers.append(
+        lambda fingerprint, duration, endpoint: DB_SLOW_QUERIES.labels(endpoint).inc()
+    )
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,13 +1,20 @@
-from flask import Blueprint, render_template, request, session, jsonify, Response
+from flask import Blueprint, current_app, render_template, request, session, jsonify, Response, send_file, url_for
 from flask_login import login_required, current_user
 from functools import wraps
-from sqlalchemy import func, extract, and_
+from sqlalchemy import func, and_
 from datetime import datetime, date
-from decimal import Decimal
 import calendar
-from io import BytesIO
+import json
+import time
+import os
+import tempfile
+from itertools import chain, islice
 
-from models import db, Transaction, Product, Customer, CustomerTransaction, Receipt, ReceiptItem, Company
+from models import db, Transaction, Product, Customer, Receipt, ReceiptItem, Company, Job
+from services.summary_service import summary_totals, monthly_totals
+from translations import get_all_translations, get_translation
+from prometheus_metrics import EXPORT_DURATION, observe_export
+from job_queue import PermanentJobError, QueueLimitReached, enqueue, job_handler, output_file
 
 reports = Blueprint('reports', __name__, url_prefix='/reports')
 
@@ -68,24 +75,13 @@ def profit_loss_report():
     last_day = calendar.monthrange(year, month)[1]
     end_date = date(year, month, last_day)
     
-    # Gelir toplamı
-    income_total = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'income',
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).scalar() or 0
-    
-    # Gider toplamı
-    expense_total = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'expense',
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).scalar() or 0
+    # Gelir/gider toplamları (günlük özet tablosundan - ay boyunca en fazla 31 satır)
+    month_totals = summary_totals(company_id, start_date, end_date)
+    income_total = month_totals['income_total']
+    expense_total = month_totals['expense_total']
     
     # Net kar
-    net_profit = Decimal(str(income_total)) - Decimal(str(expense_total))
+    net_profit = income_total - expense_total
     
     # Detaylı işlemler
     income_transactions = Transaction.query.filter(
@@ -102,41 +98,12 @@ def profit_loss_report():
         Transaction.date <= end_date
     ).order_by(Transaction.date.desc()).all()
     
-    # Aylık trend verisi (son 12 ay) - Optimized
-    # Tek sorguda tüm aylık verileri al (24 sorgu yerine 1 sorgu)
-    monthly_results = db.session.query(
-        extract('year', Transaction.date).label('year'),
-        extract('month', Transaction.date).label('month'),
-        func.sum(
-            db.case(
-                (Transaction.type == 'income', Transaction.amount),
-                else_=0
-            )
-        ).label('income'),
-        func.sum(
-            db.case(
-                (Transaction.type == 'expense', Transaction.amount),
-                else_=0
-            )
-        ).label('expense')
-    ).filter(
-        Transaction.company_id == company_id,
-        Transaction.date >= date(year - 1, month, 1)  # Son 12 ay
-    ).group_by(
-        extract('year', Transaction.date),
-        extract('month', Transaction.date)
-    ).order_by(
-        extract('year', Transaction.date),
-        extract('month', Transaction.date)
-    ).all()
-    
-    # Sonuçları sözlüğe dönüştür
+    # Aylık trend verisi (son 12 ay) - günlük özetlerden, ham işlemler taranmaz
     monthly_dict = {}
-    for r in monthly_results:
-        key = f"{int(r.month):02d}/{int(r.year)}"
-        monthly_dict[key] = {
-            'income': float(r.income or 0),
-            'expense': float(r.expense or 0)
+    for (row_year, row_month), totals in monthly_totals(company_id, date(year - 1, month, 1), end_date).items():
+        monthly_dict[f"{row_month:02d}/{row_year}"] = {
+            'income': float(totals['income_total']),
+            'expense': float(totals['expense_total'])
         }
     
     # Son 12 ay için eksik ayları 0 ile doldur
@@ -253,70 +220,21 @@ def top_products_report():
 @reports.route('/customer-debts')
 @company_required
 def customer_debts_report():
-    """Müşteri Borç Listesi Raporu - Optimized (N+1 sorunu çözüldü)"""
+    """Müşteri Borç Listesi Raporu - saklanan bakiye özetlerinden okunur"""
     company_id = get_company_id()
     
-    # Optimizasyon: Tek sorguda tüm müşteri borçlarını hesapla (N+1 sorunu çözüldü)
-    # Case when ile borç ve ödemeleri ayrı kolonlarda topla
+    # Borç/ödeme toplamları Customer üzerinde tutulduğu için defter taranmaz
     results = db.session.query(
         Customer.id,
         Customer.name,
         Customer.phone,
-        func.coalesce(
-            func.sum(
-                db.case(
-                    (CustomerTransaction.type == 'debt', CustomerTransaction.amount),
-                    else_=0
-                )
-            ), 0
-        ).label('total_debt'),
-        func.coalesce(
-            func.sum(
-                db.case(
-                    (CustomerTransaction.type == 'payment', CustomerTransaction.amount),
-                    else_=0
-                )
-            ), 0
-        ).label('total_paid')
-    ).outerjoin(
-        CustomerTransaction, Customer.id == CustomerTransaction.customer_id
+        Customer.total_debt,
+        Customer.total_payment.label('total_paid')
     ).filter(
-        Customer.company_id == company_id
-    ).group_by(
-        Customer.id, Customer.name, Customer.phone
-    ).having(
-        # Sadece borcu olan müşteriler (borç > ödeme)
-        func.coalesce(
-            func.sum(
-                db.case(
-                    (CustomerTransaction.type == 'debt', CustomerTransaction.amount),
-                    else_=0
-                )
-            ), 0
-        ) > func.coalesce(
-            func.sum(
-                db.case(
-                    (CustomerTransaction.type == 'payment', CustomerTransaction.amount),
-                    else_=0
-                )
-            ), 0
-        )
+        Customer.company_id == company_id,
+        Customer.balance > 0  # Sadece borcu olan müşteriler
     ).order_by(
-        (func.coalesce(
-            func.sum(
-                db.case(
-                    (CustomerTransaction.type == 'debt', CustomerTransaction.amount),
-                    else_=0
-                )
-            ), 0
-        ) - func.coalesce(
-            func.sum(
-                db.case(
-                    (CustomerTransaction.type == 'payment', CustomerTransaction.amount),
-                    else_=0
-                )
-            ), 0
-        )).desc()
+        Customer.balance.desc()
     ).all()
     
     # Sonuçları formatla
@@ -416,114 +334,365 @@ def stock_report():
 @reports.route('/export/<report_type>/<format>')
 @company_required
 def export_report(report_type, format):
-    """Raporları Excel veya PDF olarak dışa aktar"""
+    """Raporları Excel veya PDF olarak dışa aktar; ?async=1 ile iş kuyruğuna ekler (202 + iş id'si)"""
     company_id = get_company_id()
+    started = time.perf_counter()
+    
+    if request.args.get('async') == '1':
+        return _enqueue_export(report_type, format, company_id)
     
     if format == 'excel':
-        return export_excel(report_type, company_id)
+        return observe_export(export_excel(report_type, company_id), report_type, format, started)
     elif format == 'pdf':
-        return export_pdf(report_type, company_id)
+        return observe_export(export_pdf(report_type, company_id), report_type, format, started)
     else:
         return jsonify({'error': 'Geçersiz format'}), 400
 
 
-def export_excel(report_type, company_id):
-    """Excel formatında dışa aktar"""
+# Büyük şirketlerde export belleği sabit kalsın diye satırlar sunucu taraflı
+# imleçle (yield_per) okunur, workbook write-only modda geçici dosyaya yazılır
+# ve yanıt parça parça gönderilir.
+EXPORT_YIELD_PER = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_WIDTH_SAMPLE_ROWS = 500
+EXPORT_MAX_COLUMN_WIDTH = 50
+EXPORT_PROGRESS_ROWS = 1000
+
+
+def _report_source(report_type, company_id):
+    """Export edilecek rapor için (sayfa başlığı, kolon başlığı anahtarları, sorgu, satır dönüştürücü).
+
+    Sorgu ORM nesnesi yerine kolon tuple'ları döndürür; bilinmeyen rapor türünde None.
+    Satır dönüştürücü `t(anahtar)` çeviri fonksiyonunu da alır.
+    """
+    if report_type == 'profit_loss':
+        query = db.session.query(
+            Transaction.date, Transaction.type, Transaction.amount, Transaction.description
+        ).filter(
+            Transaction.company_id == company_id
+        ).order_by(Transaction.date.desc(), Transaction.id.desc())
+        return 'Kar Zarar', ['date', 'entry_type', 'amount', 'description'], query, lambda r, t: [
+            r.date, t('income') if r.type == 'income' else t('expense'), float(r.amount), r.description
+        ]
+
+    if report_type == 'stock':
+        query = db.session.query(
+            Product.name, Product.unit, Product.stock_quantity, Product.purchase_price
+        ).filter(
+            Product.company_id == company_id
+        ).order_by(Product.name, Product.id)
+        return 'Stok Raporu', ['product', 'unit', 'stock', 'purchase_price', 'stock_value'], query, lambda p, t: [
+            p.name, p.unit, float(p.stock_quantity or 0), float(p.purchase_price or 0),
+            float(p.stock_quantity or 0) * float(p.purchase_price or 0)
+        ]
+
+    if report_type == 'top_products':
+        query = db.session.query(
+            Product.name,
+            Product.unit,
+            func.sum(ReceiptItem.quantity).label('total_quantity'),
+            func.sum(ReceiptItem.total_price).label('total_revenue')
+        ).join(
+            ReceiptItem, Product.id == ReceiptItem.product_id
+        ).join(
+            Receipt, ReceiptItem.receipt_id == Receipt.id
+        ).filter(
+            Receipt.company_id == company_id
+        ).group_by(
+            Product.id, Product.name, Product.unit
+        ).order_by(
+            func.sum(ReceiptItem.quantity).desc()
+        ).limit(10)
+        return 'En Çok Satan Ürünler', ['product', 'unit', 'sales_quantity', 'total_revenue'], query, lambda r, t: [
+            r.name, r.unit, float(r.total_quantity or 0), float(r.total_revenue or 0)
+        ]
+
+    if report_type == 'customer_debts':
+        # Saklanan bakiyelerden - müşteri başına defter sorgusu yok
+        query = db.session.query(
+            Customer.name, Customer.phone, Customer.total_debt, Customer.total_payment, Customer.balance
+        ).filter(
+            Customer.company_id == company_id,
+            Customer.balance > 0
+        ).order_by(Customer.balance.desc(), Customer.id)
+        return 'Müşteri Borçları', ['customer', 'phone', 'total_debt', 'paid', 'remaining_debt'], query, lambda c, t: [
+            c.name, c.phone or '', float(c.total_debt), float(c.total_payment), float(c.balance)
+        ]
+
+    return None
+
+
+def _report_rows(report_type, company_id, progress=None, lang='tr'):
+    """Export edilecek rapor için (sayfa başlığı, kolon başlıkları, satır iteratörü) döndürür.
+
+    Kolon başlıkları ve hücre etiketleri `lang` diline çevrilir; satırlar
+    yield_per ile parça parça okunur; bilinmeyen rapor türünde None döner.
+    `progress(yazılan, toplam)` verilirse önce satır sayısı alınır ve her
+    EXPORT_PROGRESS_ROWS satırda bir çağrılır.
+    """
+    source = _report_source(report_type, company_id)
+    if source is None:
+        return None
+    title, header_keys, query, to_row = source
+    bundle = get_all_translations(lang)
+    headers = [bundle[key] for key in header_keys]
+    rows = (to_row(row, bundle.get) for row in query.yield_per(EXPORT_YIELD_PER))
+    if progress is not None:
+        rows = _with_progress(rows, query.order_by(None).count(), progress)
+    return title, headers, rows
+
+
+def _with_progress(rows, total, progress):
+    done = 0
+    progress(done, total)
+    for row in rows:
+        yield row
+        done += 1
+        if done % EXPORT_PROGRESS_ROWS == 0:
+            progress(done, total)
+    progress(done, total)
+
+
+def _estimate_column_widths(headers, sample_rows):
+    """Kolon genişliklerini başlık ve ilk satırlardan tahmin eder (tüm hücreler gezilmez)"""
+    widths = [len(str(header)) for header in headers]
+    for row in sample_rows:
+        for index, value in enumerate(row):
+            if value is not None:
+                widths[index] = max(widths[index], len(str(value)))
+    return [min(width + 2, EXPORT_MAX_COLUMN_WIDTH) for width in widths]
+
+
+def _stream_file(path, chunk_size=EXPORT_CHUNK_SIZE):
+    """Dosyayı parça parça okuyan yanıt üreteci"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _file_response(write, suffix, filename, mimetype):
+    """`write(path)` ile geçici dosyaya üretilen export'u parça parça gönderir"""
+    fd, path = tempfile.mkstemp(prefix='export_', suffix=suffix)
+    os.close(fd)
+    try:
+        write(path)
+    except Exception:
+        _remove_file(path)
+        raise
+
+    response = Response(
+        _stream_file(path),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'Content-Length': str(os.path.getsize(path))
+        }
+    )
+    # Yanıt kapanınca (istemci yarıda kesse bile) geçici dosyayı sil
+    response.call_on_close(lambda: _remove_file(path))
+    return response
+
+
+class ExportError(Exception):
+    """Export hazırlanamadı; istek içinde JSON hata yanıtına, iş kuyruğunda kalıcı hataya çevrilir"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def prepare_excel_export(report_type, company_id, progress=None):
+    """Excel export'u hazırlar: (write(path), dosya adı, mimetype). Workbook write-only modda yazılır."""
     try:
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, Alignment, PatternFill
-        
-        wb = Workbook()
-        ws = wb.active
-        
-        if report_type == 'profit_loss':
-            ws.title = "Kar Zarar"
-            ws.append(['Tarih', 'Tür', 'Tutar', 'Açıklama'])
-            transactions = Transaction.query.filter_by(company_id=company_id).order_by(Transaction.date.desc()).all()
-            for t in transactions:
-                ws.append([t.date, 'Gelir' if t.type == 'income' else 'Gider', float(t.amount), t.description])
-        
-        elif report_type == 'stock':
-            ws.title = "Stok Raporu"
-            ws.append(['Ürün', 'Birim', 'Stok', 'Alış Fiyatı', 'Stok Değeri'])
-            products = Product.query.filter_by(company_id=company_id).all()
-            for p in products:
-                stock_value = float(p.stock_quantity or 0) * float(p.purchase_price or 0)
-                ws.append([p.name, p.unit, float(p.stock_quantity or 0), float(p.purchase_price or 0), stock_value])
-        
-        elif report_type == 'top_products':
-            ws.title = "En Çok Satan Ürünler"
-            ws.append(['Ürün', 'Birim', 'Satış Miktarı', 'Toplam Gelir'])
-            results = db.session.query(
-                Product.name,
-                Product.unit,
-                func.sum(ReceiptItem.quantity).label('total_quantity'),
-                func.sum(ReceiptItem.total_price).label('total_revenue')
-            ).join(
-                ReceiptItem, Product.id == ReceiptItem.product_id
-            ).join(
-                Receipt, ReceiptItem.receipt_id == Receipt.id
-            ).filter(
-                Receipt.company_id == company_id
-            ).group_by(
-                Product.id, Product.name, Product.unit
-            ).order_by(
-                func.sum(ReceiptItem.quantity).desc()
-            ).limit(10).all()
-            for r in results:
-                ws.append([r.name, r.unit, float(r.total_quantity or 0), float(r.total_revenue or 0)])
-        
-        elif report_type == 'customer_debts':
-            ws.title = "Müşteri Borçları"
-            ws.append(['Müşteri', 'Telefon', 'Toplam Borç', 'Ödenen', 'Kalan Borç'])
-            customers = Customer.query.filter_by(company_id=company_id).all()
-            for customer in customers:
-                debts = db.session.query(func.sum(CustomerTransaction.amount)).filter(
-                    CustomerTransaction.customer_id == customer.id,
-                    CustomerTransaction.type == 'debt'
-                ).scalar() or 0
-                payments = db.session.query(func.sum(CustomerTransaction.amount)).filter(
-                    CustomerTransaction.customer_id == customer.id,
-                    CustomerTransaction.type == 'payment'
-                ).scalar() or 0
-                balance = float(debts) - float(payments)
-                if balance > 0:
-                    ws.append([customer.name, customer.phone or '', float(debts), float(payments), balance])
-        
-        # Sütun genişlikleri
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Başlık stili
-        for cell in ws[1]:
-            cell.font = Font(bold=True, color='FFFFFF')
-            cell.fill = PatternFill(start_color='667eea', end_color='667eea', fill_type='solid')
-            cell.alignment = Alignment(horizontal='center')
-        
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        filename = f"{report_type}_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        return Response(
-            output.getvalue(),
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
-    
+        from openpyxl.utils import get_column_letter
     except ImportError:
-        return jsonify({'error': 'openpyxl kütüphanesi kurulu değil'}), 500
+        raise ExportError('openpyxl kütüphanesi kurulu değil', 500)
+
+    report = _report_rows(report_type, company_id, progress)
+    if report is None:
+        raise ExportError('Geçersiz rapor türü')
+    title, headers, rows = report
+
+    def write(path):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title)
+
+        # Write-only modda genişlikler ilk satırdan önce ayarlanmalı - örneklemden tahmin edilir
+        sample = list(islice(rows, EXPORT_WIDTH_SAMPLE_ROWS))
+        for index, width in enumerate(_estimate_column_widths(headers, sample), start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+
+        # Başlık stili
+        header_font = Font(bold=True, color='FFFFFF')
+        header_fill = PatternFill(start_color='667eea', end_color='667eea', fill_type='solid')
+        header_alignment = Alignment(horizontal='center')
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        for row in chain(sample, rows):
+            ws.append(row)
+        wb.save(path)
+
+    filename = f"{report_type}_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return write, filename, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def prepare_pdf_export(report_type, company_id, lang, progress=None):
+    """PDF export'u hazırlar: (write(path), dosya adı, mimetype). Sayfalar üretildikçe dosyaya yazılır."""
+    from pdf_writer import find_font_path, render_table
+
+    font_path = find_font_path(current_app.config.get('PDF_FONT_PATH'))
+    if font_path is None:
+        raise ExportError('PDF için yazı tipi bulunamadı (PDF_FONT_PATH)', 500)
+
+    report = _report_rows(report_type, company_id, progress, lang)
+    if report is None:
+        raise ExportError('Geçersiz rapor türü')
+    _, headers, rows = report
+
+    title = get_translation(f'{report_type}_report', lang)
+    company = db.session.get(Company, company_id) if company_id else None
+    subtitle = ' - '.join(filter(None, [company.name if company else None, datetime.now().strftime('%d.%m.%Y %H:%M')]))
+
+    def write(path):
+        with open(path, 'wb') as f:
+            render_table(
+                f, font_path, title, headers, rows,
+                subtitle=subtitle, rtl=lang == 'ar', arabic_digits=lang == 'ar'
+            )
+
+    filename = f"{report_type}_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return write, filename, 'application/pdf'
+
+
+def export_excel(report_type, company_id):
+    """Excel formatında dışa aktar (write-only workbook, parça parça yanıt)"""
+    try:
+        write, filename, mimetype = prepare_excel_export(report_type, company_id)
+    except ExportError as e:
+        return jsonify({'error': e.message}), e.status
+    return _file_response(write, '.xlsx', filename, mimetype)
 
 
 def export_pdf(report_type, company_id):
-    """PDF formatında dışa aktar"""
-    return jsonify({'message': 'PDF export yakında eklenecek'}), 200
+    """PDF formatında dışa aktar (sayfalar üretildikçe dosyaya yazılır, parça parça yanıt)"""
+    try:
+        write, filename, mimetype = prepare_pdf_export(report_type, company_id, session.get('lang', 'tr'))
+    except ExportError as e:
+        return jsonify({'error': e.message}), e.status
+    return _file_response(write, '.pdf', filename, mimetype)
+
+
+# =============================================================================
+# ARKA PLAN EXPORT (İŞ KUYRUĞU)
+# =============================================================================
+EXPORT_REPORT_TYPES = ('profit_loss', 'stock', 'top_products', 'customer_debts')
+EXPORT_SUFFIXES = {'excel': '.xlsx', 'pdf': '.pdf'}
+
+
+def _enqueue_export(report_type, format, company_id):
+    """Export'u kuyruğa ekler; 202 ve iş durum adresi döner"""
+    if format not in EXPORT_SUFFIXES:
+        return jsonify({'error': 'Geçersiz format'}), 400
+    if report_type not in EXPORT_REPORT_TYPES:
+        return jsonify({'error': 'Geçersiz rapor türü'}), 400
+    if not company_id:
+        return jsonify({'error': 'Lütfen önce bir işletme seçin.'}), 400
+    try:
+        job = enqueue('report_export', {
+            'report_type': report_type, 'format': format, 'lang': session.get('lang', 'tr')
+        }, company_id=company_id, user_id=current_user.id, limit=current_app.config.get('JOB_TENANT_QUEUE_LIMIT', 10))
+    except QueueLimitReached:
+        return jsonify({'error': 'Bekleyen export sayısı sınıra ulaştı, lütfen mevcut işlerin bitmesini bekleyin'}), 429
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('reports.export_job_status', job_id=job.id)
+    }), 202
+
+
+def _company_job(job_id):
+    """Mevcut şirkete ait export işi; başka şirketinki veya yoksa None"""
+    return Job.query.filter_by(id=job_id, company_id=get_company_id(), kind='report_export').first()
+
+
+@reports.route('/jobs/<int:job_id>')
+@company_required
+def export_job_status(job_id):
+    """Arka plan export işinin durumu ve ilerlemesi"""
+    job = _company_job(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    data = job.to_dict()
+    data['download_url'] = url_for('reports.download_export', job_id=job.id) if job.status == 'succeeded' else None
+    return jsonify(data)
+
+
+@reports.route('/jobs/<int:job_id>/download')
+@company_required
+def download_export(job_id):
+    """Tamamlanan arka plan export'unun dosyası"""
+    job = _company_job(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    if job.status != 'succeeded':
+        return jsonify({'error': 'Export henüz tamamlanmadı', 'status': job.status}), 409
+    path = output_file(job)
+    if path is None or not os.path.exists(path):
+        return jsonify({'error': 'Export dosyasının süresi doldu'}), 410
+    result = json.loads(job.result)
+    return send_file(path, mimetype=result['mimetype'], as_attachment=True, download_name=result['filename'])
+
+
+@job_handler('report_export')
+def run_export_job(ctx):
+    """Kuyruktaki export'u çıktı dizinine yazar"""
+    report_type, format = ctx.payload['report_type'], ctx.payload['format']
+
+    def progress(done, total):
+        ctx.progress(done * 99 // total if total else 99, f'{done}/{total} satır')
+
+    try:
+        if format == 'excel':
+            write, filename, mimetype = prepare_excel_export(report_type, ctx.company_id, progress)
+        elif format == 'pdf':
+            write, filename, mimetype = prepare_pdf_export(
+                report_type, ctx.company_id, ctx.payload.get('lang', 'tr'), progress
+            )
+        else:
+            raise PermanentJobError('Geçersiz format')
+    except ExportError as e:
+        raise PermanentJobError(e.message)
+
+    path = ctx.output_path(EXPORT_SUFFIXES[format])
+    started = time.perf_counter()
+    try:
+        write(path)
+    except Exception:
+        _remove_file(path)
+        raise
+    EXPORT_DURATION.labels(report_type, format).observe(time.perf_counter() - started)
+    return {
+        'file': os.path.basename(path), 'filename': filename, 'mimetype': mimetype,
+        'size': os.path.getsize(path)
+    }
@@ -0,0 +1,172 @@
+"""
+İstek süresi ve SQL sorgu sayısı ölçümü.
+
+Her istek için şunlar toplanır:
+- toplam süre (before_request -> after_request)
+- veritabanı süresi ve SQL ifade sayısı (before/after_cursor_execute)
+- sürücünün bildirdiği satır sayısı (cursor.rowcount; SQLite SELECT için bildirmez)
+- ORM ile yüklenen nesne sayısı (N+1 döngülerini gösterir)
+
+Endpoint başına son REQUEST_METRICS_WINDOW isteğin örnekleri süreç içinde tutulur
+(yüzdelikler bu pencereden hesaplanır) ve toplam sayaçlar güncellenir. Production
+dışında yanıtlara Server-Timing başlığı eklenir; REQUEST_QUERY_WARN'dan fazla sorgu
+çalıştıran veya REQUEST_SLOW_MS'den uzun süren istekler uyarı olarak loglanır.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class _RequestTiming:
+    """Tek bir isteğin ölçümleri (g.request_timing)"""
+
+    __slots__ = ('started', 'db_time', 'queries', 'rows', 'loads')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.loads = 0
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class EndpointStats:
+    """Endpoint başına kayan pencere örnekleri ve toplam sayaçlar"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        # Her istekten sonra (request, response, süre, ölçüm) ile çağrılır (ör. Prometheus)
+        self.observers = []
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, duration, db_time, queries, rows, loads):
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    'count': 0, 'duration_total': 0.0, 'db_total': 0.0, 'queries_total': 0,
+                    'queries_max': 0, 'samples': deque(maxlen=self.window),
+                }
+            entry['count'] += 1
+            entry['duration_total'] += duration
+            entry['db_total'] += db_time
+            entry['queries_total'] += queries
+            entry['queries_max'] = max(entry['queries_max'], queries)
+            entry['samples'].append((duration, db_time, queries, rows, loads))
+
+    def snapshot(self):
+        """Endpoint başına özet (süreler ms); en yavaş p95 önce"""
+        with self._lock:
+            entries = {endpoint: (dict(entry), list(entry['samples'])) for endpoint, entry in self._endpoints.items()}
+        result = {}
+        for endpoint, (entry, samples) in entries.items():
+            durations = sorted(sample[0] for sample in samples)
+            queries = sorted(sample[2] for sample in samples)
+            result[endpoint] = {
+                'count': entry['count'],
+                'window': len(samples),
+                'p50_ms': round(_percentile(durations, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(durations, 0.95) * 1000, 2),
+                'p99_ms': round(_percentile(durations, 0.99) * 1000, 2),
+                'max_ms': round(durations[-1] * 1000, 2),
+                'avg_db_ms': round(sum(sample[1] for sample in samples) / len(samples) * 1000, 2),
+                'avg_queries': round(sum(queries) / len(queries), 2),
+                'p95_queries': _percentile(queries, 0.95),
+                'max_queries': entry['queries_max'],
+                'avg_rows': round(sum(sample[3] for sample in samples) / len(samples), 2),
+                'avg_loads': round(sum(sample[4] for sample in samples) / len(samples), 2),
+            }
+        return dict(sorted(result.items(), key=lambda item: item[1]['p95_ms'], reverse=True))
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _current_timing():
+    if not has_request_context():
+        return None
+    return g.get('request_timing')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timing() is not None:
+        conn.info.setdefault('request_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current_timing()
+    if timing is None:
+        return
+    starts = conn.info.get('request_query_start')
+    if starts:
+        timing.db_time += time.perf_counter() - starts.pop()
+    timing.queries += 1
+    if cursor.rowcount and cursor.rowcount > 0:
+        timing.rows += cursor.rowcount
+
+
+def _on_load(target, context):
+    timing = _current_timing()
+    if timing is not None:
+        timing.loads += 1
+
+
+def _start_timing():
+    g.request_timing = _RequestTiming()
+
+
+def _finish_timing(response):
+    timing = g.pop('request_timing', None)
+    if timing is None:
+        return response
+    duration = time.perf_counter() - timing.started
+    endpoint = request.endpoint or 'unmatched'
+    stats = current_app.extensions['request_metrics']
+    stats.record(endpoint, duration, timing.db_time, timing.queries, timing.rows, timing.loads)
+    for observer in stats.observers:
+        observer(request, response, duration, timing)
+
+    config = current_app.config
+    if timing.queries > config.get('REQUEST_QUERY_WARN', 50) or duration * 1000 > config.get('REQUEST_SLOW_MS', 1000):
+        logger.warning(
+            '%s %s (%s): %.0f ms, %s sorgu, db %.0f ms, %s nesne',
+            request.method, request.path, endpoint, duration * 1000, timing.queries,
+            timing.db_time * 1000, timing.loads
+        )
+
+    if config.get('SERVER_TIMING_HEADER'):
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={timing.db_time * 1000:.1f};desc="{timing.queries} queries", '
+            f'rows;desc="{timing.rows} rows, {timing.loads} objects"'
+        )
+    return response
+
+
+def init_request_metrics(app):
+    """İstek ölçümünü uygulamaya bağlar (app.extensions['request_metrics'])"""
+    from models import db
+
+    app.extensions['request_metrics'] = EndpointStats(app.config.get('REQUEST_METRICS_WINDOW', 1000))
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    if not event.contains(db.Model, 'load', _on_load):
+        event.listen(db.Model, 'load', _on_load, propagate=True)
+    app.before_request(_start_timing)
+    app.after_request(_finish_timing)
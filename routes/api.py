@@ -1,11 +1,15 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, session
 from flask_login import login_required, current_user
-from models import db, Transaction, Customer, CustomerTransaction, Product, Receipt, ReceiptItem, Supplier, SupplierTransaction
+from models import db, Transaction, Customer, CustomerTransaction, Product, Receipt, ReceiptItem, ReceiptSequence, Supplier, SupplierTransaction
 from datetime import datetime, date
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 from functools import wraps
+import os
 from translations import get_translation
+from services import dashboard_service
+from services.pagination import keyset_page, InvalidCursor, DEFAULT_LIMIT
 
 api_bp = Blueprint('api', __name__)
 
@@ -83,6 +87,43 @@ def scoped_receipts_query():
     return Receipt.query.filter_by(company_id=current_user.company_id)
 
 
+def cursor_page_response(query, columns, descending=False, serialize=None):
+    """?cursor= verildiğinde keyset sayfalama yanıtı (OFFSET ve COUNT yok).
+    
+    İlk sayfa için boş cursor gönderilir; sonraki sayfalar yanıttaki next_cursor ile alınır.
+    ?count=approx (tahmini) veya ?count=exact ile toplam sayı da istenebilir.
+    """
+    count = request.args.get('count')
+    if count not in (None, 'approx', 'exact'):
+        return jsonify({'error': f'Geçersiz count: {count}'}), 400
+    try:
+        page = keyset_page(
+            query, columns, descending,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+            count=count
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    serialize = serialize or (lambda item: item.to_dict())
+    page['items'] = [serialize(item) for item in page['items']]
+    return jsonify(page)
+
+
+def decimal_arg(name):
+    """Sorgu parametresini Decimal olarak okur (float yuvarlaması olmadan); yoksa None, geçersizse ValueError"""
+    value = request.args.get(name, '')
+    if not value:
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    if number is None or not number.is_finite():
+        raise ValueError(f'Geçersiz {name}: {value}')
+    return number
+
+
 def admin_required_api(f):
     """API için sadece admin kullanıcıları decorator'ü"""
     @wraps(f)
@@ -98,6 +139,9 @@ def admin_required_api(f):
 @login_required
 def get_transactions():
     """Tüm gelir/gider işlemlerini getir - Paginated"""
+    if 'cursor' in request.args:
+        return cursor_page_response(scoped_transactions_query(), (Transaction.date, Transaction.id), descending=True)
+    
     # Pagination parametreleri
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
@@ -105,8 +149,9 @@ def get_transactions():
     # Limit kontrolü (max 100)
     per_page = min(per_page, 100)
     
+    # Sıralama cursor moduyla aynı: (date, id) - sayfalar arası geçişte sıra değişmez
     pagination = scoped_transactions_query().order_by(
-        Transaction.date.desc(), Transaction.created_at.desc()
+        Transaction.date.desc(), Transaction.id.desc()
     ).paginate(page=page, per_page=per_page, error_out=False)
     
     result = {
@@ -192,6 +237,9 @@ def update_transaction(transaction_id):
 def get_customers():
     """Tüm müşterileri getir - Paginated"""
     try:
+        if 'cursor' in request.args:
+            return cursor_page_response(scoped_customers_query(), (Customer.name, Customer.id))
+        
         # Pagination parametreleri
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
@@ -292,6 +340,12 @@ def get_customer_transactions(customer_id):
     """Müşteri işlemlerini getir - Paginated"""
     customer = scoped_customers_query().filter_by(id=customer_id).first_or_404()
     
+    if 'cursor' in request.args:
+        return cursor_page_response(
+            CustomerTransaction.query.filter_by(customer_id=customer_id),
+            (CustomerTransaction.date, CustomerTransaction.id), descending=True
+        )
+    
     # Pagination parametreleri
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
@@ -390,9 +444,33 @@ def get_suppliers():
         # Limit kontrolü (max 100)
         per_page = min(per_page, 100)
         
-        pagination = scoped_suppliers_query().order_by(Supplier.name).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        query = scoped_suppliers_query()
+        
+        # Bakiye filtreleri - saklanan balance kolonu üzerinden SQL'de uygulanır
+        try:
+            min_balance = decimal_arg('min_balance')
+            max_balance = decimal_arg('max_balance')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if min_balance is not None:
+            query = query.filter(Supplier.balance >= min_balance)
+        if max_balance is not None:
+            query = query.filter(Supplier.balance <= max_balance)
+        
+        # Sıralama: ?sort=name, -name, balance, -balance (id ile kararlı sıra)
+        sort = request.args.get('sort', 'name')
+        sort_columns = {'name': Supplier.name, 'balance': Supplier.balance}
+        sort_column = sort_columns.get(sort.lstrip('-'))
+        if sort_column is None:
+            return jsonify({'error': f'Geçersiz sıralama: {sort}'}), 400
+        if 'cursor' in request.args:
+            return cursor_page_response(query, (sort_column, Supplier.id), descending=sort.startswith('-'))
+        if sort.startswith('-'):
+            query = query.order_by(sort_column.desc(), Supplier.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Supplier.id.asc())
+        
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
         result = {
             'items': [s.to_dict() for s in pagination.items],
@@ -479,6 +557,12 @@ def get_supplier_transactions(supplier_id):
     """Tedarikçinin tüm işlemlerini getir - Paginated"""
     supplier = scoped_suppliers_query().filter_by(id=supplier_id).first_or_404()
     
+    if 'cursor' in request.args:
+        return cursor_page_response(
+            SupplierTransaction.query.filter_by(supplier_id=supplier_id),
+            (SupplierTransaction.date, SupplierTransaction.id), descending=True
+        )
+    
     # Pagination parametreleri
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
@@ -546,6 +630,9 @@ def delete_supplier_transaction(transaction_id):
 @login_required
 def get_products():
     """Tüm ürünleri getir - Paginated"""
+    if 'cursor' in request.args:
+        return cursor_page_response(scoped_products_query(), (Product.name, Product.id))
+    
     # Pagination parametreleri
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
@@ -629,9 +716,59 @@ def delete_product(product_id):
 @api_bp.route('/receipts', methods=['GET'])
 @login_required
 def get_receipts():
-    """Tüm fişleri getir"""
-    receipts = scoped_receipts_query().order_by(Receipt.date.desc(), Receipt.created_at.desc()).all()
-    return jsonify([r.to_dict() for r in receipts])
+    """Fişleri getir - Paginated
+    
+    Filtreler: ?start_date=YYYY-MM-DD, ?end_date=YYYY-MM-DD, ?customer_id=
+    (ix_receipts_company_date / ix_receipts_company_customer_date indeksleri).
+    Fiş kalemleri yalnızca ?include=items ile döner.
+    """
+    include_items = 'items' in request.args.get('include', '').split(',')
+    
+    # Müşteri tek JOIN ile, kalemler ve ürünleri sayfa başına tek IN sorgusu ile yüklenir
+    options = [joinedload(Receipt.customer)]
+    if include_items:
+        options.append(selectinload(Receipt.items).joinedload(ReceiptItem.product))
+    query = scoped_receipts_query().options(*options)
+    
+    try:
+        start_date = request.args.get('start_date')
+        if start_date:
+            query = query.filter(Receipt.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
+        end_date = request.args.get('end_date')
+        if end_date:
+            query = query.filter(Receipt.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+    except ValueError:
+        return jsonify({'error': 'Geçersiz tarih formatı (YYYY-MM-DD)'}), 400
+    customer_id = request.args.get('customer_id', type=int)
+    if customer_id is not None:
+        query = query.filter(Receipt.customer_id == customer_id)
+    
+    if 'cursor' in request.args:
+        return cursor_page_response(query, (Receipt.date, Receipt.id), descending=True,
+                                    serialize=lambda r: r.to_dict(include_items=include_items))
+    
+    # Pagination parametreleri
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    # Limit kontrolü (max 100)
+    per_page = min(per_page, 100)
+    
+    # Sıralama cursor moduyla aynı: (date, id) - sayfalar arası geçişte sıra değişmez
+    pagination = query.order_by(
+        Receipt.date.desc(), Receipt.id.desc()
+    ).paginate(page=page, per_page=per_page, error_out=False)
+    
+    result = {
+        'items': [r.to_dict(include_items=include_items) for r in pagination.items],
+        'total': pagination.total,
+        'pages': pagination.pages,
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': pagination.has_next,
+        'has_prev': pagination.has_prev
+    }
+    return jsonify(result)
 
 @api_bp.route('/receipts', methods=['POST'])
 @login_required
@@ -640,13 +777,14 @@ def create_receipt():
     """Yeni fiş oluştur - Sadece admin"""
     data = request.get_json()
     
+    # Fiş numarası şirket sayacından verilir - şirketi olmayan kullanıcı fiş kesemez
+    company_id = get_current_company_id()
+    if not company_id:
+        return jsonify({'error': 'Bu işlem için şirket yetkisi gerekiyor.'}), 403
+    
     try:
-        # Fiş numarası oluştur
-        last_receipt = scoped_receipts_query().order_by(Receipt.id.desc()).first()
-        if last_receipt:
-            receipt_no = f"F{int(last_receipt.receipt_no[1:]) + 1:03d}"
-        else:
-            receipt_no = "F001"
+        # Fiş numarası: şirket sayacından atomik olarak ayrılır (transaction'ın ilk yazımı)
+        receipt_no = ReceiptSequence.next_receipt_no(company_id)
         
         # KDV hesapla
         total_amount = Decimal(str(data['total_amount']))
@@ -656,7 +794,7 @@ def create_receipt():
         
         # Fişi oluştur
         receipt = Receipt(
-            company_id=get_current_company_id(),
+            company_id=company_id,
             customer_id=data['customer_id'],
             receipt_no=receipt_no,
             total_amount=total_amount,
@@ -720,40 +858,51 @@ def delete_receipt(receipt_id):
 @api_bp.route('/stats/dashboard')
 @login_required
 def get_dashboard_stats():
-    """Dashboard istatistikleri"""
-    company_id = get_current_company_id()
-    # Gelir/Gider
-    total_income = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'income'
-    ).scalar() or 0
-    total_expense = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'expense'
-    ).scalar() or 0
-    cash_balance = total_income - total_expense
-    
-    # Müşteri borçları
-    total_customer_debt = sum(customer.get_balance() for customer in scoped_customers_query().all())
-    
-    # Bugünkü işlemler
-    today = date.today()
-    today_income = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'income',
-        Transaction.date == today
-    ).scalar() or 0
-    today_expense = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'expense',
-        Transaction.date == today
-    ).scalar() or 0
+    """Dashboard istatistikleri (tenant önbelleğinden)"""
+    stats = dashboard_service.get_dashboard_stats(get_current_company_id())
     
     return jsonify({
-        'cash_balance': float(cash_balance),
-        'total_income': float(total_income),
-        'total_expense': float(total_expense),
-        'total_customer_debt': float(total_customer_debt),
-        'today_income': float(today_income),
-        'today_expense': float(today_expense)
+        'cash_balance': float(stats['cash_balance']),
+        'total_income': float(stats['total_income']),
+        'total_expense': float(stats['total_expense']),
+        'total_customer_debt': float(stats['total_customer_debt']),
+        'today_income': float(stats['today_income']),
+        'today_expense': float(stats['today_expense'])
+    })
+
+@api_bp.route('/stats/cache')
+@login_required
+def get_cache_stats():
+    """Dashboard önbelleği isabet/ıskalama sayaçları - Sadece platform admin"""
+    if not current_user.is_platform_admin:
+        return jsonify({'error': get_translation('admin_required', session.get('lang', 'tr'))}), 403
+    return jsonify({'dashboard': dashboard_service.get_cache_counters()})
+
+@api_bp.route('/stats/pool')
+@login_required
+def get_pool_stats():
+    """Bu worker'ın veritabanı havuzu metrikleri - Sadece platform admin"""
+    if not current_user.is_platform_admin:
+        return jsonify({'error': get_translation('admin_required', session.get('lang', 'tr'))}), 403
+    return jsonify({'pid': os.getpid(), 'pool': current_app.extensions['pool_metrics'].snapshot()})
+
+@api_bp.route('/stats/requests')
+@login_required
+def get_request_stats():
+    """Bu worker'ın endpoint başına süre ve sorgu sayısı özetleri - Sadece platform admin"""
+    if not current_user.is_platform_admin:
+        return jsonify({'error': get_translation('admin_required', session.get('lang', 'tr'))}), 403
+    return jsonify({'pid': os.getpid(), 'endpoints': current_app.extensions['request_metrics'].snapshot()})
+
+@api_bp.route('/stats/slow-queries')
+@login_required
+def get_slow_query_stats():
+    """Bu worker'ın yavaş sorgu parmak izleri ve yakalanan planlar - Sadece platform admin"""
+    if not current_user.is_platform_admin:
+        return jsonify({'error': get_translation('admin_required', session.get('lang', 'tr'))}), 403
+    slow_queries = current_app.extensions['slow_queries']
+    return jsonify({
+        'pid': os.getpid(),
+        'threshold_ms': round(slow_queries.threshold * 1000, 2),
+        'fingerprints': slow_queries.snapshot()
     })
@@ -1,12 +1,14 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from flask_login import login_required, current_user
-from models import db, Transaction, Customer, CustomerTransaction, Product, Receipt, ReceiptItem, Supplier, SupplierTransaction
+from models import Transaction, Customer, CustomerTransaction, Product, Receipt, ReceiptItem, ReceiptSequence, Supplier, SupplierTransaction
 from datetime import datetime, date
 from decimal import Decimal
 from config import is_production, is_demo
 from functools import wraps
 from translations import get_translation
 from auth import password_change_required
+from services.dashboard_service import get_dashboard_stats
+from services.summary_service import summary_totals
 
 main_bp = Blueprint('main', __name__)
 
@@ -112,19 +114,8 @@ def index():
     """Ana sayfa - Kasa durumu"""
     company_id = get_current_company_id()
 
-    # Gelir/Gider toplamları
-    total_income = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'income'
-    ).scalar() or 0
-    total_expense = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'expense'
-    ).scalar() or 0
-    cash_balance = total_income - total_expense
-    
-    # Müşteri borç toplamı
-    total_customer_debt = sum(customer.get_balance() for customer in scoped_customers_query().all())
+    # Gelir/Gider toplamları, müşteri borcu ve son fişler (tenant önbelleğinden)
+    stats = get_dashboard_stats(company_id)
     
     # Bugünkü işlemler
     today = date.today()
@@ -132,16 +123,13 @@ def index():
         Transaction.date == today
     ).order_by(Transaction.created_at.desc()).limit(5).all()
     
-    # Son fişler
-    recent_receipts = scoped_receipts_query().order_by(Receipt.created_at.desc()).limit(5).all()
-    
     return render_template('index.html', 
-                         cash_balance=cash_balance,
-                         total_income=total_income,
-                         total_expense=total_expense,
-                         total_debt=total_customer_debt,
+                         cash_balance=stats['cash_balance'],
+                         total_income=stats['total_income'],
+                         total_expense=stats['total_expense'],
+                         total_debt=stats['total_customer_debt'],
                          today_transactions=today_transactions,
-                         recent_receipts=recent_receipts,
+                         recent_receipts=stats['recent_receipts'],
                          today_date=today)
 
 @main_bp.route('/transactions')
@@ -154,15 +142,10 @@ def transactions():
     transactions = scoped_transactions_query().order_by(Transaction.date.desc(), Transaction.created_at.desc()).paginate(
         page=page, per_page=20, error_out=False)
     
-    # Gelir/Gider toplamları
-    total_income = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'income'
-    ).scalar() or 0
-    total_expense = db.session.query(db.func.sum(Transaction.amount)).filter(
-        Transaction.company_id == company_id,
-        Transaction.type == 'expense'
-    ).scalar() or 0
+    # Gelir/Gider toplamları (günlük özet tablosundan)
+    totals = summary_totals(company_id)
+    total_income = totals['income_total']
+    total_expense = totals['expense_total']
     
     return render_template('transactions.html', 
                          transactions=transactions,
@@ -177,7 +160,7 @@ def customers():
     customers = scoped_customers_query().order_by(Customer.name).all()
     
     # Toplam borç hesapla
-    total_debt = sum(customer.get_balance() for customer in customers if customer.get_balance() > 0)
+    total_debt = sum(customer.balance for customer in customers if customer.balance > 0)
     
     return render_template('customers.html', customers=customers, total_debt=total_debt)
 
@@ -200,7 +183,7 @@ def suppliers():
     suppliers = scoped_suppliers_query().order_by(Supplier.name).all()
     
     # Toplam borç hesapla
-    total_debt = sum(supplier.get_balance() for supplier in suppliers if supplier.get_balance() > 0)
+    total_debt = sum(supplier.balance for supplier in suppliers if supplier.balance > 0)
     
     return render_template('suppliers.html', suppliers=suppliers, total_debt=total_debt)
 
@@ -231,12 +214,9 @@ def receipt():
     customers = scoped_customers_query().order_by(Customer.name).all()
     products = scoped_products_query().order_by(Product.name).all()
     
-    # Fiş numarası oluştur
-    last_receipt = scoped_receipts_query().order_by(Receipt.id.desc()).first()
-    if last_receipt:
-        receipt_no = f"F{int(last_receipt.receipt_no[1:]) + 1:03d}"
-    else:
-        receipt_no = "F001"
+    # Fiş numarası önizlemesi - kesin numara kayıt sırasında şirket sayacından ayrılır
+    company_id = get_current_company_id()
+    receipt_no = ReceiptSequence.peek_receipt_no(company_id) if company_id else ReceiptSequence.format_receipt_no(1)
     
     # Customer_id parametresi varsa seçili müşteri olarak ayarla
     selected_customer_id = request.args.get('customer_id', type=int)
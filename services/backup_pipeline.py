@@ -0,0 +1,542 @@
+"""
+Akış halinde yedekleme hattı.
+
+    kaynak (pg_dump stdout / SQLite iterdump) → sıkıştırma (zstd, kurulu değilse gzip)
+    → AES-256-GCM şifreleme → SHA-256 → parça parça yükleme
+
+Hiçbir aşamada tam boyutlu ara dosya yazılmaz; bellekte en fazla bir yükleme
+parçası tutulur. Bir parça yüklenemezse yükleyiciye o ana kadar kaç baytın
+kaydedildiği sorulur ve kalan kısımdan üstel beklemeyle devam edilir
+(resumable upload). Sonunda boyut, SHA-256 ve süreleri içeren bir manifest
+yazılır; geri yükleme manifestle doğrulanır.
+
+Şifreli dosya biçimi (dosyanın tamamını belleğe almadan doğrulanabilsin diye
+segmentlere bölünmüş GCM):
+    'MBK1' + 8 bayt rastgele nonce öneki
+    segmentler: 4 bayt uzunluk (big-endian) + 1 bayt son segment işareti
+                + şifreli veri + 16 bayt etiket
+Segment nonce'u önek + 4 baytlık sayaçtır. Ek doğrulama verisi (AAD) başlık,
+sayaç ve son segment işaretini içerir: segmentlerin sırası değiştirilemez,
+dosya sessizce kesilemez.
+
+Yükleyiciler:
+- LocalUploader: yerel dizin (çevrimdışı kurulumlar ve testler)
+- GoogleDriveUploader: Drive resumable upload API'si
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import struct
+import subprocess
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # gzip'e düşülür
+    zstandard = None
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = None
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1024 * 1024
+SEGMENT_SIZE = 1024 * 1024
+# Drive resumable upload parçaları 256 KiB'ın katı olmalı (son parça hariç)
+UPLOAD_CHUNK_ALIGNMENT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+MAGIC = b'MBK1'
+NONCE_PREFIX_SIZE = 8
+# Segment başlığı: şifreli veri uzunluğu (etiket dahil) ve son segment işareti
+SEGMENT_HEADER = '>I?'
+ENCRYPTION = 'aes-256-gcm-segmented'
+MANIFEST_SUFFIX = '.manifest.json'
+
+
+class UploadCompleted(Exception):
+    """Yükleme oturumu zaten tamamlanmış (committed sorgusu); remote_id yüklenen dosyanın kimliği"""
+
+    def __init__(self, remote_id):
+        super().__init__(remote_id)
+        self.remote_id = remote_id
+
+
+class BackupError(Exception):
+    """Yedekleme hattı hatası (kaynak, yükleme veya doğrulama)"""
+
+
+class _CommittedOutOfRange(BackupError):
+    """Yükleyicinin bildirdiği kayıtlı bayt gönderilen parçayla uyuşmuyor (yeniden denenmez)"""
+
+
+# =============================================================================
+# KAYNAKLAR
+# =============================================================================
+def process_source(command, env=None, read_size=READ_SIZE):
+    """Komutun stdout'unu parça parça verir; komut hata kodu dönerse BackupError.
+
+    stderr geçici dosyaya yazılır (dolan pipe komutu kilitlemesin). Tüketici
+    yarıda bırakırsa süreç sonlandırılır.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, env=env)
+        try:
+            while True:
+                chunk = process.stdout.read(read_size)
+                if not chunk:
+                    break
+                yield chunk
+            returncode = process.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                message = stderr.read()[-2000:].decode(errors='replace').strip()
+                raise BackupError(f'{command[0]} {returncode} koduyla çıktı: {message}')
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+
+def sqlite_source(path, read_size=READ_SIZE):
+    """SQLite veritabanının SQL dökümünü (iterdump) tek bir okuma transaction'ı içinde parça parça verir"""
+    if not os.path.exists(path):
+        raise BackupError(f'Veritabanı bulunamadı: {path}')
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        # Döküm boyunca aynı anlık görüntü okunsun
+        connection.execute('BEGIN')
+        buffer, size = [], 0
+        for line in connection.iterdump():
+            encoded = (line + '\n').encode()
+            buffer.append(encoded)
+            size += len(encoded)
+            if size >= read_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b''.join(buffer)
+    finally:
+        connection.close()
+
+
+# =============================================================================
+# SIKIŞTIRMA
+# =============================================================================
+def default_compression():
+    return 'zstd' if zstandard is not None else 'gzip'
+
+
+def compress_stream(chunks, method, level=None):
+    if method == 'zstd':
+        if zstandard is None:
+            raise BackupError('zstd için zstandard paketi kurulu değil')
+        compressor = zstandard.ZstdCompressor(level=level or 3).compressobj()
+    elif method == 'gzip':
+        compressor = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+    else:
+        raise BackupError(f'Bilinmeyen sıkıştırma: {method}')
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def decompress_stream(chunks, method):
+    if method == 'zstd':
+        if zstandard is None:
+            raise BackupError('zstd için zstandard paketi kurulu değil')
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    elif method == 'gzip':
+        decompressor = zlib.decompressobj(31)
+    else:
+        raise BackupError(f'Bilinmeyen sıkıştırma: {method}')
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    data = decompressor.flush()
+    if data:
+        yield data
+
+
+# =============================================================================
+# ŞİFRELEME
+# =============================================================================
+def load_key(encoded):
+    """BACKUP_ENCRYPTION_KEY (base64, 32 bayt) → anahtar; boşsa None"""
+    if not encoded:
+        return None
+    try:
+        key = base64.b64decode(encoded, validate=True)
+    except ValueError:
+        raise BackupError('BACKUP_ENCRYPTION_KEY base64 olmalı (openssl rand -base64 32)')
+    if len(key) != 32:
+        raise BackupError('BACKUP_ENCRYPTION_KEY 32 bayt olmalı (openssl rand -base64 32)')
+    return key
+
+
+def key_id(key):
+    """Manifestte anahtarın kendisi yerine saklanan kısa parmak izi"""
+    return hashlib.sha256(b'muhasebe-backup-key:' + key).hexdigest()[:16]
+
+
+def _aesgcm(key):
+    if AESGCM is None:
+        raise BackupError('Şifreleme için cryptography paketi kurulu değil')
+    return AESGCM(key)
+
+
+def _segment_aad(header, counter, final):
+    return header + struct.pack('>IB', counter, 1 if final else 0)
+
+
+def encrypt_stream(chunks, key, segment_size=SEGMENT_SIZE):
+    cipher = _aesgcm(key)
+    prefix = os.urandom(NONCE_PREFIX_SIZE)
+    header = MAGIC + prefix
+    yield header
+    for counter, (segment, final) in enumerate(rechunk(chunks, segment_size)):
+        sealed = cipher.encrypt(prefix + struct.pack('>I', counter), segment, _segment_aad(header, counter, final))
+        yield struct.pack(SEGMENT_HEADER, len(sealed), final) + sealed
+
+
+class _Reader:
+    """Parça iteratöründen istenen sayıda bayt okur"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def decrypt_stream(chunks, key):
+    cipher = _aesgcm(key)
+    reader = _Reader(chunks)
+    header = reader.read(len(MAGIC) + NONCE_PREFIX_SIZE)
+    if not header.startswith(MAGIC) or len(header) != len(MAGIC) + NONCE_PREFIX_SIZE:
+        raise BackupError('Şifreli yedek başlığı geçersiz')
+    prefix = header[len(MAGIC):]
+    counter = 0
+    while True:
+        segment_header = reader.read(struct.calcsize(SEGMENT_HEADER))
+        if len(segment_header) != struct.calcsize(SEGMENT_HEADER):
+            raise BackupError('Şifreli yedek eksik (son segment yok)')
+        length, final = struct.unpack(SEGMENT_HEADER, segment_header)
+        sealed = reader.read(length)
+        try:
+            segment = cipher.decrypt(
+                prefix + struct.pack('>I', counter), sealed, _segment_aad(header, counter, final)
+            )
+        except Exception:
+            raise BackupError(f'Segment {counter} doğrulanamadı (yanlış anahtar veya bozuk veri)')
+        if segment:
+            yield segment
+        if final:
+            if reader.read(1):
+                raise BackupError('Son segmentten sonra beklenmeyen veri')
+            return
+        counter += 1
+
+
+# =============================================================================
+# ÖLÇÜM VE PARÇALAMA
+# =============================================================================
+class Meter:
+    """Akıştan geçen bayt sayısı ve SHA-256"""
+
+    def __init__(self):
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+    def wrap(self, chunks):
+        for chunk in chunks:
+            self.size += len(chunk)
+            self.sha256.update(chunk)
+            yield chunk
+
+    @property
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def rechunk(chunks, size):
+    """Akışı `size` baytlık bloklara böler; (blok, son mu) verir"""
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        while len(pending) > size:
+            yield bytes(pending[:size]), False
+            del pending[:size]
+    yield bytes(pending), True
+
+
+# =============================================================================
+# YÜKLEYİCİLER
+# =============================================================================
+class LocalUploader:
+    """Yerel dizine yazan yükleyici; yarım dosya '.part' uzantısıyla tutulur"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _part(self, session):
+        return os.path.join(self.directory, session + '.part')
+
+    def begin(self, name):
+        with open(self._part(name), 'wb'):
+            pass
+        return name
+
+    def committed(self, session):
+        if not os.path.exists(self._part(session)) and os.path.exists(os.path.join(self.directory, session)):
+            raise UploadCompleted(os.path.join(self.directory, session))
+        return os.path.getsize(self._part(session))
+
+    def send(self, session, offset, data, final):
+        """Veriyi offset'ten yazar; son parçada dosyayı tamamlayıp yolunu döndürür"""
+        with open(self._part(session), 'r+b') as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        if final:
+            path = os.path.join(self.directory, session)
+            os.replace(self._part(session), path)
+            return path
+        return None
+
+    def put_bytes(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path + '.part', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.part', path)
+        return path
+
+    def open(self, name, read_size=READ_SIZE):
+        """Yüklenen dosyayı parça parça okur (geri yükleme)"""
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            while True:
+                chunk = f.read(read_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class GoogleDriveUploader:
+    """Google Drive resumable upload (servis hesabı ile)"""
+
+    UPLOAD_URL = 'https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&fields=id'
+    SCOPES = ['https://www.googleapis.com/auth/drive.file']
+
+    def __init__(self, credentials_file, folder_id, timeout=120):
+        from google.oauth2 import service_account
+        from google.auth.transport.requests import AuthorizedSession
+
+        credentials = service_account.Credentials.from_service_account_file(credentials_file, scopes=self.SCOPES)
+        self.session = AuthorizedSession(credentials)
+        self.credentials = credentials
+        self.folder_id = folder_id
+        self.timeout = timeout
+
+    def begin(self, name, mimetype='application/octet-stream'):
+        response = self.session.post(
+            self.UPLOAD_URL, json={'name': name, 'parents': [self.folder_id]},
+            headers={'X-Upload-Content-Type': mimetype}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.headers['Location']
+
+    @staticmethod
+    def _committed_from(response):
+        # 308 yanıtındaki Range: bytes=0-N → N+1 bayt kaydedildi; başlık yoksa hiç
+        committed = response.headers.get('Range')
+        return int(committed.rsplit('-', 1)[1]) + 1 if committed else 0
+
+    def committed(self, session):
+        response = self.session.put(session, headers={'Content-Range': 'bytes */*'}, timeout=self.timeout)
+        if response.status_code == 308:
+            return self._committed_from(response)
+        response.raise_for_status()
+        raise UploadCompleted(response.json()['id'])
+
+    def send(self, session, offset, data, final):
+        total = str(offset + len(data)) if final else '*'
+        content_range = f'bytes {offset}-{offset + len(data) - 1}/{total}' if data else f'bytes */{total}'
+        response = self.session.put(session, data=data, headers={'Content-Range': content_range}, timeout=self.timeout)
+        if response.status_code == 308:
+            if self._committed_from(response) != offset + len(data):
+                raise BackupError('Parçanın yalnızca bir kısmı kaydedildi')
+            return None
+        response.raise_for_status()
+        return response.json()['id']
+
+    def put_bytes(self, name, data):
+        from googleapiclient.discovery import build
+        from googleapiclient.http import MediaInMemoryUpload
+
+        service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+        media = MediaInMemoryUpload(data, mimetype='application/json')
+        created = service.files().create(
+            body={'name': name, 'parents': [self.folder_id]}, media_body=media, fields='id'
+        ).execute()
+        return created.get('id')
+
+
+def upload_stream(chunks, uploader, name, chunk_size=DEFAULT_CHUNK_SIZE, retries=5, retry_backoff=2.0,
+                  progress=None):
+    """Akışı parça parça yükler; (uzak id, yeniden deneme sayısı, parça sayısı).
+
+    Hata alan parça için yükleyiciye kaydedilen bayt sayısı sorulur ve parçanın
+    kalanı gönderilir; bellekte yalnızca o anki parça tutulur. Oturum zaten
+    tamamlanmışsa (son parçanın yanıtı kaybolduysa) yükleme başarılı sayılır.
+    """
+    chunk_size = max(UPLOAD_CHUNK_ALIGNMENT, chunk_size // UPLOAD_CHUNK_ALIGNMENT * UPLOAD_CHUNK_ALIGNMENT)
+    session = uploader.begin(name)
+    offset, total_retries, count, remote_id = 0, 0, 0, None
+    for block, final in rechunk(chunks, chunk_size):
+        start, end = offset, offset + len(block)
+        attempt, resume = 0, False
+        while True:
+            try:
+                if resume:
+                    # Sorgu da ağ hatası verebilir; başarısız olursa aynı bekleme ile tekrar denenir
+                    committed = uploader.committed(session)
+                    if not start <= committed <= end:
+                        raise _CommittedOutOfRange(
+                            f'{name}: kaydedilen bayt ({committed}) parçanın dışında ({start}-{end})'
+                        )
+                    offset, resume = committed, False
+                    if offset == end and not final:
+                        break
+                remote_id = uploader.send(session, offset, block[offset - start:], final)
+                offset = end
+                break
+            except UploadCompleted as e:
+                # Son parça kaydedildi ama yanıtı kayboldu: yükleme başarılı
+                if not final:
+                    raise BackupError(f'{name}: yükleme oturumu son parçadan önce tamamlanmış')
+                remote_id, offset = e.remote_id, end
+                break
+            except _CommittedOutOfRange:
+                raise
+            except Exception as e:
+                attempt += 1
+                total_retries += 1
+                if attempt > retries:
+                    raise BackupError(f'{name}: {start}. bayttaki parça {retries} denemede yüklenemedi: {e}')
+                delay = retry_backoff * 2 ** (attempt - 1)
+                logger.warning('%s: parça yüklenemedi (%s), %.1f sn sonra kaldığı yerden denenecek', name, e, delay)
+                time.sleep(delay)
+                resume = True
+        count += 1
+        if progress:
+            progress(offset)
+    return remote_id, total_retries, count
+
+
+# =============================================================================
+# HAT
+# =============================================================================
+def artifact_name(prefix, source_format, compression, encrypted, timestamp=None):
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    extension = {'pg_dump': 'dump', 'sqlite': 'sql'}[source_format]
+    compression_extension = {'zstd': 'zst', 'gzip': 'gz'}[compression]
+    return f"{prefix}_{timestamp}.{extension}.{compression_extension}{'.enc' if encrypted else ''}"
+
+
+def run_pipeline(source, uploader, name, source_format, key=None, compression=None, compression_level=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, retries=5, retry_backoff=2.0, progress=None, manifest_dir=None):
+    """Kaynağı sıkıştırıp (şifreleyip) yükler, manifesti yükler ve döndürür.
+
+    manifest_dir verilirse manifestin bir kopyası yerel dizine de yazılır
+    (en son yedeği bulmak ve geri yükleme doğrulaması için).
+    """
+    compression = compression or default_compression()
+    started = time.monotonic()
+    raw, compressed, artifact = Meter(), Meter(), Meter()
+
+    stream = compressed.wrap(compress_stream(raw.wrap(source), compression, compression_level))
+    if key is not None:
+        stream = encrypt_stream(stream, key)
+    remote_id, upload_retries, chunks = upload_stream(
+        artifact.wrap(stream), uploader, name, chunk_size=chunk_size, retries=retries,
+        retry_backoff=retry_backoff, progress=progress
+    )
+    duration = time.monotonic() - started
+
+    manifest = {
+        'version': 1,
+        'name': name,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source_format': source_format,
+        'compression': compression,
+        'encryption': ENCRYPTION if key is not None else None,
+        'key_id': key_id(key) if key is not None else None,
+        'raw_size': raw.size,
+        'raw_sha256': raw.hexdigest,
+        'compressed_size': compressed.size,
+        'size': artifact.size,
+        'sha256': artifact.hexdigest,
+        'chunks': chunks,
+        'chunk_size': chunk_size,
+        'upload_retries': upload_retries,
+        'remote_id': remote_id,
+        'duration_seconds': round(duration, 3),
+        'throughput_mb_s': round(raw.size / 1024 / 1024 / duration, 2) if duration else None,
+    }
+    data = json.dumps(manifest, indent=2).encode()
+    uploader.put_bytes(name + MANIFEST_SUFFIX, data)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+        with open(os.path.join(manifest_dir, name + MANIFEST_SUFFIX), 'wb') as f:
+            f.write(data)
+    logger.info(
+        'Yedek %s: %.1f MB → %.1f MB, %s parça, %s yeniden deneme, %.1f sn',
+        name, raw.size / 1024 / 1024, artifact.size / 1024 / 1024, chunks, upload_retries, duration
+    )
+    return manifest
+
+
+def restore_stream(chunks, manifest, key=None):
+    """Yüklenen dosyayı çözüp açarak döküm parçalarını verir; boyut ve SHA-256 manifestle doğrulanır.
+
+    Doğrulama akış sonunda yapılır: tüketici son parçayı aldıktan sonra hata
+    fırlatılabilir, bu yüzden döküm geri yükleme tamamlanmadan kullanılmamalıdır.
+    """
+    if manifest.get('encryption') and key is None:
+        raise BackupError('Yedek şifreli; BACKUP_ENCRYPTION_KEY gerekli')
+    if manifest.get('encryption') and key_id(key) != manifest['key_id']:
+        raise BackupError('Anahtar bu yedeğin anahtarı değil (key_id uyuşmuyor)')
+
+    artifact, raw = Meter(), Meter()
+    stream = artifact.wrap(chunks)
+    if manifest.get('encryption'):
+        stream = decrypt_stream(stream, key)
+    yield from raw.wrap(decompress_stream(stream, manifest['compression']))
+
+    if (artifact.size, artifact.hexdigest) != (manifest['size'], manifest['sha256']):
+        raise BackupError(f"{manifest['name']}: dosya boyutu/SHA-256 manifestle uyuşmuyor")
+    if (raw.size, raw.hexdigest) != (manifest['raw_size'], manifest['raw_sha256']):
+        raise BackupError(f"{manifest['name']}: döküm boyutu/SHA-256 manifestle uyuşmuyor")
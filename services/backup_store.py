@@ -0,0 +1,525 @@
+"""
+İçerik adresli, tekilleştirilmiş (dedup) yedek deposu.
+
+Döküm akışı içerik tanımlı parçalara (content-defined chunking, gear rolling
+hash - FastCDC) bölünür. Parça sınırları içerikten belirlendiği için bir
+şirketin satırları değiştiğinde yalnızca o bölgedeki parçalar değişir; değişmeyen
+parçaların kimliği aynı kalır ve tekrar yüklenmez.
+
+Her parça ayrı sıkıştırılır (zstd, kurulu değilse zlib) ve anahtar varsa
+AES-256-GCM ile şifrelenir; kimliği şifreli depoda HMAC-SHA256(anahtar, veri),
+şifresizde SHA-256'dır. Depo düzeni:
+    chunks/<id[:2]>/<id>      parça
+    snapshots/<ad>.json       yedek manifesti (parça kimlikleri sırasıyla)
+
+Yerel indeks (BACKUP_DIR/store.sqlite3) hangi parçaların depoda olduğunu ve
+kaç yedeğin onlara başvurduğunu (refs) tutar; kaybolursa depodaki manifestlerden
+yeniden kurulur (rebuild_index).
+
+Saklama büyükbaba-baba-oğul (GFS) kuralıyla yapılır: son N günlük, son N
+haftanın ve son N ayın en yeni yedeği tutulur. Silinen yedeklerin parçalarının
+başvuru sayısı düşülür; sayısı sıfıra inen parçalar çöp toplamada silinir
+(yeni yüklenmiş ama henüz bir yedeğe bağlanmamış parçalar GC_GRACE_SECONDS
+boyunca korunur).
+
+Depoya aynı anda tek bir yedekleme yazmalıdır (iş kuyruğunda 'backup' işi tekildir).
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+
+from services.backup_pipeline import AESGCM, BackupError, key_id, zstandard
+
+try:
+    import numpy
+except ImportError:  # saf Python taramasına düşülür (aynı sınırlar, daha yavaş)
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+MIN_CHUNK_SIZE = 128 * 1024
+AVG_CHUNK_SIZE = 512 * 1024
+MAX_CHUNK_SIZE = 2 * 1024 * 1024
+GC_GRACE_SECONDS = 24 * 3600
+
+CHUNK_MAGIC = b'MBC1'
+_COMPRESSION_CODES = {'none': 0, 'zlib': 1, 'zstd': 2}
+_NONCE_SIZE = 12
+
+# Gear tablosu: bayt başına sabit 64 bitlik rastgele değer (deterministik, sürümler arası aynı)
+_GEAR = [int.from_bytes(hashlib.sha256(b'muhasebe-cdc:%d' % i).digest()[:8], 'big') for i in range(256)]
+_HASH_MASK = (1 << 64) - 1
+_GEAR_ARRAY = numpy.array(_GEAR, dtype=numpy.uint64) if numpy is not None else None
+# Vektörel taramada bir adımda hash'lenen bayt sayısı (sınır bulununca kalan atlanır)
+_SCAN_BLOCK = 128 * 1024
+
+
+def _boundary_mask(bits):
+    """Sola kayan hash'in üst bitleri son 64 bayta bağlıdır; maske üst bitlerden seçilir"""
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def _gear_hashes(data, begin, stop, origin):
+    """data[begin:stop] içindeki her konumun gear hash'i (hash origin'de sıfırdan başlar).
+
+    h_n = Σ gear[b_(n-i)] << i (i < 64, mod 2^64); bayt bayt döngü yerine toplam
+    katlanarak 6 vektör adımında hesaplanır: H_2k(n) = H_k(n) + H_k(n-k) << k.
+    """
+    context = max(origin, begin - 63)
+    hashes = _GEAR_ARRAY[numpy.frombuffer(data, dtype=numpy.uint8, count=stop - context, offset=context)]
+    shifted = numpy.empty_like(hashes)
+    span = 1
+    while span < 64:
+        numpy.left_shift(hashes[:-span], span, out=shifted[:-span])
+        numpy.add(hashes[span:], shifted[:-span], out=hashes[span:])
+        span *= 2
+    return hashes[begin - context:]
+
+
+def _first_boundary(data, begin, stop, origin, boundary_mask):
+    """[begin, stop) aralığında hash'i maskeyle sıfır olan ilk konumdan sonraki indeks; yoksa None"""
+    mask = numpy.uint64(boundary_mask)
+    for block in range(begin, stop, _SCAN_BLOCK):
+        block_stop = min(block + _SCAN_BLOCK, stop)
+        hits = numpy.flatnonzero((_gear_hashes(data, block, block_stop, origin) & mask) == 0)
+        if hits.size:
+            return block + int(hits[0]) + 1
+    return None
+
+
+def cut_point(data, start, end, min_size, avg_size, max_size):
+    """data[start:end] içinde ilk parçanın uzunluğu (FastCDC, normalize edilmiş sınır).
+
+    Ortalama boyuttan önce daha zor (2 bit fazla), sonra daha kolay bir maske
+    kullanılır; böylece parça boyutları ortalama etrafında toplanır. numpy
+    kuruluysa tarama vektörel yapılır; sınırlar saf Python döngüsüyle aynıdır.
+    """
+    length = min(end - start, max_size)
+    if length <= min_size:
+        return length
+    bits = avg_size.bit_length() - 1
+    strict, loose = _boundary_mask(bits + 2), _boundary_mask(bits - 2)
+    normal = min(avg_size, length)
+    if numpy is not None:
+        origin = start + min_size
+        split = max(start + normal, origin)
+        position = (_first_boundary(data, origin, split, origin, strict)
+                    or _first_boundary(data, split, start + length, origin, loose))
+        return position - start if position else length
+    gear, mask = _GEAR, _HASH_MASK
+    h = 0
+    position = start + min_size
+    for byte in data[position:start + normal]:
+        h = ((h << 1) + gear[byte]) & mask
+        position += 1
+        if not h & strict:
+            return position - start
+    for byte in data[position:start + length]:
+        h = ((h << 1) + gear[byte]) & mask
+        position += 1
+        if not h & loose:
+            return position - start
+    return length
+
+
+def chunk_stream(chunks, min_size=MIN_CHUNK_SIZE, avg_size=AVG_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+    """Akışı içerik tanımlı parçalara böler; bellekte en fazla bir okuma + max_size tutulur"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        offset = 0
+        while len(buffer) - offset >= max_size:
+            size = cut_point(buffer, offset, len(buffer), min_size, avg_size, max_size)
+            yield bytes(buffer[offset:offset + size])
+            offset += size
+        del buffer[:offset]
+    offset = 0
+    while offset < len(buffer):
+        size = cut_point(buffer, offset, len(buffer), min_size, avg_size, max_size)
+        yield bytes(buffer[offset:offset + size])
+        offset += size
+
+
+# =============================================================================
+# NESNE DEPOLARI
+# =============================================================================
+class LocalObjectStore:
+    """Yerel dizinde nesne deposu; referans, dizine göre göreli yoldur"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def put(self, name, data):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.part', 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.part', path)
+        return name
+
+    def get(self, ref):
+        with open(os.path.join(self.directory, ref), 'rb') as f:
+            return f.read()
+
+    def delete(self, ref):
+        try:
+            os.remove(os.path.join(self.directory, ref))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix):
+        """{ad: referans} - adı prefix ile başlayan nesneler"""
+        root = os.path.join(self.directory, prefix)
+        found = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith('.part'):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.directory).replace(os.sep, '/')
+                found[name] = name
+        return found
+
+
+class DriveObjectStore:
+    """Google Drive klasöründe nesne deposu; referans Drive dosya kimliğidir"""
+
+    def __init__(self, credentials_file, folder_id):
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_file, scopes=['https://www.googleapis.com/auth/drive.file']
+        )
+        self.service = build('drive', 'v3', credentials=credentials, cache_discovery=False)
+        self.folder_id = folder_id
+
+    def put(self, name, data):
+        from googleapiclient.http import MediaInMemoryUpload
+
+        media = MediaInMemoryUpload(data, mimetype='application/octet-stream', resumable=len(data) > 5 * 1024 * 1024)
+        created = self.service.files().create(
+            body={'name': name, 'parents': [self.folder_id]}, media_body=media, fields='id'
+        ).execute(num_retries=5)
+        return created['id']
+
+    def get(self, ref):
+        return self.service.files().get_media(fileId=ref).execute(num_retries=5)
+
+    def delete(self, ref):
+        self.service.files().delete(fileId=ref).execute(num_retries=5)
+
+    def list(self, prefix):
+        found, page_token = {}, None
+        while True:
+            response = self.service.files().list(
+                q=f"'{self.folder_id}' in parents and trashed=false and name contains '{prefix}'",
+                fields='nextPageToken, files(id, name)', pageToken=page_token, pageSize=1000
+            ).execute(num_retries=5)
+            for item in response.get('files', []):
+                if item['name'].startswith(prefix):
+                    found[item['name']] = item['id']
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return found
+
+
+# =============================================================================
+# SAKLAMA KURALI
+# =============================================================================
+def gfs_keep(snapshots, daily=7, weekly=4, monthly=12):
+    """Tutulacak yedek adları: [(ad, oluşturulma datetime)] içinden son `daily` gün,
+    `weekly` ISO hafta ve `monthly` ayın her birinin en yeni yedeği. En yeni yedek her zaman tutulur.
+    """
+    ordered = sorted(snapshots, key=lambda item: item[1], reverse=True)
+    keep = {ordered[0][0]} if ordered else set()
+    for period, limit in (
+        (lambda moment: moment.date(), daily),
+        (lambda moment: moment.isocalendar()[:2], weekly),
+        (lambda moment: (moment.year, moment.month), monthly),
+    ):
+        seen = []
+        for name, created_at in ordered:
+            bucket = period(created_at)
+            if bucket in seen:
+                continue
+            if len(seen) >= limit:
+                break
+            seen.append(bucket)
+            keep.add(name)
+    return keep
+
+
+# =============================================================================
+# DEPO
+# =============================================================================
+class ChunkStore:
+    """Tekilleştirilmiş yedek deposu (parçalar nesne deposunda, indeks yerel SQLite'ta)"""
+
+    def __init__(self, objects, index_path, key=None, compression=None, compression_level=None):
+        self.objects = objects
+        self.key = key
+        self.compression = compression or ('zstd' if zstandard is not None else 'zlib')
+        self.compression_level = compression_level
+        if self.key is not None and AESGCM is None:
+            raise BackupError('Şifreleme için cryptography paketi kurulu değil')
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self.index = sqlite3.connect(index_path, timeout=30, isolation_level=None)
+        self.index.execute('PRAGMA journal_mode=WAL')
+        self.index.execute(
+            'CREATE TABLE IF NOT EXISTS chunks ('
+            'id TEXT PRIMARY KEY, size INTEGER NOT NULL, stored_size INTEGER NOT NULL, '
+            'ref TEXT NOT NULL, refs INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)'
+        )
+        self.index.execute(
+            'CREATE TABLE IF NOT EXISTS snapshots ('
+            'name TEXT PRIMARY KEY, created_at TEXT NOT NULL, ref TEXT NOT NULL, manifest TEXT NOT NULL)'
+        )
+
+    def close(self):
+        self.index.close()
+
+    # --- parçalar ---------------------------------------------------------------
+    def chunk_id(self, data):
+        if self.key is not None:
+            return hmac.new(self.key, data, hashlib.sha256).hexdigest()
+        return hashlib.sha256(data).hexdigest()
+
+    def _seal(self, chunk_id, data):
+        """Parça biçimi: 'MBC1' + sıkıştırma kodu + şifreli mi + (nonce) + veri"""
+        if self.compression == 'zstd':
+            body = zstandard.ZstdCompressor(level=self.compression_level or 3).compress(data)
+        else:
+            body = zlib.compress(data, self.compression_level or 6)
+        header = CHUNK_MAGIC + bytes([_COMPRESSION_CODES[self.compression], self.key is not None])
+        if self.key is None:
+            return header + body
+        nonce = os.urandom(_NONCE_SIZE)
+        return header + nonce + AESGCM(self.key).encrypt(nonce, body, header + chunk_id.encode())
+
+    def _open(self, chunk_id, blob):
+        header = blob[:6]
+        if header[:4] != CHUNK_MAGIC:
+            raise BackupError(f'Parça {chunk_id[:12]} biçimi geçersiz')
+        compression, encrypted = header[4], header[5]
+        body = blob[6:]
+        if encrypted:
+            if self.key is None:
+                raise BackupError('Depo şifreli; BACKUP_ENCRYPTION_KEY gerekli')
+            try:
+                body = AESGCM(self.key).decrypt(body[:_NONCE_SIZE], body[_NONCE_SIZE:], header + chunk_id.encode())
+            except Exception:
+                raise BackupError(f'Parça {chunk_id[:12]} doğrulanamadı (yanlış anahtar veya bozuk veri)')
+        if compression == _COMPRESSION_CODES['zstd']:
+            if zstandard is None:
+                raise BackupError('zstd için zstandard paketi kurulu değil')
+            data = zstandard.ZstdDecompressor().decompress(body)
+        elif compression == _COMPRESSION_CODES['zlib']:
+            data = zlib.decompress(body)
+        else:
+            data = body
+        if not hmac.compare_digest(self.chunk_id(data), chunk_id):
+            raise BackupError(f'Parça {chunk_id[:12]} içeriği kimliğiyle uyuşmuyor')
+        return data
+
+    @staticmethod
+    def _chunk_name(chunk_id):
+        return f'chunks/{chunk_id[:2]}/{chunk_id}'
+
+    def _known(self, chunk_id):
+        return self.index.execute('SELECT 1 FROM chunks WHERE id = ?', (chunk_id,)).fetchone() is not None
+
+    # --- yedek alma --------------------------------------------------------------
+    def backup(self, source, name, source_format, progress=None,
+               min_size=MIN_CHUNK_SIZE, avg_size=AVG_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+        """Akışı parçalayıp yalnızca depoda olmayan parçaları yükler; manifesti döndürür"""
+        if self.index.execute('SELECT 1 FROM snapshots WHERE name = ?', (name,)).fetchone():
+            raise BackupError(f'Aynı adlı yedek zaten var: {name}')
+        started = time.monotonic()
+        raw = hashlib.sha256()
+        chunk_ids, seen = [], set()
+        raw_size = new_chunks = new_bytes = uploaded_bytes = 0
+        for data in chunk_stream(source, min_size, avg_size, max_size):
+            raw.update(data)
+            raw_size += len(data)
+            chunk_id = self.chunk_id(data)
+            chunk_ids.append(chunk_id)
+            if chunk_id in seen or self._known(chunk_id):
+                continue
+            seen.add(chunk_id)
+            blob = self._seal(chunk_id, data)
+            ref = self.objects.put(self._chunk_name(chunk_id), blob)
+            # refs=0: yedek tamamlanınca artırılır; o zamana kadar GC bekleme süresiyle korunur
+            self.index.execute(
+                'INSERT INTO chunks (id, size, stored_size, ref, refs, created_at) VALUES (?, ?, ?, ?, 0, ?)',
+                (chunk_id, len(data), len(blob), ref, time.time())
+            )
+            new_chunks += 1
+            new_bytes += len(data)
+            uploaded_bytes += len(blob)
+            if progress:
+                progress(raw_size, uploaded_bytes)
+
+        duration = time.monotonic() - started
+        manifest = {
+            'version': 1,
+            'name': name,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'source_format': source_format,
+            'compression': self.compression,
+            'encryption': 'aes-256-gcm' if self.key is not None else None,
+            'key_id': key_id(self.key) if self.key is not None else None,
+            'chunking': {'min': min_size, 'avg': avg_size, 'max': max_size},
+            'raw_size': raw_size,
+            'raw_sha256': raw.hexdigest(),
+            'chunks': chunk_ids,
+            'new_chunks': new_chunks,
+            'reused_chunks': len(chunk_ids) - new_chunks,
+            'new_bytes': new_bytes,
+            'uploaded_bytes': uploaded_bytes,
+            'duration_seconds': round(duration, 3),
+            'throughput_mb_s': round(raw_size / 1024 / 1024 / duration, 2) if duration else None,
+        }
+        ref = self.objects.put(f'snapshots/{name}.json', json.dumps(manifest).encode())
+        self.index.execute('BEGIN IMMEDIATE')
+        try:
+            self.index.execute(
+                'INSERT INTO snapshots (name, created_at, ref, manifest) VALUES (?, ?, ?, ?)',
+                (name, manifest['created_at'], ref, json.dumps(manifest))
+            )
+            self.index.executemany('UPDATE chunks SET refs = refs + 1 WHERE id = ?',
+                                   [(chunk_id,) for chunk_id in set(chunk_ids)])
+            self.index.execute('COMMIT')
+        except Exception:
+            self.index.execute('ROLLBACK')
+            raise
+        logger.info(
+            'Dedup yedek %s: %.1f MB, %s/%s parça yeni, %.1f MB yüklendi, %.1f sn',
+            name, raw_size / 1024 / 1024, new_chunks, len(chunk_ids), uploaded_bytes / 1024 / 1024, duration
+        )
+        return manifest
+
+    # --- geri yükleme ------------------------------------------------------------
+    def snapshots(self):
+        """[(ad, oluşturulma datetime)] en yeniden eskiye"""
+        rows = self.index.execute('SELECT name, created_at FROM snapshots ORDER BY created_at DESC, name DESC')
+        return [(name, datetime.fromisoformat(created_at)) for name, created_at in rows]
+
+    def manifest(self, name):
+        row = self.index.execute('SELECT manifest FROM snapshots WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise BackupError(f'Yedek bulunamadı: {name}')
+        return json.loads(row[0])
+
+    def restore(self, name):
+        """Yedeğin dökümünü parça parça verir; her parça ve tüm döküm SHA-256 ile doğrulanır"""
+        manifest = self.manifest(name)
+        refs = dict(self.index.execute('SELECT id, ref FROM chunks'))
+        raw, size = hashlib.sha256(), 0
+        for chunk_id in manifest['chunks']:
+            if chunk_id not in refs:
+                raise BackupError(f'{name}: parça {chunk_id[:12]} depoda yok')
+            data = self._open(chunk_id, self.objects.get(refs[chunk_id]))
+            raw.update(data)
+            size += len(data)
+            yield data
+        if (size, raw.hexdigest()) != (manifest['raw_size'], manifest['raw_sha256']):
+            raise BackupError(f'{name}: döküm boyutu/SHA-256 manifestle uyuşmuyor')
+
+    # --- saklama ve çöp toplama --------------------------------------------------------
+    def delete_snapshot(self, name):
+        row = self.index.execute('SELECT ref, manifest FROM snapshots WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            return
+        ref, manifest = row[0], json.loads(row[1])
+        self.index.execute('BEGIN IMMEDIATE')
+        try:
+            self.index.execute('DELETE FROM snapshots WHERE name = ?', (name,))
+            self.index.executemany('UPDATE chunks SET refs = refs - 1 WHERE id = ?',
+                                   [(chunk_id,) for chunk_id in set(manifest['chunks'])])
+            self.index.execute('COMMIT')
+        except Exception:
+            self.index.execute('ROLLBACK')
+            raise
+        self.objects.delete(ref)
+
+    def apply_retention(self, daily=7, weekly=4, monthly=12):
+        """GFS kuralı dışında kalan yedekleri siler ve çöp toplar; (silinen yedekler, silinen parçalar, bayt)"""
+        snapshots = self.snapshots()
+        keep = gfs_keep(snapshots, daily=daily, weekly=weekly, monthly=monthly)
+        removed = [name for name, _ in snapshots if name not in keep]
+        for name in removed:
+            self.delete_snapshot(name)
+            logger.info('Yedek saklama süresi doldu: %s', name)
+        chunks, freed = self.collect_garbage()
+        return removed, chunks, freed
+
+    def collect_garbage(self, grace_seconds=GC_GRACE_SECONDS):
+        """Hiçbir yedeğin başvurmadığı parçaları siler; (parça sayısı, depolanan bayt)"""
+        rows = self.index.execute(
+            'SELECT id, ref, stored_size FROM chunks WHERE refs <= 0 AND created_at < ?',
+            (time.time() - grace_seconds,)
+        ).fetchall()
+        for chunk_id, ref, _ in rows:
+            self.objects.delete(ref)
+            self.index.execute('DELETE FROM chunks WHERE id = ? AND refs <= 0', (chunk_id,))
+        freed = sum(row[2] for row in rows)
+        if rows:
+            logger.info('Çöp toplama: %s parça, %.1f MB silindi', len(rows), freed / 1024 / 1024)
+        return len(rows), freed
+
+    def rebuild_index(self):
+        """İndeksi depodaki manifest ve parçalardan yeniden kurar (indeks dosyası kaybolduysa)"""
+        chunk_refs = self.objects.list('chunks/')
+        snapshot_refs = self.objects.list('snapshots/')
+        refs = {}
+        self.index.execute('BEGIN IMMEDIATE')
+        try:
+            self.index.execute('DELETE FROM snapshots')
+            self.index.execute('DELETE FROM chunks')
+            for name, ref in snapshot_refs.items():
+                manifest = json.loads(self.objects.get(ref))
+                self.index.execute(
+                    'INSERT INTO snapshots (name, created_at, ref, manifest) VALUES (?, ?, ?, ?)',
+                    (manifest['name'], manifest['created_at'], ref, json.dumps(manifest))
+                )
+                for chunk_id in set(manifest['chunks']):
+                    refs[chunk_id] = refs.get(chunk_id, 0) + 1
+            now = time.time()
+            for name, ref in chunk_refs.items():
+                chunk_id = name.rsplit('/', 1)[-1]
+                # Boyutlar bilinmiyor; yalnızca istatistikte kullanılır
+                self.index.execute(
+                    'INSERT INTO chunks (id, size, stored_size, ref, refs, created_at) VALUES (?, 0, 0, ?, ?, ?)',
+                    (chunk_id, ref, refs.get(chunk_id, 0), now)
+                )
+            self.index.execute('COMMIT')
+        except Exception:
+            self.index.execute('ROLLBACK')
+            raise
+        missing = set(refs) - {name.rsplit('/', 1)[-1] for name in chunk_refs}
+        if missing:
+            logger.error('Depoda eksik parça var: %s parça (%s...)', len(missing), sorted(missing)[0][:12])
+        return len(snapshot_refs), len(chunk_refs), len(missing)
+
+    def stats(self):
+        chunks, raw, stored = self.index.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM chunks'
+        ).fetchone()
+        logical = sum(json.loads(row[0])['raw_size'] for row in self.index.execute('SELECT manifest FROM snapshots'))
+        return {
+            'snapshots': self.index.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0],
+            'chunks': chunks,
+            'unique_bytes': raw,
+            'stored_bytes': stored,
+            'logical_bytes': logical,
+            'dedup_ratio': round(logical / stored, 2) if stored else None,
+        }
@@ -0,0 +1,229 @@
+"""
+Yedek geri yükleme doğrulaması (flask verify-backup).
+
+En yeni yedek BackupService manifestinden bulunur ve çevrimdışı olarak geçici
+bir veritabanına geri yüklenir:
+- pg_dump yedeği: BACKUP_VERIFY_DATABASE_URL'deki yerel PostgreSQL sunucusunda
+  geçici bir veritabanı açılır, döküm pg_restore --jobs ile paralel yüklenir ve
+  iş bitince veritabanı silinir.
+- SQLite yedeği: SQL dökümü geçici bir SQLite dosyasına deyim deyim uygulanır.
+
+Ardından her şirket için tablo satır sayıları ve bakiye/tutar sağlama toplamları
+(toplam ve id ağırlıklı toplam) canlı veritabanıyla karşılaştırılır. Yedekten
+sonra yapılan yazımlar da fark olarak görünür; doğrulamayı yedeğin hemen
+ardından veya sakin saatlerde çalıştırın.
+
+RTO: yedeğin okunmaya başlanmasından karşılaştırmanın bitmesine kadar geçen süre.
+"""
+
+import codecs
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from services.backup_pipeline import BackupError
+from services.backup_service import BackupService, pg_connection
+
+logger = logging.getLogger(__name__)
+
+# (ad, FROM ifadesi, şirket sütunu, id sütunu, sağlama toplamı alınan sütun)
+TENANT_CHECKS = [
+    ('users', 'users u', 'u.company_id', 'u.id', None),
+    ('customers', 'customers c', 'c.company_id', 'c.id', 'c.balance'),
+    ('suppliers', 'suppliers s', 's.company_id', 's.id', 's.balance'),
+    ('products', 'products p', 'p.company_id', 'p.id', 'p.stock_quantity'),
+    ('transactions', 'transactions t', 't.company_id', 't.id', 't.amount'),
+    ('receipts', 'receipts r', 'r.company_id', 'r.id', 'r.grand_total'),
+    ('customer_transactions', 'customer_transactions ct JOIN customers c ON c.id = ct.customer_id',
+     'c.company_id', 'ct.id', 'ct.amount'),
+    ('supplier_transactions', 'supplier_transactions st JOIN suppliers s ON s.id = st.supplier_id',
+     's.company_id', 'st.id', 'st.amount'),
+    ('receipt_items', 'receipt_items ri JOIN receipts r ON r.id = ri.receipt_id',
+     'r.company_id', 'ri.id', 'ri.total_price'),
+]
+CENT = Decimal('0.01')
+
+
+def _decimal(value):
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def tenant_checksums(connection):
+    """{(kontrol, şirket id): (satır sayısı, toplam, id ağırlıklı toplam)}"""
+    results = {}
+    for name, source, company, row_id, column in TENANT_CHECKS:
+        value = column or '0'
+        rows = connection.execute(text(
+            f'SELECT {company}, COUNT(*), ROUND(SUM({value}), 2), ROUND(SUM({row_id} * {value}), 2) '
+            f'FROM {source} GROUP BY {company}'
+        ))
+        for company_id, count, total, weighted in rows:
+            results[(name, company_id)] = (count, _decimal(total), _decimal(weighted))
+    return results
+
+
+def compare_checksums(live, restored):
+    """Farklı çıkan (kontrol, şirket) kayıtları: [{'check', 'company_id', 'live', 'restored'}]"""
+    empty = (0, _decimal(0), _decimal(0))
+    mismatches = []
+    for key in sorted(set(live) | set(restored), key=lambda key: (key[0], key[1] is None, key[1] or 0)):
+        if live.get(key, empty) != restored.get(key, empty):
+            mismatches.append({
+                'check': key[0], 'company_id': key[1],
+                'live': [str(value) for value in live.get(key, empty)],
+                'restored': [str(value) for value in restored.get(key, empty)],
+            })
+    return mismatches
+
+
+def restore_sqlite(chunks, path):
+    """SQL döküm akışını (iterdump) yeni bir SQLite dosyasına uygular; döküm boyutu"""
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        # Geçici kopya: günlük ve fsync gereksiz
+        connection.execute('PRAGMA journal_mode=OFF')
+        connection.execute('PRAGMA synchronous=OFF')
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        statement, pending, size = [], '', 0
+        for chunk in chunks:
+            size += len(chunk)
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                statement.append(line)
+                # Metin değerleri satır sonu içerebilir; deyim tamamlanana kadar biriktir
+                sql = '\n'.join(statement)
+                if sqlite3.complete_statement(sql):
+                    connection.execute(sql)
+                    statement = []
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            statement.append(pending)
+        if any(line.strip() for line in statement):
+            raise BackupError('SQL dökümü yarım deyimle bitiyor')
+    finally:
+        connection.close()
+    return size
+
+
+def restore_pg_dump(chunks, server_url, workdir, jobs):
+    """pg_dump arşivini yerel sunucuda geçici veritabanına paralel yükler; (veritabanı adı, döküm boyutu).
+
+    pg_restore --jobs arşivi dosyadan okumak zorunda olduğu için döküm önce
+    çalışma dizinine yazılır.
+    """
+    args, env, _ = pg_connection(server_url)
+    dump_path = os.path.join(workdir, 'backup.dump')
+    size = 0
+    with open(dump_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+
+    database = f"muhasebe_verify_{datetime.now().strftime('%Y%m%d%H%M%S')}_{os.getpid()}"
+    _run(['createdb', *args, database], env)
+    try:
+        _run([
+            'pg_restore', *args, f'--dbname={database}', f'--jobs={jobs}',
+            '--no-owner', '--no-acl', '--exit-on-error', dump_path
+        ], env)
+    except BackupError:
+        drop_pg_database(server_url, database)
+        raise
+    return database, size
+
+
+def drop_pg_database(server_url, database):
+    args, env, _ = pg_connection(server_url)
+    _run(['dropdb', *args, '--if-exists', database], env)
+
+
+def _run(command, env):
+    try:
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise BackupError(f'{command[0]} bulunamadı (PostgreSQL istemci araçları kurulu olmalı)')
+    if result.returncode != 0:
+        raise BackupError(f'{command[0]} başarısız ({result.returncode}): {result.stderr.strip()[-500:]}')
+
+
+def _database_url(server_url, database):
+    """Sunucu URL'sinden geçici veritabanının SQLAlchemy URL'si (pg8000 sürücüsüyle, sorgu parametreleri korunur)"""
+    return make_url(server_url).set(drivername='postgresql+pg8000', database=database)
+
+
+def verify_latest_backup(live_engine, service=None, server_url=None, jobs=None, keep=False):
+    """En yeni yedeği geri yükleyip canlı veritabanıyla karşılaştırır; raporu döndürür"""
+    service = service or BackupService()
+    server_url = server_url or os.environ.get('BACKUP_VERIFY_DATABASE_URL')
+    jobs = jobs or int(os.environ.get('BACKUP_VERIFY_JOBS', 0)) or os.cpu_count() or 1
+    manifest = service.latest_manifest()
+    workdir = tempfile.mkdtemp(prefix='muhasebe_verify_')
+    scratch_database = None
+    logger.info('Yedek doğrulanıyor: %s', manifest['name'])
+
+    started = time.monotonic()
+    try:
+        chunks = service.open_backup(manifest)
+        if manifest['source_format'] == 'sqlite':
+            restored_path = os.path.join(workdir, 'restored.db')
+            size = restore_sqlite(chunks, restored_path)
+            restored_url = f'sqlite:///{restored_path}'
+        else:
+            if not server_url:
+                raise BackupError('pg_dump yedeği için BACKUP_VERIFY_DATABASE_URL (yerel PostgreSQL) gerekli')
+            scratch_database, size = restore_pg_dump(chunks, server_url, workdir, jobs)
+            restored_url = _database_url(server_url, scratch_database)
+        restore_seconds = time.monotonic() - started
+
+        compare_started = time.monotonic()
+        restored_engine = create_engine(restored_url)
+        try:
+            with restored_engine.connect() as connection:
+                restored = tenant_checksums(connection)
+        finally:
+            restored_engine.dispose()
+        with live_engine.connect() as connection:
+            live = tenant_checksums(connection)
+        mismatches = compare_checksums(live, restored)
+        compare_seconds = time.monotonic() - compare_started
+    finally:
+        if scratch_database and not keep:
+            drop_pg_database(server_url, scratch_database)
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    created_at = datetime.fromisoformat(manifest['created_at'])
+    report = {
+        'name': manifest['name'],
+        'created_at': manifest['created_at'],
+        'backup_age_seconds': round((datetime.now() - created_at).total_seconds()),
+        'source_format': manifest['source_format'],
+        'raw_size': manifest['raw_size'],
+        # Hız geri yüklenen döküm üzerinden ölçülür (SQLite: SQL metni, pg_dump: arşiv dosyası)
+        'restored_size': size,
+        'restore_seconds': round(restore_seconds, 3),
+        'restore_throughput_mb_s': round(size / 1024 / 1024 / restore_seconds, 2) if restore_seconds else None,
+        'jobs': jobs if manifest['source_format'] == 'pg_dump' else 1,
+        'compare_seconds': round(compare_seconds, 3),
+        'rto_seconds': round(restore_seconds + compare_seconds, 3),
+        'tenants': len({company_id for _, company_id in live.keys() | restored.keys()}),
+        'checks': len(set(live) | set(restored)),
+        'mismatches': mismatches,
+        'restored_copy': (workdir if manifest['source_format'] == 'sqlite' else scratch_database) if keep else None,
+    }
+    logger.info(
+        'Yedek doğrulandı: %s, geri yükleme %.1f sn (%s MB/s), RTO %.1f sn, %s fark',
+        report['name'], report['restore_seconds'], report['restore_throughput_mb_s'], report['rto_seconds'],
+        len(mismatches)
+    )
+    return report
@@ -0,0 +1,96 @@
+import logging
+from decimal import Decimal
+from sqlalchemy import func, case
+from models import db, Customer, CustomerTransaction, Supplier, SupplierTransaction
+
+logger = logging.getLogger(__name__)
+
+# Bakiye özeti tutan modeller: (sahip model, defter modeli, defterdeki yabancı anahtar)
+LEDGERS = {
+    'customer': (Customer, CustomerTransaction, 'customer_id'),
+    'supplier': (Supplier, SupplierTransaction, 'supplier_id'),
+}
+
+
+def _ledger_totals_query(owner_model, transaction_model, owner_key, company_id=None):
+    """Defterden sahip başına borç/ödeme toplamları (tek GROUP BY)"""
+    query = db.session.query(
+        owner_model.id.label('owner_id'),
+        func.coalesce(func.sum(case(
+            (transaction_model.type == 'debt', transaction_model.amount), else_=0
+        )), 0).label('total_debt'),
+        func.coalesce(func.sum(case(
+            (transaction_model.type == 'payment', transaction_model.amount), else_=0
+        )), 0).label('total_payment')
+    ).outerjoin(
+        transaction_model, owner_model.id == getattr(transaction_model, owner_key)
+    ).group_by(owner_model.id)
+
+    if company_id is not None:
+        query = query.filter(owner_model.company_id == company_id)
+    return query
+
+
+def reconcile_balances(kind, company_id=None, fix=False):
+    """Saklanan bakiye özetlerini defterle karşılaştırır.
+
+    kind: 'customer' veya 'supplier'.
+    fix=True ise uyuşmayan kayıtlar defterdeki değerlerle yeniden yazılır.
+    Uyuşmayan kayıtların listesini döndürür.
+    """
+    owner_model, transaction_model, owner_key = LEDGERS[kind]
+    ledger = {
+        row.owner_id: (Decimal(str(row.total_debt)), Decimal(str(row.total_payment)))
+        for row in _ledger_totals_query(owner_model, transaction_model, owner_key, company_id)
+    }
+
+    stored_query = db.session.query(
+        owner_model.id, owner_model.company_id,
+        owner_model.total_debt, owner_model.total_payment, owner_model.balance
+    )
+    if company_id is not None:
+        stored_query = stored_query.filter(owner_model.company_id == company_id)
+
+    table = owner_model.__table__
+    mismatches = []
+    for row in stored_query:
+        total_debt, total_payment = ledger.get(row.id, (Decimal('0'), Decimal('0')))
+        expected_balance = total_debt - total_payment
+        stored = (
+            Decimal(str(row.total_debt or 0)),
+            Decimal(str(row.total_payment or 0)),
+            Decimal(str(row.balance or 0))
+        )
+        if stored == (total_debt, total_payment, expected_balance):
+            continue
+
+        mismatches.append({
+            'id': row.id,
+            'company_id': row.company_id,
+            'stored_balance': stored[2],
+            'ledger_balance': expected_balance
+        })
+        if fix:
+            db.session.execute(
+                table.update().where(table.c.id == row.id).values(
+                    total_debt=total_debt,
+                    total_payment=total_payment,
+                    balance=expected_balance
+                )
+            )
+
+    if fix and mismatches:
+        db.session.commit()
+        logger.info(f"Reconciled {len(mismatches)} {kind} balances")
+
+    return mismatches
+
+
+def reconcile_customer_balances(company_id=None, fix=False):
+    """Müşteri bakiyelerini customer_transactions defteriyle doğrular"""
+    return reconcile_balances('customer', company_id=company_id, fix=fix)
+
+
+def reconcile_supplier_balances(company_id=None, fix=False):
+    """Tedarikçi bakiyelerini supplier_transactions defteriyle doğrular"""
+    return reconcile_balances('supplier', company_id=company_id, fix=fix)
@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from flask import current_app
+from models import db, Customer, Receipt
+from cache import get_cache, data_version
+from services.summary_service import summary_totals
+
+RECENT_RECEIPTS_LIMIT = 5
+
+# İsabet/ıskalama sayaçları süreç içinde biriktirilir ve CACHE_COUNTER_FLUSH_SECONDS'ta
+# bir paylaşılan önbelleğe yazılır (her isabette ortak SQLite dosyasına yazma kilidi alınmaz)
+_pending_counts = {'hits': 0, 'misses': 0}
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def compute_dashboard_stats(company_id):
+    """Dashboard rakamlarını veritabanından hesaplar (önbelleksiz)"""
+    today = date.today()
+    # Gelir/gider toplamları günlük özet tablosundan (şirketin gün sayısı kadar satır)
+    totals = summary_totals(company_id)
+    today_totals = summary_totals(company_id, today, today)
+    total_income, total_expense = totals['income_total'], totals['expense_total']
+    today_income, today_expense = today_totals['income_total'], today_totals['expense_total']
+
+    # Müşteri borçları (saklanan bakiyelerden). Platform admin (company_id=None) tüm müşterileri görür.
+    debt_query = db.session.query(db.func.sum(Customer.balance))
+    if company_id is not None:
+        debt_query = debt_query.filter(Customer.company_id == company_id)
+    total_customer_debt = Decimal(str(debt_query.scalar() or 0))
+
+    receipts_query = Receipt.query.options(db.joinedload(Receipt.customer))
+    if company_id is not None:
+        receipts_query = receipts_query.filter(Receipt.company_id == company_id)
+    recent_receipts = receipts_query.order_by(Receipt.created_at.desc()).limit(RECENT_RECEIPTS_LIMIT).all()
+
+    return {
+        'cash_balance': str(total_income - total_expense),
+        'total_income': str(total_income),
+        'total_expense': str(total_expense),
+        'total_customer_debt': str(total_customer_debt),
+        'today_income': str(today_income),
+        'today_expense': str(today_expense),
+        'recent_receipts': [
+            {
+                'id': r.id,
+                'receipt_no': r.receipt_no,
+                'date': r.date.isoformat() if r.date else None,
+                'customer': {'name': r.customer.name if r.customer else None},
+                'total_amount': str(r.total_amount)
+            }
+            for r in recent_receipts
+        ]
+    }
+
+
+def _load(stats):
+    """JSON'dan gelen değerleri şablonların beklediği tiplere çevirir"""
+    result = {
+        key: Decimal(value) for key, value in stats.items() if key != 'recent_receipts'
+    }
+    result['recent_receipts'] = [
+        dict(r, date=date.fromisoformat(r['date']) if r['date'] else None, total_amount=Decimal(r['total_amount']))
+        for r in stats['recent_receipts']
+    ]
+    return result
+
+
+def get_dashboard_stats(company_id):
+    """Şirket dashboard rakamları - veri versiyonuna bağlı, worker'lar arası paylaşılan önbellekten.
+
+    Anahtar şirketin veri versiyonunu ve günün tarihini içerir; Transaction,
+    CustomerTransaction veya Receipt yazıldığında versiyon artar ve önbellek
+    kendiliğinden geçersiz olur.
+    """
+    if company_id is None:
+        return _load(compute_dashboard_stats(company_id))
+
+    cache = get_cache()
+    key = f'dashboard:{company_id}:{data_version(company_id)}:{date.today().isoformat()}'
+    stats = cache.get(key)
+    if stats is not None:
+        _count('hits')
+        return _load(stats)
+
+    _count('misses')
+    stats = compute_dashboard_stats(company_id)
+    cache.set(key, stats, ttl=current_app.config.get('DASHBOARD_CACHE_TTL', 300))
+    return _load(stats)
+
+
+def _count(result):
+    with _pending_lock:
+        _pending_counts[result] += 1
+        if time.monotonic() - _last_flush < current_app.config.get('CACHE_COUNTER_FLUSH_SECONDS', 10):
+            return
+    flush_cache_counters()
+
+
+def flush_cache_counters():
+    """Bu süreçte biriken sayaçları paylaşılan önbelleğe ekler"""
+    global _last_flush
+    with _pending_lock:
+        pending = dict(_pending_counts)
+        _pending_counts.update(hits=0, misses=0)
+        _last_flush = time.monotonic()
+    cache = get_cache()
+    for result, count in pending.items():
+        if count:
+            cache.incr(f'stats:dashboard:{result}', count)
+
+
+def get_cache_counters():
+    """Dashboard önbelleği isabet/ıskalama sayaçları (tüm süreçler; diğer süreçlerde bekleyenler hariç)"""
+    flush_cache_counters()
+    cache = get_cache()
+    hits = cache.get_counter('stats:dashboard:hits')
+    misses = cache.get_counter('stats:dashboard:misses')
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0
+    }
@@ -0,0 +1,139 @@
+"""
+API listeleri için keyset (imleç) sayfalama.
+
+OFFSET yerine son satırın sıralama anahtarından devam edilir:
+    WHERE (date, id) < (:son_tarih, :son_id) ORDER BY date DESC, id DESC LIMIT n
+Böylece derin sayfalar da ilk sayfa kadar hızlıdır ve COUNT(*) zorunlu değildir.
+İmleç, son anahtarı taşıyan opak bir base64 metnidir.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import func, text, tuple_
+
+from models import db
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Yaklaşık sayımda en fazla bu kadar satır sayılır (planlayıcı tahmini yoksa)
+APPROX_COUNT_CAP = 10000
+
+
+class InvalidCursor(ValueError):
+    """Çözülemeyen veya bu sıralamaya ait olmayan imleç"""
+
+
+def _signature(columns, descending):
+    return ','.join(column.key for column in columns) + (':desc' if descending else ':asc')
+
+
+def _dump(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load(column, value):
+    python_type = column.type.python_type
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is Decimal:
+            return Decimal(str(value))
+        if python_type is int:
+            return int(value)
+        return str(value)
+    except (TypeError, ValueError, InvalidOperation):
+        raise InvalidCursor('Geçersiz cursor')
+
+
+def encode_cursor(row, columns, descending):
+    payload = {
+        'o': _signature(columns, descending),
+        'k': [_dump(getattr(row, column.key)) for column in columns]
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token, columns, descending):
+    """İmleçteki son anahtarı kolon tiplerine çevirir; boş imleç ilk sayfa demektir"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor('Geçersiz cursor')
+    if not isinstance(payload, dict) or payload.get('o') != _signature(columns, descending):
+        raise InvalidCursor('Cursor bu sıralamaya ait değil')
+    keys = payload.get('k')
+    if not isinstance(keys, list) or len(keys) != len(columns):
+        raise InvalidCursor('Geçersiz cursor')
+    return [_load(column, value) for column, value in zip(columns, keys)]
+
+
+def _approximate_count(query):
+    """PostgreSQL'de planlayıcı tahmini, diğerlerinde APPROX_COUNT_CAP ile sınırlı sayım.
+
+    (sayı, tahmin_mi) döndürür.
+    """
+    statement = query.order_by(None).statement
+    bind = db.session.get_bind()
+    if bind.dialect.name == 'postgresql':
+        try:
+            compiled = statement.compile(dialect=bind.dialect, compile_kwargs={'literal_binds': True})
+            plan = db.session.execute(text(f'EXPLAIN (FORMAT JSON) {compiled}')).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows']), True
+        except Exception:
+            pass
+
+    capped = db.session.query(func.count()).select_from(
+        query.order_by(None).limit(APPROX_COUNT_CAP + 1).subquery()
+    ).scalar()
+    return min(capped, APPROX_COUNT_CAP), capped > APPROX_COUNT_CAP
+
+
+def keyset_page(query, columns, descending, cursor=None, limit=DEFAULT_LIMIT, count=None):
+    """Sorgunun imleçten sonraki sayfası.
+
+    columns: NOT NULL sıralama kolonları (son kolon benzersiz olmalı, ör. id).
+    count: None (sayım yok), 'exact' veya 'approx'.
+    Döndürür: {'items', 'next_cursor', 'has_next', 'limit', ['total', 'total_is_estimate']}
+    """
+    limit = max(1, min(limit or DEFAULT_LIMIT, MAX_LIMIT))
+    last_key = decode_cursor(cursor, columns, descending)
+
+    page_query = query.order_by(None).order_by(
+        *[column.desc() if descending else column.asc() for column in columns]
+    )
+    if last_key is not None:
+        key, last = tuple_(*columns), tuple_(*last_key)
+        page_query = page_query.filter(key < last if descending else key > last)
+
+    rows = page_query.limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    result = {
+        'items': rows,
+        'next_cursor': encode_cursor(rows[-1], columns, descending) if has_next else None,
+        'has_next': has_next,
+        'limit': limit
+    }
+    if count == 'exact':
+        result['total'] = query.order_by(None).count()
+        result['total_is_estimate'] = False
+    elif count == 'approx':
+        result['total'], result['total_is_estimate'] = _approximate_count(query)
+    return result
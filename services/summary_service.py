@@ -0,0 +1,123 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import func, case
+from models import db, DailySummary, Transaction, Receipt, Customer, CustomerTransaction
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 1000
+CENTS = Decimal('0.01')
+
+
+def _to_value(column, value):
+    if column == 'receipt_count':
+        return int(value or 0)
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+def _raw_daily_totals(company_id=None):
+    """Ham tablolardan (şirket, gün) bazında özet değerleri - üç GROUP BY sorgusu"""
+    totals = defaultdict(lambda: {column: 0 for column in DailySummary.TOTAL_COLUMNS})
+
+    transactions = db.session.query(
+        Transaction.company_id,
+        Transaction.date,
+        func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)),
+        func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0))
+    ).group_by(Transaction.company_id, Transaction.date)
+
+    receipts = db.session.query(
+        Receipt.company_id,
+        Receipt.date,
+        func.count(Receipt.id),
+        func.sum(Receipt.grand_total)
+    ).group_by(Receipt.company_id, Receipt.date)
+
+    ledger = db.session.query(
+        Customer.company_id,
+        CustomerTransaction.date,
+        func.sum(case((CustomerTransaction.type == 'debt', CustomerTransaction.amount), else_=0)),
+        func.sum(case((CustomerTransaction.type == 'payment', CustomerTransaction.amount), else_=0))
+    ).join(
+        Customer, CustomerTransaction.customer_id == Customer.id
+    ).group_by(Customer.company_id, CustomerTransaction.date)
+
+    if company_id is not None:
+        transactions = transactions.filter(Transaction.company_id == company_id)
+        receipts = receipts.filter(Receipt.company_id == company_id)
+        ledger = ledger.filter(Customer.company_id == company_id)
+
+    for query, columns in (
+        (transactions, ('income_total', 'expense_total')),
+        (receipts, ('receipt_count', 'receipt_total')),
+        (ledger, ('debt_total', 'payment_total')),
+    ):
+        for row_company_id, day, *values in query:
+            if row_company_id is None or day is None:
+                continue
+            entry = totals[(row_company_id, day)]
+            for column, value in zip(columns, values):
+                entry[column] = _to_value(column, value)
+    return totals
+
+
+def backfill_daily_summaries(company_id=None):
+    """Günlük özetleri ham tablolardan yeniden oluşturur; yazılan gün sayısını döndürür.
+
+    Şirketin (veya tüm şirketlerin) mevcut özet satırları silinip tek
+    transaction'da yeniden yazılır. Yoğun yazım saatleri dışında çalıştırılmalıdır.
+    """
+    totals = _raw_daily_totals(company_id)
+    table = DailySummary.__table__
+
+    delete = table.delete()
+    if company_id is not None:
+        delete = delete.where(table.c.company_id == company_id)
+    db.session.execute(delete)
+
+    rows = [
+        dict(values, company_id=row_company_id, date=day)
+        for (row_company_id, day), values in sorted(totals.items())
+    ]
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.session.execute(table.insert(), rows[start:start + INSERT_BATCH_SIZE])
+    db.session.commit()
+
+    logger.info(f"Backfilled {len(rows)} daily summaries")
+    return len(rows)
+
+
+def summary_totals(company_id, start_date=None, end_date=None):
+    """Tarih aralığındaki toplamlar (gün sayısı kadar satır okunur).
+
+    Ham işlem sorgularıyla aynı şekilde company_id None ise sonuç sıfırdır.
+    """
+    query = db.session.query(*[
+        func.coalesce(func.sum(getattr(DailySummary, column)), 0) for column in DailySummary.TOTAL_COLUMNS
+    ]).filter(DailySummary.company_id == company_id)
+    if start_date is not None:
+        query = query.filter(DailySummary.date >= start_date)
+    if end_date is not None:
+        query = query.filter(DailySummary.date <= end_date)
+
+    row = query.one()
+    return {column: _to_value(column, value) for column, value in zip(DailySummary.TOTAL_COLUMNS, row)}
+
+
+def monthly_totals(company_id, start_date, end_date):
+    """(yıl, ay) -> toplamlar; günlük satırlar Python'da aylara toplanır"""
+    query = db.session.query(
+        DailySummary.date, *[getattr(DailySummary, column) for column in DailySummary.TOTAL_COLUMNS]
+    ).filter(
+        DailySummary.company_id == company_id,
+        DailySummary.date >= start_date,
+        DailySummary.date <= end_date
+    )
+
+    months = defaultdict(lambda: {column: _to_value(column, 0) for column in DailySummary.TOTAL_COLUMNS})
+    for day, *values in query:
+        entry = months[(day.year, day.month)]
+        for column, value in zip(DailySummary.TOTAL_COLUMNS, values):
+            entry[column] += _to_value(column, value)
+    return months
@@ -0,0 +1,369 @@
+"""
+Performans ölçümleri için deterministik sentetik veri üretici.
+
+Her şirket için onaylı şirket kaydı, bir admin kullanıcı, ürünler, müşteriler,
+tedarikçiler, gelir/gider işlemleri, fişler (kalemleri ve veresiye borç
+kayıtlarıyla), müşteri ödemeleri ve tedarikçi borç/ödemeleri yazılır.
+
+- Aynı seed ve bitiş tarihiyle aynı satırlar üretilir (her şirketin kendi
+  random.Random akışı vardır; şirket sayısını artırmak öncekileri değiştirmez).
+- Satırlar ORM nesnesi oluşturulmadan Core executemany ile batch_size'lık
+  parçalar halinde yazılır; milyonlarca satırda bellek parça boyutuyla sınırlıdır.
+- Toplu yazım ORM olaylarını tetiklemez: bakiye özetleri üretim sırasında
+  hesaplanıp yazılır, günlük özetler backfill_daily_summaries ile oluşturulur,
+  fiş sayacı son numaraya ayarlanır.
+"""
+
+import logging
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import bindparam
+from werkzeug.security import generate_password_hash
+
+from models import (
+    db, Company, User, Customer, CustomerTransaction, Product, Receipt, ReceiptItem, ReceiptSequence,
+    Supplier, SupplierTransaction, Transaction
+)
+from services.summary_service import backfill_daily_summaries
+
+logger = logging.getLogger(__name__)
+
+USERNAME_PREFIX = 'sentetik'
+DEFAULT_PASSWORD = 'Sentetik123!'
+
+FIRST_NAMES = ('Ahmet', 'Ayşe', 'Mehmet', 'Fatma', 'Ali', 'Zeynep', 'Mustafa', 'Elif', 'Hasan', 'Emine',
+               'Hüseyin', 'Hatice', 'İbrahim', 'Merve', 'Murat', 'Selin', 'Can', 'Derya', 'Emre', 'Gül')
+LAST_NAMES = ('Yılmaz', 'Demir', 'Kaya', 'Öztürk', 'Vural', 'Çelik', 'Şahin', 'Aydın', 'Arslan', 'Doğan',
+              'Kılıç', 'Aslan', 'Çetin', 'Koç', 'Kurt', 'Özdemir', 'Polat', 'Erdoğan', 'Yıldız', 'Güneş')
+PRODUCT_NAMES = ('Çay', 'Kahve', 'Sandviç', 'Su', 'Meyve Suyu', 'Simit', 'Poğaça', 'Tost', 'Ayran', 'Kek',
+                 'Un', 'Şeker', 'Pirinç', 'Makarna', 'Yağ', 'Peynir', 'Zeytin', 'Yumurta', 'Süt', 'Ekmek')
+UNITS = ('adet', 'kg', 'paket', 'litre', 'fincan')
+SUPPLIER_KINDS = ('Gıda', 'Toptan', 'Ambalaj', 'İçecek', 'Temizlik', 'Lojistik')
+CITIES = ('İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Konya')
+BUSINESS_TYPES = ('kafe', 'market', 'restoran', 'genel')
+INCOME_DESCRIPTIONS = ('Günlük ciro', 'Toptan satış', 'Hizmet geliri', 'Kasa')
+EXPENSE_DESCRIPTIONS = ('Kira', 'Elektrik faturası', 'Su faturası', 'Malzeme alışverişi', 'Personel', 'İnternet faturası')
+TAX_RATES = (0, 1, 10, 20)
+
+
+def _money(rng, low, high):
+    """[low, high] aralığında kuruş hassasiyetinde tutar"""
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+def _moment(rng, day):
+    """Gün içinde deterministik bir zaman (created_at)"""
+    return datetime.combine(day, time(rng.randint(8, 21), rng.randint(0, 59), rng.randint(0, 59)))
+
+
+def _insert_rows(table, rows, batch_size):
+    """Satır üretecini batch_size'lık parçalar halinde yazar; yazılan satır sayısını döndürür"""
+    count, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        count += len(batch)
+    return count
+
+
+def _company_ids(model, company_id):
+    """Şirketin yeni yazılan satırlarının id'leri, yazım sırasıyla"""
+    table = model.__table__
+    return list(db.session.execute(
+        db.select(table.c.id).where(table.c.company_id == company_id).order_by(table.c.id)
+    ).scalars())
+
+
+def _write_balances(model, ids, debts, payments, updated_at, batch_size):
+    """Üretim sırasında toplanan borç/ödeme toplamlarını bakiye özetlerine yazar"""
+    table = model.__table__
+    stmt = table.update().where(table.c.id == bindparam('owner_id')).values(
+        total_debt=bindparam('debt'), total_payment=bindparam('payment'), balance=bindparam('owner_balance'),
+        updated_at=updated_at
+    )
+    rows = (
+        {'owner_id': owner_id, 'debt': debt, 'payment': payment, 'owner_balance': debt - payment}
+        for owner_id, debt, payment in zip(ids, debts, payments) if debt or payment
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(stmt, batch)
+            batch = []
+    if batch:
+        db.session.execute(stmt, batch)
+    db.session.commit()
+
+
+class _CompanyGenerator:
+    """Tek bir şirketin satırlarını kendi random akışıyla üretir ve yazar"""
+
+    def __init__(self, number, options, password_hash):
+        self.number = number
+        self.options = options
+        self.password_hash = password_hash
+        self.rng = random.Random(f"{options['seed']}:{number}")
+        self.end_date = options['end_date']
+        self.start_date = self.end_date - timedelta(days=options['days'] - 1)
+        # Ana kayıtların oluşturulma/güncellenme zamanı - deterministik olsun diye sabit
+        self.created_at = datetime.combine(self.start_date, time(9))
+        self.username = f"{options['prefix']}{number}"
+        self.counts = {}
+
+    def random_day(self):
+        return self.start_date + timedelta(days=self.rng.randrange(self.options['days']))
+
+    def run(self):
+        rng, batch_size = self.rng, self.options['batch_size']
+
+        company = Company(
+            name=f'Sentetik İşletme {self.number}',
+            business_type=rng.choice(BUSINESS_TYPES),
+            authorized_person=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            email=f'{self.username}@sentetik.local',
+            city=rng.choice(CITIES),
+            status='approved',
+            created_at=self.created_at,
+            updated_at=self.created_at
+        )
+        db.session.add(company)
+        db.session.flush()
+        self.company_id = company.id
+        db.session.add(User(
+            company_id=company.id, username=self.username, email=f'{self.username}@kullanici.sentetik.local',
+            password_hash=self.password_hash, role='admin', is_active=True, force_password_change=False
+        ))
+        db.session.commit()
+
+        self.counts['products'] = _insert_rows(Product.__table__, self.product_rows(), batch_size)
+        self.counts['customers'] = _insert_rows(Customer.__table__, self.customer_rows(), batch_size)
+        self.counts['suppliers'] = _insert_rows(Supplier.__table__, self.supplier_rows(), batch_size)
+        self.counts['transactions'] = _insert_rows(Transaction.__table__, self.transaction_rows(), batch_size)
+
+        customer_ids = _company_ids(Customer, company.id)
+        self.customer_debts = [Decimal('0')] * len(customer_ids)
+        self.customer_payments = [Decimal('0')] * len(customer_ids)
+        self.write_receipts(customer_ids, _company_ids(Product, company.id))
+        self.counts['customer_payments'] = _insert_rows(
+            CustomerTransaction.__table__, self.customer_payment_rows(customer_ids), batch_size
+        )
+        _write_balances(
+            Customer, customer_ids, self.customer_debts, self.customer_payments, self.created_at, batch_size
+        )
+
+        supplier_ids = _company_ids(Supplier, company.id)
+        self.supplier_debts = [Decimal('0')] * len(supplier_ids)
+        self.supplier_payments = [Decimal('0')] * len(supplier_ids)
+        self.counts['supplier_transactions'] = _insert_rows(
+            SupplierTransaction.__table__, self.supplier_transaction_rows(supplier_ids), batch_size
+        )
+        _write_balances(
+            Supplier, supplier_ids, self.supplier_debts, self.supplier_payments, self.created_at, batch_size
+        )
+
+        db.session.execute(ReceiptSequence.__table__.insert().values(
+            company_id=company.id, last_value=self.counts['receipts']
+        ))
+        db.session.commit()
+        self.counts['daily_summaries'] = backfill_daily_summaries(company_id=company.id)
+        return {'company_id': company.id, 'username': self.username, 'counts': self.counts}
+
+    def product_rows(self):
+        rng = self.rng
+        for index in range(self.options['products']):
+            unit_price = _money(rng, 1, 500)
+            yield {
+                'company_id': self.company_id,
+                'name': f'{rng.choice(PRODUCT_NAMES)} {index + 1}',
+                'unit': rng.choice(UNITS),
+                'unit_price': unit_price,
+                'purchase_price': (unit_price * Decimal('0.6')).quantize(Decimal('0.01')),
+                'stock_quantity': Decimal(rng.randint(0, 500)),
+                'stock_threshold': Decimal(rng.choice((5, 10, 20))),
+                'created_at': self.created_at,
+                'updated_at': self.created_at,
+            }
+
+    def customer_rows(self):
+        rng = self.rng
+        for _ in range(self.options['customers']):
+            yield {
+                'company_id': self.company_id,
+                'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'phone': f'05{rng.randint(30, 59)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}',
+                'notes': '',
+                'created_at': self.created_at,
+                'updated_at': self.created_at,
+            }
+
+    def supplier_rows(self):
+        rng = self.rng
+        for index in range(self.options['suppliers']):
+            yield {
+                'company_id': self.company_id,
+                'name': f'{rng.choice(SUPPLIER_KINDS)} Tedarik {index + 1}',
+                'contact_person': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'phone': f'0212 {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}',
+                'is_active': rng.random() > 0.1,
+                'created_at': self.created_at,
+                'updated_at': self.created_at,
+            }
+
+    def transaction_rows(self):
+        rng = self.rng
+        for _ in range(self.options['transactions']):
+            day = self.random_day()
+            income = rng.random() < 0.6
+            yield {
+                'company_id': self.company_id,
+                'type': 'income' if income else 'expense',
+                'amount': _money(rng, 50, 5000) if income else _money(rng, 20, 2000),
+                'description': rng.choice(INCOME_DESCRIPTIONS if income else EXPENSE_DESCRIPTIONS),
+                'date': day,
+                'created_at': _moment(rng, day),
+            }
+
+    def write_receipts(self, customer_ids, product_ids):
+        """Fişleri, kalemlerini ve veresiye borç kayıtlarını parça parça yazar"""
+        rng, options = self.rng, self.options
+        receipts_table = Receipt.__table__
+        count = options['receipts'] if customer_ids and product_ids else 0
+        prices = dict(zip(product_ids, db.session.execute(
+            db.select(Product.__table__.c.unit_price).where(Product.__table__.c.company_id == self.company_id)
+            .order_by(Product.__table__.c.id)
+        ).scalars()))
+        # Fiş id'leri receipt_no ile geri okunur; IN listesi parametre sınırının altında kalsın
+        batch_size = min(options['batch_size'], 500)
+        items_total = ledger_total = 0
+
+        for start in range(0, count, batch_size):
+            receipts, items, ledger = [], {}, []
+            for value in range(start + 1, min(start + batch_size, count) + 1):
+                receipt_no = ReceiptSequence.format_receipt_no(value)
+                customer_index = rng.randrange(len(customer_ids))
+                day = self.random_day()
+                lines, total = [], Decimal('0')
+                for _ in range(rng.randint(1, 2 * options['items_per_receipt'] - 1)):
+                    product_id = rng.choice(product_ids)
+                    quantity = Decimal(rng.randint(1, 5))
+                    line_total = quantity * prices[product_id]
+                    total += line_total
+                    lines.append({
+                        'product_id': product_id, 'quantity': quantity,
+                        'unit_price': prices[product_id], 'total_price': line_total,
+                    })
+                tax_rate = Decimal(rng.choice(TAX_RATES))
+                tax_amount = (total * tax_rate / 100).quantize(Decimal('0.01'))
+                grand_total = total + tax_amount
+                receipts.append({
+                    'company_id': self.company_id, 'customer_id': customer_ids[customer_index],
+                    'receipt_no': receipt_no, 'total_amount': total, 'tax_rate': tax_rate,
+                    'tax_amount': tax_amount, 'grand_total': grand_total, 'notes': 'Satış',
+                    'date': day, 'created_at': _moment(rng, day),
+                })
+                items[receipt_no] = lines
+                ledger.append({
+                    'customer_id': customer_ids[customer_index], 'type': 'debt', 'amount': grand_total,
+                    'description': f'Fiş #{receipt_no} - Satış', 'date': day, 'created_at': _moment(rng, day),
+                })
+                self.customer_debts[customer_index] += grand_total
+
+            db.session.execute(receipts_table.insert(), receipts)
+            ids = dict(db.session.execute(
+                db.select(receipts_table.c.receipt_no, receipts_table.c.id).where(
+                    receipts_table.c.company_id == self.company_id,
+                    receipts_table.c.receipt_no.in_(list(items))
+                )
+            ).all())
+            item_rows = [
+                dict(line, receipt_id=ids[receipt_no]) for receipt_no, lines in items.items() for line in lines
+            ]
+            db.session.execute(ReceiptItem.__table__.insert(), item_rows)
+            db.session.execute(CustomerTransaction.__table__.insert(), ledger)
+            db.session.commit()
+            items_total += len(item_rows)
+            ledger_total += len(ledger)
+
+        self.counts['receipts'] = count
+        self.counts['receipt_items'] = items_total
+        self.counts['customer_debts'] = ledger_total
+
+    def customer_payment_rows(self, customer_ids):
+        """Borcu olan müşterilerden kalan borcu aşmayan tahsilatlar"""
+        rng = self.rng
+        if not customer_ids:
+            return
+        for _ in range(self.options['customer_payments']):
+            index = rng.randrange(len(customer_ids))
+            outstanding = self.customer_debts[index] - self.customer_payments[index]
+            if outstanding <= 0:
+                continue
+            amount = max(Decimal('0.01'), (outstanding * Decimal(rng.randint(10, 100)) / 100).quantize(Decimal('0.01')))
+            self.customer_payments[index] += amount
+            day = self.random_day()
+            yield {
+                'customer_id': customer_ids[index], 'type': 'payment', 'amount': amount,
+                'description': 'Tahsilat', 'date': day, 'created_at': _moment(rng, day),
+            }
+
+    def supplier_transaction_rows(self, supplier_ids):
+        rng = self.rng
+        if not supplier_ids:
+            return
+        for _ in range(self.options['supplier_transactions']):
+            index = rng.randrange(len(supplier_ids))
+            outstanding = self.supplier_debts[index] - self.supplier_payments[index]
+            if outstanding > 0 and rng.random() < 0.4:
+                tx_type = 'payment'
+                amount = (outstanding * Decimal(rng.randint(10, 100)) / 100).quantize(Decimal('0.01'))
+                self.supplier_payments[index] += amount
+            else:
+                tx_type = 'debt'
+                amount = _money(rng, 100, 20000)
+                self.supplier_debts[index] += amount
+            day = self.random_day()
+            yield {
+                'supplier_id': supplier_ids[index], 'type': tx_type, 'amount': amount,
+                'description': 'Mal alımı' if tx_type == 'debt' else 'Ödeme', 'date': day,
+                'created_at': _moment(rng, day),
+            }
+
+
+def generate_synthetic_data(companies=1, customers=200, products=100, suppliers=20, transactions=2000,
+                            receipts=1000, items_per_receipt=3, customer_payments=None,
+                            supplier_transactions=None, days=365, end_date=None, seed=42,
+                            prefix=USERNAME_PREFIX, password=DEFAULT_PASSWORD, batch_size=5000, start=1):
+    """Sentetik şirketler ve verileri yazar; şirket başına özet listesi döndürür.
+
+    Sayılar şirket başınadır. customer_payments varsayılanı fiş sayısının yarısı,
+    supplier_transactions varsayılanı tedarikçi başına 10 kayıttır. Şirketler
+    start numarasından başlayarak numaralandırılır; kullanıcı adı
+    `{prefix}{numara}`, şifre tüm şirketlerde `password`'dür.
+    """
+    options = {
+        'customers': customers, 'products': products, 'suppliers': suppliers,
+        'transactions': transactions, 'receipts': receipts,
+        'items_per_receipt': max(1, items_per_receipt),
+        'customer_payments': receipts // 2 if customer_payments is None else customer_payments,
+        'supplier_transactions': suppliers * 10 if supplier_transactions is None else supplier_transactions,
+        'days': max(1, days), 'end_date': end_date or date.today(), 'seed': seed, 'prefix': prefix,
+        'batch_size': max(1, batch_size),
+    }
+    # Aynı hash tüm kullanıcılarda kullanılır - binlerce şirkette hashleme maliyeti olmasın
+    password_hash = generate_password_hash(password)
+    results = []
+    for number in range(start, start + companies):
+        result = _CompanyGenerator(number, options, password_hash).run()
+        logger.info(f"Synthetic company {number} (id {result['company_id']}): {result['counts']}")
+        results.append(result)
+    return results
@@ -0,0 +1,211 @@
+"""
+Yavaş SQL sorgu logu.
+
+SLOW_QUERY_MS eşiğinden uzun süren her SQL ifadesi; endpoint (istek dışında
+CLI/betik için '-'), company_id ve normalize edilmiş SQL parmak iziyle
+uyarı olarak loglanır. Parmak izi literal ve parametreleri '?' ile değiştirir,
+IN listelerini tek elemana indirir; aynı sorgu farklı değerlerle aynı izi verir.
+
+SLOW_QUERY_EXPLAIN açıksa her parmak izinin ilk yavaş örneği için plan alınır:
+- PostgreSQL: EXPLAIN (ANALYZE, BUFFERS) - sorgu bir kez daha çalıştırılır,
+  hata transaction'ı bozmasın diye savepoint içinde
+- SQLite: EXPLAIN QUERY PLAN (sorgu çalıştırılmaz)
+Yalnızca SELECT/WITH ifadelerinin planı alınır (ANALYZE yazan ifadeyi tekrarlar).
+
+Parmak izi başına sayaç, toplam/en yüksek süre, son endpoint ve plan süreç
+içinde tutulur; platform admin /api/stats/slow-queries adresinden okur.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?')
+_IN_LIST = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(
+    r'\bvalues\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*', re.IGNORECASE
+)
+_WHITESPACE = re.compile(r'\s+')
+_EXPLAINABLE = re.compile(r'^\s*(select|with)\b', re.IGNORECASE)
+_EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+
+def normalize_sql(statement):
+    """Literal ve parametreleri '?' yapar, IN/VALUES listelerini daraltır, boşlukları tekler"""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip()
+    normalized = _IN_LIST.sub('IN (?)', normalized)
+    return _VALUES_LIST.sub(r'VALUES \1', normalized)
+
+
+def fingerprint(statement):
+    """Normalize edilmiş SQL'in kısa özeti ve kendisi: (parmak izi, normalize SQL)"""
+    normalized = normalize_sql(statement)
+    return hashlib.sha1(normalized.lower().encode()).hexdigest()[:12], normalized
+
+
+def _query_context():
+    if has_request_context():
+        endpoint = request.endpoint or request.path
+    else:
+        endpoint = '-'
+    company_id = g.get('company_id') if has_app_context() else None
+    return endpoint, company_id
+
+
+def _sqlite_plan(rows):
+    """EXPLAIN QUERY PLAN satırlarını (id, parent, notused, detail) girintili ağaca çevirir"""
+    depth, lines = {0: -1}, []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append(f"{'  ' * depth[node_id]}{detail}")
+    return '\n'.join(lines)
+
+
+def explain(dbapi_connection, dialect, statement, parameters):
+    """İfadenin planını aynı DBAPI bağlantısında alır; desteklenmiyorsa None"""
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect == 'postgresql':
+            cursor.execute(f'SAVEPOINT {_EXPLAIN_SAVEPOINT}')
+            try:
+                cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {statement}', parameters)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            except Exception:
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}')
+                raise
+            cursor.execute(f'RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}')
+            return plan
+        if dialect == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            return _sqlite_plan(cursor.fetchall())
+        return None
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Parmak izi başına yavaş sorgu özetleri (süreç içi)"""
+
+    def __init__(self, threshold_ms=200, explain=False, max_fingerprints=500):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.max_fingerprints = max_fingerprints
+        # Her yavaş sorgudan sonra (parmak izi, süre, endpoint) ile çağrılır (ör. Prometheus)
+        self.observers = []
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key, normalized):
+        """Parmak izini kaydeder; ilk görülüşse (ve sınır dolmadıysa) True"""
+        with self._lock:
+            if key in self._entries:
+                return False
+            if len(self._entries) >= self.max_fingerprints:
+                return False
+            self._entries[key] = {
+                'sql': normalized, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'last_endpoint': None, 'last_company_id': None, 'plan': None,
+            }
+            return True
+
+    def record(self, key, duration, endpoint, company_id):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['count'] += 1
+            entry['total_ms'] += duration * 1000
+            entry['max_ms'] = max(entry['max_ms'], duration * 1000)
+            entry['last_endpoint'] = endpoint
+            entry['last_company_id'] = company_id
+
+    def set_plan(self, key, plan):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]['plan'] = plan
+
+    def snapshot(self):
+        """Parmak izi başına özet; toplam süresi en yüksek önce"""
+        with self._lock:
+            entries = {key: dict(entry) for key, entry in self._entries.items()}
+        for entry in entries.values():
+            entry['total_ms'] = round(entry['total_ms'], 2)
+            entry['max_ms'] = round(entry['max_ms'], 2)
+        return dict(sorted(entries.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def install_slow_query_log(engine, slow_log):
+    """Engine'in cursor olaylarına yavaş sorgu dinleyicisini bağlar"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'handle_error')
+    def _handle_error(context):
+        # Hata alan ifadenin başlangıç zamanı yığında kalmasın
+        connection = context.connection
+        if connection is not None and connection.info.get('slow_query_start'):
+            connection.info['slow_query_start'].pop()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('slow_query_start')
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if duration < slow_log.threshold:
+            return
+
+        key, normalized = fingerprint(statement)
+        endpoint, company_id = _query_context()
+        first = slow_log.claim(key, normalized)
+        slow_log.record(key, duration, endpoint, company_id)
+        logger.warning(
+            'Yavaş sorgu %.0f ms [%s] endpoint=%s company_id=%s: %s',
+            duration * 1000, key, endpoint, company_id, normalized[:1000]
+        )
+        for observer in slow_log.observers:
+            observer(key, duration, endpoint)
+
+        if not (first and slow_log.explain and not executemany and _EXPLAINABLE.match(statement)):
+            return
+        try:
+            plan = explain(conn.connection.dbapi_connection, conn.dialect.name, statement, parameters)
+        except Exception as e:
+            logger.warning('Sorgu planı alınamadı [%s]: %s', key, e)
+            return
+        if plan:
+            slow_log.set_plan(key, plan)
+            logger.warning('Sorgu planı [%s]:\n%s', key, plan)
+
+
+def init_slow_query_log(app):
+    """Yavaş sorgu logunu uygulamaya bağlar (app.extensions['slow_queries'])"""
+    from models import db
+
+    slow_log = SlowQueryLog(
+        threshold_ms=app.config.get('SLOW_QUERY_MS', 200),
+        explain=app.config.get('SLOW_QUERY_EXPLAIN', False),
+        max_fingerprints=app.config.get('SLOW_QUERY_MAX_FINGERPRINTS', 500),
+    )
+    app.extensions['slow_queries'] = slow_log
+    with app.app_context():
+        engine = db.engine
+    install_slow_query_log(engine, slow_log)
@@ -24,4 +24,5 @@ fi
 echo ""
 echo "[2/2] Starting Gunicorn server..."
 echo "------------------------------------------"
-exec gunicorn --workers 1 --timeout 120 --bind 0.0.0.0:8080 "app:create_app()"
+# Worker sayısı/sınıfı, preload ve zaman aşımı gunicorn.conf.py içinde (GUNICORN_PROFILE)
+exec gunicorn -c gunicorn.conf.py "app:create_app()"
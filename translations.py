@@ -1,5 +1,7 @@
 # Çoklu dil desteği - Türkçe ve Arapça
 
+from types import MappingProxyType
+
 TRANSLATIONS = {
     'tr': {
         # Genel
@@ -364,6 +366,13 @@ TRANSLATIONS = {
         'total_paid': 'Toplam Ödenen',
         'stock_report_subtitle': 'Mevcut stok ve düşük stok uyarıları',
         'show_low_stock_only': 'Sadece Düşük Stokları Göster',
+        
+        # Rapor export kolonları
+        'entry_type': 'Tür',
+        'stock': 'Stok',
+        'purchase_price': 'Alış Fiyatı',
+        'stock_value': 'Stok Değeri',
+        'sales_quantity': 'Satış Miktarı',
     },
     
     'ar': {
@@ -729,25 +738,66 @@ TRANSLATIONS = {
         'total_paid': 'إجمالي المدفوع',
         'stock_report_subtitle': 'المخزون الحالي وتنبيهات المخزون المنخفض',
         'show_low_stock_only': 'عرض المخزون المنخفض فقط',
+        
+        # أعمدة تصدير التقارير
+        'entry_type': 'النوع',
+        'stock': 'المخزون',
+        'purchase_price': 'سعر الشراء',
+        'stock_value': 'قيمة المخزون',
+        'sales_quantity': 'كمية المبيعات',
     }
 }
 
-class TranslationDict:
-    """Dict wrapper that allows attribute access without conflicting with built-in methods"""
-    def __init__(self, data):
-        self._data = data
-    
+# Rakam çeviri tabloları - filtrelerde her çağrıda yeniden oluşturulmaz
+DIGIT_TABLES = {
+    'ar': str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩'),
+}
+
+
+class TranslationBundle:
+    """Bir dilin derlenmiş, salt okunur çevirileri.
+
+    Anahtarlar alt sınıfın __slots__ özniteliği olarak tutulur; template'deki
+    t.anahtar erişimi sözlük sarmalayıcısı yerine doğrudan slot okumasıdır.
+    Eksik anahtar için anahtarın kendisi döner.
+    """
+
+    __slots__ = ()
+
     def __getattr__(self, key):
         if key.startswith('_'):
-            return object.__getattribute__(self, key)
-        return self._data.get(key, key)
-    
+            raise AttributeError(key)
+        return key
+
+    def __setattr__(self, key, value):
+        raise AttributeError('Çeviriler salt okunurdur')
+
+    def __delattr__(self, key):
+        raise AttributeError('Çeviriler salt okunurdur')
+
     def __getitem__(self, key):
         return self._data.get(key, key)
-    
+
     def get(self, key, default=None):
         return self._data.get(key, default if default is not None else key)
 
+
+def _compile_bundle(lang, data):
+    """Dil sözlüğünden slot tabanlı, dondurulmuş bir nesne üretir"""
+    bundle_class = type(f'TranslationBundle_{lang}', (TranslationBundle,), {
+        '__slots__': tuple(data),
+        '_data': MappingProxyType(dict(data)),
+    })
+    bundle = object.__new__(bundle_class)
+    for key, value in data.items():
+        object.__setattr__(bundle, key, value)
+    return bundle
+
+
+# Uygulama başlarken bir kez derlenir
+BUNDLES = {lang: _compile_bundle(lang, data) for lang, data in TRANSLATIONS.items()}
+
+
 def get_translation(key, lang='tr'):
     """Belirtilen dilde çeviriyi döndürür"""
     if lang not in TRANSLATIONS:
@@ -755,7 +805,5 @@ def get_translation(key, lang='tr'):
     return TRANSLATIONS.get(lang, {}).get(key, key)
 
 def get_all_translations(lang='tr'):
-    """Belirtilen dilin tüm çevirilerini döndürür"""
-    if lang not in TRANSLATIONS:
-        lang = 'tr'
-    return TranslationDict(TRANSLATIONS.get(lang, TRANSLATIONS['tr']))
+    """Belirtilen dilin derlenmiş çevirilerini döndürür"""
+    return BUNDLES.get(lang) or BUNDLES['tr']